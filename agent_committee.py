@@ -1,25 +1,108 @@
 """
 Deep Research — Multi-agent stock research pipeline using Anthropic Claude.
 
-7-agent pipeline: Planner → Researcher → Quant → Qual → Moderator → Writer → Risk
+7-agent pipeline: Planner → Researcher → Quant ∥ Qual (map-reduce over ticker groups for 30+ tickers) → Moderator → Writer → Risk
 Uses yfinance for live market data and InvestIQ local data files for proprietary scores.
 """
 
+import hashlib
+import heapq
+import importlib
 import json
 import os
+import re
+import threading
 import time
 import traceback
 import urllib.request
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from contextlib import contextmanager, nullcontext
 from datetime import datetime
 
-import anthropic
-import yfinance as yf
+import criteria_codec
+from request_metrics import observe_outbound, outbound
+from research_cache import get_cache, get_llm_cache
+
+
+class _LazyModule:
+    """Stand-in for a heavy module that imports it on first attribute access.
+
+    Keeps the anthropic SDK off the import path of everything that only needs the helpers here
+    (flight keys, timing stats, data context). research_replay.py still swaps the module-level name.
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+
+anthropic = _LazyModule("anthropic")
 
 # ── Constants ──
 MODEL = "claude-opus-4-6"
 MODEL_FAST = "claude-sonnet-4-6"  # For verification passes — fast + cheap
 MAX_RESEARCH_PASSES = 3
 MAX_CYCLES = 5
+STREAM_FLUSH_SECS = 0.1  # report_delta coalescing window
+TIMING_HISTORY = 200  # recent runs kept for timing_stats()
+
+# Context budgets (estimated tokens) for the research-data block of each prompt
+ANALYST_CONTEXT_TOKENS = 10000
+QUICK_CONTEXT_TOKENS = 7000
+SHARED_CONTEXT_SHARE = 0.3  # max share of a budget for platform (scout) data; the rest is split across tickers
+
+# Map-reduce analysis for large ticker sets (e.g. 30+ holding portfolios): tickers are sharded into
+# groups analyzed in parallel, each with its own compact context, and the Moderator/Writer reduce them
+BATCH_MIN_TICKERS = 30
+BATCH_SIZE = 8  # tickers per group
+BATCH_MAX_TICKERS = 120  # yfinance deep-fetch cap in batched mode; tickers past it are grouped on InvestIQ data alone
+BATCH_MAX_WORKERS = -(-BATCH_MAX_TICKERS // BATCH_SIZE)  # every deep-fetched group in one wave, so wall time stays flat
+BATCH_CONTEXT_TOKENS = 6000
+BATCH_DATA_TYPES = ["stock_info", "price_history"]  # per-ticker context is small in batched mode; skip the rest
+
+# Per-ticker sections, most valuable first — the tail is dropped first when a ticker is over budget
+SECTION_PRIORITY = ["investiq", "stock_info", "earnings", "price_history", "analyst_recommendations", "error"]
+# JSON fields stripped before any whole section is dropped
+LOW_VALUE_FIELDS = {
+    "iq_criteria", "reasons", "enterpriseValue", "targetHighPrice", "targetLowPrice", "shortRatio",
+    "heldPercentInsiders", "heldPercentInstitutions", "fiftyTwoWeekHigh", "fiftyTwoWeekLow", "dividendYield",
+}
+
+# Opt-in LLM response cache (per request, or RESEARCH_LLM_CACHE=1 for every run)
+LLM_CACHE_DEFAULT = os.environ.get("RESEARCH_LLM_CACHE", "").lower() in ("1", "true", "yes")
+
+# Local data files whose contents feed the prompts — their mtimes/sizes define the data generation
+GENERATION_FILES = [
+    "data/all_stocks.json", "data/sec_fundamentals.json", "data/insider_universe.json",
+    "data/sell_signals.json", "data/earnings_calendar.json",
+]
+
+# all_stocks fields with a descending rank index per data generation (top-N = slice); others use heapq
+RANK_FIELDS = [
+    "score", "ewros_score", "iq_edge", "moonshot_score",
+    "technical_score", "growth_score", "quality_score", "context_score",
+]
+EWROS_LEADER_MIN = 60
+
+# yfinance fetches: one task per (ticker, data type) through a shared bounded pool
+YF_DATA_TYPES = ["stock_info", "earnings", "price_history", "analyst_recommendations"]  # merge order
+YF_MAX_WORKERS = 8
+YF_CALL_TIMEOUT = 20  # seconds per Yahoo call before we stop waiting on it
+YF_FETCH_DEADLINE = 60  # seconds from submit for a whole _fetch_yfinance_many batch, queue time included
+
+# How long each yfinance data type stays fresh in the shared research cache (seconds)
+YF_CACHE_TTL = {
+    "stock_info": 15 * 60,
+    "price_history": 60 * 60,
+    "analyst_recommendations": 12 * 60 * 60,
+    "earnings": 24 * 60 * 60,
+}
 
 # Intent → required data types
 INTENT_DATA_MAP = {
@@ -45,6 +128,158 @@ DATA_SOURCES = {
 }
 
 
+class _RunClient:
+    """Anthropic client plus the per-run options every agent call needs (emit, LLM cache, timing spans)."""
+
+    def __init__(self, client, emit=None, use_cache=False):
+        self.messages = client.messages
+        self.emit = emit
+        self.use_cache = use_cache
+        self.generation = _data_generation() if use_cache else None
+        self.usage = []  # one entry per API call — see _record_usage
+        self.started = time.time()
+        self.spans = []  # finished spans, see span()
+        self._spans_lock = threading.Lock()
+        self._stage = threading.local()  # innermost open stage on this thread
+
+    def current_stage(self):
+        return getattr(self._stage, "name", None)
+
+    @contextmanager
+    def span(self, kind, name, **attrs):
+        """Time a block of this run. kind: stage | llm | fetch | verify.
+
+        Spans record the stage they ran under (analyst threads open their own stage), so LLM calls
+        and fetches can be attributed. The yielded dict can be extended with extra fields (tokens etc.).
+        """
+        parent = self.current_stage()
+        span = {"kind": kind, "name": name, "stage": parent, **attrs}
+        if kind == "stage":
+            self._stage.name = name
+        start = time.time()
+        failed = True
+        try:
+            yield span
+            failed = False
+        finally:
+            span["start_ms"] = round((start - self.started) * 1000)
+            span["ms"] = round((time.time() - start) * 1000)
+            if kind == "stage":
+                self._stage.name = parent
+            if kind == "llm" and not span.get("llm_cache_hit"):
+                observe_outbound("anthropic", span["ms"] / 1000, ok=not failed)
+            with self._spans_lock:
+                self.spans.append(span)
+
+
+def _data_generation():
+    """Fingerprint of the local data files — changes whenever a scan rewrites any of them."""
+    parts = []
+    for name in GENERATION_FILES:
+        try:
+            st = os.stat(_data_path(name))
+            parts.append(f"{name}:{st.st_mtime_ns}:{st.st_size}")
+        except OSError:
+            parts.append(f"{name}:-")
+    return hashlib.sha256("|".join(parts).encode()).hexdigest()[:16]
+
+
+class _DataContext:
+    """Parsed local data files for one data generation, shared read-only by every run in the process.
+
+    Built by _data_context(); files whose own mtime/size did not change are carried over from the
+    previous context instead of being parsed again. Callers must not mutate what they get back.
+    """
+
+    def __init__(self, generation, files):
+        self.generation = generation
+        self.files = files  # name -> (fingerprint, parsed JSON or None, error or None)
+        self.stocks = self.data("data/all_stocks.json").get("stocks", {})
+        self.sec = self.data("data/sec_fundamentals.json")
+        self.insider = self.data("data/insider_universe.json").get("signals", {})
+        self.criteria_schema = self.data("data/all_stocks.json").get("criteria_schema")
+        # Rank indexes so top-N source fetches are slices, not per-call sorts
+        self.ranks = {
+            field: sorted(self.stocks.items(), key=lambda x, f=field: x[1].get(f, 0) or 0, reverse=True)
+            for field in RANK_FIELDS
+        }
+        ewros = self.ranks["ewros_score"]
+        n = 0
+        while n < len(ewros) and (ewros[n][1].get("ewros_score") or 0) >= EWROS_LEADER_MIN:
+            n += 1
+        self.ewros_leaders = ewros[:n]
+        notable = [(t, s) for t, s in self.insider.items() if s.get("ins_score", 0) != 0]
+        self.insider_notable = sorted(notable, key=lambda x: abs(x[1].get("ins_score", 0)), reverse=True)
+
+    def top(self, field, limit):
+        """Top `limit` (ticker, stock) pairs by `field`, descending — same order as a full stable sort."""
+        ranked = self.ranks.get(field)
+        if ranked is not None:
+            return ranked[:limit]
+        return heapq.nlargest(limit, self.stocks.items(), key=lambda x: x[1].get(field, 0) or 0)
+
+    def criteria(self, stock):
+        """A stock's criteria as dicts (they are held packed, see criteria_codec)."""
+        packed = stock.get("criteria")
+        if not packed or self.criteria_schema is None:
+            return packed or []
+        return criteria_codec.expand(packed, self.criteria_schema)
+
+    def data(self, name):
+        """Parsed contents of a generation file ({} if it is missing or unreadable)."""
+        return self.files[name][1] or {}
+
+    def error(self, name):
+        return self.files[name][2]
+
+
+_data_ctx = None
+_data_ctx_lock = threading.Lock()
+
+
+def _file_fingerprint(path):
+    try:
+        st = os.stat(path)
+        return (st.st_mtime_ns, st.st_size)
+    except OSError:
+        return None
+
+
+def _load_data_file(name, f):
+    data = json.load(f)
+    if name == "data/all_stocks.json" and isinstance(data.get("stocks"), dict):
+        # Criteria dicts dominate the parsed universe — hold them as interned rows instead
+        data["criteria_schema"] = criteria_codec.compact_stocks(data["stocks"].values())
+    return data
+
+
+def _data_context():
+    """Current _DataContext — reloaded (only the changed files) when the data generation moves."""
+    global _data_ctx
+    generation = _data_generation()
+    ctx = _data_ctx
+    if ctx is not None and ctx.generation == generation:
+        return ctx
+    with _data_ctx_lock:
+        if _data_ctx is not None and _data_ctx.generation == generation:
+            return _data_ctx
+        previous = _data_ctx.files if _data_ctx is not None else {}
+        files = {}
+        for name in GENERATION_FILES:
+            path = _data_path(name)
+            fingerprint = _file_fingerprint(path)
+            if fingerprint is not None and name in previous and previous[name][0] == fingerprint:
+                files[name] = previous[name]
+                continue
+            try:
+                with open(path) as f:
+                    files[name] = (fingerprint, _load_data_file(name, f), None)
+            except Exception as e:
+                files[name] = (fingerprint, None, str(e))
+        _data_ctx = _DataContext(generation, files)
+        return _data_ctx
+
+
 def _load_api_key():
     key = os.environ.get("ANTHROPIC_API_KEY", "")
     if not key:
@@ -79,7 +314,8 @@ def _load_portfolio_tickers():
             'apikey': supabase_key,
             'Authorization': f'Bearer {supabase_key}'
         })
-        resp = urllib.request.urlopen(req, timeout=8)
+        with outbound("supabase"):
+            resp = urllib.request.urlopen(req, timeout=8)
         baskets = json.loads(resp.read())
         
         basket_map = {}
@@ -103,7 +339,13 @@ def _is_portfolio_query(query):
 
 
 def _data_path(filename):
-    """Resolve data file path — tries script dir first, then cwd."""
+    """Resolve data file path — tries INVESTIQ_DATA_ROOT (data/ files only, e.g. a synth_universe.py
+    output), then script dir, then cwd."""
+    root = os.environ.get("INVESTIQ_DATA_ROOT")
+    if root and filename.startswith("data/"):
+        p = os.path.join(root, filename)
+        if os.path.exists(p):
+            return p
     base = os.path.dirname(os.path.abspath(__file__))
     p = os.path.join(base, filename)
     if os.path.exists(p):
@@ -118,14 +360,13 @@ def _fetch_data_source(source, params=None):
     """Surgically fetch data from a specific InvestIQ source. Returns a compact summary, not raw dumps."""
     
     if source == "hunter":
-        # Load top stocks, sorted by score
+        # Top stocks by score — a slice of the presorted universe
         try:
-            with open(_data_path("data/all_stocks.json")) as f:
-                data = json.load(f)
-            stocks = data.get("stocks", {})
-            # Sort by score descending, return top N
+            ctx = _data_context()
+            if ctx.error("data/all_stocks.json"):
+                raise RuntimeError(ctx.error("data/all_stocks.json"))
             limit = (params or {}).get("limit", 20)
-            sorted_stocks = sorted(stocks.items(), key=lambda x: x[1].get("score", 0) or 0, reverse=True)[:limit]
+            sorted_stocks = ctx.top("score", limit)
             return {
                 "source": "hunter",
                 "count": len(sorted_stocks),
@@ -150,11 +391,7 @@ def _fetch_data_source(source, params=None):
     elif source == "portfolio":
         basket_map, all_tickers = _load_portfolio_tickers()
         # Also load scores for portfolio tickers
-        try:
-            with open(_data_path("data/all_stocks.json")) as f:
-                all_stocks = json.load(f).get("stocks", {})
-        except Exception:
-            all_stocks = {}
+        all_stocks = _data_context().stocks
         
         # Filter to specific basket if requested
         basket_filter = (params or {}).get("basket", None)
@@ -185,14 +422,11 @@ def _fetch_data_source(source, params=None):
 
     elif source == "ewros":
         try:
-            with open(_data_path("data/all_stocks.json")) as f:
-                data = json.load(f)
-            stocks = data.get("stocks", {})
+            ctx = _data_context()
+            if ctx.error("data/all_stocks.json"):
+                raise RuntimeError(ctx.error("data/all_stocks.json"))
             limit = (params or {}).get("limit", 20)
-            ewros_leaders = sorted(
-                [(t, s) for t, s in stocks.items() if (s.get("ewros_score") or 0) >= 60],
-                key=lambda x: x[1].get("ewros_score", 0) or 0, reverse=True
-            )[:limit]
+            ewros_leaders = ctx.ewros_leaders[:limit]
             return {
                 "source": "ewros",
                 "count": len(ewros_leaders),
@@ -209,16 +443,14 @@ def _fetch_data_source(source, params=None):
             return {"source": "ewros", "error": str(e)}
 
     elif source == "sell_signals":
-        try:
-            with open(_data_path("data/sell_signals.json")) as f:
-                return {"source": "sell_signals", "data": json.load(f)}
-        except Exception:
+        ctx = _data_context()
+        if ctx.error("data/sell_signals.json"):
             return {"source": "sell_signals", "data": {"signals": []}}
+        return {"source": "sell_signals", "data": ctx.data("data/sell_signals.json")}
 
     elif source == "calendar":
         try:
-            with open(_data_path("data/earnings_calendar.json")) as f:
-                cal = json.load(f)
+            cal = _data_context().data("data/earnings_calendar.json")
             # Return just upcoming 2 weeks
             return {"source": "calendar", "earnings": cal.get("earnings", [])[:30], "fomc": cal.get("fomc", [])}
         except Exception:
@@ -226,12 +458,8 @@ def _fetch_data_source(source, params=None):
 
     elif source == "insider":
         try:
-            with open(_data_path("data/insider_universe.json")) as f:
-                data = json.load(f)
-            signals = data.get("signals", {})
-            # Only return notable signals (score != 0)
-            notable = {t: s for t, s in signals.items() if s.get("ins_score", 0) != 0}
-            top = sorted(notable.items(), key=lambda x: abs(x[1].get("ins_score", 0)), reverse=True)[:20]
+            # Only return notable signals (score != 0), strongest first
+            top = _data_context().insider_notable[:20]
             return {
                 "source": "insider",
                 "signals": [{"ticker": t, "ins_score": s.get("ins_score"), "signal": s.get("signal")} for t, s in top]
@@ -256,7 +484,8 @@ def _fetch_data_source(source, params=None):
             req = urllib.request.Request(url, headers={
                 'apikey': supabase_key, 'Authorization': f'Bearer {supabase_key}'
             })
-            items = json.loads(urllib.request.urlopen(req, timeout=8).read())
+            with outbound("supabase"):
+                items = json.loads(urllib.request.urlopen(req, timeout=8).read())
             return {"source": "watchlist", "items": items}
         except Exception:
             return {"source": "watchlist", "items": []}
@@ -264,12 +493,12 @@ def _fetch_data_source(source, params=None):
     elif source == "screener":
         # Return top by custom params
         try:
-            with open(_data_path("data/all_stocks.json")) as f:
-                data = json.load(f)
-            stocks = data.get("stocks", {})
+            ctx = _data_context()
+            if ctx.error("data/all_stocks.json"):
+                raise RuntimeError(ctx.error("data/all_stocks.json"))
             sort_by = (params or {}).get("sort_by", "score")
             limit = (params or {}).get("limit", 20)
-            filtered = sorted(stocks.items(), key=lambda x: x[1].get(sort_by, 0) or 0, reverse=True)[:limit]
+            filtered = ctx.top(sort_by, limit)
             return {
                 "source": "screener",
                 "stocks": [
@@ -428,7 +657,8 @@ Respond in JSON only:
         if src_name in DATA_SOURCES:
             _emit(state, "researcher_step", {"step": f"Fetching {src_name} data..."})
             try:
-                data = _fetch_data_source(src_name, src_params)
+                with _span(client, "fetch", src_name):
+                    data = _fetch_data_source(src_name, src_params)
                 fetched_data[src_name] = data
 
                 # Extract tickers from fetched data for downstream agents
@@ -449,7 +679,7 @@ Respond in JSON only:
                 _emit(state, "researcher_step", {"step": f"❌ {src_name} failed: {str(e)}"})
 
     state["_scout_data"] = fetched_data
-    state["_scout_tickers"] = list(set(discovered_tickers))
+    state["_scout_tickers"] = list(dict.fromkeys(discovered_tickers))  # deduped, discovery (rank) order
     state["_scout_plan"] = scout_plan
 
     _emit(state, "agent_done", {
@@ -464,27 +694,8 @@ Respond in JSON only:
 def _load_investiq_data(tickers):
     """Load InvestIQ scores, SEC fundamentals, and insider signals for given tickers."""
     result = {}
-
-    # all_stocks.json
-    try:
-        with open(_data_path("data/all_stocks.json")) as f:
-            all_stocks = json.load(f).get("stocks", {})
-    except Exception:
-        all_stocks = {}
-
-    # sec_fundamentals.json
-    try:
-        with open(_data_path("data/sec_fundamentals.json")) as f:
-            sec_data = json.load(f)
-    except Exception:
-        sec_data = {}
-
-    # insider_universe.json
-    try:
-        with open(_data_path("data/insider_universe.json")) as f:
-            insider_data = json.load(f).get("signals", {})
-    except Exception:
-        insider_data = {}
+    ctx = _data_context()
+    all_stocks, sec_data, insider_data = ctx.stocks, ctx.sec, ctx.insider
 
     for ticker in tickers:
         t = ticker.upper()
@@ -510,7 +721,7 @@ def _load_investiq_data(tickers):
                 "earnings_growth": stock.get("earnings_growth"),
             }
             # Include criteria breakdown
-            criteria = stock.get("criteria", [])
+            criteria = ctx.criteria(stock)
             if criteria:
                 info["iq_criteria"] = [
                     {"name": c.get("name"), "passed": c.get("passed"), "value": c.get("value"), "points": c.get("points")}
@@ -547,7 +758,33 @@ def _load_investiq_data(tickers):
 
 
 def _fetch_yfinance_data(ticker, data_types):
+    """Fetch financial data for a single ticker, serving each data type from the shared cache when fresh."""
+    cache = get_cache()
+    result, missing = {}, []
+    for data_type in data_types:
+        cached = cache.get("yfinance", f"{ticker}:{data_type}")
+        if cached is not None:
+            result[f"{ticker}__{data_type}"] = cached
+        else:
+            missing.append(data_type)
+    if not missing:
+        return result
+
+    with outbound("yahoo"):
+        fetched = _fetch_yfinance_uncached(ticker, missing)
+    for data_type in missing:
+        value = fetched.get(f"{ticker}__{data_type}")
+        # Never cache failures — the next run should retry
+        if isinstance(value, str) and not value.startswith("Error:") and f"{ticker}__error" not in fetched:
+            cache.set("yfinance", f"{ticker}:{data_type}", value, YF_CACHE_TTL.get(data_type, 15 * 60))
+    result.update(fetched)
+    return result
+
+
+def _fetch_yfinance_uncached(ticker, data_types):
     """Fetch financial data from yfinance for a single ticker."""
+    import yfinance as yf  # pulls in pandas/numpy — only paid by runs that actually fetch
+
     result = {}
     try:
         stock = yf.Ticker(ticker)
@@ -607,9 +844,209 @@ def _fetch_yfinance_data(ticker, data_types):
     return result
 
 
+def _fetch_yfinance_many(tickers, data_types, on_ticker_done=None):
+    """Fetch yfinance data for many tickers concurrently — one pool task per (ticker, data type).
+
+    Calls on_ticker_done(ticker, done_count, total) from the calling thread as each ticker finishes.
+    A call still running after YF_CALL_TIMEOUT is abandoned and recorded as an error, and the whole
+    batch stops waiting YF_FETCH_DEADLINE seconds after submit: calls still queued then are cancelled.
+    Each batch gets its own YF_MAX_WORKERS pool, so calls abandoned by one run can't starve the next.
+    Results are merged in ticker order, then YF_DATA_TYPES order, regardless of completion order.
+    """
+    types = [dt for dt in YF_DATA_TYPES if dt in data_types]
+    started = {}
+
+    def run(ticker, data_type):
+        started[(ticker, data_type)] = time.time()
+        return _fetch_yfinance_data(ticker, [data_type])
+
+    pool = ThreadPoolExecutor(max_workers=YF_MAX_WORKERS, thread_name_prefix="yfinance")
+    futures = {pool.submit(run, t, dt): (t, dt) for t in tickers for dt in types}
+    deadline = time.time() + YF_FETCH_DEADLINE
+    results = {}
+    remaining = {t: len(types) for t in tickers}
+    done_tickers = 0
+
+    def finish(task, data):
+        nonlocal done_tickers
+        results[task] = data
+        remaining[task[0]] -= 1
+        if remaining[task[0]] == 0:
+            done_tickers += 1
+            if on_ticker_done:
+                on_ticker_done(task[0], done_tickers, len(tickers))
+
+    def give_up(fut, reason):
+        pending.discard(fut)
+        fut.cancel()  # no-op once running; a queued call never starts
+        ticker, data_type = futures[fut]
+        finish((ticker, data_type), {f"{ticker}__{data_type}": f"Error: {reason}"})
+
+    pending = set(futures)
+    try:
+        while pending:
+            done, pending = wait(pending, timeout=max(0, min(1, deadline - time.time())), return_when=FIRST_COMPLETED)
+            for fut in done:
+                try:
+                    data = fut.result()
+                except Exception as e:
+                    data = {f"{futures[fut][0]}__{futures[fut][1]}": f"Error: {e}"}
+                finish(futures[fut], data)
+            now = time.time()
+            if now >= deadline:
+                for fut in list(pending):
+                    give_up(fut, f"fetch deadline of {YF_FETCH_DEADLINE}s passed")
+            for fut in [f for f in pending if now - started.get(futures[f], now) > YF_CALL_TIMEOUT]:
+                give_up(fut, f"timed out after {YF_CALL_TIMEOUT}s")
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    merged = {}
+    for t in tickers:
+        for dt in types:
+            merged.update(results.get((t, dt), {}))
+    return merged
+
+
+# ── Context builder ──
+
+_TOKEN_RE = re.compile(r"[A-Za-z]+|\d{1,3}|[^\sA-Za-z\d]")
+
+
+def _estimate_tokens(text):
+    """Fast local token estimate: letter runs, 3-digit groups and punctuation each count as one token."""
+    return len(_TOKEN_RE.findall(text))
+
+
+_TRUNCATED = "\n…[truncated]"
+
+
+def _truncate_to_tokens(text, budget):
+    if _estimate_tokens(text) <= budget:
+        return text
+    budget -= _estimate_tokens(_TRUNCATED)
+    lo, hi = 0, len(text)
+    while lo < hi:  # longest prefix that fits
+        mid = (lo + hi + 1) // 2
+        if _estimate_tokens(text[:mid]) <= budget:
+            lo = mid
+        else:
+            hi = mid - 1
+    return text[:lo].rstrip() + _TRUNCATED
+
+
+def _compact_value(value, drop_fields=()):
+    """Dense form of a research_data value: minified JSON without nulls, or a squeezed DataFrame dump."""
+    try:
+        data = json.loads(value)
+    except (TypeError, ValueError):
+        data = None
+    if isinstance(data, (dict, list)):
+        def strip(obj):
+            if isinstance(obj, dict):
+                return {k: strip(v) for k, v in obj.items() if v is not None and k not in drop_fields}
+            if isinstance(obj, list):
+                return [strip(v) for v in obj]
+            return obj
+        return json.dumps(strip(data), separators=(",", ":"), default=str)
+    text = str(value)
+    text = re.sub(r"(\d{4}-\d{2}-\d{2}) 00:00:00(?:[+-]\d{2}:\d{2})?", r"\1", text)  # midnight timestamps
+    text = re.sub(r"(\d+\.\d{2})\d+", r"\1", text)  # long float tails
+    return "\n".join(re.sub(r" {2,}", " ", line).strip() for line in text.splitlines() if line.strip())
+
+
+MIN_SECTION_TOKENS = 40  # don't bother including a truncated section smaller than this
+
+
+def _fit_sections(sections, budget):
+    """Fit one ticker's [(key, raw_value)] into budget: compact → strip low-value fields → truncate/drop tail sections."""
+    def render(drop_fields):
+        return [f"=== {k} ===\n{_compact_value(v, drop_fields)}" for k, v in sections]
+
+    blocks = render(())
+    if sum(_estimate_tokens(b) for b in blocks) > budget:
+        blocks = render(LOW_VALUE_FIELDS)
+    fitted, left = [], budget
+    for i, block in enumerate(blocks):
+        cost = _estimate_tokens(block)
+        if cost <= left:
+            fitted.append(block)
+            left -= cost
+        elif i == 0 or left >= MIN_SECTION_TOKENS:
+            fitted.append(_truncate_to_tokens(block, left))
+            break
+        else:
+            break
+    return fitted
+
+
+def _build_context(research_data, budget, extra_shared=None):
+    """Build the research-data block for a prompt within an estimated token budget.
+
+    Platform (scout) data gets up to SHARED_CONTEXT_SHARE of the budget; every ticker then gets a fair
+    share of the rest, with budget unused by small tickers passed on to larger ones, so the last
+    ticker of a portfolio is never silently cut off.
+    """
+    shared = [(k, v) for k, v in research_data.items() if k.startswith("__scout_")]
+    shared += list((extra_shared or {}).items())
+    per_ticker = {}
+    for key, value in research_data.items():
+        if key.startswith("__scout_") or "__" not in key:
+            continue
+        ticker, section = key.split("__", 1)
+        per_ticker.setdefault(ticker, []).append((key, value, section))
+
+    blocks = []
+    shared_blocks = [f"=== {k} ===\n{_compact_value(v)}" for k, v in shared]
+    shared_text = _truncate_to_tokens("\n\n".join(shared_blocks), int(budget * SHARED_CONTEXT_SHARE)) if shared_blocks else ""
+    if shared_text:
+        blocks.append(shared_text)
+    remaining = budget - _estimate_tokens(shared_text)
+
+    ordered = {}
+    for ticker, items in per_ticker.items():
+        items.sort(key=lambda it: SECTION_PRIORITY.index(it[2]) if it[2] in SECTION_PRIORITY else len(SECTION_PRIORITY))
+        ordered[ticker] = [(k, v) for k, v, _ in items]
+
+    # Water-filling: smallest tickers first, each gets a fair share of what's left after the previous ones
+    needs = {t: sum(_estimate_tokens(f"=== {k} ===\n{_compact_value(v)}") for k, v in secs) for t, secs in ordered.items()}
+    fitted = {}
+    left, n = remaining, len(ordered)
+    for t in sorted(ordered, key=lambda t: needs[t]):
+        fitted[t] = _fit_sections(ordered[t], max(left // n, 0))
+        left -= sum(_estimate_tokens(b) for b in fitted[t])
+        n -= 1
+    for ticker in ordered:  # original ticker order
+        blocks.extend(fitted[ticker])
+    return "\n\n".join(blocks)
+
+
+# Shared system prompts: identical across the Quant/Qual (and both verifier) calls so that, together
+# with the cache-marked data block that opens the user message, they form a stable cacheable prefix.
+ANALYST_SYSTEM = """You are a member of an investment research committee for The IQ Investor.
+The first part of the user message is the research data for this query. The second part gives your role, rules and task.
+Work ONLY from the provided data — never infer, guess, or use general knowledge for specific numbers."""
+
+VERIFIER_SYSTEM = """You are a fact-checker on an investment research committee.
+The first part of the user message is the SOURCE DATA — the same research data the analysts worked from. The second part contains the ANALYSIS to verify and your instructions.
+Do NOT add new information. Only remove or flag unsupported claims."""
+
+
+def _prefixed_prompt(data_text, rest):
+    """User content with the cache-marked research data block followed by the call-specific part.
+
+    Analysts and verifiers pass the same data_text, so every call on a data set opens with a
+    byte-identical first block (research_replay.py check asserts this layout offline).
+    """
+    return [
+        {"type": "text", "text": f"Research data:\n{data_text}", "cache_control": {"type": "ephemeral"}},
+        {"type": "text", "text": rest},
+    ]
+
+
 def _verify_analysis(client, analysis, source_data, analysis_type, use_fast_model=True):
     """Verify an analysis against source data. Uses fast model by default."""
-    verify_system = f"""You are a fact-checker for {analysis_type} financial analysis. Your job:
+    verify_instructions = f"""You are a fact-checker for {analysis_type} financial analysis. Your job:
 
 1. Read the ANALYSIS and the SOURCE DATA side by side
 2. For each specific claim (number, metric, trend, rating), check if it exists in the source data
@@ -627,26 +1064,196 @@ Important: Do NOT add new information. Only remove or flag unsupported claims.
 If the analysis is mostly accurate, return it mostly unchanged. Only strip clear fabrications.
 Data from InvestIQ (scout data) is TRUSTED — do not strip scores, grades, or growth rates from it."""
 
-    verify_prompt = f"""ANALYSIS TO VERIFY:
-{analysis}
+    verify_prompt = f"""{verify_instructions}
 
-SOURCE DATA:
-{source_data[:20000]}
+ANALYSIS TO VERIFY:
+{analysis}
 
 Output the verified analysis. Keep the same format, just remove any claims not supported by the source data."""
 
-    return _call_claude(client, verify_system, verify_prompt, max_tokens=16000, model=MODEL_FAST if use_fast_model else None)
+    with _span(client, "verify", analysis_type):
+        return _call_claude(client, VERIFIER_SYSTEM, _prefixed_prompt(source_data, verify_prompt),
+                            max_tokens=16000, model=MODEL_FAST if use_fast_model else None)
+
+
+def _llm_cache_key(client, model, system_prompt, user_prompt, max_tokens):
+    """Content address for a call, scoped to the data generation. None when the run doesn't use the cache."""
+    if not getattr(client, "use_cache", False):
+        return None
+    payload = json.dumps([client.generation, model, system_prompt, user_prompt, max_tokens])
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _record_usage(client, model, usage):
+    """Append one call's token usage (cache reads vs writes vs uncached input) to the run's ledger."""
+    ledger = getattr(client, "usage", None)
+    if ledger is None or usage is None:
+        return {}
+    entry = {
+        "model": model,
+        "input_tokens": getattr(usage, "input_tokens", 0) or 0,
+        "cache_creation_input_tokens": getattr(usage, "cache_creation_input_tokens", 0) or 0,
+        "cache_read_input_tokens": getattr(usage, "cache_read_input_tokens", 0) or 0,
+        "output_tokens": getattr(usage, "output_tokens", 0) or 0,
+    }
+    ledger.append(entry)
+    return entry
+
+
+def usage_summary(usage):
+    """Totals for a run's usage ledger, including the share of input served from the prompt cache."""
+    totals = {k: sum(u[k] for u in usage) for k in
+              ("input_tokens", "cache_creation_input_tokens", "cache_read_input_tokens", "output_tokens")}
+    all_input = totals["input_tokens"] + totals["cache_creation_input_tokens"] + totals["cache_read_input_tokens"]
+    totals["calls"] = len(usage)
+    totals["cache_read_ratio"] = round(totals["cache_read_input_tokens"] / all_input, 3) if all_input else 0
+    return totals
+
+
+def _span(client, kind, name, **attrs):
+    """client.span(...) for run clients; a no-op context (yielding a scratch dict) for anything else."""
+    if isinstance(client, _RunClient):
+        return client.span(kind, name, **attrs)
+    return nullcontext({})
+
+
+# ── Timing ──
+
+_timing_history = deque(maxlen=TIMING_HISTORY)
+_timing_lock = threading.Lock()
+
+
+def _percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct))] if values else 0
+
+
+def _finish_timing(client, mode):
+    """Close out a run's spans: per-kind / per-stage totals, kept for timing_stats() and returned for the report."""
+    total_ms = round((time.time() - client.started) * 1000)
+    stages, by_kind = {}, {}
+    for sp in client.spans:
+        by_kind[sp["kind"]] = by_kind.get(sp["kind"], 0) + sp["ms"]
+        if sp["kind"] == "stage":
+            stages[sp["name"]] = stages.get(sp["name"], 0) + sp["ms"]
+    timing = {
+        "mode": mode,
+        "total_ms": total_ms,
+        "stages_ms": stages,
+        "kind_ms": by_kind,  # sums overlap where stages ran in parallel
+        "llm": usage_summary(client.usage),
+        "spans": sorted(client.spans, key=lambda sp: sp["start_ms"]),
+    }
+    with _timing_lock:
+        _timing_history.append(timing)
+    return timing
+
+
+def timing_stats():
+    """Aggregate the recent runs' spans: latency percentiles per stage, LLM model and fetch, plus token totals."""
+    with _timing_lock:
+        runs = list(_timing_history)
+    groups = {}
+    for run in runs:
+        groups.setdefault(("run", run["mode"]), []).append(run["total_ms"])
+        for sp in run["spans"]:
+            label = sp.get("model") if sp["kind"] == "llm" else sp["name"]
+            groups.setdefault((sp["kind"], label), []).append(sp["ms"])
+    stats = {}
+    for (kind, label), values in sorted(groups.items(), key=lambda kv: (kv[0][0], str(kv[0][1]))):
+        stats.setdefault(kind, {})[label] = {
+            "count": len(values),
+            "mean_ms": round(sum(values) / len(values)),
+            "p50_ms": _percentile(values, 0.5),
+            "p95_ms": _percentile(values, 0.95),
+            "max_ms": max(values),
+        }
+    tokens = {}
+    for run in runs:
+        for sp in run["spans"]:
+            if sp["kind"] == "llm" and sp.get("input_tokens") is not None:
+                t = tokens.setdefault(sp["model"], {"calls": 0, "input_tokens": 0, "cache_read_input_tokens": 0,
+                                                    "cache_creation_input_tokens": 0, "output_tokens": 0})
+                t["calls"] += 1
+                for k in ("input_tokens", "cache_read_input_tokens", "cache_creation_input_tokens", "output_tokens"):
+                    t[k] += sp.get(k, 0)
+    return {"runs": len(runs), "latency": stats, "tokens_by_model": tokens}
+
+
+def _cached_response(client, key, model):
+    if key is None:
+        return None
+    text = get_llm_cache().get(key)
+    if text is not None and client.emit:
+        client.emit("cache_hit", {"cache": "llm", "model": model, "key": key[:12]})
+    return text
 
 
 def _call_claude(client, system_prompt, user_prompt, max_tokens=16000, model=None):
-    """Make a single Claude API call."""
-    resp = client.messages.create(
-        model=model or MODEL,
-        max_tokens=max_tokens,
-        system=system_prompt,
-        messages=[{"role": "user", "content": user_prompt}],
-    )
-    return resp.content[0].text
+    """Make a single Claude API call (served from the LLM cache when the run opted in)."""
+    model = model or MODEL
+    key = _llm_cache_key(client, model, system_prompt, user_prompt, max_tokens)
+    with _span(client, "llm", "create", model=model) as span:
+        cached = _cached_response(client, key, model)
+        if cached is not None:
+            span["llm_cache_hit"] = True
+            return cached
+
+        resp = client.messages.create(
+            model=model,
+            max_tokens=max_tokens,
+            system=system_prompt,
+            messages=[{"role": "user", "content": user_prompt}],
+        )
+        span.update(_record_usage(client, model, resp.usage))
+    text = resp.content[0].text
+    if key is not None:
+        get_llm_cache().set(key, text)
+    return text
+
+
+def _call_claude_stream(client, system_prompt, user_prompt, on_delta, max_tokens=16000, model=None):
+    """Streaming variant of _call_claude — forwards text deltas to on_delta as they arrive.
+
+    Deltas are coalesced (flushed at most every STREAM_FLUSH_SECS) so the SSE stream isn't one
+    event per token; the first delta is always flushed immediately. Returns the full text.
+    """
+    model = model or MODEL
+    key = _llm_cache_key(client, model, system_prompt, user_prompt, max_tokens)
+    with _span(client, "llm", "stream", model=model) as span:
+        cached = _cached_response(client, key, model)
+        if cached is not None:
+            span["llm_cache_hit"] = True
+            on_delta(cached)
+            return cached
+
+        buf, last_flush, start = [], 0.0, time.time()
+        with client.messages.stream(
+            model=model,
+            max_tokens=max_tokens,
+            system=system_prompt,
+            messages=[{"role": "user", "content": user_prompt}],
+        ) as stream:
+            for text in stream.text_stream:
+                if "first_token_ms" not in span:
+                    span["first_token_ms"] = round((time.time() - start) * 1000)
+                buf.append(text)
+                if time.time() - last_flush >= STREAM_FLUSH_SECS:
+                    on_delta("".join(buf))
+                    buf, last_flush = [], time.time()
+            if buf:
+                on_delta("".join(buf))
+            text = stream.get_final_text()
+            span.update(_record_usage(client, model, stream.get_final_message().usage))
+    if key is not None:
+        get_llm_cache().set(key, text)
+    return text
+
+
+def _stream_report(state, agent):
+    """on_delta callback that forwards report tokens as report_delta events (after a reset marker)."""
+    _emit(state, "report_delta", {"agent": agent, "text": "", "reset": True})
+    return lambda text: _emit(state, "report_delta", {"agent": agent, "text": text})
 
 
 def _emit(state, event_type, data):
@@ -688,7 +1295,8 @@ Total tickers: {len(scout_tickers)}
 You MUST use ONLY these tickers. Do NOT default to SPY."""
         else:
             _emit(state, "researcher_step", {"step": "Detected portfolio query — fetching your holdings from Supabase..."})
-            basket_map, all_tickers = _load_portfolio_tickers()
+            with _span(client, "fetch", "supabase_portfolio"):
+                basket_map, all_tickers = _load_portfolio_tickers()
             if all_tickers:
                 state["_portfolio_baskets"] = basket_map
                 state["_portfolio_tickers"] = all_tickers
@@ -770,19 +1378,33 @@ def run_researcher(client, state):
         for src_name, src_data in state["_scout_data"].items():
             research_data[f"__scout_{src_name}"] = json.dumps(src_data, default=str)
 
-    # Fetch yfinance data for each ticker (but limit to avoid token bloat)
-    if len(tickers) > 15:
-        _emit(state, "researcher_step", {"step": f"Limiting yfinance deep fetch to top 15 of {len(tickers)} tickers..."})
-        tickers = tickers[:15]
-
-    for ticker in tickers:
-        _emit(state, "researcher_step", {"step": f"Fetching market data for {ticker}..."})
-        yf_data = _fetch_yfinance_data(ticker, data_types)
-        research_data.update(yf_data)
+    # Fetch yfinance data for each ticker (but limit to avoid token bloat — batched mode gives
+    # every group its own context, so it can take far more). Past the cap, batched mode still
+    # analyzes every ticker, from the local InvestIQ data only; single-prompt mode drops them.
+    batched = _use_batches(state)
+    limit = BATCH_MAX_TICKERS if batched else 15
+    if batched:
+        data_types = {dt for dt in data_types if dt in BATCH_DATA_TYPES} or set(BATCH_DATA_TYPES)
+    iq_tickers = tickers if batched else tickers[:limit]
+    if len(tickers) > limit:
+        skipped = tickers[limit:]
+        state["shallow_tickers" if batched else "dropped_tickers"] = skipped
+        rest = "InvestIQ data only" if batched else "not analyzed"
+        _emit(state, "researcher_step", {"step": f"Limiting yfinance deep fetch to top {limit} of {len(tickers)} tickers "
+                                                 f"({rest}: {', '.join(skipped)})"})
+        tickers = tickers[:limit]
+
+    _emit(state, "researcher_step", {"step": f"Fetching market data for {len(tickers)} tickers in parallel..."})
+    with _span(client, "fetch", "yfinance", tickers=len(tickers)):
+        research_data.update(_fetch_yfinance_many(
+            tickers, data_types,
+            on_ticker_done=lambda t, n, total: _emit(state, "researcher_step", {"step": f"Market data ready for {t} ({n}/{total})"}),
+        ))
 
     # Load InvestIQ proprietary data
     _emit(state, "researcher_step", {"step": "Loading InvestIQ scores & fundamentals..."})
-    iq_data = _load_investiq_data(tickers)
+    with _span(client, "fetch", "investiq", tickers=len(iq_tickers)):
+        iq_data = _load_investiq_data(iq_tickers)
     for ticker, data in iq_data.items():
         if data:
             research_data[f"{ticker}__investiq"] = json.dumps(data, default=str)
@@ -793,10 +1415,14 @@ def run_researcher(client, state):
     sources = state.get("sources", [])
     for ticker in tickers:
         sources.append({"title": f"Yahoo Finance: {ticker}", "ticker": ticker, "url": f"https://finance.yahoo.com/quote/{ticker}"})
-    sources.append({"title": "InvestIQ Proprietary Scores", "ticker": ",".join(tickers), "url": ""})
+    sources.append({"title": "InvestIQ Proprietary Scores", "ticker": ",".join(iq_tickers), "url": ""})
     state["sources"] = sources
 
-    _emit(state, "agent_done", {"agent": "Researcher", "result": {"tickers": tickers, "data_points": len(research_data)}})
+    result = {"tickers": tickers, "data_points": len(research_data)}
+    for key in ("shallow_tickers", "dropped_tickers"):
+        if state.get(key):
+            result[key] = state[key]
+    _emit(state, "agent_done", {"agent": "Researcher", "result": result})
     return state
 
 
@@ -808,16 +1434,13 @@ def run_quant_analyst(client, state):
     research_data = state.get("research_data", {})
 
     # Build context from research data
-    data_summary = []
-    for key, value in research_data.items():
-        data_summary.append(f"=== {key} ===\n{value}\n")
-    data_text = "\n".join(data_summary)
+    data_text = _build_context(research_data, ANALYST_CONTEXT_TOKENS)
 
     focus = ""
     if state.get("moderator_request"):
         focus = f"\n\nIMPORTANT — The moderator specifically wants you to focus on: {state['moderator_request']}"
 
-    system = """You are a quantitative financial analyst. Analyze ONLY the data provided below — never infer, guess, or use general knowledge for specific numbers.
+    instructions = """You are a quantitative financial analyst. Analyze ONLY the data provided above — never infer, guess, or use general knowledge for specific numbers.
 
 Rules:
 - ONLY cite numbers that appear in the provided data. If a metric isn't in the data, say "Not available in data."
@@ -834,18 +1457,18 @@ Analyze for:
 
 Be precise. No filler. If you don't have the data, skip that section."""
 
-    user_prompt = f"""Query: {state['user_query']}
-Plan: {json.dumps(plan)}
-{focus}
+    user_prompt = f"""{instructions}
 
-Available Data:
-{data_text[:30000]}"""
+Query: {state['user_query']}
+Plan: {json.dumps(plan)}
+{focus}"""
 
-    raw_analysis = _call_claude(client, system, user_prompt, max_tokens=16000)
+    raw_analysis = _call_claude(client, ANALYST_SYSTEM, _prefixed_prompt(data_text, user_prompt),
+                                max_tokens=16000)
     
     # VERIFY: Check analysis against actual data
     _emit(state, "researcher_step", {"step": "Verifying quant claims against source data..."})
-    state["quant_analysis"] = _verify_analysis(client, raw_analysis, data_text[:15000], "quantitative")
+    state["quant_analysis"] = _verify_analysis(client, raw_analysis, data_text, "quantitative")
     
     _emit(state, "agent_done", {"agent": "Quant Analyst", "result": "Analysis verified"})
     return state
@@ -858,16 +1481,13 @@ def run_qual_analyst(client, state):
     plan = state["plan"]
     research_data = state.get("research_data", {})
 
-    data_summary = []
-    for key, value in research_data.items():
-        data_summary.append(f"=== {key} ===\n{value}\n")
-    data_text = "\n".join(data_summary)
+    data_text = _build_context(research_data, ANALYST_CONTEXT_TOKENS)
 
     focus = ""
     if state.get("moderator_request"):
         focus = f"\n\nIMPORTANT — The moderator specifically wants you to focus on: {state['moderator_request']}"
 
-    system = """You are a qualitative financial analyst. Analyze ONLY what can be inferred from the provided data.
+    instructions = """You are a qualitative financial analyst. Analyze ONLY what can be inferred from the provided data.
 
 Rules:
 - Base your analysis on the DATA PROVIDED — sector, industry, IQ criteria, insider signals, analyst recs
@@ -886,23 +1506,201 @@ Analyze for:
 
 Be honest about data gaps. Say "insufficient data" rather than guessing."""
 
-    user_prompt = f"""Query: {state['user_query']}
-Plan: {json.dumps(plan)}
-{focus}
+    user_prompt = f"""{instructions}
 
-Available Data:
-{data_text[:30000]}"""
+Query: {state['user_query']}
+Plan: {json.dumps(plan)}
+{focus}"""
 
-    raw_analysis = _call_claude(client, system, user_prompt, max_tokens=16000)
+    raw_analysis = _call_claude(client, ANALYST_SYSTEM, _prefixed_prompt(data_text, user_prompt),
+                                max_tokens=16000)
     
     # VERIFY: Check analysis against actual data
     _emit(state, "researcher_step", {"step": "Verifying qualitative claims against source data..."})
-    state["qual_analysis"] = _verify_analysis(client, raw_analysis, data_text[:15000], "qualitative")
+    state["qual_analysis"] = _verify_analysis(client, raw_analysis, data_text, "qualitative")
     
     _emit(state, "agent_done", {"agent": "Qual Analyst", "result": "Analysis verified"})
     return state
 
 
+class _LaneEmitter:
+    """Fan-in for events from agents running in parallel "lanes".
+
+    Progress events stream live, but agent_start/agent_done are released in lane order
+    (lane 1's agent_done never precedes lane 0's), and each lane's events keep their own order.
+    """
+    ORDERED = ("agent_start", "agent_done")
+
+    def __init__(self, emit, lanes):
+        self._emit = emit
+        self._lock = threading.Lock()
+        self._queues = [[] for _ in range(lanes)]
+        self._released = {k: 0 for k in self.ORDERED}
+
+    def lane(self, i):
+        return lambda event_type, data: self._put(i, event_type, data)
+
+    def _put(self, lane, event_type, data):
+        with self._lock:
+            self._queues[lane].append((event_type, data))
+            self._drain()
+
+    def _drain(self, force=False):
+        progress = True
+        while progress:
+            progress = False
+            for lane, q in enumerate(self._queues):
+                while q:
+                    event_type, data = q[0]
+                    if not force and event_type in self.ORDERED and self._released[event_type] != lane:
+                        break
+                    q.pop(0)
+                    if self._emit:
+                        self._emit(event_type, data)
+                    if event_type in self.ORDERED:
+                        self._released[event_type] += 1
+                        progress = True
+
+    def close(self):
+        """Flush anything still held (e.g. a lane failed before its agent_done)."""
+        with self._lock:
+            self._drain(force=True)
+
+
+def run_analysts(client, state):
+    """Run the Quant and Qual analysts (and their verification passes) concurrently.
+
+    Both read the same research_data and write disjoint keys, so each works on a shallow copy
+    of state and only its output key is merged back.
+    """
+    if _use_batches(state):
+        return run_batched_analysts(client, state)
+
+    analysts = [(run_quant_analyst, "quant_analysis", "Quant Analyst"),
+                (run_qual_analyst, "qual_analysis", "Qual Analyst")]
+    lanes = _LaneEmitter(state.get("_emit"), len(analysts))
+    parent = client.current_stage() if isinstance(client, _RunClient) else None
+
+    def run_lane(fn, name, lane_state):
+        # Opened on the lane's thread so its calls are attributed to it; parented to the caller's stage
+        with _span(client, "stage", name, stage=parent):
+            return fn(client, lane_state)
+
+    with ThreadPoolExecutor(max_workers=len(analysts), thread_name_prefix="analyst") as pool:
+        futures = [pool.submit(run_lane, fn, name, {**state, "_emit": lanes.lane(i)})
+                   for i, (fn, _, name) in enumerate(analysts)]
+    lanes.close()
+    for fut, (_, key, _) in zip(futures, analysts):
+        state[key] = fut.result()[key]  # re-raises the analyst's exception, if any
+    return state
+
+
+BATCH_INSTRUCTIONS = """You are analyzing ONE GROUP of a larger set of holdings; the other groups are analyzed in parallel and merged afterwards. Analyze ONLY the data provided above — never infer, guess, or use general knowledge for specific numbers.
+
+For EACH ticker in this group (never skip one), give:
+- Numbers: valuation, growth, InvestIQ score/grade/EWROS, price trend — only as present in the data, citing the source
+- Qualitative: business position, catalysts and risks evidenced by the data
+- Stance: bullish / neutral / bearish, with the key reason
+
+If a ticker has little or no data, say so in one line instead of skipping it. Be concise — your output is combined with the other groups."""
+
+
+def _use_batches(state):
+    return len(state.get("plan", {}).get("tickers", [])) >= BATCH_MIN_TICKERS
+
+
+def _ticker_groups(state):
+    """Shard the plan's tickers into (label, tickers) groups of at most BATCH_SIZE.
+
+    Portfolio baskets stay together (split if larger than a group); small neighbouring groups are
+    packed into one so a portfolio of many tiny baskets doesn't turn into many tiny calls.
+    """
+    tickers = state["plan"].get("tickers", [])
+    wanted, seen, chunks = set(tickers), set(), []
+    for basket, members in (state.get("_portfolio_baskets") or {}).items():
+        members = [t for t in dict.fromkeys(members) if t in wanted and t not in seen]
+        seen.update(members)
+        chunks += [(basket, members[i:i + BATCH_SIZE]) for i in range(0, len(members), BATCH_SIZE)]
+    rest = [t for t in dict.fromkeys(tickers) if t not in seen]
+    chunks += [(None, rest[i:i + BATCH_SIZE]) for i in range(0, len(rest), BATCH_SIZE)]
+
+    groups = []
+    for label, members in chunks:
+        if groups and len(groups[-1][1]) + len(members) <= BATCH_SIZE:
+            prev_label, prev = groups[-1]
+            groups[-1] = (" + ".join(x for x in (prev_label, label) if x) or None, prev + members)
+        else:
+            groups.append((label, members))
+    return [(label or f"Group {i + 1}", members) for i, (label, members) in enumerate(groups)]
+
+
+def _analyze_group(client, state, label, tickers):
+    """Map step: one verified quant + qual analysis for a group, from that group's data only."""
+    prefixes = tuple(f"{t}__" for t in tickers)
+    group_data = {k: v for k, v in state.get("research_data", {}).items() if k.startswith(prefixes)}
+    data_text = _build_context(group_data, BATCH_CONTEXT_TOKENS)
+
+    focus = ""
+    if state.get("moderator_request"):
+        focus = f"\n\nIMPORTANT — The moderator specifically wants you to focus on: {state['moderator_request']}"
+
+    shallow = [t for t in tickers if t in set(state.get("shallow_tickers") or ())]
+    if shallow:
+        focus += f"\n\nOnly InvestIQ data was loaded (no market data fetch) for: {', '.join(shallow)}"
+
+    user_prompt = f"""{BATCH_INSTRUCTIONS}
+
+Query: {state['user_query']}
+Group: {label}
+Tickers in this group: {', '.join(tickers)}
+{focus}"""
+
+    raw_analysis = _call_claude(client, ANALYST_SYSTEM, _prefixed_prompt(data_text, user_prompt),
+                                max_tokens=4000)
+    return _verify_analysis(client, raw_analysis, data_text, "per-ticker")
+
+
+def run_batched_analysts(client, state):
+    """Map-reduce replacement for the Quant/Qual pair when the plan has BATCH_MIN_TICKERS or more tickers.
+
+    Each group is analyzed (and verified) in parallel against a compact context of its own data,
+    so wall time stays roughly flat as holdings grow and no ticker is truncated out of the prompt.
+    The combined group analyses become quant_analysis for the Moderator and Writer to reduce.
+    """
+    groups = _ticker_groups(state)
+    total = sum(len(members) for _, members in groups)
+    _emit(state, "agent_start", {"agent": "Quant Analyst", "description": f"Analyzing {total} tickers in {len(groups)} parallel groups..."})
+    _emit(state, "agent_start", {"agent": "Qual Analyst", "description": "Covered per group alongside the numbers..."})
+
+    parent = client.current_stage() if isinstance(client, _RunClient) else None
+
+    def run_group(label, tickers):
+        with _span(client, "stage", label, stage=parent, tickers=len(tickers)):
+            return _analyze_group(client, state, label, tickers)
+
+    results = [None] * len(groups)
+    with ThreadPoolExecutor(max_workers=min(BATCH_MAX_WORKERS, len(groups)), thread_name_prefix="batch") as pool:
+        futures = {pool.submit(run_group, label, members): i for i, (label, members) in enumerate(groups)}
+        for done, fut in enumerate(as_completed(futures), 1):
+            i = futures[fut]
+            label, members = groups[i]
+            try:
+                results[i] = fut.result()
+            except Exception as e:
+                # Keep the other groups — the Writer still lists these tickers, flagged as unanalyzed
+                results[i] = f"Analysis unavailable for {', '.join(members)}: {e}"
+            _emit(state, "researcher_step", {"step": f"Group {done}/{len(groups)} analyzed — {label}: {', '.join(members)}"})
+
+    state["quant_analysis"] = "\n\n".join(
+        f"### {label} ({', '.join(members)})\n{text}" for (label, members), text in zip(groups, results))
+    state["qual_analysis"] = "Batched mode — qualitative factors are covered per ticker in each group analysis above."
+    state["batch_groups"] = [{"label": label, "tickers": members} for label, members in groups]
+
+    _emit(state, "agent_done", {"agent": "Quant Analyst", "result": f"{len(groups)} groups verified"})
+    _emit(state, "agent_done", {"agent": "Qual Analyst", "result": "Covered in group analyses"})
+    return state
+
+
 def run_moderator(client, state):
     """Review analyses and decide next action."""
     _emit(state, "agent_start", {"agent": "Moderator", "description": "Reviewing analyses for completeness..."})
@@ -1016,7 +1814,7 @@ Qual Analysis:
 
 Sources: {json.dumps(state.get('sources', []))}"""
 
-    report = _call_claude(client, system, user_prompt, max_tokens=16000)
+    report = _call_claude_stream(client, system, user_prompt, _stream_report(state, "Writer"), max_tokens=16000)
 
     # Extract self-evaluation
     if "SELF_EVAL:WEAK" in report:
@@ -1061,13 +1859,24 @@ Raw Data Available:
 
 # ── Pipeline Orchestrator ──
 
-def research(query, emit=None):
+def research_flight_key(query, mode="deep"):
+    """Single-flight key for a research request: normalized query + mode + data generation.
+
+    Requests with the same key would run the same pipeline over the same data, so the servers
+    coalesce them onto one job (see research_jobs).
+    """
+    normalized = re.sub(r"\s+", " ", _preprocess_query(query)).strip().rstrip("?!. ").lower()
+    return hashlib.sha256(f"{mode}|{_data_generation()}|{normalized}".encode()).hexdigest()[:32]
+
+
+def research(query, emit=None, use_cache=None):
     """
     Run the full 7-agent research pipeline.
 
     Args:
         query: User's research question
         emit: Optional callback(event_type, data) for SSE streaming
+        use_cache: Replay identical LLM calls from the response cache (default: RESEARCH_LLM_CACHE env)
 
     Returns:
         dict with final_report, risk_flags, plan, sources, etc.
@@ -1076,7 +1885,8 @@ def research(query, emit=None):
     if not api_key:
         raise ValueError("ANTHROPIC_API_KEY not found in environment or .env file")
 
-    client = anthropic.Anthropic(api_key=api_key)
+    client = _RunClient(anthropic.Anthropic(api_key=api_key), emit,
+                        LLM_CACHE_DEFAULT if use_cache is None else use_cache)
 
     state = {
         "user_query": query,
@@ -1098,33 +1908,36 @@ def research(query, emit=None):
 
     try:
         # 0. Data Scout — determines which sources to fetch
-        state = run_data_scout(client, state)
+        with client.span("stage", "Data Scout"):
+            state = run_data_scout(client, state)
         if state.get("error"):
             return state
 
         # 1. Planner
-        state = run_planner(client, state)
+        with client.span("stage", "Planner"):
+            state = run_planner(client, state)
 
         # 2. Researcher (with possible loops)
-        state = run_researcher(client, state)
+        with client.span("stage", "Researcher"):
+            state = run_researcher(client, state)
 
         # Main analysis loop with moderator
         while True:
-            # 3. Quant Analyst
-            state = run_quant_analyst(client, state)
-
-            # 4. Qual Analyst
-            state = run_qual_analyst(client, state)
+            # 3 + 4. Quant and Qual Analysts (in parallel)
+            with client.span("stage", "Analysts"):
+                state = run_analysts(client, state)
 
             # 5. Moderator
-            state = run_moderator(client, state)
+            with client.span("stage", "Moderator"):
+                state = run_moderator(client, state)
 
             decision = state["moderator_decision"]
 
             if decision == "NEED_DATA":
                 # Loop back to researcher
                 if state["research_pass_count"] < MAX_RESEARCH_PASSES:
-                    state = run_researcher(client, state)
+                    with client.span("stage", "Researcher"):
+                        state = run_researcher(client, state)
                 else:
                     # Can't fetch more data, force forward
                     state["moderator_decision"] = "VERDICT"
@@ -1138,15 +1951,19 @@ def research(query, emit=None):
                 break
 
         # 6. Writer (with possible loop back to moderator)
-        state = run_writer(client, state)
+        with client.span("stage", "Writer"):
+            state = run_writer(client, state)
 
         if state["writer_verdict"] == "WEAK" and state["cycle_count"] < MAX_CYCLES:
             # One more moderator pass
-            state = run_moderator(client, state)
-            state = run_writer(client, state)
+            with client.span("stage", "Moderator"):
+                state = run_moderator(client, state)
+            with client.span("stage", "Writer"):
+                state = run_writer(client, state)
 
         # 7. Risk Analyst
-        state = run_risk_analyst(client, state)
+        with client.span("stage", "Risk Analyst"):
+            state = run_risk_analyst(client, state)
 
         _emit(state, "complete", {
             "report": state["final_report"],
@@ -1154,16 +1971,21 @@ def research(query, emit=None):
             "tickers": state["plan"].get("tickers", []),
             "intents": state["plan"].get("intents", []),
             "sources": state.get("sources", []),
+            **{key: state[key] for key in ("shallow_tickers", "dropped_tickers") if state.get(key)},
         })
 
     except Exception as e:
         _emit(state, "error", {"message": str(e), "traceback": traceback.format_exc()})
         state["error"] = str(e)
-
+    finally:
+        # Early returns (e.g. the Data Scout aborting) still get usage and timing
+        state["llm_usage"] = {"calls": client.usage, "totals": usage_summary(client.usage)}
+        state["timing"] = _finish_timing(client, "deep")
+        _emit(state, "timing", state["timing"])
     return state
 
 
-def quick_research(query, emit=None):
+def quick_research(query, emit=None, use_cache=None):
     """
     Fast research mode — same data gathering as Deep, but single analysis call.
     Data Scout (Sonnet) → Researcher → One Opus analysis call → done.
@@ -1172,7 +1994,8 @@ def quick_research(query, emit=None):
     if not api_key:
         raise ValueError("ANTHROPIC_API_KEY not found")
 
-    client = anthropic.Anthropic(api_key=api_key)
+    client = _RunClient(anthropic.Anthropic(api_key=api_key), emit,
+                        LLM_CACHE_DEFAULT if use_cache is None else use_cache)
     state = {
         "user_query": query,
         "_emit": emit,
@@ -1188,42 +2011,45 @@ def quick_research(query, emit=None):
 
     try:
         # 1. Data Scout — same as Deep mode (uses Sonnet, fast)
-        state = run_data_scout(client, state)
+        with client.span("stage", "Data Scout"):
+            state = run_data_scout(client, state)
         if state.get("error"):
             return state
 
         # 2. Planner — same as Deep mode (uses Sonnet, fast)
-        state = run_planner(client, state)
+        with client.span("stage", "Planner"):
+            state = run_planner(client, state)
 
         # 3. Data gathering — skip full yfinance if Scout already has data
         tickers = state["plan"].get("tickers", [])
         if state.get("_scout_data") and len(tickers) > 3:
             # Scout already fetched IQ scores — only do yfinance for top 3
-            _emit(state, "agent_start", {"agent": "Data Gathering", "description": "Gathering market data..."})
-            iq_data = _load_investiq_data(tickers)
-            for t in tickers:
-                if t in iq_data and iq_data[t]:
-                    state.setdefault("research_data", {})[f"{t}__investiq"] = json.dumps(iq_data[t], default=str)
-            for t in tickers[:3]:
-                _emit(state, "researcher_step", {"step": f"Fetching live data for {t}..."})
-                yf_data = _fetch_yfinance_data(t, ["stock_info", "price_history"])
+            with client.span("stage", "Data Gathering"):
+                _emit(state, "agent_start", {"agent": "Data Gathering", "description": "Gathering market data..."})
+                with _span(client, "fetch", "investiq", tickers=len(tickers)):
+                    iq_data = _load_investiq_data(tickers)
+                for t in tickers:
+                    if t in iq_data and iq_data[t]:
+                        state.setdefault("research_data", {})[f"{t}__investiq"] = json.dumps(iq_data[t], default=str)
+                _emit(state, "researcher_step", {"step": f"Fetching live data for {', '.join(tickers[:3])}..."})
+                with _span(client, "fetch", "yfinance", tickers=min(3, len(tickers))):
+                    yf_data = _fetch_yfinance_many(
+                        tickers[:3], ["stock_info", "price_history"],
+                        on_ticker_done=lambda t, n, total: _emit(state, "researcher_step", {"step": f"Live data ready for {t} ({n}/{total})"}),
+                    )
                 state.setdefault("research_data", {}).update(yf_data)
-            _emit(state, "agent_done", {"agent": "Data Gathering", "result": {"tickers": len(tickers), "yfinance": min(3, len(tickers))}})
+                _emit(state, "agent_done", {"agent": "Data Gathering", "result": {"tickers": len(tickers), "yfinance": min(3, len(tickers))}})
         else:
-            state = run_researcher(client, state)
+            with client.span("stage", "Researcher"):
+                state = run_researcher(client, state)
 
-        # 4. Build context from all gathered data
-        data_context = []
-        
-        # Scout data (hunter, portfolio, etc.)
-        for src_name, src_data in state.get("_scout_data", {}).items():
-            data_context.append(f"=== Platform: {src_name} ===\n{json.dumps(src_data, indent=2, default=str)}")
-        
-        # Research data (yfinance + IQ scores)
-        for key, value in state.get("research_data", {}).items():
-            data_context.append(f"=== {key} ===\n{value}")
-
-        data_text = "\n\n".join(data_context)
+        # 4. Build context from all gathered data — scout data (hunter, portfolio, etc.) unless the
+        # Researcher already folded it into research_data, then yfinance + IQ scores per ticker
+        research_data = state.get("research_data", {})
+        platform = {f"Platform: {src_name}": json.dumps(src_data, default=str)
+                    for src_name, src_data in state.get("_scout_data", {}).items()
+                    if f"__scout_{src_name}" not in research_data}
+        data_text = _build_context(research_data, QUICK_CONTEXT_TOKENS, extra_shared=platform)
 
         _emit(state, "agent_start", {"agent": "Researcher", "description": "Generating report..."})
         _emit(state, "researcher_step", {"step": f"Analyzing {len(tickers)} tickers with Claude — this takes 10-15 seconds..."})
@@ -1258,7 +2084,9 @@ Rules:
 
         tickers = state["plan"].get("tickers", [])
         ticker_list = ', '.join(tickers)
-        report = _call_claude(client, system, f"Question: {query}\nTickers: {ticker_list}\n\nData:\n{data_text[:20000]}", max_tokens=4000, model=MODEL_FAST)
+        with client.span("stage", "Analysis"):
+            report = _call_claude_stream(client, system, f"Question: {query}\nTickers: {ticker_list}\n\nData:\n{data_text}",
+                                         _stream_report(state, "Researcher"), max_tokens=4000, model=MODEL_FAST)
 
         _emit(state, "agent_done", {"agent": "Researcher", "result": "Complete"})
 
@@ -1278,5 +2106,9 @@ Rules:
     except Exception as e:
         _emit(state, "error", {"message": str(e), "traceback": traceback.format_exc()})
         state["error"] = str(e)
-
+    finally:
+        # Early returns (e.g. the Data Scout aborting) still get usage and timing
+        state["llm_usage"] = {"calls": client.usage, "totals": usage_summary(client.usage)}
+        state["timing"] = _finish_timing(client, "quick")
+        _emit(state, "timing", state["timing"])
     return state
@@ -1,17 +1,25 @@
 from flask import Flask, render_template, jsonify, request, Response
 import os
 import json
+import gzip
+import hashlib
 import traceback
 import sys
 import uuid
 import urllib.request
-import threading
-import queue
-from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone
-from zoneinfo import ZoneInfo
+
+import criteria_codec
+from journal_store import get_store
+from request_metrics import count_cache, outbound, timed_urlopen
+import request_metrics
+import request_profiler
+from research_jobs import trust_proxies
 
 app = Flask(__name__)
+trust_proxies(app)
+request_metrics.install(app)
+request_profiler.install(app)
 
 # Supabase Configuration
 SUPABASE_URL = os.environ.get('SUPABASE_URL', 'https://jvgxgfbthfsdqtvzeuqz.supabase.co')
@@ -27,6 +35,12 @@ if not SUPABASE_KEY:
     except FileNotFoundError:
         pass
 
+def _now_et():
+    """Current time in New York (zoneinfo is imported on first use, not at cold start)."""
+    from zoneinfo import ZoneInfo
+    return datetime.now(ZoneInfo("America/New_York"))
+
+
 def load_insider_scores():
     """Load insider universe scores as a ticker -> {ins_score, insider_signal} lookup"""
     # Try universe scan first (all stocks)
@@ -70,7 +84,7 @@ def fetch_live_prices_bulk(tickers, batch_size=15):
         url = f'https://query1.finance.yahoo.com/v8/finance/spark?symbols={symbols}&range=1d&interval=1m'
         try:
             req = urllib.request.Request(url, headers={'User-Agent': 'Mozilla/5.0'})
-            resp = urllib.request.urlopen(req, timeout=8)
+            resp = timed_urlopen(req, timeout=8)
             data = json.loads(resp.read())
             for sym, info in data.items():
                 closes = info.get('close', [])
@@ -87,6 +101,30 @@ def fetch_live_prices_bulk(tickers, batch_size=15):
     return results
 
 
+@app.route('/metrics')
+def metrics():
+    """Prometheus scrape endpoint: route latency/size/status, outbound call latency, cache hit ratios."""
+    return Response(request_metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/api/profiles')
+def list_profiles():
+    """Slow-request profiles in the on-disk ring (admin: X-Profile token)."""
+    if not request_profiler.is_admin(request):
+        return jsonify({"error": "Forbidden"}), 403
+    return jsonify({"threshold_ms": request_profiler.PROFILE_SLOW_MS or None,
+                    "profiles": request_profiler.list_profiles()})
+
+@app.route('/api/profiles/<name>')
+def download_profile(name):
+    """One profile as collapsed stacks (flamegraph.pl / speedscope input)."""
+    if not request_profiler.is_admin(request):
+        return jsonify({"error": "Forbidden"}), 403
+    path = request_profiler.profile_path(name)
+    if path is None:
+        return jsonify({"error": "Profile not found"}), 404
+    from flask import send_file
+    return send_file(path, mimetype='text/plain', as_attachment=True, download_name=name)
+
 @app.route('/health')
 def health():
     return jsonify({"status": "ok", "python": sys.version})
@@ -99,7 +137,8 @@ def earnings_detail(ticker):
         t = yf.Ticker(ticker.upper())
 
         # --- EPS + surprise from earnings_dates ---
-        ed = t.earnings_dates
+        with outbound('yahoo'):
+            ed = t.earnings_dates
         eps_rows = {}
         if ed is not None and not ed.empty:
             for dt, row in ed.iterrows():
@@ -121,7 +160,8 @@ def earnings_detail(ticker):
         # --- Revenue from quarterly income stmt (keyed by period-end date) ---
         rev_by_quarter = {}
         try:
-            inc = t.quarterly_income_stmt
+            with outbound('yahoo'):
+                inc = t.quarterly_income_stmt
             if inc is not None and not inc.empty:
                 rev_row = None
                 for candidate in ['Total Revenue', 'Revenue']:
@@ -222,8 +262,39 @@ def debug():
     
     return jsonify(info)
 
-@app.route('/')
-def index():
+# Rendered pages/payloads: name -> (version, body, gzipped body, etag). Rebuilt only when the
+# version (source file mtime/size) changes; a racing rebuild just produces the same entry twice.
+_page_cache = {}
+
+
+def _file_version(path):
+    try:
+        st = os.stat(path)
+        return (st.st_mtime_ns, st.st_size)
+    except OSError:
+        return None
+
+
+def _cached_response(name, version, build, mimetype):
+    """Serve build()'s output, cached per version, gzipped when accepted, revalidated by ETag (304)."""
+    entry = _page_cache.get(name)
+    count_cache('page', entry is not None and entry[0] == version)
+    if entry is None or entry[0] != version:
+        body = build().encode('utf-8')
+        entry = (version, body, gzip.compress(body, 6), hashlib.sha256(body).hexdigest()[:20])
+        _page_cache[name] = entry
+    _, body, gz_body, etag = entry
+    use_gzip = 'gzip' in request.accept_encodings
+    response = Response(gz_body if use_gzip else body, mimetype=mimetype)
+    if use_gzip:
+        response.headers['Content-Encoding'] = 'gzip'
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['Cache-Control'] = 'no-cache'  # always revalidate; unchanged → 304, no body
+    response.set_etag(etag + ('-gz' if use_gzip else ''))
+    return response.make_conditional(request)
+
+
+def _index_data_js():
     data = {"last_scan": "Awaiting scan", "stocks": []}
     if os.path.exists('data/top_stocks.json'):
         try:
@@ -231,14 +302,63 @@ def index():
                 data = json.load(f)
         except:
             pass
+    payload = criteria_codec.compact_payload({"stocks": data.get('stocks', []), "last_scan": data.get('last_scan')})
+    return 'window.__INDEX_DATA__ = ' + json.dumps(payload, separators=(',', ':')) + ';\n'
+
+
+def _index_template():
+    """build/index.html (inline JS/CSS moved to /assets by build_assets.py) while it matches the source."""
+    templates = os.path.join(app.root_path, app.template_folder)
+    try:
+        with open(os.path.join(app.root_path, 'static/assets/manifest.json')) as f:
+            built = json.load(f)['pages']['templates/index.html']
+        with open(os.path.join(templates, 'index.html'), 'rb') as f:
+            if hashlib.sha256(f.read()).hexdigest() == built['source_sha256']:
+                return 'build/index.html'
+        app.logger.warning("templates/build/index.html is stale — serving inline template; run build_assets.py")
+    except (OSError, ValueError, KeyError):
+        pass
+    return 'index.html'
+
+
+@app.route('/')
+def index():
+    # Static shell: depends only on the template (and its asset build), so repeat visits get a 304.
     # v4.5 Moonshot Score integration
-    resp = render_template('index.html', stocks=data.get('stocks', []), last_scan=data.get('last_scan'), version="4.6")
-    response = app.make_response(resp)
-    response.headers['Cache-Control'] = 'no-store, no-cache, must-revalidate, max-age=0'
-    response.headers['Pragma'] = 'no-cache'
-    response.headers['Expires'] = '0'
+    templates = os.path.join(app.root_path, app.template_folder)
+    version = tuple(_file_version(os.path.join(templates, name)) for name in ('index.html', 'build/index.html'))
+    return _cached_response('index.html', version,
+                            lambda: render_template(_index_template(), version="4.6"), 'text/html')
+
+
+@app.route('/assets/<path:filename>')
+def built_asset(filename):
+    """Content-hashed JS/CSS from build_assets.py: immutable, precompressed variant when accepted."""
+    import mimetypes
+    from flask import send_file
+    from werkzeug.security import safe_join
+    path = safe_join(os.path.join(app.root_path, 'static', 'assets'), filename)
+    if path is None or not os.path.isfile(path):
+        return jsonify({"error": "Not found"}), 404
+    mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    for encoding, ext in (('br', '.br'), ('gzip', '.gz')):
+        if encoding in request.accept_encodings and os.path.isfile(path + ext):
+            response = send_file(path + ext, mimetype=mimetype, conditional=True)
+            response.headers['Content-Encoding'] = encoding
+            break
+    else:
+        response = send_file(path, mimetype=mimetype, conditional=True)
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['Cache-Control'] = 'public, max-age=31536000, s-maxage=31536000, immutable'
     return response
 
+
+@app.route('/index-data.js')
+def index_data():
+    """Stock list for the index shell, versioned by the top_stocks.json generation."""
+    return _cached_response('index-data.js', _file_version('data/top_stocks.json'),
+                            _index_data_js, 'application/javascript')
+
 @app.route('/breakout-explorer')
 def breakout_explorer():
     """Interactive breakout ML data explorer"""
@@ -335,6 +455,9 @@ def all_stocks():
             ins = ins_lookup.get(ticker, {})
             stock['ins_score'] = ins.get('ins_score', stock.get('ins_score', 0))
             stock['insider_signal'] = ins.get('insider_signal', stock.get('insider_signal', 'neutral'))
+        # ?criteria=compact: shared criteria schema + per-stock rows (criteria_codec), expanded client-side
+        if request.args.get('criteria') == 'compact':
+            data = criteria_codec.compact_payload(data)
         return jsonify(data)
     except FileNotFoundError:
         return jsonify({"error": "Stock data not found"}), 500
@@ -349,7 +472,8 @@ def get_news(ticker):
         stock = yf.Ticker(ticker.upper())
         news_items = []
         
-        raw_news = stock.news or []
+        with outbound('yahoo'):
+            raw_news = stock.news or []
         for n in raw_news[:5]:
             content = n.get('content', {})
             title = content.get('title')
@@ -396,7 +520,7 @@ def watchlist():
             f'{SUPABASE_URL}/rest/v1/baskets?select=name,icon,weight,sort_order,holdings(ticker,position_pct)&order=sort_order',
             headers=sb_headers
         )
-        baskets_raw = json.loads(urllib.request.urlopen(req).read())
+        baskets_raw = json.loads(timed_urlopen(req).read())
 
         all_stocks_list = []
         baskets = {}
@@ -440,7 +564,7 @@ def watchlist():
         return jsonify({
             'all': all_stocks_list,
             'baskets': baskets,
-            'last_updated': datetime.now(ZoneInfo("America/New_York")).strftime("%Y-%m-%d %H:%M EST")
+            'last_updated': _now_et().strftime("%Y-%m-%d %H:%M EST")
         })
 
     except Exception as e:
@@ -448,7 +572,7 @@ def watchlist():
         try:
             with open('data/watchlist.json') as f:
                 data = json.load(f)
-            data['last_updated'] = datetime.now(ZoneInfo("America/New_York")).strftime("%Y-%m-%d %H:%M EST")
+            data['last_updated'] = _now_et().strftime("%Y-%m-%d %H:%M EST")
             return jsonify(data)
         except Exception:
             pass
@@ -467,7 +591,7 @@ def watchlist_live():
                 'apikey': SUPABASE_KEY,
                 'Authorization': f'Bearer {SUPABASE_KEY}'
             })
-            resp = urllib.request.urlopen(req)
+            resp = timed_urlopen(req)
             holdings = json.loads(resp.read())
             tickers = list(set(h['ticker'] for h in holdings))
         except:
@@ -491,7 +615,7 @@ def watchlist_live():
             live[t]['insider_signal'] = ins.get('insider_signal', 'neutral')
 
         return jsonify({
-            "timestamp": datetime.now(ZoneInfo("America/New_York")).strftime("%Y-%m-%d %H:%M:%S EST"),
+            "timestamp": _now_et().strftime("%Y-%m-%d %H:%M:%S EST"),
             "prices": live
         })
     except Exception as e:
@@ -600,7 +724,7 @@ def get_portfolio():
             'apikey': SUPABASE_KEY,
             'Authorization': f'Bearer {SUPABASE_KEY}'
         })
-        resp = urllib.request.urlopen(req)
+        resp = timed_urlopen(req)
         baskets = json.loads(resp.read())
         
         # Transform to the format the frontend expects
@@ -638,23 +762,23 @@ def save_portfolio():
 
         def sb_get(path):
             req = urllib.request.Request(f'{SUPABASE_URL}{path}', headers=sb_headers)
-            return json.loads(urllib.request.urlopen(req).read())
+            return json.loads(timed_urlopen(req).read())
 
         def sb_post(path, payload, prefer=None):
             h = {**sb_headers}
             if prefer: h['Prefer'] = prefer
             req = urllib.request.Request(f'{SUPABASE_URL}{path}',
                 data=json.dumps(payload).encode(), method='POST', headers=h)
-            return json.loads(urllib.request.urlopen(req).read())
+            return json.loads(timed_urlopen(req).read())
 
         def sb_patch(path, payload):
             req = urllib.request.Request(f'{SUPABASE_URL}{path}',
                 data=json.dumps(payload).encode(), method='PATCH', headers=sb_headers)
-            urllib.request.urlopen(req)
+            timed_urlopen(req)
 
         def sb_delete(path):
             req = urllib.request.Request(f'{SUPABASE_URL}{path}', method='DELETE', headers=sb_headers)
-            urllib.request.urlopen(req)
+            timed_urlopen(req)
 
         try:
             # --- Step 1: Get current state from Supabase ---
@@ -736,7 +860,7 @@ def get_watchlists():
             'apikey': SUPABASE_KEY,
             'Authorization': f'Bearer {SUPABASE_KEY}'
         })
-        resp = urllib.request.urlopen(req)
+        resp = timed_urlopen(req)
         watchlists = json.loads(resp.read())
 
         # Load scores from all_stocks.json
@@ -794,7 +918,7 @@ def create_watchlist():
                 'Prefer': 'return=representation'
             }
         )
-        resp = urllib.request.urlopen(req)
+        resp = timed_urlopen(req)
         row = json.loads(resp.read())[0]
         return jsonify({"status": "ok", "id": row["id"], "name": row["name"]})
     except Exception as e:
@@ -809,7 +933,7 @@ def delete_watchlist(wl_id):
             method='DELETE',
             headers={'apikey': SUPABASE_KEY, 'Authorization': f'Bearer {SUPABASE_KEY}'}
         )
-        urllib.request.urlopen(req)
+        timed_urlopen(req)
         return jsonify({"status": "ok"})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -841,7 +965,7 @@ def add_watchlist_item(wl_id):
                 'Prefer': 'return=representation'
             }
         )
-        resp = urllib.request.urlopen(req)
+        resp = timed_urlopen(req)
         return jsonify({"status": "ok"})
     except urllib.error.HTTPError as e:
         err_body = e.read().decode()
@@ -860,7 +984,7 @@ def delete_watchlist_item(item_id):
             method='DELETE',
             headers={'apikey': SUPABASE_KEY, 'Authorization': f'Bearer {SUPABASE_KEY}'}
         )
-        urllib.request.urlopen(req)
+        timed_urlopen(req)
         return jsonify({"status": "ok"})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -900,7 +1024,7 @@ def watchlists_live():
             'apikey': SUPABASE_KEY,
             'Authorization': f'Bearer {SUPABASE_KEY}'
         })
-        resp = urllib.request.urlopen(req)
+        resp = timed_urlopen(req)
         items = json.loads(resp.read())
         tickers = list(set(i['ticker'] for i in items))
         if not tickers:
@@ -914,7 +1038,7 @@ def watchlists_live():
             live[t]['ins_score'] = ins.get('ins_score', 0)
             live[t]['insider_signal'] = ins.get('insider_signal', 'neutral')
 
-        return jsonify({"prices": live, "timestamp": datetime.now(ZoneInfo("America/New_York")).strftime("%Y-%m-%d %H:%M:%S EST")})
+        return jsonify({"prices": live, "timestamp": _now_et().strftime("%Y-%m-%d %H:%M:%S EST")})
     except Exception as e:
         return jsonify({"prices": {}, "error": str(e)})
 
@@ -967,7 +1091,7 @@ def market_internals():
             try:
                 url = f'https://query1.finance.yahoo.com/v8/finance/chart/{sym}?range=1y&interval=1d'
                 req = urllib.request.Request(url, headers={'User-Agent': 'Mozilla/5.0'})
-                resp = urllib.request.urlopen(req, timeout=10)
+                resp = timed_urlopen(req, timeout=10)
                 chart = json.loads(resp.read())
                 result = chart.get('chart', {}).get('result', [{}])[0]
                 closes = result.get('indicators', {}).get('quote', [{}])[0].get('close', [])
@@ -994,7 +1118,7 @@ def market_internals():
         try:
             url = 'https://query1.finance.yahoo.com/v8/finance/spark?symbols=%5EVIX&range=1d&interval=1m'
             req = urllib.request.Request(url, headers={'User-Agent': 'Mozilla/5.0'})
-            resp = urllib.request.urlopen(req, timeout=8)
+            resp = timed_urlopen(req, timeout=8)
             vix_data = json.loads(resp.read())
             vix_closes = vix_data.get('^VIX', {}).get('close', [])
             vix_current = vix_closes[-1] if vix_closes else None
@@ -1042,7 +1166,7 @@ def market_internals():
         try:
             url = 'https://query1.finance.yahoo.com/v8/finance/chart/SPY?interval=1d&range=3mo'
             req = urllib.request.Request(url, headers={'User-Agent': 'Mozilla/5.0'})
-            resp = urllib.request.urlopen(req, timeout=10)
+            resp = timed_urlopen(req, timeout=10)
             spy_chart = json.loads(resp.read())['chart']['result'][0]
             spy_closes = spy_chart['indicators']['quote'][0]['close']
             spy_volumes = spy_chart['indicators']['quote'][0]['volume']
@@ -1105,7 +1229,7 @@ def market_internals():
         except Exception:
             results['market_stage'] = None
 
-        results['timestamp'] = datetime.now(ZoneInfo("America/New_York")).strftime("%Y-%m-%d %H:%M:%S EST")
+        results['timestamp'] = _now_et().strftime("%Y-%m-%d %H:%M:%S EST")
         return jsonify(results)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -1126,30 +1250,17 @@ def catalyst_calendar():
 
 
 ## ===== THESIS JOURNAL =====
-def _load_json(path, default=None):
-    try:
-        with open(path) as f:
-            return json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        return default if default is not None else []
-
-def _save_json(path, data):
-    try:
-        os.makedirs(os.path.dirname(path), exist_ok=True)
-        with open(path, 'w') as f:
-            json.dump(data, f, indent=2)
-    except OSError:
-        pass
-
-THESIS_FILE = 'data/trade_theses.json'
-JOURNAL_FILE = 'data/trade_journal.json'
-
+# Theses, trades and alerts live in journal_store (SQLite, legacy JSON files migrated on first use)
 @app.route('/api/thesis', methods=['GET'])
 def get_theses():
     ticker = request.args.get('ticker', '').upper()
-    theses = _load_json(THESIS_FILE, [])
+    status = request.args.get('status', '').upper()
+    filters = {}
     if ticker:
-        theses = [t for t in theses if t.get('ticker') == ticker]
+        filters['ticker'] = ticker
+    if status:
+        filters['status'] = status
+    theses = get_store().query('theses', **filters)
     return jsonify({"theses": theses})
 
 @app.route('/api/thesis', methods=['POST'])
@@ -1161,9 +1272,7 @@ def save_thesis():
             if not data.get(field):
                 return jsonify({"error": f"{field} is required"}), 400
 
-        theses = _load_json(THESIS_FILE, [])
         entry = {
-            "id": len(theses) + 1,
             "ticker": data['ticker'].upper(),
             "thesis": data['thesis'],
             "target_price": float(data['target_price']),
@@ -1174,61 +1283,46 @@ def save_thesis():
             "prove_wrong": data.get('prove_wrong', ''),
             "checklist": data.get('checklist', {}),
             "rr_ratio": float(data.get('rr_ratio', 0)),
-            "created_at": datetime.now(ZoneInfo("America/New_York")).isoformat(),
+            "created_at": _now_et().isoformat(),
             "status": "OPEN"
         }
-        theses.append(entry)
-        _save_json(THESIS_FILE, theses)
-        return jsonify({"status": "ok", "id": entry["id"]})
+        thesis_id = get_store().insert('theses', entry)
+        return jsonify({"status": "ok", "id": thesis_id})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 ## ===== TRADE JOURNAL =====
+def _trade_stats(store):
+    """stats (scoped to ?ticker=) plus the ?group_by= breakdown. The aggregates are per group kind,
+    so a ticker-scoped breakdown is not available — that combination is a ValueError (400)."""
+    ticker = request.args.get('ticker', '').upper()
+    group_by = request.args.get('group_by')
+    if ticker and group_by:
+        raise ValueError('group_by cannot be combined with ticker')
+    result = {"stats": store.trade_stats('ticker', ticker) if ticker else store.trade_stats()}
+    if group_by:
+        result["groups"] = store.trade_stats(group_by)
+    return ticker, result
+
 @app.route('/api/trade_journal', methods=['GET'])
 def get_trade_journal():
-    trades = _load_json(JOURNAL_FILE, [])
-    # Calculate P&L for each trade
-    wins, losses = [], []
-    for t in trades:
-        if t.get('exit_price') and t.get('entry_price') and t['entry_price'] > 0:
-            t['pl_pct'] = round((t['exit_price'] - t['entry_price']) / t['entry_price'] * 100, 2)
-            if t['pl_pct'] > 0:
-                wins.append(t['pl_pct'])
-            else:
-                losses.append(t['pl_pct'])
-        else:
-            t['pl_pct'] = None
-        # Days held
-        if t.get('entry_date') and t.get('exit_date'):
-            try:
-                d1 = datetime.strptime(t['entry_date'][:10], '%Y-%m-%d')
-                d2 = datetime.strptime(t['exit_date'][:10], '%Y-%m-%d')
-                t['days_held'] = (d2 - d1).days
-            except:
-                t['days_held'] = None
-        else:
-            t['days_held'] = None
-
-    total_trades = len([t for t in trades if t.get('pl_pct') is not None])
-    win_rate = round(len(wins) / total_trades * 100, 1) if total_trades else 0
-    avg_win = round(sum(wins) / len(wins), 2) if wins else 0
-    avg_loss = round(sum(losses) / len(losses), 2) if losses else 0
-    gross_wins = sum(wins)
-    gross_losses = abs(sum(losses))
-    profit_factor = round(gross_wins / gross_losses, 2) if gross_losses > 0 else float('inf') if gross_wins > 0 else 0
-    total_pl = round(sum(t.get('pl_pct', 0) or 0 for t in trades), 2)
-
-    return jsonify({
-        "trades": trades,
-        "stats": {
-            "total_trades": total_trades,
-            "win_rate": win_rate,
-            "avg_win": avg_win,
-            "avg_loss": avg_loss,
-            "profit_factor": profit_factor,
-            "total_pl": total_pl
-        }
-    })
+    """Trades with P&L stats. pl_pct/days_held are stored per trade and the stats come from
+    running aggregates, so nothing is recomputed here. ?ticker= scopes trades and stats to one ticker;
+    ?group_by=basket|month|thesis_id|ticker adds a journal-wide breakdown (not combinable with ?ticker=)."""
+    try:
+        store = get_store()
+        ticker, stats = _trade_stats(store)
+        return jsonify({"trades": store.query('trades', **({'ticker': ticker} if ticker else {})), **stats})
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+@app.route('/api/trade_journal/stats', methods=['GET'])
+def get_trade_journal_stats():
+    """Stats only (no trade list): ?ticker= scopes them, ?group_by= adds a basket/month/thesis_id/ticker breakdown"""
+    try:
+        return jsonify(_trade_stats(get_store())[1])
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
 @app.route('/api/trade_journal', methods=['POST'])
 def add_trade():
@@ -1237,25 +1331,45 @@ def add_trade():
         if not data.get('ticker'):
             return jsonify({"error": "ticker required"}), 400
 
-        trades = _load_json(JOURNAL_FILE, [])
         trade = {
-            "id": len(trades) + 1,
             "ticker": data['ticker'].upper(),
             "basket": data.get('basket', ''),
             "action": data.get('action', 'BUY').upper(),
             "entry_price": float(data.get('entry_price', 0)),
             "exit_price": float(data['exit_price']) if data.get('exit_price') else None,
             "quantity_or_pct": data.get('quantity_or_pct', ''),
-            "entry_date": data.get('entry_date', datetime.now(ZoneInfo("America/New_York")).strftime('%Y-%m-%d')),
+            "entry_date": data.get('entry_date', _now_et().strftime('%Y-%m-%d')),
             "exit_date": data.get('exit_date'),
             "thesis_id": data.get('thesis_id'),
             "exit_reason": data.get('exit_reason', ''),
             "notes": data.get('notes', ''),
-            "created_at": datetime.now(ZoneInfo("America/New_York")).isoformat()
+            "created_at": _now_et().isoformat()
         }
-        trades.append(trade)
-        _save_json(JOURNAL_FILE, trades)
-        return jsonify({"status": "ok", "id": trade["id"]})
+        trade_id = get_store().insert('trades', trade)
+        return jsonify({"status": "ok", "id": trade_id})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/trade_journal/<int:trade_id>', methods=['PATCH'])
+def close_trade(trade_id):
+    """Close (or amend) a trade — exit_price, exit_date, exit_reason, notes"""
+    try:
+        data = request.get_json(silent=True) or {}
+        changes = {}
+        if data.get('exit_price'):
+            changes['exit_price'] = float(data['exit_price'])
+            changes['exit_date'] = data.get('exit_date', _now_et().strftime('%Y-%m-%d'))
+        elif data.get('exit_date'):
+            changes['exit_date'] = data['exit_date']
+        for field in ('exit_reason', 'notes'):
+            if field in data:
+                changes[field] = data[field]
+        if not changes:
+            return jsonify({"error": "nothing to update (exit_price, exit_date, exit_reason or notes)"}), 400
+        trade = get_store().update('trades', trade_id, changes)
+        if trade is None:
+            return jsonify({"error": "Trade not found"}), 404
+        return jsonify({"status": "ok", "trade": trade})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -1272,7 +1386,7 @@ def insider_activity():
                 f'{SUPABASE_URL}/rest/v1/holdings?select=ticker',
                 headers=sb_headers
             )
-            holdings = json.loads(urllib.request.urlopen(req).read())
+            holdings = json.loads(timed_urlopen(req).read())
             tickers = list(set(h['ticker'] for h in holdings))
         except:
             pass
@@ -1289,7 +1403,7 @@ def insider_activity():
                 req = urllib.request.Request(url, headers={
                     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
                 })
-                resp = urllib.request.urlopen(req, timeout=10)
+                resp = timed_urlopen(req, timeout=10)
                 html = resp.read().decode('utf-8', errors='ignore')
 
                 # Parse insider table — look for rows with insider data
@@ -1314,6 +1428,7 @@ def insider_activity():
                 pass
             return results
 
+        from concurrent.futures import ThreadPoolExecutor, as_completed
         with ThreadPoolExecutor(max_workers=6) as executor:
             futures = {executor.submit(fetch_insider, t): t for t in tickers[:20]}
             for f in as_completed(futures):
@@ -1339,7 +1454,7 @@ def insider_activity():
         return jsonify({
             "insider_data": insider_data[:100],
             "cluster_buys": cluster_buys,
-            "timestamp": datetime.now(ZoneInfo("America/New_York")).strftime("%Y-%m-%d %H:%M:%S EST")
+            "timestamp": _now_et().strftime("%Y-%m-%d %H:%M:%S EST")
         })
     except Exception as e:
         return jsonify({"error": str(e), "insider_data": [], "cluster_buys": []}), 500
@@ -1355,7 +1470,7 @@ def portfolio_risk():
             f'{SUPABASE_URL}/rest/v1/baskets?select=name,holdings(ticker,position_pct)&order=sort_order',
             headers=sb_headers
         )
-        baskets_raw = json.loads(urllib.request.urlopen(req).read())
+        baskets_raw = json.loads(timed_urlopen(req).read())
 
         basket_tickers = {}
         all_tickers = set()
@@ -1381,7 +1496,7 @@ def portfolio_risk():
             try:
                 url = f'https://query1.finance.yahoo.com/v8/finance/chart/{ticker}?range=6mo&interval=1d'
                 req = urllib.request.Request(url, headers={'User-Agent': 'Mozilla/5.0'})
-                resp = urllib.request.urlopen(req, timeout=10)
+                resp = timed_urlopen(req, timeout=10)
                 chart = json.loads(resp.read())
                 closes = chart.get('chart', {}).get('result', [{}])[0].get('indicators', {}).get('quote', [{}])[0].get('close', [])
                 valid = [c for c in closes if c is not None]
@@ -1393,6 +1508,7 @@ def portfolio_risk():
             except:
                 return ticker, []
 
+        from concurrent.futures import ThreadPoolExecutor, as_completed
         with ThreadPoolExecutor(max_workers=10) as executor:
             futures = {executor.submit(fetch_returns, t): t for t in fetch_tickers}
             for f in as_completed(futures):
@@ -1478,7 +1594,7 @@ def portfolio_risk():
                 "top5": top5,
                 "top5_total_pct": top5_total
             },
-            "timestamp": datetime.now(ZoneInfo("America/New_York")).strftime("%Y-%m-%d %H:%M:%S EST")
+            "timestamp": _now_et().strftime("%Y-%m-%d %H:%M:%S EST")
         })
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -1570,18 +1686,17 @@ def screener():
         return jsonify({
             'results': results[:200],
             'total': len(results),
-            'timestamp': datetime.now(ZoneInfo("America/New_York")).strftime("%Y-%m-%d %H:%M EST")
+            'timestamp': _now_et().strftime("%Y-%m-%d %H:%M EST")
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
 ## ===== ALERTS =====
-ALERTS_FILE = 'data/alerts.json'
-
 @app.route('/api/alerts', methods=['GET'])
 def get_alerts():
-    alerts = _load_json(ALERTS_FILE, [])
+    ticker = request.args.get('ticker', '').strip().upper()
+    alerts = get_store().query('alerts', **({'ticker': ticker} if ticker else {}))
     return jsonify({'alerts': alerts})
 
 @app.route('/api/alerts', methods=['POST'])
@@ -1594,19 +1709,16 @@ def create_alert():
         if not ticker or not atype or threshold is None:
             return jsonify({'error': 'ticker, type, and threshold required'}), 400
 
-        alerts = _load_json(ALERTS_FILE, [])
         alert = {
-            'id': len(alerts) + 1,
             'ticker': ticker,
             'type': atype,
             'threshold': float(threshold),
             'triggered': False,
             'triggered_at': None,
             'current_value': None,
-            'created_at': datetime.now(ZoneInfo("America/New_York")).isoformat()
+            'created_at': _now_et().isoformat()
         }
-        alerts.append(alert)
-        _save_json(ALERTS_FILE, alerts)
+        alert = {'id': get_store().insert('alerts', alert), **alert}
         return jsonify({'status': 'ok', 'alert': alert})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -1614,9 +1726,7 @@ def create_alert():
 @app.route('/api/alerts/<int:alert_id>', methods=['DELETE'])
 def delete_alert(alert_id):
     try:
-        alerts = _load_json(ALERTS_FILE, [])
-        alerts = [a for a in alerts if a.get('id') != alert_id]
-        _save_json(ALERTS_FILE, alerts)
+        get_store().delete('alerts', alert_id)
         return jsonify({'status': 'ok'})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -1665,7 +1775,7 @@ def dashboard_summary():
         try:
             url = f'https://query1.finance.yahoo.com/v8/finance/spark?symbols={symbols}&range=1d&interval=1m'
             req = urllib.request.Request(url, headers={'User-Agent': 'Mozilla/5.0'})
-            resp = urllib.request.urlopen(req, timeout=8)
+            resp = timed_urlopen(req, timeout=8)
             data = json.loads(resp.read())
             for sym, info in data.items():
                 closes = info.get('close', [])
@@ -1686,7 +1796,7 @@ def dashboard_summary():
         try:
             url = f'https://query1.finance.yahoo.com/v8/finance/chart/{sym}?range=1y&interval=1d'
             req = urllib.request.Request(url, headers={'User-Agent': 'Mozilla/5.0'})
-            resp = urllib.request.urlopen(req, timeout=10)
+            resp = timed_urlopen(req, timeout=10)
             chart = json.loads(resp.read())
             result = chart.get('chart', {}).get('result', [{}])[0]
             closes = result.get('indicators', {}).get('quote', [{}])[0].get('close', [])
@@ -1713,7 +1823,7 @@ def dashboard_summary():
         try:
             url = f'https://query1.finance.yahoo.com/v8/finance/chart/{encoded}?range=1d&interval=1m'
             req = urllib.request.Request(url, headers={'User-Agent': 'Mozilla/5.0'})
-            resp = urllib.request.urlopen(req, timeout=8)
+            resp = timed_urlopen(req, timeout=8)
             data = json.loads(resp.read())['chart']['result'][0]
             meta = data['meta']
             price = meta.get('regularMarketPrice', 0)
@@ -1738,101 +1848,112 @@ def dashboard_summary():
 # Deep Research Endpoints
 # ═══════════════════════════════════════════════════════════════
 
-_active_research = {}  # session_id → True, prevents duplicate runs
+def _research_event_stream(job, session_id):
+    """SSE response following a research job, replaying anything after the client's Last-Event-ID."""
+    from research_jobs import sse_stream, last_event_id
+
+    def tag(event_type, event_data):
+        if isinstance(event_data, dict):
+            return {**event_data, '_session_id': session_id}
+        return event_data
+
+    stream = sse_stream(job, last_event_id(request), idle_timeout=300, on_event=tag)
+    return Response(stream, mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',
+        'Connection': 'keep-alive',
+    })
+
 
 @app.route('/api/research/stream', methods=['POST'])
 def research_stream():
-    """Stream SSE events from the multi-agent research pipeline."""
+    """Stream SSE events from the multi-agent research pipeline.
+
+    Posting a session_id whose job is still running (or finished within the resume window)
+    re-attaches to it instead of starting a new run; send Last-Event-ID to skip events already seen.
+    """
+    from research_jobs import get_scheduler, request_user, save_report, SchedulerFull, UserLimitReached
     data = request.get_json(force=True)
     query = data.get('query', '').strip()
     session_id = data.get('session_id', str(uuid.uuid4()))
     
     mode = data.get('mode', 'deep')  # 'quick' or 'deep'
+    use_cache = data.get('cache')  # None → server default (RESEARCH_LLM_CACHE)
     
     if not query:
         return jsonify({'error': 'query is required'}), 400
 
-    # Prevent duplicate concurrent runs (same session)
-    if session_id in _active_research:
+    scheduler = get_scheduler()
+    job = scheduler.get(session_id)
+    if job is not None:
+        return _research_event_stream(job, session_id)
+
+    def run_research(emit):
+        from agent_committee import research, quick_research
+        final_data = {}
+
+        def emit_tracked(event_type, event_data):
+            if event_type == 'complete':
+                final_data.update(event_data)
+            emit(event_type, event_data)
+
+        if mode == 'fast':
+            result = quick_research(query, emit=emit_tracked, use_cache=use_cache)
+        else:
+            result = research(query, emit=emit_tracked, use_cache=use_cache)
+        # If no complete event was emitted (e.g. error path), emit one
+        if not result.get('error') and not result.get('final_report'):
+            emit('error', {'message': 'Pipeline completed without producing a report'})
+        # Saved once per job here, not per subscriber
+        if final_data:
+            save_report(SUPABASE_URL, SUPABASE_KEY, query, final_data, result.get('timing'))
+        return result
+
+    # Runs on the shared worker pool; rejects overload and concurrent duplicates. Identical queries
+    # (same normalized text, mode and data) share one job unless the caller opted out of caching.
+    from agent_committee import research_flight_key
+    flight_key = None if use_cache is False else research_flight_key(query, mode)
+    try:
+        job = scheduler.submit(run_research, user=request_user(request), job_id=session_id,
+                               key=flight_key)
+    except ValueError:
         return jsonify({'error': 'Research already in progress for this session'}), 429
-    _active_research[session_id] = True
+    except UserLimitReached as e:
+        return jsonify({'error': str(e)}), 429
+    except SchedulerFull as e:
+        return jsonify({'error': str(e)}), 503, {'Retry-After': '30'}
+    return _research_event_stream(job, session_id)
 
-    event_queue = queue.Queue()
 
-    def emit_callback(event_type, event_data):
-        event_queue.put((event_type, event_data))
+@app.route('/api/research/stream/<session_id>')
+def research_stream_resume(session_id):
+    """Follow (or resume) an existing research job — works with EventSource, which sends Last-Event-ID itself."""
+    from research_jobs import get_scheduler
+    job = get_scheduler().get(session_id)
+    if job is None:
+        return jsonify({'error': 'No active research for this session'}), 404
+    return _research_event_stream(job, session_id)
 
-    def run_research():
-        try:
-            from agent_committee import research, quick_research
-            if mode == 'fast':
-                result = quick_research(query, emit=emit_callback)
-            else:
-                result = research(query, emit=emit_callback)
-            # If no complete event was emitted (e.g. error path), emit one
-            if not result.get('error') and not result.get('final_report'):
-                event_queue.put(('error', {'message': 'Pipeline completed without producing a report'}))
-        except Exception as e:
-            event_queue.put(('error', {'message': str(e), 'traceback': traceback.format_exc()}))
-        finally:
-            event_queue.put(('__done__', None))
-            _active_research.pop(session_id, None)
-
-    thread = threading.Thread(target=run_research, daemon=True)
-    thread.start()
-
-    def generate():
-        final_data = None
-        while True:
-            try:
-                event_type, event_data = event_queue.get(timeout=300)
-            except queue.Empty:
-                yield f"event: error\ndata: {json.dumps({'message': 'Timeout'})}\n\n"
-                break
-
-            if event_type == '__done__':
-                # Save report to Supabase if we have a complete result
-                if final_data and SUPABASE_KEY:
-                    try:
-                        report_row = {
-                            'id': str(uuid.uuid4()),
-                            'query': query,
-                            'report': final_data.get('report', ''),
-                            'risk_flags': final_data.get('risk_flags', ''),
-                            'tickers': final_data.get('tickers', []),
-                            'intents': final_data.get('intents', []),
-                            'sources': final_data.get('sources', []),
-                            'created_at': datetime.now(timezone.utc).isoformat(),
-                        }
-                        req_body = json.dumps(report_row).encode()
-                        req = urllib.request.Request(
-                            f'{SUPABASE_URL}/rest/v1/research_reports',
-                            data=req_body,
-                            headers={
-                                'apikey': SUPABASE_KEY,
-                                'Authorization': f'Bearer {SUPABASE_KEY}',
-                                'Content-Type': 'application/json',
-                                'Prefer': 'return=representation',
-                            },
-                            method='POST'
-                        )
-                        urllib.request.urlopen(req, timeout=10)
-                    except Exception:
-                        pass  # Non-critical — report is already sent to client
-                break
 
-            if event_type == 'complete':
-                final_data = event_data
+@app.route('/api/research/jobs/metrics')
+def research_job_metrics():
+    """Research scheduler queue depth, wait times and job counts."""
+    from research_jobs import get_scheduler
+    return jsonify(get_scheduler().metrics())
 
-            if isinstance(event_data, dict):
-                event_data['_session_id'] = session_id
-            yield f"event: {event_type}\ndata: {json.dumps(event_data, default=str)}\n\n"
 
-    return Response(generate(), mimetype='text/event-stream', headers={
-        'Cache-Control': 'no-cache',
-        'X-Accel-Buffering': 'no',
-        'Connection': 'keep-alive',
-    })
+@app.route('/api/research/timing')
+def research_timing():
+    """Latency percentiles per pipeline stage, LLM model and data fetch over recent runs, plus token totals."""
+    from agent_committee import timing_stats
+    return jsonify(timing_stats())
+
+
+@app.route('/api/research/cache_stats')
+def research_cache_stats():
+    """Hit rates and entry counts for the shared research caches (yfinance data + LLM responses)."""
+    from research_cache import all_stats
+    return jsonify(all_stats())
 
 
 @app.route('/api/reports')
@@ -1848,7 +1969,7 @@ def list_reports():
                 'Authorization': f'Bearer {SUPABASE_KEY}',
             }
         )
-        resp = urllib.request.urlopen(req, timeout=10)
+        resp = timed_urlopen(req, timeout=10)
         reports = json.loads(resp.read())
         return jsonify({'reports': reports})
     except Exception as e:
@@ -1869,7 +1990,7 @@ def get_report(report_id):
                 'Accept': 'application/vnd.pgrst.object+json',
             }
         )
-        resp = urllib.request.urlopen(req, timeout=10)
+        resp = timed_urlopen(req, timeout=10)
         report = json.loads(resp.read())
         return jsonify(report)
     except Exception as e:
@@ -1890,7 +2011,7 @@ def delete_report(report_id):
             },
             method='DELETE'
         )
-        urllib.request.urlopen(req, timeout=10)
+        timed_urlopen(req, timeout=10)
         return jsonify({'ok': True})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -0,0 +1,531 @@
+"""
+Endpoint Benchmarks — p50/p95 latency and peak memory for every /api/* route, offline.
+
+Drives app.py through Flask's test client with its outbound calls served by local stand-ins:
+- urllib (Yahoo chart/spark, Supabase REST, Finviz): responses from fixtures/endpoints/http.json
+  when recorded (matched by method + URL), synthetic ones shaped like the real APIs otherwise.
+  No fixture set is committed yet — recording needs network access and the live Supabase key —
+  so until `record` has been run every response is synthetic (the "synthetic" counts in --save).
+- yfinance: a stub module whose Ticker has no earnings/news data (those routes take their
+  empty-data path; their cost is the network wait, modelled by the latency settings)
+
+Each universe runs in its own scratch directory: "real" uses the data/*.json files as they are,
+"10k"/"50k" (any N) are generated by synth_universe.py, so the file-scanning routes can be
+measured at sizes the production data has not reached yet. Journal/cache databases also live in
+the scratch directory, so write endpoints never touch real data.
+
+Latency is measured over --runs requests per endpoint; peak memory is traced (tracemalloc) on
+one extra request so it does not distort the timings. Non-2xx rows are marked ("!") and left out
+of the latency/memory comparison — a failing route is fast for the wrong reason — while a status
+that differs from the baseline counts as a regression. /api/breakout_viz and /api/rate/<ticker>
+currently fail everywhere (data/breakout_viz.json and rater.py are not in this repo). The research SSE stream and the admin
+profile routes are not covered — bench_research.py benchmarks the research pipeline.
+
+Usage:
+  python3 bench_endpoints.py                                  # real data, 5 runs per endpoint
+  python3 bench_endpoints.py --universes real,10k,50k --runs 3
+  python3 bench_endpoints.py --save bench_endpoints.json      # write a baseline
+  python3 bench_endpoints.py --baseline bench_endpoints.json --threshold 0.25
+  python3 bench_endpoints.py record                           # capture live GET responses as fixtures
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import math
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import types
+import urllib.error
+import urllib.parse
+import urllib.request
+from contextlib import contextmanager
+
+import synth_universe
+
+BASE = os.path.dirname(os.path.abspath(__file__))
+FIXTURE_PATH = os.path.join(BASE, 'fixtures', 'endpoints', 'http.json')
+BENCH_SUPABASE_URL = 'https://bench.supabase.co'
+
+# Data files copied into every scratch universe as they are (missing ones are skipped)
+STATIC_FILES = ['sell_signals.json', 'earnings_calendar.json', 'watchlist.json', 'insider_signals.json',
+                'breakout_viz.json', 'avg_volumes.json', 'portfolio.json']
+
+# (method, path, JSON body). {ticker} is the universe's top-scored ticker.
+ENDPOINTS = [
+    ('GET', '/api/all_stocks', None),
+    ('GET', '/api/report/{ticker}', None),
+    ('GET', '/api/rotation', None),
+    ('GET', '/api/screener', None),
+    ('GET', '/api/screener?grades=A,B&rotation_min=60&sort=ewros_score', None),
+    ('GET', '/api/insider_signals', None),
+    ('GET', '/api/sell_signals', None),
+    ('GET', '/api/catalyst_calendar', None),
+    ('GET', '/api/breakout_viz', None),
+    ('GET', '/api/rate/{ticker}', None),
+    ('GET', '/api/earnings/{ticker}', None),
+    ('GET', '/api/news/{ticker}', None),
+    ('GET', '/api/stock_price/{ticker}', None),
+    ('GET', '/api/watchlist', None),
+    ('GET', '/api/watchlist/live', None),
+    ('GET', '/api/portfolio', None),
+    ('GET', '/api/watchlists', None),
+    ('GET', '/api/watchlists/live', None),
+    ('GET', '/api/market_internals', None),
+    ('GET', '/api/dashboard_summary', None),
+    ('GET', '/api/insider_activity', None),
+    ('GET', '/api/portfolio_risk', None),
+    ('GET', '/api/thesis', None),
+    ('GET', '/api/trade_journal', None),
+    ('GET', '/api/trade_journal/stats', None),
+    ('GET', '/api/alerts', None),
+    ('GET', '/api/reports', None),
+    ('GET', '/api/reports/bench-report', None),
+    ('GET', '/api/research/jobs/metrics', None),
+    ('GET', '/api/research/timing', None),
+    ('GET', '/api/research/cache_stats', None),
+    ('POST', '/api/thesis', {'ticker': '{ticker}', 'thesis': 'Benchmark thesis', 'target_price': 120,
+                             'stop_loss': 90, 'entry_price': 100}),
+    ('POST', '/api/trade_journal', {'ticker': '{ticker}', 'basket': 'Bench', 'entry_price': 100}),
+    ('PATCH', '/api/trade_journal/1', {'exit_price': 110}),
+    ('POST', '/api/alerts', {'ticker': '{ticker}', 'type': 'price_above', 'threshold': 150}),
+    ('DELETE', '/api/alerts/1', None),
+    ('POST', '/api/portfolio', {'baskets': {'Bench': {'icon': '📋', 'weight': '10%',
+                                                      'tickers': {'{ticker}': 5.0}}}}),
+    ('POST', '/api/watchlists', {'name': 'Bench', 'icon': '👁️'}),
+    ('POST', '/api/watchlists/1/items', {'ticker': '{ticker}', 'entry_price': 100}),
+    ('DELETE', '/api/watchlist_items/1', None),
+    ('DELETE', '/api/watchlists/1', None),
+    ('DELETE', '/api/reports/bench-report', None),
+]
+
+
+class Latency:
+    """Artificial latency of the stand-ins, in seconds per call. scale=0 disables sleeping."""
+
+    def __init__(self, yahoo=0.12, supabase=0.08, finviz=0.35, scale=1.0):
+        self.by_service = {'yahoo': yahoo, 'supabase': supabase, 'finviz': finviz}
+        self.scale = scale
+
+    def sleep(self, service):
+        seconds = self.by_service.get(service, 0) * self.scale
+        if seconds > 0:
+            time.sleep(seconds)
+
+
+def _service(url):
+    host = urllib.parse.urlsplit(url).hostname or ''
+    for suffix, service in (('finance.yahoo.com', 'yahoo'), ('supabase.co', 'supabase'), ('finviz.com', 'finviz')):
+        if host == suffix or host.endswith('.' + suffix):
+            return service
+    return 'other'
+
+
+def _fixture_key(method, url):
+    return f'{method} {url}'
+
+
+def _seed(text):
+    return int(hashlib.md5(text.encode()).hexdigest()[:8], 16)
+
+
+# ── Synthetic responses ──
+
+def _closes(symbol, n, start=None):
+    rng = random.Random(_seed(symbol))
+    price = start or 20 + rng.random() * 480
+    out = []
+    for _ in range(n):
+        price *= 1 + rng.gauss(0.0004, 0.018)
+        out.append(round(price, 2))
+    return out
+
+
+def _yahoo(url):
+    parts = urllib.parse.urlsplit(url)
+    query = urllib.parse.parse_qs(parts.query)
+    if parts.path.endswith('/spark'):
+        symbols = query.get('symbols', [''])[0].split(',')
+        return {s: {'close': _closes(s, 30), 'chartPreviousClose': _closes(s, 1)[0] * 0.99} for s in symbols if s}
+    symbol = urllib.parse.unquote(parts.path.rsplit('/', 1)[-1])
+    days = {'1d': 390, '5d': 5, '1mo': 21, '3mo': 63, '6mo': 126, '1y': 252}.get(query.get('range', ['1y'])[0], 252)
+    closes = _closes(symbol, days)
+    rng = random.Random(_seed(symbol + 'v'))
+    volumes = [int(rng.uniform(2e6, 8e7)) for _ in closes]
+    now = int(time.time())
+    return {'chart': {'result': [{
+        'meta': {'symbol': symbol, 'regularMarketPrice': closes[-1], 'chartPreviousClose': closes[0]},
+        'timestamp': [now - (len(closes) - i) * 86400 for i in range(len(closes))],
+        'indicators': {'quote': [{'close': closes, 'volume': volumes}]},
+    }], 'error': None}}
+
+
+class _Universe:
+    """Tickers the Supabase stand-in builds baskets and watchlists from."""
+
+    def __init__(self, tickers):
+        self.tickers = tickers or ['NVDA', 'AMD', 'AVGO', 'LLY', 'VRTX', 'LMT']
+
+    def baskets(self, with_holdings=True):
+        names = ['AI Semis', 'Biotech', 'Defense', 'Energy', 'Fintech', 'Industrials']
+        held = self.tickers[:48]
+        rows = []
+        for i, name in enumerate(names):
+            row = {'id': i + 1, 'name': name, 'icon': '📋', 'weight': f'{100 // len(names)}%', 'sort_order': i}
+            if with_holdings:
+                row['holdings'] = [{'id': i * 100 + j, 'basket_id': i + 1, 'ticker': t, 'position_pct': 2.0}
+                                   for j, t in enumerate(held[i::len(names)])]
+            rows.append(row)
+        return rows
+
+    def watchlist_items(self):
+        return [{'id': i + 1, 'watchlist_id': 1 + i % 2, 'ticker': t, 'added_date': '2026-01-02',
+                 'entry_price': 100.0, 'snapshot': {}} for i, t in enumerate(self.tickers[48:68])]
+
+
+def _supabase(method, url, universe):
+    parts = urllib.parse.urlsplit(url)
+    table = parts.path.rsplit('/', 1)[-1]
+    query = urllib.parse.unquote(parts.query)
+    if method == 'POST':
+        return [{'id': 1000 + _seed(url) % 1000, 'name': 'Bench'}]
+    if method in ('PATCH', 'DELETE'):
+        return None
+    if table == 'baskets':
+        return universe.baskets(with_holdings='holdings' in query)
+    if table == 'holdings':
+        basket = urllib.parse.parse_qs(parts.query).get('basket_id', [''])[0].replace('eq.', '')
+        return [h for b in universe.baskets() for h in b['holdings'] if not basket or str(b['id']) == basket]
+    if table == 'watchlists':
+        items = universe.watchlist_items()
+        return [{'id': w, 'name': f'Watchlist {w}', 'icon': '👁️', 'sort_order': w,
+                 'watchlist_items': [i for i in items if i['watchlist_id'] == w]} for w in (1, 2)]
+    if table == 'watchlist_items':
+        return universe.watchlist_items()
+    if table == 'research_reports':
+        if 'id=eq.' in query:
+            return {'id': 'bench-report', 'query': 'Is NVDA a buy?', 'report': '# Report\n' + 'Lorem ipsum. ' * 400,
+                    'tickers': ['NVDA'], 'created_at': '2026-01-02T00:00:00Z'}
+        return [{'id': f'report-{i}', 'query': f'Query {i}', 'tickers': ['NVDA'],
+                 'created_at': '2026-01-02T00:00:00Z'} for i in range(50)]
+    return []
+
+
+def _finviz(url):
+    ticker = urllib.parse.parse_qs(urllib.parse.urlsplit(url).query).get('t', ['X'])[0]
+    rows = ''.join(
+        f'<tr class="insider-row"><td>Insider {i}</td><td>Director</td><td>Jan 0{i + 1}</td>'
+        f'<td>{"Buy" if i % 3 == 0 else "Sale"}</td><td>{1000 * (i + 1)}</td><td>${50000 * (i + 1)}</td></tr>'
+        for i in range(8))
+    return f'<html><body><h1>{ticker}</h1><table>{rows}</table></body></html>'
+
+
+class _Response(io.BytesIO):
+    def __init__(self, body, status=200):
+        super().__init__(body)
+        self.status = status
+
+    def getcode(self):
+        return self.status
+
+
+class StandIns:
+    """urllib.request.urlopen / yfinance stand-ins. Counts calls per service and synthetic misses."""
+
+    def __init__(self, fixture=None, latency=None, universe=None):
+        self.fixture = fixture or {}
+        self.latency = latency or Latency()
+        self.universe = universe or _Universe([])
+        self.calls, self.misses = {}, {}
+        self._lock = threading.Lock()
+
+    def _count(self, service, miss):
+        with self._lock:
+            self.calls[service] = self.calls.get(service, 0) + 1
+            if miss:
+                self.misses[service] = self.misses.get(service, 0) + 1
+
+    def urlopen(self, req, data=None, timeout=None, **kwargs):
+        url = req.full_url if isinstance(req, urllib.request.Request) else req
+        method = req.get_method() if isinstance(req, urllib.request.Request) else ('POST' if data else 'GET')
+        service = _service(url)
+        recorded = self.fixture.get(_fixture_key(method, url))
+        self._count(service, miss=recorded is None)
+        self.latency.sleep(service)
+        if recorded is not None:
+            status, body = recorded['status'], recorded['body'].encode()
+        elif service == 'yahoo':
+            status, body = 200, json.dumps(_yahoo(url)).encode()
+        elif service == 'supabase':
+            rows = _supabase(method, url, self.universe)
+            status, body = 200, (json.dumps(rows).encode() if rows is not None else b'')
+        elif service == 'finviz':
+            status, body = 200, _finviz(url).encode()
+        else:
+            status, body = 404, b''
+        if status >= 400:
+            raise urllib.error.HTTPError(url, status, 'stand-in', {}, io.BytesIO(body))
+        return _Response(body, status)
+
+    def yfinance_module(self):
+        stand_ins = self
+
+        class Ticker:
+            def __init__(self, symbol):
+                self.symbol = symbol
+                stand_ins._count('yahoo', miss=True)
+                stand_ins.latency.sleep('yahoo')
+                self.info = {'shortName': symbol}
+                self.news = []
+                self.earnings_dates = None
+                self.quarterly_income_stmt = None
+
+        return types.SimpleNamespace(Ticker=Ticker, __version__='stand-in')
+
+
+@contextmanager
+def stand_ins(fixture=None, latency=None, universe=None):
+    """Route urllib and yfinance through StandIns for the duration of the block."""
+    harness = StandIns(fixture, latency, universe)
+    real_urlopen = urllib.request.urlopen
+    real_yf = sys.modules.get('yfinance')
+    urllib.request.urlopen = harness.urlopen
+    sys.modules['yfinance'] = harness.yfinance_module()
+    try:
+        yield harness
+    finally:
+        urllib.request.urlopen = real_urlopen
+        if real_yf is None:
+            sys.modules.pop('yfinance', None)
+        else:
+            sys.modules['yfinance'] = real_yf
+
+
+# ── Universes ──
+
+def prepare_universe(label, root):
+    """Populate root/data for a universe label ("real" or a ticker count); returns its tickers by score."""
+    data_dir = os.path.join(root, 'data')
+    os.makedirs(data_dir, exist_ok=True)
+    if label == 'real':
+        for name in ('all_stocks.json', 'top_stocks.json', 'insider_universe.json', 'rotation_snapshots.json'):
+            if os.path.exists(os.path.join(BASE, 'data', name)):
+                shutil.copy(os.path.join(BASE, 'data', name), data_dir)
+        with open(os.path.join(data_dir, 'all_stocks.json')) as f:
+            stocks = json.load(f)['stocks']
+    else:
+        payloads = synth_universe.generate(synth_universe.parse_size(label))
+        for name, payload in payloads.items():
+            with open(os.path.join(data_dir, name), 'w') as f:
+                json.dump(payload, f, separators=(',', ':'))
+        stocks = payloads['all_stocks.json']['stocks']
+    for name in STATIC_FILES:
+        if os.path.exists(os.path.join(BASE, 'data', name)):
+            shutil.copy(os.path.join(BASE, 'data', name), data_dir)
+    return [t for t, _ in sorted(stocks.items(), key=lambda x: x[1].get('score', 0) or 0, reverse=True)]
+
+
+# ── Running ──
+
+def _import_app(scratch, live=False):
+    """Import app.py with its databases under scratch and, unless live, Supabase pointed at the stand-in."""
+    if not live:
+        os.environ['SUPABASE_URL'] = BENCH_SUPABASE_URL
+        os.environ['SUPABASE_KEY'] = 'bench'
+    os.environ['INVESTIQ_DB'] = os.path.join(scratch, 'investiq.db')
+    os.environ['INVESTIQ_CACHE_DB'] = os.path.join(scratch, 'research_cache.db')
+    if BASE not in sys.path:
+        sys.path.insert(0, BASE)
+    import app
+    return app
+
+
+def _fresh_journal(scratch):
+    """Give each universe an empty journal, so write endpoints start from the same state."""
+    import journal_store
+    journal_store._store = journal_store.JournalStore(os.path.join(scratch, 'investiq.db'), legacy_files={})
+
+
+def _fill(value, ticker):
+    if isinstance(value, str):
+        return value.replace('{ticker}', ticker)
+    if isinstance(value, dict):
+        return {_fill(k, ticker): _fill(v, ticker) for k, v in value.items()}
+    return value
+
+
+def _request(client, method, path, body):
+    return client.open(path, method=method, json=body)
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * pct / 100
+    lo, hi = math.floor(k), math.ceil(k)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def bench_endpoint(client, method, path, body, runs):
+    samples, status, size = [], None, 0
+    for _ in range(runs):
+        start = time.perf_counter()
+        resp = _request(client, method, path, body)
+        samples.append((time.perf_counter() - start) * 1000)
+        status, size = resp.status_code, len(resp.get_data())
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    _request(client, method, path, body)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        'endpoint': f'{method} {path}',
+        'status': status,
+        'bytes': size,
+        'p50_ms': round(_percentile(samples, 50), 1),
+        'p95_ms': round(_percentile(samples, 95), 1),
+        'peak_kb': round(peak / 1024),
+    }
+
+
+def run(universes, runs, latency, fixture, only=None):
+    results = {}
+    app = _import_app(tempfile.mkdtemp(prefix='bench-db-'))
+    for label in universes:
+        scratch = tempfile.mkdtemp(prefix=f'bench-{label}-')
+        cwd = os.getcwd()
+        try:
+            tickers = prepare_universe(label, scratch)
+            _fresh_journal(scratch)
+            os.chdir(scratch)  # app.py reads data/*.json relative to the working directory
+            client = app.app.test_client()
+            with stand_ins(fixture, latency, _Universe(tickers)) as harness:
+                rows = []
+                for method, path, body in ENDPOINTS:
+                    if only and not any(o in path for o in only):
+                        continue
+                    path, body = _fill(path, tickers[0]), _fill(body, tickers[0])
+                    rows.append(bench_endpoint(client, method, path, body, runs))
+                    r = rows[-1]
+                    print(f"{label:<6} {r['endpoint']:<58} {r['status']:>3}{' ' if _ok(r) else '!'} {r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} "
+                          f"{r['peak_kb']:>9} {r['bytes']:>10}")
+            results[label] = {'rows': rows, 'calls': harness.calls, 'synthetic': harness.misses}
+        finally:
+            os.chdir(cwd)
+            shutil.rmtree(scratch, ignore_errors=True)
+    return results
+
+
+def _ok(row):
+    return 200 <= (row['status'] or 0) < 300
+
+
+def compare(results, baseline, threshold, min_delta_ms):
+    """Regressions vs a saved run: a changed status, or p95 / peak memory more than threshold (fraction)
+    worse. Timings are only compared when both runs got a 2xx."""
+    regressions = []
+    for label, result in results.items():
+        before = {r['endpoint']: r for r in baseline.get('results', {}).get(label, {}).get('rows', [])}
+        for row in result['rows']:
+            old = before.get(row['endpoint'])
+            if old is None:
+                continue
+            if row['status'] != old['status']:
+                regressions.append(f"{label} {row['endpoint']}: status {old['status']} → {row['status']}")
+                continue
+            if not _ok(row):
+                continue
+            if row['p95_ms'] > old['p95_ms'] * (1 + threshold) and row['p95_ms'] - old['p95_ms'] > min_delta_ms:
+                regressions.append(f"{label} {row['endpoint']}: p95 {old['p95_ms']}ms → {row['p95_ms']}ms")
+            if row['peak_kb'] > old['peak_kb'] * (1 + threshold) and row['peak_kb'] - old['peak_kb'] > 64:
+                regressions.append(f"{label} {row['endpoint']}: peak {old['peak_kb']}KB → {row['peak_kb']}KB")
+    return regressions
+
+
+# ── Recording ──
+
+def record(path):
+    """Call the GET endpoints against the live services (real data) and save every response."""
+    recorded = {}
+    real_urlopen = urllib.request.urlopen
+
+    def recording_urlopen(req, *args, **kwargs):
+        url = req.full_url if isinstance(req, urllib.request.Request) else req
+        method = req.get_method() if isinstance(req, urllib.request.Request) else 'GET'
+        try:
+            resp = real_urlopen(req, *args, **kwargs)
+            body, status = resp.read(), getattr(resp, 'status', 200)
+        except urllib.error.HTTPError as e:
+            body, status = e.read(), e.code
+        recorded[_fixture_key(method, url)] = {'status': status, 'body': body.decode('utf-8', errors='replace')}
+        if status >= 400:
+            raise urllib.error.HTTPError(url, status, 'recorded', {}, io.BytesIO(body))
+        return _Response(body, status)
+
+    scratch = tempfile.mkdtemp(prefix='bench-record-')
+    tickers = prepare_universe('real', scratch)
+    app = _import_app(scratch, live=True)
+    client = app.app.test_client()
+    os.chdir(scratch)
+    urllib.request.urlopen = recording_urlopen
+    try:
+        for method, endpoint, _ in ENDPOINTS:
+            if method == 'GET':  # never replay writes against live services
+                client.get(_fill(endpoint, tickers[0]))
+    finally:
+        urllib.request.urlopen = real_urlopen
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(recorded, f, indent=1)
+    print(f"Recorded {len(recorded)} responses → {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark every /api/* endpoint offline')
+    parser.add_argument('command', nargs='?', default='run', choices=['run', 'record'])
+    parser.add_argument('--universes', default='real', help='comma-separated: real and/or ticker counts (10k, 50k)')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--only', help='comma-separated substrings of endpoint paths to run')
+    parser.add_argument('--scale', type=float, default=1.0, help='stand-in latency multiplier (0 = none)')
+    parser.add_argument('--fixtures', default=FIXTURE_PATH)
+    parser.add_argument('--save', help='write results (a future baseline) to this file')
+    parser.add_argument('--baseline', help='compare against a saved run and fail on regressions')
+    parser.add_argument('--threshold', type=float, default=0.25, help='allowed p95/memory growth vs baseline')
+    parser.add_argument('--min-delta-ms', type=float, default=5.0, help='ignore p95 growth smaller than this')
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        record(args.fixtures)
+        return
+
+    fixture = None
+    if os.path.exists(args.fixtures):
+        with open(args.fixtures) as f:
+            fixture = json.load(f)
+    print(f"{'data':<6} {'endpoint':<58} {'st':>3}  {'p50 ms':>9} {'p95 ms':>9} {'peak KB':>9} {'bytes':>10}")
+    results = run(args.universes.split(','), args.runs, Latency(scale=args.scale), fixture,
+                  only=args.only.split(',') if args.only else None)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({'runs': args.runs, 'scale': args.scale, 'results': results}, f, indent=1)
+        print(f"\nResults → {args.save}")
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold, args.min_delta_ms)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"\nNo regressions beyond {args.threshold:.0%} vs {args.baseline}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+"""
+Research Benchmarks — offline wall-time / call-count / critical-path benchmarks for the research pipeline.
+
+Runs representative queries through research() and quick_research() on the replay harness
+(research_replay.py). A query uses fixtures/research/<name>-<mode>.json when one exists, and
+synthetic responses otherwise; either way latency comes from the harness's model, so numbers are
+comparable between runs on any machine. The src column says which: "live" (recorded against the
+real services), "frozen" (synthetic responses pinned by `research_replay.py freeze` — what is
+committed today) or "synthetic" (no fixture).
+
+Usage:
+  python3 bench_research.py                       # all queries, both modes, 3 runs each
+  python3 bench_research.py --queries direct,hunter --modes quick --runs 5
+  python3 bench_research.py --scale 0             # no artificial latency: pure pipeline overhead
+  python3 bench_research.py --json bench.json     # save full results (per-run critical paths)
+"""
+
+import argparse
+import json
+import os
+import statistics
+import time
+
+from research_replay import FIXTURE_DIR, Latency, load_fixture, replay, run_pipeline
+
+QUERIES = {
+    "direct": "Is NVDA a buy here? Compare it with AMD",
+    "portfolio": "How is my portfolio positioned for the next quarter?",
+    "hunter": "What are the top stocks on the hunter right now?",
+    "ewros": "What's rotating? Show me the EWROS momentum leaders",
+}
+MODES = ["deep", "quick"]
+
+
+def critical_path(timing):
+    """Top-level stages in start order, each with its LLM/fetch time; parallel stages report their slowest lane."""
+    spans = timing.get("spans", [])
+    stages = [sp for sp in spans if sp["kind"] == "stage" and sp["stage"] is None]
+    path = []
+    for stage in stages:
+        lanes = [sp for sp in spans if sp["kind"] == "stage" and sp["stage"] == stage["name"]]
+        bottleneck = max(lanes, key=lambda sp: sp["ms"])["name"] if lanes else None
+        owner = bottleneck or stage["name"]
+        path.append({
+            "stage": stage["name"],
+            "ms": stage["ms"],
+            "bottleneck": bottleneck,
+            "llm_ms": sum(sp["ms"] for sp in spans if sp["kind"] == "llm" and sp["stage"] == owner),
+            "fetch_ms": sum(sp["ms"] for sp in spans if sp["kind"] == "fetch" and sp["stage"] == owner),
+        })
+    return path
+
+
+def bench_one(name, query, mode, runs, latency, fixture_dir):
+    path = os.path.join(fixture_dir, f"{name}-{mode}.json")
+    fixture = load_fixture(path) if os.path.exists(path) else None
+    samples = []
+    for _ in range(runs):
+        start = time.time()
+        with replay(fixture, latency) as harness:
+            result = run_pipeline(query, mode)
+        wall_ms = round((time.time() - start) * 1000)
+        timing = result.get("timing", {})
+        path_stages = critical_path(timing)
+        samples.append({
+            "wall_ms": wall_ms,
+            "calls": dict(harness.calls),
+            "synthetic": dict(harness.misses),
+            "tokens": {k: v for k, v in timing.get("llm", {}).items() if k.endswith("tokens")},
+            "critical_path": path_stages,
+            "unattributed_ms": wall_ms - sum(s["ms"] for s in path_stages),
+            "error": result.get("error"),
+        })
+    walls = [s["wall_ms"] for s in samples]
+    return {
+        "query": name,
+        "mode": mode,
+        "fixture": fixture is not None,
+        "source": _source(fixture),
+        "runs": runs,
+        "wall_ms": {"min": min(walls), "median": round(statistics.median(walls)), "max": max(walls)},
+        "samples": samples,
+    }
+
+
+def _source(fixture):
+    if fixture is None:
+        return "synthetic"
+    return "frozen" if fixture.get("source") == "synthetic" else "live"
+
+
+def _format_path(path):
+    parts = []
+    for s in path:
+        label = f"{s['stage']}[{s['bottleneck']}]" if s["bottleneck"] else s["stage"]
+        parts.append(f"{label} {s['ms']}ms")
+    return " → ".join(parts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark research() / quick_research() offline")
+    parser.add_argument("--queries", default=",".join(QUERIES), help=f"comma-separated subset of {list(QUERIES)}")
+    parser.add_argument("--modes", default=",".join(MODES))
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--scale", type=float, default=1.0, help="latency multiplier (0 = no artificial latency)")
+    parser.add_argument("--fixtures", default=FIXTURE_DIR)
+    parser.add_argument("--json", help="write full results to this file")
+    args = parser.parse_args()
+
+    latency = Latency(scale=args.scale)
+    results = []
+    print(f"{'query':<10} {'mode':<6} {'src':<9} {'wall p50':>9} {'llm':>4} {'yf':>4} {'sb':>4}  critical path")
+    for name in args.queries.split(","):
+        for mode in args.modes.split(","):
+            r = bench_one(name, QUERIES[name], mode, args.runs, latency, args.fixtures)
+            results.append(r)
+            last = r["samples"][-1]
+            calls = last["calls"]
+            print(f"{name:<10} {mode:<6} {r['source']:<9} "
+                  f"{r['wall_ms']['median']:>7}ms {calls['llm'] + calls['llm_stream']:>4} {calls['yfinance']:>4} "
+                  f"{calls['supabase']:>4}  {_format_path(last['critical_path'])}"
+                  + (f"  ERROR: {last['error']}" if last["error"] else ""))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"scale": args.scale, "results": results}, f, indent=1)
+        print(f"\nFull results → {args.json}")
+
+
+if __name__ == "__main__":
+    main()
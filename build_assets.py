@@ -0,0 +1,143 @@
+"""
+Build Assets — pull the inline <script>/<style> blocks out of the HTML pages into content-hashed files.
+
+Each large inline block becomes static/assets/app.<sha>.js|css (plus .gz, and .br when the
+brotli package is installed) and the page gets a <script src>/<link> in its place, in the same
+position so execution and cascade order are unchanged. Blocks shared by both pages hash to the
+same file. app.py serves /assets/* with immutable cache headers, picking the precompressed
+variant the client accepts, and serves the built shell only while its manifest matches the
+source template — an edited template falls back to the inline original until this is re-run.
+
+Usage:
+  python3 build_assets.py            # rebuild after editing templates/index.html or index.html
+  python3 build_assets.py --check    # exit 1 if the built pages are stale
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import sys
+
+try:
+    import brotli
+except ImportError:  # optional: gzip variants are always written
+    brotli = None
+
+BASE = os.path.dirname(os.path.abspath(__file__))
+ASSET_DIR = "static/assets"
+ASSET_URL = "/assets"
+MANIFEST = "static/assets/manifest.json"
+# source page → built page
+PAGES = {
+    "templates/index.html": "templates/build/index.html",
+    "index.html": "static/index.html",
+}
+MIN_EXTRACT = 512  # bytes; smaller blocks stay inline (not worth a request)
+
+# Browsers end a script/style at the first closing tag, so a non-greedy match mirrors the parser
+_BLOCK = re.compile(r"<(script|style)\b([^>]*)>(.*?)</\1>", re.S | re.I)
+
+
+def source_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _extractable(tag, attrs, body, jinja):
+    if len(body) < MIN_EXTRACT or re.search(r"\bsrc\s*=", attrs, re.I):
+        return False
+    if jinja and ("{{" in body or "{%" in body):
+        return False  # rendered per request — must stay in the template
+    kind = re.search(r"\btype\s*=\s*[\"']?([^\"'\s>]+)", attrs, re.I)
+    if tag.lower() == "script":
+        return kind is None or kind.group(1).lower() in ("text/javascript", "application/javascript")
+    return kind is None or kind.group(1).lower() == "text/css"
+
+
+def _write_asset(name, body):
+    data = body.encode("utf-8")
+    path = os.path.join(BASE, ASSET_DIR, name)
+    with open(path, "wb") as f:
+        f.write(data)
+    with open(path + ".gz", "wb") as f:
+        f.write(gzip.compress(data, 9, mtime=0))  # mtime=0: byte-identical rebuilds
+    if brotli is not None:
+        with open(path + ".br", "wb") as f:
+            f.write(brotli.compress(data, quality=11))
+    return len(data)
+
+
+def build_page(src):
+    """Rewrite one page; returns (html, {asset name: size})."""
+    with open(os.path.join(BASE, src), encoding="utf-8") as f:
+        html = f.read()
+    assets = {}
+
+    def extract(m):
+        tag, attrs, body = m.group(1), m.group(2), m.group(3)
+        if not _extractable(tag, attrs, body, jinja=src.startswith("templates/")):
+            return m.group(0)
+        ext = "js" if tag.lower() == "script" else "css"
+        name = f"app.{hashlib.sha256(body.encode('utf-8')).hexdigest()[:12]}.{ext}"
+        assets[name] = _write_asset(name, body)
+        if ext == "js":
+            return f'<script src="{ASSET_URL}/{name}"></script>'
+        return f'<link rel="stylesheet" href="{ASSET_URL}/{name}">'
+
+    return _BLOCK.sub(extract, html), assets
+
+
+def build():
+    os.makedirs(os.path.join(BASE, ASSET_DIR), exist_ok=True)
+    manifest = {"pages": {}, "assets": {}}
+    for src, out in PAGES.items():
+        html, assets = build_page(src)
+        os.makedirs(os.path.dirname(os.path.join(BASE, out)), exist_ok=True)
+        with open(os.path.join(BASE, out), "w", encoding="utf-8") as f:
+            f.write(html)
+        with open(os.path.join(BASE, src), encoding="utf-8") as f:
+            manifest["pages"][src] = {"built": out, "source_sha256": source_hash(f.read()), "assets": sorted(assets)}
+        manifest["assets"].update(assets)
+        print(f"{src} → {out}: {len(html) // 1024} KB shell, {len(assets)} assets "
+              f"({sum(assets.values()) // 1024} KB)")
+
+    # Drop assets no page references any more
+    for name in os.listdir(os.path.join(BASE, ASSET_DIR)):
+        base = name[:-3] if name.endswith((".gz", ".br")) else name
+        if base != os.path.basename(MANIFEST) and base not in manifest["assets"]:
+            os.remove(os.path.join(BASE, ASSET_DIR, name))
+
+    with open(os.path.join(BASE, MANIFEST), "w") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+
+
+def stale_pages():
+    try:
+        with open(os.path.join(BASE, MANIFEST)) as f:
+            pages = json.load(f)["pages"]
+    except (OSError, ValueError, KeyError):
+        return list(PAGES)
+    stale = []
+    for src in PAGES:
+        with open(os.path.join(BASE, src), encoding="utf-8") as f:
+            if pages.get(src, {}).get("source_sha256") != source_hash(f.read()):
+                stale.append(src)
+    return stale
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract inline JS/CSS into content-hashed assets")
+    parser.add_argument("--check", action="store_true", help="only report whether the built pages are stale")
+    args = parser.parse_args()
+    if args.check:
+        stale = stale_pages()
+        for src in stale:
+            print(f"stale: {src} (run python3 build_assets.py)")
+        sys.exit(1 if stale else 0)
+    build()
+
+
+if __name__ == "__main__":
+    main()
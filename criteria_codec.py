@@ -0,0 +1,92 @@
+"""
+Criteria Codec — compact, interned representation of the per-stock IQ criteria arrays.
+
+Every scored stock carries ~14 criteria dicts that repeat the same name/category/threshold
+strings. The compact form keeps those once, in a shared schema table, and each stock keeps only
+what varies:
+
+    schema:   [[name, category, threshold], ...]            one row per distinct criterion
+    criteria: [[schema_id, passed (0/1), points, value], ...] per stock
+
+In memory the per-stock rows are tuples (value strings deduplicated through the schema's pool),
+several times smaller than parsed dicts. expand()/expand_stock() restore the on-disk shape
+(same keys, same order) at serialization time. The same layout is the opt-in wire format:
+compact_payload() turns an all_stocks/top_stocks payload into it, and the frontend's
+expandCriteria() reverses it per stock when a detail view renders.
+"""
+
+WIRE_FORMAT = "compact-v1"
+
+
+class CriteriaSchema:
+    """Interned (name, category, threshold) rows plus a pool of the distinct value strings."""
+
+    def __init__(self, rows=None):
+        self.rows = []
+        self._ids = {}
+        self._values = {}
+        for row in rows or []:
+            self.intern(*row)
+
+    def intern(self, name, category, threshold):
+        key = (name, category, threshold)
+        sid = self._ids.get(key)
+        if sid is None:
+            sid = self._ids[key] = len(self.rows)
+            self.rows.append(key)
+        return sid
+
+    def value(self, v):
+        return self._values.setdefault(v, v) if isinstance(v, str) else v
+
+    def to_wire(self):
+        return [list(row) for row in self.rows]
+
+
+def pack(criteria, schema):
+    """Criteria dicts → tuple of (schema_id, passed, points, value) rows."""
+    return tuple(
+        (schema.intern(c.get("name"), c.get("category"), c.get("threshold")),
+         1 if c.get("passed") else 0, c.get("points"), schema.value(c.get("value")))
+        for c in criteria
+    )
+
+
+def expand(packed, schema):
+    """Packed rows → criteria dicts in the scanner's key order."""
+    out = []
+    for sid, passed, points, value in packed:
+        name, category, threshold = schema.rows[sid]
+        out.append({"name": name, "category": category, "passed": bool(passed), "value": value,
+                    "threshold": threshold, "points": points})
+    return out
+
+
+def is_packed(criteria):
+    return isinstance(criteria, tuple)
+
+
+def compact_stocks(stocks, schema=None):
+    """Pack the criteria of every stock record in place; returns the schema they reference."""
+    schema = schema or CriteriaSchema()
+    for stock in stocks:
+        criteria = stock.get("criteria")
+        if criteria and not is_packed(criteria):
+            stock["criteria"] = pack(criteria, schema)
+    return schema
+
+
+def expand_stock(stock, schema):
+    """Shallow copy of a record with packed criteria expanded back to dicts."""
+    criteria = stock.get("criteria")
+    if not criteria or not is_packed(criteria):
+        return stock
+    return {**stock, "criteria": expand(criteria, schema)}
+
+
+def compact_payload(data):
+    """all_stocks/top_stocks payload → wire format (criteria_schema table + per-stock rows), packing in place."""
+    stocks = data.get("stocks")
+    records = stocks.values() if isinstance(stocks, dict) else (stocks or [])
+    schema = compact_stocks(records)
+    return {**data, "criteria_format": WIRE_FORMAT, "criteria_schema": schema.to_wire()}
@@ -0,0 +1,99 @@
+"""
+Import Budget — cold-start import-time check for the Vercel entry point and research modules.
+
+Imports each module in a fresh interpreter under `python -X importtime`, takes the best of a few
+runs, and fails when a module's cumulative import time exceeds its budget or when it pulls in a
+dependency that must stay lazy (anthropic, yfinance, pandas, numpy are loaded on first use by the
+routes that need them).
+
+Usage:
+  python3 import_budget.py                 # check every module in BUDGETS
+  python3 import_budget.py --runs 5 -v     # more samples, print the slowest imports per module
+  python3 import_budget.py --scale 2       # loosen budgets on a slow machine
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+HEAVY = ["anthropic", "yfinance", "pandas", "numpy"]
+
+# module → (budget in ms for its cumulative import time, modules it must not import)
+BUDGETS = {
+    "app": (300, HEAVY + ["agent_committee"]),
+    "research_jobs": (40, HEAVY + ["agent_committee"]),
+    "agent_committee": (120, HEAVY),
+}
+
+
+def measure(module, cwd):
+    """Parse one `-X importtime` run: (cumulative µs for module, {name: cumulative µs} of what it imported).
+
+    importtime prints each import after its children, indented by depth, so the module's subtree is
+    every line since the previous top-level entry — interpreter startup (site etc.) is excluded.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=cwd, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr.strip().splitlines()[-1]}")
+    subtree = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():
+            continue  # header row
+        if name[1:] == module:
+            return int(cumulative), subtree
+        if not name[1:].startswith(" "):
+            subtree = {}  # a top-level import that is not ours
+            continue
+        subtree[name.strip()] = int(cumulative)
+    return 0, {}
+
+
+def check(module, budget_ms, forbidden, runs, cwd):
+    best, imported = None, {}
+    for _ in range(runs):
+        total, names = measure(module, cwd)
+        if best is None or total < best:
+            best, imported = total, names
+    leaked = [name for name in forbidden if name in imported]
+    return {
+        "module": module,
+        "ms": round(best / 1000, 1),
+        "budget_ms": budget_ms,
+        "leaked": leaked,
+        "slowest": sorted(((us, n) for n, us in imported.items()), reverse=True)[:8],
+        "ok": best / 1000 <= budget_ms and not leaked,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fail when cold-start imports exceed their budget")
+    parser.add_argument("--modules", default=",".join(BUDGETS), help=f"comma-separated subset of {list(BUDGETS)}")
+    parser.add_argument("--runs", type=int, default=3, help="fresh interpreters per module (best run counts)")
+    parser.add_argument("--scale", type=float, default=1.0, help="budget multiplier")
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args()
+
+    cwd = os.path.dirname(os.path.abspath(__file__))
+    failed = False
+    for module in args.modules.split(","):
+        budget_ms, forbidden = BUDGETS[module]
+        r = check(module, budget_ms * args.scale, forbidden, args.runs, cwd)
+        status = "ok" if r["ok"] else "FAIL"
+        print(f"{status:<4} {module:<16} {r['ms']:>7}ms / {r['budget_ms']:g}ms"
+              + (f"  imports {', '.join(r['leaked'])} at load time" if r["leaked"] else ""))
+        if args.verbose or not r["ok"]:
+            for us, name in r["slowest"]:
+                print(f"       {us / 1000:>7.1f}ms  {name}")
+        failed |= not r["ok"]
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+"""
+Journal Store — embedded SQLite storage for trade theses, the trade journal and price alerts.
+
+Replaces the read-modify-write JSON files (data/trade_theses.json, data/trade_journal.json,
+data/alerts.json). Each record is kept as a JSON document next to a few indexed columns
+(ticker, status, dates) so lookups never scan the whole journal.
+
+- WAL mode: readers never block the writer, writes are atomic transactions
+- AUTOINCREMENT ids: never reused after a delete
+- One connection per thread, so threaded Flask workers can write concurrently
+- Legacy JSON files are imported once on first start
+- Trade P&L stats are kept as running aggregates, updated in the same transaction as the trade
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from datetime import date
+
+DB_PATH = os.environ.get('INVESTIQ_DB', 'data/investiq.db')
+FALLBACK_DB_PATH = '/tmp/investiq.db'  # Read-only filesystems (Vercel)
+
+# table → indexed columns (everything else lives in the JSON `data` column)
+TABLES = {
+    'theses': ('ticker', 'status', 'created_at'),
+    'trades': ('ticker', 'basket', 'thesis_id', 'entry_date', 'exit_date', 'created_at'),
+    'alerts': ('ticker', 'type', 'triggered', 'created_at'),
+}
+
+# table → legacy JSON file migrated on first start
+LEGACY_FILES = {
+    'theses': 'data/trade_theses.json',
+    'trades': 'data/trade_journal.json',
+    'alerts': 'data/alerts.json',
+}
+
+
+# Trade journal stats can be broken down by these groups (plus the journal-wide 'all' group)
+TRADE_STAT_GROUPS = ('basket', 'month', 'thesis_id', 'ticker')
+
+
+def _load_legacy(path):
+    try:
+        with open(path) as f:
+            data = json.load(f)
+        return data if isinstance(data, list) else []
+    except (FileNotFoundError, json.JSONDecodeError):
+        return []
+
+
+class JournalStore:
+    """Thread-safe document store backed by a single SQLite database."""
+
+    def __init__(self, path=DB_PATH, legacy_files=LEGACY_FILES):
+        self.path = path
+        self._local = threading.local()
+        try:
+            self._init_schema()
+        except (sqlite3.OperationalError, OSError):
+            # Data dir not writable — keep the store usable for this process
+            self.path = FALLBACK_DB_PATH
+            self._local = threading.local()
+            self._init_schema()
+        for table, legacy_path in (legacy_files or {}).items():
+            self._migrate(table, legacy_path)
+        self._ensure_trade_stats()
+
+    # ── Connection handling ──
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            d = os.path.dirname(self.path)
+            if d:
+                os.makedirs(d, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA busy_timeout=10000')
+            self._local.conn = conn
+        return conn
+
+    def _write(self):
+        """Context manager for an atomic write transaction (BEGIN IMMEDIATE → COMMIT/ROLLBACK)."""
+        return _WriteTxn(self._conn())
+
+    def _init_schema(self):
+        with self._write() as conn:
+            conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+            for table, columns in TABLES.items():
+                cols = ''.join(f', {c}' for c in columns)
+                conn.execute(f'CREATE TABLE IF NOT EXISTS {table} '
+                             f'(id INTEGER PRIMARY KEY AUTOINCREMENT{cols}, data TEXT NOT NULL)')
+                for c in columns:
+                    conn.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_{c} ON {table} ({c})')
+            conn.execute('CREATE TABLE IF NOT EXISTS trade_stats ('
+                         'group_kind TEXT NOT NULL, group_key TEXT NOT NULL, '
+                         'closed INTEGER NOT NULL DEFAULT 0, wins INTEGER NOT NULL DEFAULT 0, '
+                         'losses INTEGER NOT NULL DEFAULT 0, sum_wins REAL NOT NULL DEFAULT 0, '
+                         'sum_losses REAL NOT NULL DEFAULT 0, PRIMARY KEY (group_kind, group_key))')
+
+    def _migrate(self, table, legacy_path):
+        """Import a legacy JSON list once. Original ids are kept so existing references still resolve."""
+        key = f'migrated:{table}'
+        with self._write() as conn:
+            if conn.execute('SELECT 1 FROM meta WHERE key = ?', (key,)).fetchone():
+                return
+            for record in _load_legacy(legacy_path):
+                if not isinstance(record, dict):
+                    continue
+                rid = record.get('id')
+                exists = isinstance(rid, int) and conn.execute(
+                    f'SELECT 1 FROM {table} WHERE id = ?', (rid,)).fetchone()
+                # Legacy ids could collide after deletes — give duplicates a fresh id
+                self._insert_row(conn, table, record, rid if isinstance(rid, int) and not exists else None)
+            conn.execute('INSERT INTO meta (key, value) VALUES (?, ?)', (key, legacy_path))
+
+    # ── Row helpers ──
+
+    @staticmethod
+    def _index_value(value):
+        if isinstance(value, bool):
+            return int(value)
+        if isinstance(value, (dict, list)):
+            return json.dumps(value, default=str)
+        return value
+
+    def _insert_row(self, conn, table, record, rid=None):
+        columns = TABLES[table]
+        body = {k: v for k, v in record.items() if k != 'id'}
+        if table == 'trades':
+            body.update(trade_metrics(body))
+            _apply_trade_stats(conn, body, +1)
+        names = ['id'] + list(columns) + ['data']
+        values = [rid] + [self._index_value(body.get(c)) for c in columns] + [json.dumps(body, default=str)]
+        cur = conn.execute(f'INSERT INTO {table} ({", ".join(names)}) VALUES ({", ".join("?" * len(names))})',
+                           values)
+        return cur.lastrowid
+
+    @staticmethod
+    def _row_to_record(row):
+        return {'id': row['id'], **json.loads(row['data'])}
+
+    # ── Public API ──
+
+    def insert(self, table, record):
+        """Insert a record and return its new id."""
+        with self._write() as conn:
+            return self._insert_row(conn, table, record)
+
+    def get(self, table, rid):
+        row = self._conn().execute(f'SELECT id, data FROM {table} WHERE id = ?', (rid,)).fetchone()
+        return self._row_to_record(row) if row else None
+
+    def query(self, table, **filters):
+        """Return records matching exact values on indexed columns, oldest first."""
+        columns = TABLES[table]
+        where, params = [], []
+        for col, value in filters.items():
+            if col not in columns:
+                raise ValueError(f'{col} is not an indexed column of {table}')
+            where.append(f'{col} = ?')
+            params.append(self._index_value(value))
+        sql = f'SELECT id, data FROM {table}'
+        if where:
+            sql += ' WHERE ' + ' AND '.join(where)
+        sql += ' ORDER BY id'
+        return [self._row_to_record(r) for r in self._conn().execute(sql, params)]
+
+    def update(self, table, rid, changes):
+        """Merge changes into a record. Returns the updated record, or None if it doesn't exist."""
+        columns = TABLES[table]
+        with self._write() as conn:
+            row = conn.execute(f'SELECT data FROM {table} WHERE id = ?', (rid,)).fetchone()
+            if not row:
+                return None
+            body = json.loads(row['data'])
+            if table == 'trades':
+                _apply_trade_stats(conn, body, -1)
+            body.update({k: v for k, v in changes.items() if k != 'id'})
+            if table == 'trades':
+                body.update(trade_metrics(body))
+                _apply_trade_stats(conn, body, +1)
+            assignments = ', '.join(f'{c} = ?' for c in columns)
+            conn.execute(f'UPDATE {table} SET {assignments}, data = ? WHERE id = ?',
+                         [self._index_value(body.get(c)) for c in columns]
+                         + [json.dumps(body, default=str), rid])
+        return {'id': rid, **body}
+
+    def delete(self, table, rid):
+        """Delete a record. Returns True if a row was removed."""
+        with self._write() as conn:
+            if table == 'trades':
+                row = conn.execute('SELECT data FROM trades WHERE id = ?', (rid,)).fetchone()
+                if row:
+                    _apply_trade_stats(conn, json.loads(row['data']), -1)
+            return conn.execute(f'DELETE FROM {table} WHERE id = ?', (rid,)).rowcount > 0
+
+    # ── Trade journal stats ──
+
+    def _ensure_trade_stats(self):
+        """Build the running aggregates once for journals written before they existed."""
+        with self._write() as conn:
+            if conn.execute("SELECT 1 FROM meta WHERE key = 'trade_stats:v2'").fetchone():
+                return
+            conn.execute('DELETE FROM trade_stats')
+            for row in conn.execute('SELECT id, data FROM trades').fetchall():
+                body = json.loads(row['data'])
+                body.update(trade_metrics(body))
+                conn.execute('UPDATE trades SET data = ? WHERE id = ?', (json.dumps(body, default=str), row['id']))
+                _apply_trade_stats(conn, body, +1)
+            conn.execute("INSERT INTO meta (key, value) VALUES ('trade_stats:v2', '')")
+
+    def trade_stats(self, group_by=None, key=None):
+        """Journal-wide stats, or {group_key: stats} when group_by is one of TRADE_STAT_GROUPS
+        (just that group's stats when key is given too)."""
+        if group_by is None:
+            row = self._conn().execute(
+                "SELECT * FROM trade_stats WHERE group_kind = 'all' AND group_key = ''").fetchone()
+            return _format_stats(row)
+        if group_by not in TRADE_STAT_GROUPS:
+            raise ValueError(f'group_by must be one of {", ".join(TRADE_STAT_GROUPS)}')
+        if key is not None:
+            row = self._conn().execute(
+                'SELECT * FROM trade_stats WHERE group_kind = ? AND group_key = ?', (group_by, key)).fetchone()
+            return _format_stats(row)
+        rows = self._conn().execute(
+            'SELECT * FROM trade_stats WHERE group_kind = ? ORDER BY group_key', (group_by,))
+        return {r['group_key']: _format_stats(r) for r in rows}
+
+
+def trade_metrics(trade):
+    """Derived per-trade fields: pl_pct and days_held (None until the trade is closed)."""
+    entry, exit_price = trade.get('entry_price'), trade.get('exit_price')
+    pl_pct = None
+    if exit_price and entry and entry > 0:
+        pl_pct = round((exit_price - entry) / entry * 100, 2)
+    days_held = None
+    if trade.get('entry_date') and trade.get('exit_date'):
+        try:
+            days_held = (date.fromisoformat(trade['exit_date'][:10])
+                         - date.fromisoformat(trade['entry_date'][:10])).days
+        except (TypeError, ValueError):
+            pass
+    return {'pl_pct': pl_pct, 'days_held': days_held}
+
+
+def _stat_groups(trade):
+    month = (trade.get('exit_date') or trade.get('entry_date') or '')[:7]
+    thesis_id = trade.get('thesis_id')
+    return [
+        ('all', ''),
+        ('basket', trade.get('basket') or ''),
+        ('month', month),
+        ('thesis_id', '' if thesis_id is None else str(thesis_id)),
+        ('ticker', (trade.get('ticker') or '').upper()),
+    ]
+
+
+def _apply_trade_stats(conn, trade, sign):
+    """Add (sign=+1) or remove (sign=-1) a closed trade's contribution to every stats group."""
+    pl = trade.get('pl_pct')
+    if pl is None:
+        return
+    win = pl > 0
+    delta = (sign, sign if win else 0, 0 if win else sign, sign * pl if win else 0, 0 if win else sign * pl)
+    for kind, key in _stat_groups(trade):
+        conn.execute(
+            'INSERT INTO trade_stats (group_kind, group_key, closed, wins, losses, sum_wins, sum_losses) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT (group_kind, group_key) DO UPDATE SET '
+            'closed = closed + excluded.closed, wins = wins + excluded.wins, losses = losses + excluded.losses, '
+            'sum_wins = sum_wins + excluded.sum_wins, sum_losses = sum_losses + excluded.sum_losses',
+            (kind, key) + delta)
+    conn.execute('DELETE FROM trade_stats WHERE closed <= 0')
+
+
+def _format_stats(row):
+    if not row:
+        return {"total_trades": 0, "win_rate": 0, "avg_win": 0, "avg_loss": 0, "profit_factor": 0, "total_pl": 0}
+    closed, wins, losses = row['closed'], row['wins'], row['losses']
+    gross_wins, gross_losses = row['sum_wins'], abs(row['sum_losses'])
+    return {
+        "total_trades": closed,
+        "win_rate": round(wins / closed * 100, 1) if closed else 0,
+        "avg_win": round(row['sum_wins'] / wins, 2) if wins else 0,
+        "avg_loss": round(row['sum_losses'] / losses, 2) if losses else 0,
+        "profit_factor": round(gross_wins / gross_losses, 2) if gross_losses > 0 else float('inf') if gross_wins > 0 else 0,
+        "total_pl": round(row['sum_wins'] + row['sum_losses'], 2),
+    }
+
+
+class _WriteTxn:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute('BEGIN IMMEDIATE')
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute('ROLLBACK' if exc_type else 'COMMIT')
+        return False
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """Process-wide store, created (and legacy files migrated) on first use."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = JournalStore()
+    return _store
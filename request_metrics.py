@@ -0,0 +1,192 @@
+"""
+Request Metrics — in-process latency histograms and counters, exposed in Prometheus text format.
+
+- Per-route request latency, response size and status counts (install() adds the Flask hooks)
+- Outbound call latency per service (Yahoo, Supabase, Finviz, Anthropic) via outbound()/timed_urlopen()
+- Cache hit/miss counters (count_cache(), plus the research caches' own counters at scrape time)
+
+Routes are labelled by their URL rule (/api/report/<ticker>), so label cardinality stays bounded.
+Streaming responses (SSE) are timed to the first byte and have no size. Counters live for the
+lifetime of the process; Prometheus computes rates from them.
+"""
+
+import sys
+import threading
+import time
+import urllib.parse
+import urllib.request
+from contextlib import contextmanager
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)  # seconds
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)  # bytes
+
+# host suffix → service label for outbound calls
+SERVICES = {
+    "finance.yahoo.com": "yahoo",
+    "supabase.co": "supabase",
+    "finviz.com": "finviz",
+    "anthropic.com": "anthropic",
+}
+
+
+class Histogram:
+    """Cumulative-bucket histogram per label set (Prometheus semantics)."""
+
+    def __init__(self, name, help_text, buckets, labels):
+        self.name = name
+        self.help = help_text
+        self.buckets = buckets
+        self.labels = labels
+        self._series = {}  # label values → [bucket counts..., +Inf count, sum]
+
+    def observe(self, label_values, value):
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = [0] * (len(self.buckets) + 2)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+        series[-2] += 1
+        series[-1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for label_values, series in sorted(self._series.items()):
+            labels = _labels(self.labels, label_values)
+            for bound, count in zip(self.buckets, series):
+                lines.append(f'{self.name}_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f'{self.name}_bucket{{{labels},le="+Inf"}} {series[-2]}')
+            lines.append(f"{self.name}_sum{{{labels}}} {round(series[-1], 6)}")
+            lines.append(f"{self.name}_count{{{labels}}} {series[-2]}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name, help_text, labels):
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self._series = {}
+
+    def inc(self, label_values, amount=1):
+        self._series[label_values] = self._series.get(label_values, 0) + amount
+
+    def render(self, extra=None):
+        series = dict(self._series)
+        for label_values, value in (extra or {}).items():
+            series[label_values] = series.get(label_values, 0) + value
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for label_values, value in sorted(series.items()):
+            lines.append(f"{self.name}{{{_labels(self.labels, label_values)}}} {value}")
+        return lines
+
+
+def _labels(names, values):
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for v in values)
+    return ",".join(f'{n}="{v}"' for n, v in zip(names, escaped))
+
+
+_lock = threading.Lock()
+REQUEST_LATENCY = Histogram("http_request_duration_seconds", "Time to first response byte per route.",
+                            LATENCY_BUCKETS, ("route", "method"))
+RESPONSE_SIZE = Histogram("http_response_size_bytes", "Response body size per route (non-streaming).",
+                          SIZE_BUCKETS, ("route",))
+REQUESTS = Counter("http_requests_total", "Requests by route, method and status.", ("route", "method", "status"))
+OUTBOUND_LATENCY = Histogram("outbound_request_duration_seconds", "Outbound call latency per service.",
+                             LATENCY_BUCKETS, ("service",))
+OUTBOUND = Counter("outbound_requests_total", "Outbound calls per service and outcome.", ("service", "outcome"))
+CACHE = Counter("cache_lookups_total", "Cache lookups by cache and result.", ("cache", "result"))
+
+
+def observe_request(route, method, status, seconds, size=None):
+    with _lock:
+        REQUEST_LATENCY.observe((route, method), seconds)
+        REQUESTS.inc((route, method, str(status)))
+        if size is not None:
+            RESPONSE_SIZE.observe((route,), size)
+
+
+def observe_outbound(service, seconds, ok=True):
+    with _lock:
+        OUTBOUND_LATENCY.observe((service,), seconds)
+        OUTBOUND.inc((service, "ok" if ok else "error"))
+
+
+def count_cache(cache, hit):
+    with _lock:
+        CACHE.inc((cache, "hit" if hit else "miss"))
+
+
+@contextmanager
+def outbound(service):
+    """Time a block that talks to an external service; an exception counts as an error."""
+    start = time.perf_counter()
+    ok = False
+    try:
+        yield
+        ok = True
+    finally:
+        observe_outbound(service, time.perf_counter() - start, ok)
+
+
+def service_for(url):
+    host = urllib.parse.urlsplit(url).hostname or ""
+    for suffix, service in SERVICES.items():
+        if host == suffix or host.endswith("." + suffix):
+            return service
+    return "other"
+
+
+def timed_urlopen(req, *args, **kwargs):
+    """urllib.request.urlopen, timed (to response headers) under the target's service label."""
+    url = req.full_url if isinstance(req, urllib.request.Request) else req
+    with outbound(service_for(url)):
+        return urllib.request.urlopen(req, *args, **kwargs)
+
+
+def _research_cache_counts():
+    """Hit/miss counters of the research caches, if this process has opened them."""
+    rc = sys.modules.get("research_cache")
+    counts = {}
+    if rc is None:
+        return counts
+    for cache in (rc._cache, rc._llm_cache):
+        if cache is None:
+            continue
+        for namespace, c in cache.hit_counts().items():
+            counts[(f"research_{namespace}", "hit")] = c["hits"]
+            counts[(f"research_{namespace}", "miss")] = c["misses"]
+    return counts
+
+
+def render():
+    """All metrics in Prometheus text exposition format (version 0.0.4)."""
+    extra = _research_cache_counts()
+    with _lock:
+        lines = []
+        for metric in (REQUEST_LATENCY, RESPONSE_SIZE, REQUESTS, OUTBOUND_LATENCY, OUTBOUND):
+            lines.extend(metric.render())
+        lines.extend(CACHE.render(extra))
+    return "\n".join(lines) + "\n"
+
+
+def install(app):
+    """Record latency, size and status of every request handled by a Flask app."""
+    from flask import g, request
+
+    @app.before_request
+    def _start_timer():
+        g._metrics_start = time.perf_counter()
+
+    @app.after_request
+    def _record(response):
+        start = g.pop("_metrics_start", None)
+        if start is not None:
+            route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+            size = response.content_length
+            if size is None and not response.is_streamed:  # never buffer a streaming body to measure it
+                size = response.calculate_content_length()
+            observe_request(route, request.method, response.status_code, time.perf_counter() - start, size)
+        return response
+
+    return app
@@ -0,0 +1,213 @@
+"""
+Request Profiler — opt-in sampling profiler for slow Flask requests.
+
+A single background thread samples the Python stack of every request thread being profiled
+(sys._current_frames, every PROFILE_INTERVAL_MS) and folds the samples into collapsed stacks:
+one "outer;...;inner count" line per distinct stack, ready for flamegraph.pl or speedscope.
+Network waits show up as socket/ssl/threading frames, Python loops as the app's own frames.
+
+Threads started while a request is profiled (e.g. the ThreadPoolExecutor workers behind
+/api/portfolio_risk or the research fetches) are sampled into the same profile, their stacks rooted
+at a "[thread name]" frame; idle pool workers are skipped. Workers of a pool created before the
+request started belong to no request and are not sampled.
+
+- PROFILE_SLOW_MS=20000   profile every request, keep only those at least this slow
+- PROFILE_TOKEN=<secret>  enables admin use: `X-Profile: <token>` header or `?profile=<token>`
+                          forces a profile of that request; the same token lists/downloads them
+- Profiles go to a bounded on-disk ring (PROFILE_DIR, newest PROFILE_KEEP files kept)
+
+Off by default: with neither variable set the hooks return immediately.
+"""
+
+import hmac
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+PROFILE_SLOW_MS = int(os.environ.get('PROFILE_SLOW_MS', '0'))  # 0 = threshold profiling off
+PROFILE_TOKEN = os.environ.get('PROFILE_TOKEN', '')
+PROFILE_INTERVAL_MS = float(os.environ.get('PROFILE_INTERVAL_MS', '5'))
+PROFILE_DIR = os.environ.get('PROFILE_DIR', 'data/profiles')
+FALLBACK_PROFILE_DIR = '/tmp/profiles'  # Read-only filesystems (Vercel)
+PROFILE_KEEP = int(os.environ.get('PROFILE_KEEP', '50'))
+MAX_DEPTH = 128
+
+_NAME = re.compile(r'^\d{8}-\d{6}-\d+-\d+ms-[A-Z]+-[\w.-]*\.folded$')
+
+
+class _Session:
+    def __init__(self, thread_id):
+        self.thread_id = thread_id
+        self.started = time.perf_counter()
+        self.samples = Counter()
+
+
+class SamplingProfiler:
+    """Samples the stacks of registered threads, and of threads they start, from one shared daemon thread."""
+
+    def __init__(self, interval=PROFILE_INTERVAL_MS / 1000):
+        self.interval = interval
+        self._sessions = {}  # thread id → (_Session, stack root label or None for the request thread)
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self, thread_id=None):
+        session = _Session(thread_id or threading.get_ident())
+        with self._lock:
+            self._sessions[session.thread_id] = (session, None)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='request-profiler', daemon=True)
+                _thread_start(self._thread)  # unpatched: adopt() would wait on the lock held here
+        return session
+
+    def adopt(self, parent_id, thread):
+        """Sample a thread started by parent_id into the parent's session, if it has one."""
+        with self._lock:
+            owner = self._sessions.get(parent_id)
+            if owner is not None and thread.ident is not None:
+                self._sessions[thread.ident] = (owner[0], f"[{thread.name}]")
+
+    def stop(self, session):
+        with self._lock:
+            for tid in [tid for tid, (s, _) in self._sessions.items() if s is session]:
+                del self._sessions[tid]
+        return session
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                if not self._sessions:
+                    self._thread = None
+                    return
+                threads = list(self._sessions.items())
+            frames = sys._current_frames()
+            for tid, (session, root) in threads:
+                frame = frames.get(tid)
+                if frame is None or (root and _idle_worker(frame)):
+                    continue
+                stack = _fold(frame)
+                session.samples[f"{root};{stack}" if root else stack] += 1
+
+
+def _idle_worker(frame):
+    """A pool worker blocked waiting for work (its innermost Python frame is the worker loop itself)."""
+    return frame.f_code.co_name == '_worker' and frame.f_code.co_filename.endswith(os.path.join('futures', 'thread.py'))
+
+
+_thread_start = threading.Thread.start
+
+
+def _start_adopted(thread):
+    _thread_start(thread)
+    _profiler.adopt(threading.get_ident(), thread)
+
+
+def _fold(frame):
+    stack = []
+    while frame is not None and len(stack) < MAX_DEPTH:
+        code = frame.f_code
+        stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+        frame = frame.f_back
+    return ';'.join(reversed(stack))
+
+
+def _profile_dir():
+    for d in (PROFILE_DIR, FALLBACK_PROFILE_DIR):
+        try:
+            os.makedirs(d, exist_ok=True)
+            if os.access(d, os.W_OK):
+                return d
+        except OSError:
+            continue
+    return None
+
+
+def save(session, method, route, elapsed_ms):
+    """Write one profile into the ring and drop the oldest beyond PROFILE_KEEP. Returns its name."""
+    d = _profile_dir()
+    if d is None or not session.samples:
+        return None
+    slug = re.sub(r'[^\w.-]+', '_', route.strip('/')) or 'index'
+    name = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{round(elapsed_ms)}ms-{method}-{slug[:60]}.folded"
+    with open(os.path.join(d, name), 'w') as f:
+        for stack, count in session.samples.most_common():
+            f.write(f"{stack} {count}\n")
+    existing = sorted(list_profiles(), key=lambda p: p['mtime'])
+    for old in existing[:max(0, len(existing) - PROFILE_KEEP)]:
+        try:
+            os.remove(os.path.join(d, old['name']))
+        except OSError:
+            pass
+    return name
+
+
+def list_profiles():
+    """Profiles in the ring, newest first: name, size, mtime, method, route slug and elapsed ms."""
+    d = _profile_dir()
+    if d is None:
+        return []
+    profiles = []
+    for name in os.listdir(d):
+        if not _NAME.match(name):
+            continue
+        st = os.stat(os.path.join(d, name))
+        _, _, _, ms, method, slug = name[:-len('.folded')].split('-', 5)
+        profiles.append({'name': name, 'size': st.st_size, 'mtime': st.st_mtime,
+                         'method': method, 'route': slug, 'ms': int(ms[:-2])})
+    return sorted(profiles, key=lambda p: p['mtime'], reverse=True)
+
+
+def profile_path(name):
+    """Absolute path of a stored profile, or None for unknown/unsafe names."""
+    d = _profile_dir()
+    if d is None or not _NAME.match(name):
+        return None
+    path = os.path.join(d, name)
+    return path if os.path.isfile(path) else None
+
+
+def is_admin(request):
+    """True when profiling admin is enabled and the request carries the token."""
+    if not PROFILE_TOKEN:
+        return False
+    supplied = request.headers.get('X-Profile') or request.args.get('profile') or ''
+    return hmac.compare_digest(supplied.encode(), PROFILE_TOKEN.encode())
+
+
+_profiler = SamplingProfiler()
+
+
+def install(app):
+    """Profile requests that run longer than PROFILE_SLOW_MS, or that an admin asks for."""
+    from flask import g, request
+
+    if not PROFILE_SLOW_MS and not PROFILE_TOKEN:
+        return app
+    threading.Thread.start = _start_adopted  # follow threads a profiled request starts
+
+    @app.before_request
+    def _start_profile():
+        forced = is_admin(request) and not request.path.startswith('/api/profiles')
+        if forced or PROFILE_SLOW_MS:
+            g._profile = (_profiler.start(), forced)
+
+    @app.teardown_request
+    def _stop_profile(exc=None):
+        started = g.pop('_profile', None)
+        if started is None:
+            return
+        session, forced = started
+        _profiler.stop(session)
+        elapsed_ms = (time.perf_counter() - session.started) * 1000
+        if forced or elapsed_ms >= PROFILE_SLOW_MS:
+            route = request.url_rule.rule if request.url_rule is not None else request.path
+            name = save(session, request.method, route, elapsed_ms)
+            if name:
+                app.logger.info("profiled %s %s (%.0fms) → %s", request.method, request.path, elapsed_ms, name)
+
+    return app
@@ -0,0 +1,210 @@
+"""
+Research Cache — on-disk caches shared by every research run and both server processes.
+
+Backed by SQLite in WAL mode (data/research_cache.db next to this file), so app.py and
+research_server.py running side by side read and write the same entries. Values are
+JSON-encoded. Hit/miss counters are kept per namespace for the lifetime of the process.
+
+- DiskCache: key/value entries with per-entry TTLs (yfinance data)
+- LRUDiskCache: content-addressed entries bounded by total size, least-recently-used evicted (LLM responses)
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+CACHE_PATH = os.environ.get(
+    'INVESTIQ_CACHE_DB',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'research_cache.db'),
+)
+FALLBACK_CACHE_PATH = '/tmp/research_cache.db'  # Read-only filesystems (Vercel)
+PURGE_EVERY = 200  # sets between sweeps of expired entries
+LLM_CACHE_MAX_BYTES = int(os.environ.get('RESEARCH_LLM_CACHE_MAX_MB', '200')) * 1024 * 1024
+
+
+class _SQLiteCache:
+    """Connection handling and hit/miss counters shared by the cache flavours."""
+
+    def __init__(self, path=CACHE_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._counters = {}  # namespace → {"hits": n, "misses": n}
+        try:
+            self._init_schema()
+        except (sqlite3.OperationalError, OSError):
+            self.path = FALLBACK_CACHE_PATH
+            self._local = threading.local()
+            self._init_schema()
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            d = os.path.dirname(self.path)
+            if d:
+                os.makedirs(d, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA busy_timeout=10000')
+            self._local.conn = conn
+        return conn
+
+    def _count(self, namespace, field):
+        with self._lock:
+            self._counters.setdefault(namespace, {"hits": 0, "misses": 0})[field] += 1
+
+    def hit_counts(self):
+        """{namespace: {"hits": n, "misses": n}} for this process (request_metrics reads these)."""
+        with self._lock:
+            return {ns: dict(c) for ns, c in self._counters.items()}
+
+    def _hit_stats(self, namespace):
+        with self._lock:
+            c = dict(self._counters.get(namespace, {"hits": 0, "misses": 0}))
+        lookups = c["hits"] + c["misses"]
+        return {**c, "hit_rate": round(c["hits"] / lookups, 3) if lookups else None}
+
+
+class DiskCache(_SQLiteCache):
+    """Thread- and process-safe key/value cache with per-entry TTLs."""
+
+    def __init__(self, path=CACHE_PATH):
+        self._sets = 0
+        super().__init__(path)
+
+    def _init_schema(self):
+        conn = self._conn()
+        conn.execute('CREATE TABLE IF NOT EXISTS entries (namespace TEXT NOT NULL, key TEXT NOT NULL, '
+                     'value TEXT NOT NULL, expires_at REAL NOT NULL, PRIMARY KEY (namespace, key))')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_entries_expires ON entries (expires_at)')
+
+    def get(self, namespace, key):
+        """Return the cached value, or None if missing/expired. Never raises."""
+        try:
+            row = self._conn().execute(
+                'SELECT value FROM entries WHERE namespace = ? AND key = ? AND expires_at > ?',
+                (namespace, key, time.time())).fetchone()
+        except sqlite3.Error:
+            row = None
+        self._count(namespace, "hits" if row else "misses")
+        return json.loads(row[0]) if row else None
+
+    def set(self, namespace, key, value, ttl):
+        """Store a JSON-serializable value for ttl seconds. Failures are swallowed — the cache is best-effort."""
+        try:
+            conn = self._conn()
+            conn.execute('INSERT OR REPLACE INTO entries (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)',
+                         (namespace, key, json.dumps(value, default=str), time.time() + ttl))
+            with self._lock:
+                self._sets += 1
+                purge = self._sets % PURGE_EVERY == 0
+            if purge:
+                conn.execute('DELETE FROM entries WHERE expires_at <= ?', (time.time(),))
+        except sqlite3.Error:
+            pass
+
+    def stats(self):
+        """Per-namespace hit/miss counts for this process, plus live entry counts on disk."""
+        try:
+            entries = dict(self._conn().execute(
+                'SELECT namespace, COUNT(*) FROM entries WHERE expires_at > ? GROUP BY namespace',
+                (time.time(),)).fetchall())
+        except sqlite3.Error:
+            entries = {}
+        with self._lock:
+            namespaces = set(self._counters) | set(entries)
+        return {ns: {**self._hit_stats(ns), "entries": entries.get(ns, 0)} for ns in sorted(namespaces)}
+
+
+class LRUDiskCache(_SQLiteCache):
+    """Content-addressed cache capped at max_bytes of stored values; least recently read entries go first."""
+
+    NAMESPACE = "llm"
+
+    def __init__(self, path=CACHE_PATH, max_bytes=LLM_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        super().__init__(path)
+
+    def _init_schema(self):
+        conn = self._conn()
+        conn.execute('CREATE TABLE IF NOT EXISTS lru_entries (key TEXT PRIMARY KEY, value TEXT NOT NULL, '
+                     'size INTEGER NOT NULL, accessed_at REAL NOT NULL)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_lru_accessed ON lru_entries (accessed_at)')
+
+    def get(self, key):
+        """Return the cached value (refreshing its recency), or None. Never raises."""
+        try:
+            conn = self._conn()
+            row = conn.execute('SELECT value FROM lru_entries WHERE key = ?', (key,)).fetchone()
+            if row:
+                conn.execute('UPDATE lru_entries SET accessed_at = ? WHERE key = ?', (time.time(), key))
+        except sqlite3.Error:
+            row = None
+        self._count(self.NAMESPACE, "hits" if row else "misses")
+        return json.loads(row[0]) if row else None
+
+    def set(self, key, value):
+        """Store a value, then evict least-recently-used entries until the cache fits max_bytes."""
+        payload = json.dumps(value, default=str)
+        size = len(payload.encode())
+        if size > self.max_bytes:
+            return
+        try:
+            conn = self._conn()
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                conn.execute('INSERT OR REPLACE INTO lru_entries (key, value, size, accessed_at) VALUES (?, ?, ?, ?)',
+                             (key, payload, size, time.time()))
+                total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM lru_entries').fetchone()[0]
+                while total > self.max_bytes:
+                    oldest = conn.execute('SELECT key, size FROM lru_entries ORDER BY accessed_at LIMIT 1').fetchone()
+                    conn.execute('DELETE FROM lru_entries WHERE key = ?', (oldest[0],))
+                    total -= oldest[1]
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+        except sqlite3.Error:
+            pass
+
+    def stats(self):
+        try:
+            entries, size = self._conn().execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM lru_entries').fetchone()
+        except sqlite3.Error:
+            entries, size = 0, 0
+        return {self.NAMESPACE: {**self._hit_stats(self.NAMESPACE), "entries": entries,
+                                 "bytes": size, "max_bytes": self.max_bytes}}
+
+
+_cache = None
+_llm_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """Process-wide cache instance, opened on first use."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = DiskCache()
+    return _cache
+
+
+def get_llm_cache():
+    """Process-wide LLM response cache, opened on first use."""
+    global _llm_cache
+    if _llm_cache is None:
+        with _cache_lock:
+            if _llm_cache is None:
+                _llm_cache = LRUDiskCache()
+    return _llm_cache
+
+
+def all_stats():
+    """Hit rates and sizes for both caches."""
+    return {**get_cache().stats(), **get_llm_cache().stats()}
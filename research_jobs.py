@@ -0,0 +1,425 @@
+"""
+Research Jobs — bounded scheduler for research pipelines, shared by app.py and research_server.py.
+
+Instead of one daemon thread per request, jobs go through a fixed pool of workers and a
+bounded FIFO queue:
+- Admission control: the queue has a hard cap, and each user may only hold a few jobs
+- Waiting jobs get `queued` events with their position and an ETA
+- A job whose SSE clients all disconnect (and don't come back within RESEARCH_RESUME_GRACE)
+  is cancelled: dropped from the queue, or stopped at its next event
+- Queue depth, wait and run times are exposed via metrics()
+
+Jobs receive pipeline events through job.emit(). Every event gets a sequence number and is kept
+in a per-job ring buffer, so any number of subscribers can follow the same job and a client that
+reconnects with Last-Event-ID gets the events it missed replayed before the live ones
+(see sse_stream). Finished jobs stay resumable for RESEARCH_RESUME_TTL seconds.
+
+Identical requests are single-flighted: a job submitted with a key (normalized query + mode +
+data generation) that matches one already in flight isn't run again — the new session becomes
+an alias of the running job and follows its stream. Successful results stay servable the same
+way for RESEARCH_RESULT_TTL seconds.
+"""
+
+import json
+import os
+import threading
+import time
+import traceback
+import uuid
+from collections import deque
+from itertools import islice
+
+RESEARCH_WORKERS = int(os.environ.get('RESEARCH_WORKERS', '2'))
+RESEARCH_QUEUE_MAX = int(os.environ.get('RESEARCH_QUEUE_MAX', '10'))
+RESEARCH_PER_USER = int(os.environ.get('RESEARCH_PER_USER', '2'))  # queued + running jobs per user
+DEFAULT_JOB_SECONDS = 120  # ETA seed until real run times are observed
+EVENT_BUFFER = int(os.environ.get('RESEARCH_EVENT_BUFFER', '5000'))  # events kept per job for replay
+RESUME_GRACE = int(os.environ.get('RESEARCH_RESUME_GRACE', '30'))  # seconds without subscribers before cancel
+RESUME_TTL = int(os.environ.get('RESEARCH_RESUME_TTL', '300'))  # seconds a finished job stays resumable
+RESULT_TTL = int(os.environ.get('RESEARCH_RESULT_TTL', '600'))  # seconds a completed result is reused
+KEEPALIVE_SECONDS = 15
+
+
+class SchedulerFull(Exception):
+    """The queue is at capacity — retry later."""
+
+
+class UserLimitReached(Exception):
+    """This user already has RESEARCH_PER_USER jobs queued or running."""
+
+
+class JobCancelled(Exception):
+    """Raised inside a running pipeline (from emit) once its job has been cancelled."""
+
+
+class ResearchJob:
+    def __init__(self, job_id, user, run, key=None):
+        self.id = job_id
+        self.user = user
+        self.run = run  # run(emit) → pipeline result
+        self.key = key  # single-flight key, if coalescing is wanted
+        self.subscribers = 0
+        self.status = 'queued'  # queued → running → done | failed | cancelled
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.result = None
+        self._cancelled = threading.Event()
+        self._log = deque(maxlen=EVENT_BUFFER)  # (seq, event_type, data), seq contiguous from 1
+        self._seq = 0
+        self._log_cond = threading.Condition()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    @property
+    def finished(self):
+        return self.finished_at is not None
+
+    def emit(self, event_type, data):
+        """Pipeline-side event sink. Raises JobCancelled so a cancelled pipeline stops at its next event."""
+        if self.cancelled:
+            raise JobCancelled(self.id)
+        self.publish(event_type, data)
+
+    def publish(self, event_type, data):
+        """Append an event to the replay buffer and wake subscribers."""
+        with self._log_cond:
+            self._seq += 1
+            self._log.append((self._seq, event_type, data))
+            self._log_cond.notify_all()
+
+    def events_after(self, last_id, timeout=KEEPALIVE_SECONDS):
+        """Buffered events with seq > last_id, waiting up to timeout for one to arrive ([] on timeout).
+
+        If last_id has already rotated out of the buffer, replay starts at the oldest event kept.
+        """
+        with self._log_cond:
+            if self._seq <= last_id:
+                self._log_cond.wait(timeout)
+            if not self._log or self._seq <= last_id:
+                return []
+            first = self._log[0][0]
+            return list(islice(self._log, max(0, last_id + 1 - first), None))
+
+    def subscribe(self, last_id=0, timeout=KEEPALIVE_SECONDS):
+        """Yield (seq, event_type, data) after last_id until '__done__'; yields None after each idle timeout."""
+        while True:
+            batch = self.events_after(last_id, timeout)
+            if not batch:
+                yield None
+                continue
+            for event in batch:
+                last_id = event[0]
+                yield event
+                if event[1] == '__done__':
+                    return
+
+
+class ResearchScheduler:
+    """Fixed worker pool + bounded FIFO queue with per-user limits."""
+
+    def __init__(self, workers=RESEARCH_WORKERS, max_queue=RESEARCH_QUEUE_MAX, per_user=RESEARCH_PER_USER):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.per_user = per_user
+        self._cond = threading.Condition()
+        self._queue = deque()
+        self._jobs = {}  # job id → job (queued or running)
+        self._finished = {}  # job id → finished job, resumable until RESUME_TTL
+        self._flights = {}  # single-flight key → running job, or successful one until RESULT_TTL
+        self._aliases = {}  # coalesced session id → (job, aliased_at)
+        self._avg_run = DEFAULT_JOB_SECONDS
+        self._waits = deque(maxlen=200)
+        self._counts = {'submitted': 0, 'completed': 0, 'failed': 0, 'cancelled': 0, 'rejected': 0,
+                        'coalesced': 0, 'result_cache_hits': 0}
+        self._threads = []
+
+    def _ensure_workers(self):
+        # Started lazily so importing this module never spawns threads
+        if not self._threads:
+            for i in range(self.workers):
+                t = threading.Thread(target=self._worker, name=f'research-worker-{i}', daemon=True)
+                t.start()
+                self._threads.append(t)
+
+    # ── Submission / cancellation ──
+
+    def submit(self, run, user='anonymous', job_id=None, key=None):
+        """Queue run(emit) as a job. Raises SchedulerFull / UserLimitReached / ValueError (duplicate id).
+
+        With a key, an identical job that is in flight (or succeeded within RESULT_TTL) is returned
+        instead of queueing a new one; job_id then resolves to it via get().
+        """
+        with self._cond:
+            self._ensure_workers()
+            self._prune_finished()
+            job_id = job_id or str(uuid.uuid4())
+            if job_id in self._jobs or job_id in self._aliases:
+                raise ValueError(f'Job {job_id} already in progress')
+            existing = self._flights.get(key) if key else None
+            if existing is not None and not existing.cancelled:
+                self._aliases[job_id] = (existing, time.time())
+                self._counts['result_cache_hits' if existing.finished else 'coalesced'] += 1
+                return existing
+            if len(self._queue) >= self.max_queue:
+                self._counts['rejected'] += 1
+                raise SchedulerFull(f'Research queue is full ({self.max_queue} waiting)')
+            if sum(1 for j in self._jobs.values() if j.user == user) >= self.per_user:
+                self._counts['rejected'] += 1
+                raise UserLimitReached(f'At most {self.per_user} research jobs per user')
+            job = ResearchJob(job_id, user, run, key)
+            self._jobs[job_id] = job
+            if key:
+                self._flights[key] = job
+            self._finished.pop(job_id, None)
+            self._queue.append(job)
+            self._counts['submitted'] += 1
+            self._announce_positions()
+            self._cond.notify()
+            return job
+
+    def cancel(self, job):
+        """Cancel a job: drop it from the queue, or flag it so the running pipeline stops at its next event."""
+        with self._cond:
+            if job.status not in ('queued', 'running'):
+                return
+            job._cancelled.set()
+            if job.status == 'queued':
+                self._queue.remove(job)
+                self._finish(job, 'cancelled')
+                self._announce_positions()
+
+    def get(self, job_id):
+        """A queued/running job, or one that finished less than RESUME_TTL seconds ago."""
+        with self._cond:
+            self._prune_finished()
+            alias = self._aliases.get(job_id)
+            return self._jobs.get(job_id) or self._finished.get(job_id) or (alias and alias[0])
+
+    # ── Subscribers ──
+
+    def attach(self, job):
+        with self._cond:
+            job.subscribers += 1
+
+    def detach(self, job):
+        """Drop a subscriber; a job left without any for RESUME_GRACE seconds is cancelled."""
+        with self._cond:
+            job.subscribers -= 1
+            if job.subscribers > 0 or job.finished:
+                return
+        timer = threading.Timer(RESUME_GRACE, self._cancel_if_abandoned, args=(job,))
+        timer.daemon = True
+        timer.start()
+
+    def _cancel_if_abandoned(self, job):
+        with self._cond:
+            abandoned = job.subscribers <= 0
+        if abandoned:
+            self.cancel(job)
+
+    def _prune_finished(self):
+        now = time.time()
+        cutoff = now - RESUME_TTL
+        for job_id in [j for j, job in self._finished.items() if job.finished_at < cutoff]:
+            del self._finished[job_id]
+        for job_id in [a for a, (job, at) in self._aliases.items() if job.finished and max(at, job.finished_at) < cutoff]:
+            del self._aliases[job_id]
+        for key in [k for k, job in self._flights.items() if job.finished and job.finished_at < now - RESULT_TTL]:
+            del self._flights[key]
+
+    # ── Workers ──
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while not self._queue:
+                    self._cond.wait()
+                job = self._queue.popleft()
+                job.status = 'running'
+                job.started_at = time.time()
+                self._waits.append(job.started_at - job.submitted_at)
+                self._announce_positions()
+            status = 'done'
+            try:
+                job.result = job.run(job.emit)
+            except JobCancelled:
+                status = 'cancelled'
+            except Exception as e:
+                status = 'failed'
+                job.publish('error', {'message': str(e), 'traceback': traceback.format_exc()})
+            if job.cancelled:
+                status = 'cancelled'
+            with self._cond:
+                self._finish(job, status)
+
+    def _finish(self, job, status):
+        """Record a job's end (caller holds the lock) and close its event stream."""
+        job.status = status
+        job.finished_at = time.time()
+        self._jobs.pop(job.id, None)
+        self._finished[job.id] = job
+        self._counts['completed' if status == 'done' else status] += 1
+        # Only successful results are reused; anything else lets the next identical request run fresh
+        failed_result = isinstance(job.result, dict) and job.result.get('error')
+        if job.key and (status != 'done' or failed_result) and self._flights.get(job.key) is job:
+            del self._flights[job.key]
+        if status == 'done' and job.started_at:
+            self._avg_run = 0.8 * self._avg_run + 0.2 * (job.finished_at - job.started_at)
+        job.publish('__done__', None)
+
+    def _announce_positions(self):
+        """Send every waiting job its queue position and ETA (caller holds the lock)."""
+        for i, job in enumerate(self._queue):
+            position = i + 1
+            eta = -(-position // self.workers) * self._avg_run  # ceil(position / workers) run-lengths
+            job.publish('queued', {'position': position, 'queue_depth': len(self._queue),
+                                   'eta_seconds': round(eta)})
+
+    # ── Metrics ──
+
+    def metrics(self):
+        with self._cond:
+            waits = sorted(self._waits)
+            return {
+                'workers': self.workers,
+                'running': sum(1 for j in self._jobs.values() if j.status == 'running'),
+                'queue_depth': len(self._queue),
+                'subscribers': sum(j.subscribers for j in self._jobs.values()),
+                'resumable_finished': len(self._finished),
+                'in_flight_keys': sum(1 for j in self._flights.values() if not j.finished),
+                'cached_results': sum(1 for j in self._flights.values() if j.finished),
+                'max_queue': self.max_queue,
+                'per_user_limit': self.per_user,
+                'avg_run_seconds': round(self._avg_run, 1),
+                'wait_seconds': {
+                    'avg': round(sum(waits) / len(waits), 2) if waits else 0,
+                    'p95': round(waits[min(len(waits) - 1, int(len(waits) * 0.95))], 2) if waits else 0,
+                    'max': round(waits[-1], 2) if waits else 0,
+                },
+                **self._counts,
+            }
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    """Process-wide scheduler."""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = ResearchScheduler()
+    return _scheduler
+
+
+def trust_proxies(app):
+    """Honour X-Forwarded-For from TRUSTED_PROXY_HOPS reverse proxies in front of the app (ProxyFix).
+
+    Without it (the default) request.remote_addr is the peer address and forwarded headers are ignored,
+    since any client can set them.
+    """
+    hops = int(os.environ.get('TRUSTED_PROXY_HOPS', '0') or 0)
+    if hops > 0:
+        from werkzeug.middleware.proxy_fix import ProxyFix
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=hops)
+    return app
+
+
+def request_user(req):
+    """Who a research request counts against for per-user limits: the authenticated user when an auth
+    layer set one (REMOTE_USER), else the client address. Never taken from the request body or raw
+    headers, which the client controls — see trust_proxies for deployments behind a proxy."""
+    return req.remote_user or req.remote_addr or 'anonymous'
+
+
+def save_report(supabase_url, supabase_key, query, final_data, timing=None):
+    """Save a completed report to Supabase research_reports (non-critical — the client already has it).
+
+    Retries once without the timing column when the insert is rejected with 400, for tables that
+    predate it.
+    """
+    if not supabase_key:
+        return
+    import urllib.error
+    import urllib.request
+    from datetime import datetime, timezone
+    from request_metrics import timed_urlopen
+    try:
+        report_row = {
+            'id': str(uuid.uuid4()),
+            'query': query,
+            'report': final_data.get('report', ''),
+            'risk_flags': final_data.get('risk_flags', ''),
+            'tickers': final_data.get('tickers', []),
+            'intents': final_data.get('intents', []),
+            'sources': final_data.get('sources', []),
+            'created_at': datetime.now(timezone.utc).isoformat(),
+        }
+        if timing:
+            report_row['timing'] = timing
+        for row in ([report_row, {k: v for k, v in report_row.items() if k != 'timing'}] if timing else [report_row]):
+            req = urllib.request.Request(
+                f'{supabase_url}/rest/v1/research_reports',
+                data=json.dumps(row, default=str).encode(),
+                headers={
+                    'apikey': supabase_key,
+                    'Authorization': f'Bearer {supabase_key}',
+                    'Content-Type': 'application/json',
+                    'Prefer': 'return=representation',
+                },
+                method='POST'
+            )
+            try:
+                timed_urlopen(req, timeout=10)
+                break
+            except urllib.error.HTTPError as e:
+                if e.code != 400 or 'timing' not in row:
+                    raise
+                # Table predates the timing column — save the report without it
+    except Exception:
+        pass
+
+
+def last_event_id(req):
+    """Sequence number the client last saw (Last-Event-ID header, or ?last_event_id= for manual resumes)."""
+    raw = req.headers.get('Last-Event-ID') or req.args.get('last_event_id') or '0'
+    try:
+        return max(0, int(raw))
+    except ValueError:
+        return 0
+
+
+def sse_stream(job, last_id=0, idle_timeout=300, timeout_message='Timeout', on_event=None):
+    """SSE lines for a job: replay after last_id, then live events until the job finishes.
+
+    Each event carries `id: <seq>` so clients can resume with Last-Event-ID. Keepalive comments
+    go out while idle; time spent queued doesn't count towards idle_timeout. on_event(type, data)
+    returns the payload to send (e.g. tagged with the session id). Closing the generator — client
+    disconnect included — detaches the subscriber.
+    """
+    scheduler = get_scheduler()
+    scheduler.attach(job)
+    idle = 0
+    try:
+        for event in job.subscribe(last_id):
+            if event is None:
+                idle = 0 if job.status == 'queued' else idle + KEEPALIVE_SECONDS
+                if idle >= idle_timeout:
+                    yield f"event: error\ndata: {json.dumps({'message': timeout_message})}\n\n"
+                    break
+                yield ": keepalive\n\n"
+                continue
+            idle = 0
+            seq, event_type, data = event
+            if event_type == '__done__':
+                break
+            if on_event:
+                data = on_event(event_type, data)
+            yield f"id: {seq}\nevent: {event_type}\ndata: {json.dumps(data, default=str)}\n\n"
+    finally:
+        scheduler.detach(job)
@@ -0,0 +1,571 @@
+"""
+Research Replay — offline record/replay harness for research() and quick_research().
+
+Record mode runs the real pipeline and writes every Anthropic response, yfinance fetch and
+Supabase read to a fixture file. Replay mode swaps agent_committee's outbound calls for
+stand-ins fed from a fixture, with configurable artificial latency, so pipeline changes can be
+timed reproducibly without network access:
+- anthropic: a stub client whose messages.create / messages.stream return recorded responses
+  (matched by exact prompt, then by agent role), or synthetic ones when nothing was recorded
+- yfinance: _fetch_yfinance_uncached returns recorded per-(ticker, data type) results
+- Supabase: urllib reads of /rest/v1/<table> return recorded rows
+
+The research caches are bypassed in both modes so every run takes the cold path.
+
+Freeze mode records a run against the synthetic stand-ins instead of the live services. The
+result is a fixture with "source": "synthetic" and no recorded latencies: it pins every response
+(so benchmark numbers stay comparable when the synthetic generators change) but says nothing about
+real prompts or payloads. The committed fixtures/research/*.json are frozen ones — no network or
+API keys were available when they were made; `record` over them to replace them with live captures.
+
+Usage:
+  python3 research_replay.py record "Is NVDA a buy?" --mode deep -o fixtures/research/direct-deep.json
+  python3 research_replay.py freeze "Is NVDA a buy?" --mode deep -o fixtures/research/direct-deep.json
+  python3 research_replay.py run fixtures/research/direct-deep.json --scale 0
+  python3 research_replay.py check --cycles 3     # analyst/verifier prompts share one cache-marked prefix
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+import urllib.parse
+import urllib.request
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import agent_committee as ac
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'research')
+
+# Output lengths (estimated tokens) for synthetic responses, by agent role
+SYNTHETIC_TOKENS = {'scout': 80, 'planner': 60, 'moderator': 150, 'writer': 1500, 'risk': 600, 'default': 900}
+
+
+class Latency:
+    """Artificial latency model for the stand-ins, in seconds. scale=0 disables sleeping entirely.
+
+    LLM calls take llm_first_token plus output_tokens / llm_tokens_per_sec, unless the fixture
+    recorded a real latency and use_recorded is set.
+    """
+
+    def __init__(self, llm_first_token=0.8, llm_tokens_per_sec=60.0, yfinance=0.35, supabase=0.15,
+                 scale=1.0, use_recorded=True):
+        self.llm_first_token = llm_first_token
+        self.llm_tokens_per_sec = llm_tokens_per_sec
+        self.yfinance = yfinance
+        self.supabase = supabase
+        self.scale = scale
+        self.use_recorded = use_recorded
+
+    def llm(self, output_tokens, recorded_ms=None):
+        """(first_token, total) seconds for one LLM call."""
+        if self.use_recorded and recorded_ms:
+            total = recorded_ms / 1000
+            return min(self.llm_first_token, total), total
+        return self.llm_first_token, self.llm_first_token + output_tokens / self.llm_tokens_per_sec
+
+    def sleep(self, seconds):
+        if self.scale > 0 and seconds > 0:
+            time.sleep(seconds * self.scale)
+
+
+class _NullCache:
+    """Stands in for the research caches: always a miss, never stores."""
+
+    def get(self, *args):
+        return None
+
+    def set(self, *args):
+        pass
+
+
+_NULL_CACHE = _NullCache()
+
+
+# ── Prompt keys ──
+
+def _first_line(text, width=80):
+    return (text or '').strip().split('\n', 1)[0][:width]
+
+
+def _prompt_text(content):
+    if isinstance(content, str):
+        return content
+    return '\n'.join(block.get('text', '') for block in content)
+
+
+def _llm_keys(model, system, messages):
+    """(exact, role) keys for a call. Role keys survive prompt/context changes, so tuned prompts still replay."""
+    user = messages[-1]['content']
+    exact = hashlib.sha256(json.dumps([model, system, user], default=str).encode()).hexdigest()
+    last_block = user if isinstance(user, str) else user[-1].get('text', '')
+    role = f"{model}|{_first_line(system)}|{_first_line(last_block)}"
+    return exact, role
+
+
+def _agent_role(system):
+    s = (system or '').lower()
+    for needle, role in (('data routing agent', 'scout'), ('research planner', 'planner'),
+                         ('research moderator', 'moderator'), ('research writer', 'writer'),
+                         ('risk analyst', 'risk')):
+        if needle in s:
+            return role
+    return 'default'
+
+
+def _synthetic_reply(system, user_text):
+    """A well-formed response for an agent when the fixture has nothing recorded for the call."""
+    role = _agent_role(system)
+    q = user_text.lower()
+    if role == 'scout':
+        if ac._is_portfolio_query(user_text) or 'portfolio' in q:
+            sources = [{'name': 'portfolio', 'params': {}}]
+        elif 'ewros' in q or 'rotat' in q:
+            sources = [{'name': 'ewros', 'params': {'limit': 10}}]
+        else:
+            sources = [{'name': 'hunter', 'params': {'limit': 10}}]
+        return json.dumps({'sources': sources, 'explicit_tickers': [], 'reasoning': 'synthetic', 'abort': False})
+    if role == 'planner':
+        tickers = ac._extract_tickers_from_query(user_text) or ['SPY']
+        return json.dumps({'tickers': tickers, 'intents': ['outlook'], 'timeframe': 'medium-term'})
+    if role == 'moderator':
+        return json.dumps({'decision': 'VERDICT', 'reason': 'synthetic', 'verdict': 'Proceed. ' * 20})
+    body = ' '.join(['analysis'] * SYNTHETIC_TOKENS[role])
+    if role == 'writer':
+        return f"# Research Report\n\n## Executive Summary\n{body}\n\nSELF_EVAL:COMPLETE"
+    return f"## Analysis\n{body}"
+
+
+def _usage(input_tokens, output_tokens, cache_read_input_tokens=0, cache_creation_input_tokens=0):
+    return SimpleNamespace(input_tokens=input_tokens, output_tokens=output_tokens,
+                           cache_read_input_tokens=cache_read_input_tokens,
+                           cache_creation_input_tokens=cache_creation_input_tokens)
+
+
+def _usage_dict(usage):
+    return {k: getattr(usage, k, 0) or 0 for k in
+            ('input_tokens', 'output_tokens', 'cache_read_input_tokens', 'cache_creation_input_tokens')}
+
+
+# ── Replay stand-ins ──
+
+class _ReplayStream:
+    """messages.stream() stand-in: yields the reply in small chunks paced by the latency model."""
+
+    CHUNK_CHARS = 16
+
+    def __init__(self, text, usage, first_token, total, latency):
+        self._text, self._usage = text, usage
+        self._first, self._total = first_token, total
+        self._latency = latency
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    @property
+    def text_stream(self):
+        chunks = [self._text[i:i + self.CHUNK_CHARS] for i in range(0, len(self._text), self.CHUNK_CHARS)] or ['']
+        self._latency.sleep(self._first)
+        per_chunk = max(0.0, self._total - self._first) / len(chunks)
+        for chunk in chunks:
+            yield chunk
+            self._latency.sleep(per_chunk)
+
+    def get_final_text(self):
+        return self._text
+
+    def get_final_message(self):
+        return SimpleNamespace(usage=self._usage)
+
+
+class ReplayHarness:
+    """Stand-ins for agent_committee's outbound calls, fed from a fixture. Counts every call."""
+
+    def __init__(self, fixture=None, latency=None, scripted=None):
+        fixture = fixture or {}
+        self.latency = latency or Latency()
+        self.calls = {'llm': 0, 'llm_stream': 0, 'yfinance': 0, 'supabase': 0}
+        self.misses = {'llm': 0, 'yfinance': 0, 'supabase': 0}  # served synthetically
+        self.requests = []  # (model, system, user content) of every LLM call, in call order
+        self._scripted = {role: list(texts) for role, texts in (scripted or {}).items()}  # role → replies to serve first
+        self._lock = threading.Lock()
+        self._exact, self._roles = {}, {}
+        for entry in fixture.get('llm', []):
+            self._exact[entry['key']] = entry
+            self._roles.setdefault(entry['role'], []).append(entry)
+        self._role_next = {}
+        self._yfinance = fixture.get('yfinance', {})
+        self._supabase = fixture.get('supabase', {})
+        self.messages = SimpleNamespace(create=self._create, stream=self._stream)
+
+    def _count(self, kind, miss=False):
+        with self._lock:
+            self.calls[kind] += 1
+            if miss:
+                self.misses['llm' if kind.startswith('llm') else kind] += 1
+
+    def _reply(self, model, system, messages, kind):
+        with self._lock:
+            self.requests.append((model, system, messages[-1]['content']))
+            scripted = self._scripted.get(_agent_role(system if isinstance(system, str) else _prompt_text(system)))
+            text = scripted.pop(0) if scripted else None
+        if text is not None:
+            self._count(kind)
+            usage = _usage(ac._estimate_tokens(_prompt_text(messages[-1]['content'])), ac._estimate_tokens(text))
+            return text, usage, self.latency.llm(usage.output_tokens)
+        exact, role = _llm_keys(model, system, messages)
+        entry = self._exact.get(exact)
+        if entry is None and role in self._roles:
+            with self._lock:  # recorded calls for this role, in order; the last one repeats
+                entries = self._roles[role]
+                i = self._role_next.get(role, 0)
+                self._role_next[role] = i + 1
+                entry = entries[min(i, len(entries) - 1)]
+        self._count(kind, miss=entry is None)
+        if entry is not None:
+            usage = _usage(**entry['usage'])
+            return entry['text'], usage, self.latency.llm(usage.output_tokens, entry.get('latency_ms'))
+        user_text = _prompt_text(messages[-1]['content'])
+        text = _synthetic_reply(system if isinstance(system, str) else _prompt_text(system), user_text)
+        usage = _usage(ac._estimate_tokens(_prompt_text(system) if not isinstance(system, str) else system)
+                       + ac._estimate_tokens(user_text), ac._estimate_tokens(text))
+        return text, usage, self.latency.llm(usage.output_tokens)
+
+    def _create(self, model, max_tokens, system, messages, **kwargs):
+        text, usage, (_, total) = self._reply(model, system, messages, 'llm')
+        self.latency.sleep(total)
+        return SimpleNamespace(content=[SimpleNamespace(text=text)], usage=usage)
+
+    def _stream(self, model, max_tokens, system, messages, **kwargs):
+        text, usage, (first, total) = self._reply(model, system, messages, 'llm_stream')
+        return _ReplayStream(text, usage, first, total, self.latency)
+
+    def fetch_yfinance(self, ticker, data_types):
+        """_fetch_yfinance_uncached stand-in (one simulated Yahoo round trip per call)."""
+        recorded = self._yfinance.get(ticker, {})
+        self._count('yfinance', miss=not all(dt in recorded for dt in data_types))
+        self.latency.sleep(self.latency.yfinance)
+        result = {}
+        for dt in data_types:
+            if dt in recorded:
+                result.update(recorded[dt])
+            elif dt == 'stock_info':
+                seed = int(hashlib.md5(ticker.encode()).hexdigest()[:6], 16)
+                result[f"{ticker}__{dt}"] = json.dumps({
+                    'shortName': ticker, 'currentPrice': round(20 + seed % 500, 2), 'trailingPE': 10 + seed % 40,
+                    'forwardPE': 8 + seed % 30, 'revenueGrowth': (seed % 60) / 100, 'recommendationKey': 'buy',
+                })
+            else:
+                rows = '\n'.join(f"2025-{m:02d}-01  {100 + m * 3:.2f}  {1_000_000 + m * 1000}" for m in range(1, 13))
+                result[f"{ticker}__{dt}"] = f"{dt}\n{rows}"
+        return result
+
+    def urlopen(self, req, timeout=None):
+        """urllib.request.urlopen stand-in for Supabase REST reads (/rest/v1/<table>?...)."""
+        url = req.full_url if isinstance(req, urllib.request.Request) else req
+        table = urllib.parse.urlparse(url).path.rsplit('/', 1)[-1]
+        rows = self._supabase.get(table)
+        self._count('supabase', miss=rows is None)
+        self.latency.sleep(self.latency.supabase)
+        if rows is None:
+            rows = _synthetic_rows(table)
+        return io.BytesIO(json.dumps(rows).encode())
+
+
+def _synthetic_rows(table):
+    if table == 'baskets':
+        try:
+            with open(ac._data_path('data/all_stocks.json')) as f:
+                tickers = list(json.load(f).get('stocks', {}))[:15]
+        except (OSError, ValueError):
+            tickers = ['NVDA', 'AMD', 'AVGO', 'LLY', 'VRTX', 'REGN', 'LMT', 'NOC', 'RTX']
+        names = ['AI Semis', 'Biotech', 'Defense']
+        return [{'name': name, 'holdings': [{'ticker': t} for t in tickers[i::len(names)]]}
+                for i, name in enumerate(names)]
+    if table == 'watchlist_items':
+        return [{'ticker': t, 'watchlist_id': 1} for t in ('NVDA', 'PLTR', 'COIN')]
+    return []
+
+
+_PATCHED = ('anthropic', 'urllib', '_fetch_yfinance_uncached', 'get_cache', 'get_llm_cache')
+_ENV = ('ANTHROPIC_API_KEY', 'SUPABASE_KEY')
+
+
+@contextmanager
+def _patched(anthropic_factory, urlopen, fetch_yfinance):
+    saved = {name: getattr(ac, name) for name in _PATCHED}
+    saved_env = {k: os.environ.get(k) for k in _ENV}
+    ac.anthropic = SimpleNamespace(Anthropic=anthropic_factory)
+    ac.urllib = SimpleNamespace(request=SimpleNamespace(Request=urllib.request.Request, urlopen=urlopen))
+    ac._fetch_yfinance_uncached = fetch_yfinance
+    ac.get_cache = ac.get_llm_cache = lambda: _NULL_CACHE
+    for k in _ENV:
+        os.environ.setdefault(k, 'replay')
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(ac, name, value)
+        for k, value in saved_env.items():
+            if value is None:
+                os.environ.pop(k, None)
+            else:
+                os.environ[k] = value
+
+
+@contextmanager
+def replay(fixture=None, latency=None, scripted=None):
+    """Run agent_committee against stand-ins fed from a fixture (dict or path). Yields the ReplayHarness."""
+    if isinstance(fixture, str):
+        fixture = load_fixture(fixture)
+    harness = ReplayHarness(fixture, latency, scripted)
+    with _patched(lambda api_key=None, **kw: SimpleNamespace(messages=harness.messages),
+                  harness.urlopen, harness.fetch_yfinance):
+        yield harness
+
+
+# ── Prompt-prefix layout ──
+
+def prefix_layout_errors(requests):
+    """Problems with the cache-prefix layout of the analyst and verifier calls in harness.requests.
+
+    Every such call must send [data block with cache_control ephemeral, call-specific block], and
+    all of them must open with the byte-identical data block — analysts and verifiers alike, in
+    every moderator cycle — so that only the second block varies. Batched runs send one data
+    block per group instead, so pass the calls of a single-prompt (fewer than BATCH_MIN_TICKERS) run.
+    """
+    errors = []
+    calls = [(system, content) for _, system, content in requests
+             if system in (ac.ANALYST_SYSTEM, ac.VERIFIER_SYSTEM)]
+    roles = {'analyst': sum(s == ac.ANALYST_SYSTEM for s, _ in calls),
+             'verifier': sum(s == ac.VERIFIER_SYSTEM for s, _ in calls)}
+    for role, count in roles.items():
+        if not count:
+            errors.append(f"no {role} calls")
+    for i, (system, content) in enumerate(calls):
+        if not isinstance(content, list) or len(content) != 2:
+            errors.append(f"call {i}: content is not [prefix, suffix] blocks")
+            continue
+        if content[0].get('cache_control') != {'type': 'ephemeral'}:
+            errors.append(f"call {i}: first block is not marked cache_control ephemeral")
+        if 'cache_control' in content[1]:
+            errors.append(f"call {i}: the call-specific block carries cache_control")
+    blocks = [content for _, content in calls if isinstance(content, list) and len(content) == 2]
+    prefixes = {json.dumps(content[0], sort_keys=True) for content in blocks}
+    if len(prefixes) > 1:
+        errors.append(f"{len(prefixes)} distinct first blocks across {len(blocks)} calls (expected 1)")
+    if len(blocks) > 1 and len({content[1]['text'] for content in blocks}) < 2:
+        errors.append("the call-specific blocks never vary")
+    return errors
+
+
+def check_prefix_layout(query='Is NVDA a buy?', cycles=2):
+    """Run the deep pipeline offline with the Moderator asking for cycles - 1 re-analyses, and check
+    the prefix layout of every analyst and verifier call. Returns (harness, errors)."""
+    scripted = {'moderator': [json.dumps({'decision': 'NEED_ANALYSIS', 'reason': 'check',
+                                          'request': f're-examine (cycle {c + 1})'}) for c in range(cycles - 1)]}
+    with replay(None, Latency(scale=0), scripted) as harness:
+        result = run_pipeline(query, 'deep')
+    errors = prefix_layout_errors(harness.requests)
+    if result.get('error'):
+        errors.append(f"run failed: {result['error']}")
+    if result.get('cycle_count', 0) < cycles:
+        errors.append(f"only {result.get('cycle_count', 0)} moderator cycles ran (expected {cycles})")
+    return harness, errors
+
+
+# ── Recording ──
+
+class _RecordingStream:
+    """Proxies a real messages.stream() manager and records the final text, usage and latency."""
+
+    def __init__(self, manager, on_done):
+        self._manager, self._on_done = manager, on_done
+        self._stream, self._start = None, None
+
+    def __enter__(self):
+        self._start = time.time()
+        self._stream = self._manager.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        result = self._manager.__exit__(*exc)
+        if exc[0] is None:
+            self._on_done(self._stream.get_final_text(), self._stream.get_final_message().usage,
+                          round((time.time() - self._start) * 1000))
+        return result
+
+    @property
+    def text_stream(self):
+        return self._stream.text_stream
+
+    def get_final_text(self):
+        return self._stream.get_final_text()
+
+    def get_final_message(self):
+        return self._stream.get_final_message()
+
+
+class Recorder:
+    """Wraps the real clients and collects everything they return into a fixture."""
+
+    def __init__(self, real_anthropic, real_fetch_yfinance, real_urlopen):
+        self.fixture = {'llm': [], 'yfinance': {}, 'supabase': {}}
+        self._lock = threading.Lock()
+        self._real_anthropic = real_anthropic
+        self._real_fetch = real_fetch_yfinance
+        self._real_urlopen = real_urlopen
+
+    def _record_llm(self, model, system, messages, text, usage, latency_ms, stream):
+        exact, role = _llm_keys(model, system, messages)
+        with self._lock:
+            self.fixture['llm'].append({'key': exact, 'role': role, 'model': model, 'stream': stream, 'text': text,
+                                        'usage': _usage_dict(usage), 'latency_ms': latency_ms})
+
+    def anthropic(self, api_key=None, **kwargs):
+        real = self._real_anthropic.Anthropic(api_key=api_key, **kwargs)
+
+        def create(model, max_tokens, system, messages, **kw):
+            start = time.time()
+            resp = real.messages.create(model=model, max_tokens=max_tokens, system=system, messages=messages, **kw)
+            self._record_llm(model, system, messages, resp.content[0].text, resp.usage,
+                             round((time.time() - start) * 1000), False)
+            return resp
+
+        def stream(model, max_tokens, system, messages, **kw):
+            manager = real.messages.stream(model=model, max_tokens=max_tokens, system=system, messages=messages, **kw)
+            return _RecordingStream(manager, lambda text, usage, ms: self._record_llm(
+                model, system, messages, text, usage, ms, True))
+
+        return SimpleNamespace(messages=SimpleNamespace(create=create, stream=stream))
+
+    def fetch_yfinance(self, ticker, data_types):
+        result = self._real_fetch(ticker, data_types)
+        with self._lock:
+            per_ticker = self.fixture['yfinance'].setdefault(ticker, {})
+            for dt in data_types:
+                per_ticker[dt] = {k: v for k, v in result.items() if k in (f"{ticker}__{dt}", f"{ticker}__error")}
+        return result
+
+    def urlopen(self, req, timeout=None):
+        url = req.full_url if isinstance(req, urllib.request.Request) else req
+        body = self._real_urlopen(req, timeout=timeout).read()
+        table = urllib.parse.urlparse(url).path.rsplit('/', 1)[-1]
+        try:
+            with self._lock:
+                self.fixture['supabase'][table] = json.loads(body)
+        except ValueError:
+            pass
+        return io.BytesIO(body)
+
+
+@contextmanager
+def recording():
+    """Run agent_committee against the real services, capturing their responses. Yields the Recorder."""
+    recorder = Recorder(ac.anthropic, ac._fetch_yfinance_uncached, ac.urllib.request.urlopen)
+    saved = {name: getattr(ac, name) for name in _PATCHED}
+    ac.anthropic = SimpleNamespace(Anthropic=recorder.anthropic)
+    ac.urllib = SimpleNamespace(request=SimpleNamespace(Request=urllib.request.Request, urlopen=recorder.urlopen))
+    ac._fetch_yfinance_uncached = recorder.fetch_yfinance
+    ac.get_cache = ac.get_llm_cache = lambda: _NULL_CACHE
+    try:
+        yield recorder
+    finally:
+        for name, value in saved.items():
+            setattr(ac, name, value)
+
+
+def freeze(query, mode='deep'):
+    """Fixture captured from the synthetic stand-ins (see module docstring). Returns (fixture, result)."""
+    with replay(None, Latency(scale=0)):
+        with recording() as recorder:
+            result = run_pipeline(query, mode)
+    for entry in recorder.fixture['llm']:
+        entry['latency_ms'] = None  # replay paces synthetic calls by the latency model, not by this run
+    recorder.fixture.update({'query': query, 'mode': mode, 'source': 'synthetic',
+                             'recorded_at': datetime.now(timezone.utc).isoformat()})
+    return recorder.fixture, result
+
+
+def load_fixture(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_fixture(fixture, path):
+    d = os.path.dirname(path)
+    if d:
+        os.makedirs(d, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(fixture, f, indent=1, default=str)
+
+
+def run_pipeline(query, mode='deep', emit=None):
+    """research() or quick_research() with the LLM cache off — what the harness and benchmarks run."""
+    fn = ac.quick_research if mode == 'quick' else ac.research
+    return fn(query, emit=emit, use_cache=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Record or replay research pipeline runs')
+    sub = parser.add_subparsers(dest='command', required=True)
+    rec = sub.add_parser('record', help='run against live services and save a fixture')
+    rec.add_argument('query')
+    rec.add_argument('--mode', choices=['deep', 'quick'], default='deep')
+    rec.add_argument('-o', '--output', required=True)
+    frz = sub.add_parser('freeze', help='record the synthetic stand-ins into a fixture (offline)')
+    frz.add_argument('query')
+    frz.add_argument('--mode', choices=['deep', 'quick'], default='deep')
+    frz.add_argument('-o', '--output', required=True)
+    chk = sub.add_parser('check', help='check the analyst/verifier prompt-prefix layout offline')
+    chk.add_argument('query', nargs='?', default='Is NVDA a buy?')
+    chk.add_argument('--cycles', type=int, default=2, help='moderator cycles to run (re-sends included)')
+    rep = sub.add_parser('run', help='replay a fixture offline')
+    rep.add_argument('fixture')
+    rep.add_argument('--query', help='defaults to the query the fixture was recorded with')
+    rep.add_argument('--mode', choices=['deep', 'quick'])
+    rep.add_argument('--scale', type=float, default=1.0, help='latency multiplier (0 = no artificial latency)')
+    args = parser.parse_args()
+
+    if args.command == 'check':
+        harness, errors = check_prefix_layout(args.query, args.cycles)
+        checked = sum(system in (ac.ANALYST_SYSTEM, ac.VERIFIER_SYSTEM) for _, system, _ in harness.requests)
+        for error in errors:
+            print(f"FAIL {error}")
+        print(f"{'FAIL' if errors else 'ok'}: prefix layout of {checked} analyst/verifier calls")
+        raise SystemExit(1 if errors else 0)
+    if args.command in ('record', 'freeze'):
+        if args.command == 'freeze':
+            fixture, result = freeze(args.query, args.mode)
+        else:
+            with recording() as recorder:
+                result = run_pipeline(args.query, args.mode)
+            fixture = recorder.fixture
+            fixture.update({'query': args.query, 'mode': args.mode, 'source': 'live',
+                            'recorded_at': datetime.now(timezone.utc).isoformat()})
+        save_fixture(fixture, args.output)
+        print(f"Recorded {len(fixture['llm'])} LLM calls, {len(fixture['yfinance'])} tickers, "
+              f"{len(fixture['supabase'])} Supabase tables → {args.output}"
+              + (f" (run failed: {result['error']})" if result.get('error') else ''))
+    else:
+        fixture = load_fixture(args.fixture)
+        query = args.query or fixture.get('query')
+        mode = args.mode or fixture.get('mode', 'deep')
+        start = time.time()
+        with replay(fixture, Latency(scale=args.scale)) as harness:
+            result = run_pipeline(query, mode)
+        print(json.dumps({'query': query, 'mode': mode, 'wall_ms': round((time.time() - start) * 1000),
+                          'calls': harness.calls, 'synthetic': harness.misses, 'error': result.get('error'),
+                          'stages_ms': result.get('timing', {}).get('stages_ms')}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -11,16 +11,19 @@ Frontend calls: POST https://<mac-mini>:5050/api/research/stream
 
 import json
 import os
-import queue
-import threading
-import traceback
 import uuid
-from datetime import datetime, timezone
 from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
 
+from research_jobs import (get_scheduler, request_user, last_event_id, save_report, sse_stream,
+                           trust_proxies,
+                           SchedulerFull, UserLimitReached)
+from request_metrics import timed_urlopen
+import request_metrics
+
 app = Flask(__name__)
 CORS(app)  # Allow cross-origin from Vercel frontend
+request_metrics.install(app)
 
 # Load env
 try:
@@ -33,17 +36,32 @@ try:
 except FileNotFoundError:
     pass
 
+trust_proxies(app)  # after .env, which may set TRUSTED_PROXY_HOPS
+
 SUPABASE_URL = os.environ.get('SUPABASE_URL', '')
 SUPABASE_KEY = os.environ.get('SUPABASE_KEY', '')
 
-_active_research = {}
-
+@app.route('/metrics')
+def metrics():
+    return Response(request_metrics.render(), mimetype='text/plain; version=0.0.4')
 
 @app.route('/health')
 def health():
     return jsonify({'status': 'ok', 'service': 'research-server'})
 
 
+def _event_stream(job, session_id):
+    def tag(event_type, event_data):
+        if isinstance(event_data, dict):
+            return {**event_data, '_session_id': session_id}
+        return event_data
+
+    stream = sse_stream(job, last_event_id(request), idle_timeout=600,  # 10 min without events once running
+                        timeout_message='Timeout (10 min)', on_event=tag)
+    return Response(stream, mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
 @app.route('/api/research/stream', methods=['POST', 'OPTIONS'])
 def research_stream():
     if request.method == 'OPTIONS':
@@ -52,84 +70,70 @@ def research_stream():
     data = request.get_json(force=True)
     query = data.get('query', '').strip()
     session_id = data.get('session_id', str(uuid.uuid4()))
+    use_cache = data.get('cache')  # None → server default (RESEARCH_LLM_CACHE)
 
     if not query:
         return jsonify({'error': 'query is required'}), 400
 
-    if session_id in _active_research:
+    # Reconnect to a running (or just finished) job for this session instead of starting another
+    scheduler = get_scheduler()
+    job = scheduler.get(session_id)
+    if job is not None:
+        return _event_stream(job, session_id)
+
+    def run_research(emit):
+        from agent_committee import research
+        final_data = {}
+
+        def emit_tracked(event_type, event_data):
+            if event_type == 'complete':
+                final_data.update(event_data)
+            emit(event_type, event_data)
+
+        result = research(query, emit=emit_tracked, use_cache=use_cache)
+        if not result.get('error') and not result.get('final_report'):
+            emit('error', {'message': 'Pipeline completed without producing a report'})
+        if final_data:
+            save_report(SUPABASE_URL, SUPABASE_KEY, query, final_data, result.get('timing'))
+        return result
+
+    from agent_committee import research_flight_key
+    flight_key = None if use_cache is False else research_flight_key(query, 'deep')  # share identical runs
+    try:
+        job = scheduler.submit(run_research, user=request_user(request), job_id=session_id,
+                               key=flight_key)
+    except ValueError:
         return jsonify({'error': 'Research already in progress'}), 429
-    _active_research[session_id] = True
+    except UserLimitReached as e:
+        return jsonify({'error': str(e)}), 429
+    except SchedulerFull as e:
+        return jsonify({'error': str(e)}), 503, {'Retry-After': '30'}
+    return _event_stream(job, session_id)
 
-    event_queue = queue.Queue()
 
-    def emit_callback(event_type, event_data):
-        event_queue.put((event_type, event_data))
+@app.route('/api/research/stream/<session_id>')
+def research_stream_resume(session_id):
+    job = get_scheduler().get(session_id)
+    if job is None:
+        return jsonify({'error': 'No active research for this session'}), 404
+    return _event_stream(job, session_id)
 
-    def run_research():
-        try:
-            from agent_committee import research
-            result = research(query, emit=emit_callback)
-            if not result.get('error') and not result.get('final_report'):
-                event_queue.put(('error', {'message': 'Pipeline completed without producing a report'}))
-        except Exception as e:
-            event_queue.put(('error', {'message': str(e), 'traceback': traceback.format_exc()}))
-        finally:
-            event_queue.put(('__done__', None))
-            _active_research.pop(session_id, None)
 
-    thread = threading.Thread(target=run_research, daemon=True)
-    thread.start()
+@app.route('/api/research/jobs/metrics')
+def research_job_metrics():
+    return jsonify(get_scheduler().metrics())
 
-    def generate():
-        import urllib.request
-        final_data = None
-        while True:
-            try:
-                event_type, event_data = event_queue.get(timeout=600)  # 10 min timeout
-            except queue.Empty:
-                yield f"event: error\ndata: {json.dumps({'message': 'Timeout (10 min)'})}\n\n"
-                break
-
-            if event_type == '__done__':
-                # Save report to Supabase
-                if final_data and SUPABASE_KEY:
-                    try:
-                        report_row = {
-                            'id': str(uuid.uuid4()),
-                            'query': query,
-                            'report': final_data.get('report', ''),
-                            'risk_flags': final_data.get('risk_flags', ''),
-                            'tickers': final_data.get('tickers', []),
-                            'intents': final_data.get('intents', []),
-                            'sources': final_data.get('sources', []),
-                            'created_at': datetime.now(timezone.utc).isoformat(),
-                        }
-                        req_body = json.dumps(report_row).encode()
-                        req = urllib.request.Request(
-                            f'{SUPABASE_URL}/rest/v1/research_reports',
-                            data=req_body,
-                            headers={
-                                'apikey': SUPABASE_KEY,
-                                'Authorization': f'Bearer {SUPABASE_KEY}',
-                                'Content-Type': 'application/json',
-                                'Prefer': 'return=representation',
-                            },
-                            method='POST'
-                        )
-                        urllib.request.urlopen(req, timeout=10)
-                    except Exception:
-                        pass
-                break
 
-            if event_type == 'complete':
-                final_data = event_data
+@app.route('/api/research/timing')
+def research_timing():
+    from agent_committee import timing_stats
+    return jsonify(timing_stats())
 
-            if isinstance(event_data, dict):
-                event_data['_session_id'] = session_id
-            yield f"event: {event_type}\ndata: {json.dumps(event_data, default=str)}\n\n"
 
-    return Response(generate(), mimetype='text/event-stream',
-                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+@app.route('/api/research/cache_stats')
+def research_cache_stats():
+    from research_cache import all_stats
+    return jsonify(all_stats())
 
 
 @app.route('/api/reports')
@@ -142,7 +146,7 @@ def list_reports():
         req = urllib.request.Request(url, headers={
             'apikey': SUPABASE_KEY, 'Authorization': f'Bearer {SUPABASE_KEY}'
         })
-        data = json.loads(urllib.request.urlopen(req, timeout=10).read())
+        data = json.loads(timed_urlopen(req, timeout=10).read())
         return jsonify(data)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -158,7 +162,7 @@ def get_report(report_id):
         req = urllib.request.Request(url, headers={
             'apikey': SUPABASE_KEY, 'Authorization': f'Bearer {SUPABASE_KEY}'
         })
-        data = json.loads(urllib.request.urlopen(req, timeout=10).read())
+        data = json.loads(timed_urlopen(req, timeout=10).read())
         return jsonify(data[0] if data else {'error': 'Not found'})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -174,7 +178,7 @@ def delete_report(report_id):
         req = urllib.request.Request(url, headers={
             'apikey': SUPABASE_KEY, 'Authorization': f'Bearer {SUPABASE_KEY}',
         }, method='DELETE')
-        urllib.request.urlopen(req, timeout=10)
+        timed_urlopen(req, timeout=10)
         return jsonify({'ok': True})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -0,0 +1,4363 @@
+
+        // Stock data from server (/index-data.js, revalidated per data generation)
+        const indexData = window.__INDEX_DATA__ || {};
+        const stocksData = (indexData.stocks || []).map(s => ({ ...s, score: s.score ?? s.total ?? 0 }));
+        if (indexData.last_scan) document.getElementById('scan-time').textContent = indexData.last_scan;
+        let currentSort = { column: 'score', direction: 'desc' };
+        let currentFilter = null;
+
+        function init() {
+            populateTickerDatalist();
+        }
+
+        // ═══ Top Navigation ═══
+        function navTo(tab) {
+            hideLanding();
+            const map = {
+                dashboard: () => showDashboard(),
+                hunter: () => showHunter(),
+                portfolio: () => showWatchlist(),
+                rotation: () => showRotation(),
+                ewros: () => showEwrosTab(),
+                watchlist: () => showWatchlistEntries(),
+                screener: () => showScreener(),
+                alerts: () => showAlerts(),
+                research: () => showResearch(),
+                calendar: () => showCalendar(),
+                journal: () => showJournal(),
+                risk: () => showRiskDashboard()
+            };
+            if (map[tab]) map[tab]();
+        }
+
+        function updateActiveNav(tabName) {
+            document.querySelectorAll('.top-nav-item').forEach(el => {
+                el.classList.toggle('active', el.dataset.tab === tabName);
+            });
+        }
+
+        // ═══ Hero Section ═══
+        async function loadHeroData() {
+            // Top pick from stocksData
+            const sorted = [...stocksData].sort((a, b) => (b.ewros_score || 0) - (a.ewros_score || 0));
+            if (sorted.length > 0) {
+                document.getElementById('hero-top-ticker').textContent = sorted[0].ticker;
+                document.getElementById('hero-top-sub').textContent = `${sorted[0].name} · Rot ${(sorted[0].ewros_score || 0).toFixed(1)}`;
+            }
+
+            // Portfolio health (% with HOLD signal) — try loading
+            try {
+                const res = await fetch('/api/portfolio');
+                if (res.ok) {
+                    const portfolio = await res.json();
+                    let holdCount = 0, totalCount = 0;
+                    for (const basket of Object.values(portfolio.baskets || {})) {
+                        for (const t of (basket.tickers || [])) {
+                            totalCount++;
+                            const stockData = stocksData.find(s => s.ticker === t.ticker);
+                            const rotSig = stockData?.ewros_signal || '';
+                            if (rotSig.toLowerCase().includes('hold') || rotSig.toLowerCase().includes('buy') || rotSig.toLowerCase().includes('accumulate')) holdCount++;
+                        }
+                    }
+                    const healthPct = totalCount > 0 ? Math.round(holdCount / totalCount * 100) : 0;
+                    document.getElementById('hero-health-value').textContent = healthPct + '%';
+                    document.getElementById('hero-health-value').style.color = healthPct >= 70 ? '#10b981' : healthPct >= 40 ? '#eab308' : '#ef4444';
+                    document.getElementById('hero-health-sub').textContent = `${holdCount}/${totalCount} positive signals`;
+                }
+            } catch(e) {
+                document.getElementById('hero-health-value').textContent = 'N/A';
+            }
+
+            // Market stage from market_internals
+            try {
+                const res = await fetch('/api/market_internals');
+                if (res.ok) {
+                    const data = await res.json();
+                    const stage = data.market_stage;
+                    if (stage) {
+                        const colorMap = { green: '#10b981', yellow: '#eab308', orange: '#f97316', red: '#ef4444' };
+                        const c = colorMap[stage.color] || '#94a3b8';
+
+                        // Hero card
+                        const stageShort = stage.stage.replace('MARKET IN ', '').replace('RALLY ', '');
+                        document.getElementById('hero-stage-value').textContent = stageShort;
+                        document.getElementById('hero-stage-value').style.color = c;
+                        document.getElementById('hero-stage-sub').textContent = `${stage.distribution_days} dist days`;
+
+                        // Market banner (removed from dashboard, no-op if missing)
+                        const banner = document.getElementById('hero-market-banner');
+                        if (banner) {
+                            banner.style.display = 'flex';
+                            banner.style.borderColor = c + '66';
+                            banner.style.background = c + '10';
+                            const sn = document.getElementById('hero-stage-name');
+                            if (sn) { sn.textContent = stage.stage; sn.style.color = c; }
+                            const sa = document.getElementById('hero-stage-action');
+                            if (sa) sa.textContent = stage.action;
+                        }
+                    }
+                }
+            } catch(e) {}
+        }
+
+        // ═══ Top 5 Cards ═══
+        function renderTop5Cards() {
+            const sorted = [...stocksData].sort((a, b) => (b.ewros_score || 0) - (a.ewros_score || 0));
+            const top5 = sorted.slice(0, 5);
+            const container = document.getElementById('top5-cards');
+            container.innerHTML = top5.map(s => {
+                const rotScore = (s.ewros_score || 0).toFixed(1);
+                const scoreColor = s.ewros_score >= 80 ? '#10b981' : s.ewros_score >= 60 ? '#eab308' : '#94a3b8';
+                const gradeBadge = {'A':'badge-green','B':'badge-blue','C':'badge-yellow','D':'badge-purple','F':'badge-red'}[s.grade] || 'badge-gray';
+                return `
+                    <div class="top5-card" onclick="viewStock('${s.ticker}')">
+                        <div class="t5-ticker">${s.ticker}</div>
+                        <div class="t5-name">${s.name}</div>
+                        <div class="t5-score" style="color: ${scoreColor};">${rotScore}</div>
+                        <div class="t5-grade"><span class="badge ${gradeBadge}">${s.grade}</span></div>
+                    </div>
+                `;
+            }).join('');
+        }
+
+        // ═══ Sparkline Renderer ═══
+        function drawSparkline(canvas, prices) {
+            if (!prices || prices.length < 2) return;
+            const ctx = canvas.getContext('2d');
+            const w = canvas.width, h = canvas.height;
+            const dpr = window.devicePixelRatio || 1;
+            canvas.width = w * dpr;
+            canvas.height = h * dpr;
+            canvas.style.width = w / dpr + 'px';
+            canvas.style.height = h / dpr + 'px';
+            ctx.scale(dpr, dpr);
+            const actualW = w / dpr, actualH = h / dpr;
+
+            const min = Math.min(...prices);
+            const max = Math.max(...prices);
+            const range = max - min || 1;
+            const isUp = prices[prices.length - 1] >= prices[0];
+
+            ctx.beginPath();
+            ctx.strokeStyle = isUp ? '#10b981' : '#ef4444';
+            ctx.lineWidth = 1.2;
+            prices.forEach((p, i) => {
+                const x = (i / (prices.length - 1)) * actualW;
+                const y = actualH - ((p - min) / range) * (actualH - 4) - 2;
+                if (i === 0) ctx.moveTo(x, y);
+                else ctx.lineTo(x, y);
+            });
+            ctx.stroke();
+        }
+
+        async function loadSparklines() {
+            try {
+                const data = await loadAllStocks();
+                if (!data || !data.stocks) return;
+                document.querySelectorAll('.sparkline-canvas').forEach(canvas => {
+                    const ticker = canvas.dataset.ticker;
+                    const stock = data.stocks[ticker];
+                    if (stock && stock.price_history) {
+                        drawSparkline(canvas, stock.price_history.slice(-20));
+                    }
+                });
+            } catch(e) {}
+        }
+
+        function populateTickerDatalist() {
+            const datalist = document.getElementById('ticker-list');
+            datalist.innerHTML = stocksData.map(s => `<option value="${s.ticker}">${s.name}</option>`).join('');
+        }
+
+        // ═══ Shared: Insider Signal Badge ═══
+        function renderInsiderBadge(ins_score, insider_signal, compact=false) {
+            if (ins_score === undefined || ins_score === null) return '';
+            let color, emoji, label;
+            if (insider_signal === 'dumping' || ins_score <= -3) {
+                color = '#ef4444'; emoji = '🔴'; label = 'Dumping';
+            } else if (insider_signal === 'accumulating' || ins_score >= 3) {
+                color = '#10b981'; emoji = '🟢'; label = 'Buying';
+            } else {
+                color = '#666'; emoji = '⚪'; label = 'Neutral';
+            }
+            if (compact) {
+                return `<span title="Insider: ${label} (INS ${ins_score >= 0 ? '+' : ''}${ins_score})" style="font-size:0.7rem;padding:2px 5px;border-radius:4px;background:${color}22;color:${color};border:1px solid ${color}44;cursor:help;">${emoji}${ins_score >= 0 ? '+' : ''}${ins_score}</span>`;
+            }
+            return `<span style="font-size:0.75rem;padding:3px 8px;border-radius:6px;background:${color}15;color:${color};border:1px solid ${color}33;">${emoji} INS ${ins_score >= 0 ? '+' : ''}${ins_score} · ${label}</span>`;
+        }
+
+        function renderTable() {
+            const tbody = document.getElementById('stocks-tbody');
+            let filtered = stocksData;
+            
+            if (currentFilter) {
+                filtered = stocksData.filter(s => s.sector === currentFilter);
+            }
+            
+            // Sort
+            filtered.sort((a, b) => {
+                let valA = a[currentSort.column];
+                let valB = b[currentSort.column];
+                
+                if (typeof valA === 'string') {
+                    valA = valA.toLowerCase();
+                    valB = valB.toLowerCase();
+                }
+                
+                if (currentSort.direction === 'asc') {
+                    return valA > valB ? 1 : -1;
+                } else {
+                    return valA < valB ? 1 : -1;
+                }
+            });
+            
+            tbody.innerHTML = filtered.map((stock, idx) => {
+                const scoreColor = stock.score >= 80 ? '#38bdf8' : stock.score >= 70 ? '#10b981' : stock.score >= 55 ? '#f59e0b' : '#94a3b8';
+                const rotationScore = stock.ewros_score || 0;
+                const rotBadge = rotationScore >= 80 ? 'badge-green' : rotationScore >= 60 ? 'badge-yellow' : rotationScore >= 40 ? 'badge-gray' : 'badge-gray';
+                const gradeBadge = {'A':'badge-green','B':'badge-blue','C':'badge-yellow','D':'badge-purple','F':'badge-red'}[stock.grade] || 'badge-gray';
+                return `
+                    <tr data-sector="${stock.sector}" data-ticker="${stock.ticker}" onclick="viewStock('${stock.ticker}')" style="cursor:pointer;">
+                        <td class="text-sm" style="color: var(--text-dim);">${idx + 1}</td>
+                        <td style="text-align:left; font-weight:700; color:#38bdf8;">${stock.ticker}</td>
+                        <td class="text-sm">${stock.name}</td>
+                        <td class="text-sm">
+                            <span class="cursor-pointer hover:text-sky-400 transition" onclick="event.stopPropagation(); filterBySector('${stock.sector}')">
+                                ${stock.sector}
+                            </span>
+                        </td>
+                        <td>
+                            <div class="score-container">
+                                <div class="score-bar-bg">
+                                    <div class="score-bar-fill" style="width: ${stock.score}%; background: ${scoreColor};"></div>
+                                </div>
+                                <span class="score-text">${stock.score ?? stock.total ?? 0}</span>
+                            </div>
+                        </td>
+                        <td><span class="badge ${gradeBadge}">${stock.grade}</span></td>
+                        <td><span class="badge ${rotBadge}">${rotationScore.toFixed(1)}</span></td>
+                        <td style="font-weight:700; color:${(stock.ewros_score||0) >= 70 ? '#10b981' : (stock.ewros_score||0) >= 40 ? '#eab308' : '#64748b'};">${stock.ewros_score || '—'}</td>
+                        <td style="font-weight:700; color:${(stock.iq_edge||0) >= 90 ? '#a855f7' : (stock.iq_edge||0) >= 70 ? '#10b981' : (stock.iq_edge||0) >= 40 ? '#eab308' : '#64748b'};">${stock.iq_edge || '—'}</td>
+                        <td>${renderInsiderBadge(stock.ins_score, stock.insider_signal, true)}</td>
+                        <td><button onclick="event.stopPropagation(); viewStock('${stock.ticker}')" class="text-xs bg-slate-700 px-3 py-1 rounded hover:bg-slate-600 transition">Analyze</button></td>
+                    </tr>
+                `;
+            }).join('');
+            
+            // Update header sort indicators
+            document.querySelectorAll('th').forEach(th => {
+                th.classList.remove('sort-asc', 'sort-desc');
+            });
+            const activeTh = document.querySelector(`th[onclick="sortTable('${currentSort.column}')"]`);
+            if (activeTh) {
+                activeTh.classList.add(currentSort.direction === 'asc' ? 'sort-asc' : 'sort-desc');
+            }
+        }
+
+        function sortTable(column) {
+            if (currentSort.column === column) {
+                currentSort.direction = currentSort.direction === 'asc' ? 'desc' : 'asc';
+            } else {
+                currentSort.column = column;
+                currentSort.direction = 'desc';
+            }
+            renderTable();
+        }
+
+        function createIndustryFilters() {
+            const sectors = [...new Set(stocksData.map(s => s.sector))].sort();
+            const container = document.getElementById('industry-filters');
+            
+            sectors.forEach(sector => {
+                const count = stocksData.filter(s => s.sector === sector).length;
+                const pill = document.createElement('span');
+                pill.className = 'filter-pill';
+                pill.textContent = `${sector} (${count})`;
+                pill.onclick = () => filterBySector(sector);
+                pill.dataset.sector = sector;
+                container.appendChild(pill);
+            });
+        }
+
+        function filterBySector(sector) {
+            currentFilter = sector;
+            
+            // Update pill styles
+            document.querySelectorAll('.filter-pill').forEach(pill => {
+                pill.classList.remove('active');
+                if (pill.dataset.sector === sector) {
+                    pill.classList.add('active');
+                }
+            });
+            
+            renderTable();
+        }
+
+        function clearFilter() {
+            currentFilter = null;
+            document.querySelectorAll('.filter-pill').forEach(pill => {
+                pill.classList.remove('active');
+            });
+            renderTable();
+        }
+
+        function toggleMenu() {
+            document.getElementById('sidebar').classList.toggle('open');
+            document.getElementById('overlay').classList.toggle('active');
+        }
+
+        function showAlert(msg) { alert(msg); }
+        
+        function hideAllViews() {
+            ['landing-view','dashboard-view','hunter-view','detail-view','watchlist-view','rotation-view','ewros-view','watchlist-entries-view','calendar-view','journal-view','risk-view','screener-view','report-view','alerts-view','research-view'].forEach(id => {
+                const el = document.getElementById(id);
+                if (el) el.style.display = 'none';
+            });
+            if (liveRefreshTimer) { clearInterval(liveRefreshTimer); liveRefreshTimer = null; }
+        }
+
+        let dashboardLoaded = false;
+
+        function showDashboard() {
+            if (location.hash !== '#dashboard' && location.hash !== '') history.pushState(null, '', '#dashboard');
+            hideAllViews();
+            document.getElementById('dashboard-view').style.display = 'block';
+            updateActiveNav('dashboard');
+
+            if (window.tvCheckInterval) {
+                clearInterval(window.tvCheckInterval);
+                window.tvCheckInterval = null;
+            }
+            const chartContainer = document.getElementById('tv-chart');
+            if (chartContainer) chartContainer.innerHTML = '';
+            window.tvWidget = null;
+
+            if (!dashboardLoaded) {
+                dashboardLoaded = true;
+                loadDashboardData();
+            }
+        }
+
+        async function loadDashboardData() {
+            // Fetch both APIs in parallel
+            const [summaryRes, internalsRes] = await Promise.allSettled([
+                fetch('/api/dashboard_summary').then(r => r.ok ? r.json() : null),
+                fetch('/api/market_internals').then(r => r.ok ? r.json() : null)
+            ]);
+            const summary = summaryRes.status === 'fulfilled' ? summaryRes.value : null;
+            const internals = internalsRes.status === 'fulfilled' ? internalsRes.value : null;
+
+            // Row 1: O'Neil Market Stage
+            if (internals && internals.market_stage) {
+                const ms = internals.market_stage;
+                const colorMap = {
+                    green:  { bg: 'rgba(16,185,129,0.12)', border: '#10b981', text: '#10b981' },
+                    yellow: { bg: 'rgba(234,179,8,0.12)',  border: '#eab308', text: '#eab308' },
+                    orange: { bg: 'rgba(249,115,22,0.12)', border: '#f97316', text: '#f97316' },
+                    red:    { bg: 'rgba(239,68,68,0.12)',  border: '#ef4444', text: '#ef4444' }
+                };
+                const c = colorMap[ms.color] || colorMap.red;
+                const banner = document.getElementById('dash-stage-banner');
+                banner.style.display = 'flex';
+                banner.style.background = c.bg;
+                banner.style.borderColor = c.border;
+                document.getElementById('dash-stage-name').textContent = ms.stage;
+                document.getElementById('dash-stage-name').style.color = c.text;
+                document.getElementById('dash-stage-detail').textContent =
+                    `${ms.distribution_days} dist + ${ms.stalling_days} stalling = ${ms.total_distribution} total (last ${ms.window})`;
+                document.getElementById('dash-stage-action').textContent = ms.action;
+                document.getElementById('dash-stage-action').style.color = c.text;
+                if (ms.follow_through_day) {
+                    const ftd = document.getElementById('dash-stage-ftd');
+                    ftd.style.display = 'inline-block';
+                    ftd.textContent = 'Follow-Through Day Detected';
+                }
+            }
+
+            // Row 2: Major Indices (SPY, QQQ, IWM, DIA)
+            if (summary && summary.indices) {
+                const indexNames = { SPY: 'S&P 500', QQQ: 'NASDAQ 100', IWM: 'Russell 2000', DIA: 'Dow Jones' };
+                const indicesHtml = Object.entries(summary.indices).map(([ticker, d]) => {
+                    if (!d || !d.price) return '';
+                    const color = d.change_pct > 0 ? '#10b981' : d.change_pct < 0 ? '#ef4444' : '#94a3b8';
+                    const arrow = d.change_pct > 0 ? '&#9650;' : d.change_pct < 0 ? '&#9660;' : '';
+                    const prefix = d.change_pct > 0 ? '+' : '';
+                    const ma50Badge = d.above_50 === true
+                        ? '<span class="dash-ma-badge dash-ma-above">Above 50d</span>'
+                        : d.above_50 === false
+                        ? '<span class="dash-ma-badge dash-ma-below">Below 50d</span>' : '';
+                    const ma200Badge = d.above_200 === true
+                        ? '<span class="dash-ma-badge dash-ma-above">Above 200d</span>'
+                        : d.above_200 === false
+                        ? '<span class="dash-ma-badge dash-ma-below">Below 200d</span>' : '';
+                    return `<div class="dash-glass" style="padding:20px; text-align:center;">
+                        <div style="font-size:0.65rem; color:#64748b; text-transform:uppercase; letter-spacing:2px; margin-bottom:4px;">${indexNames[ticker] || ticker}</div>
+                        <div style="font-size:0.75rem; color:#94a3b8; font-weight:600; margin-bottom:6px;">${ticker}</div>
+                        <div class="dash-price">\$${d.price.toFixed(2)}</div>
+                        <div class="dash-change" style="color:${color};">${arrow} ${prefix}${d.change_pct.toFixed(2)}%</div>
+                        <div style="margin-top:8px;">${ma50Badge}${ma200Badge}</div>
+                    </div>`;
+                }).join('');
+                document.getElementById('dash-indices').innerHTML = indicesHtml || '<div class="dash-glass" style="padding:20px; text-align:center; grid-column:1/-1;"><div style="color:#64748b;">Market data unavailable</div></div>';
+            }
+
+            // Row 3: Fear & Breadth
+            if (summary || internals) {
+                let fearHtml = '';
+
+                // VIX
+                const vix = summary?.indicators?.['^VIX'];
+                if (vix && vix.price) {
+                    let vixColor, vixLabel;
+                    if (vix.price >= 30) { vixColor = '#ef4444'; vixLabel = 'PANIC'; }
+                    else if (vix.price >= 25) { vixColor = '#ef4444'; vixLabel = 'FEAR'; }
+                    else if (vix.price >= 16) { vixColor = '#eab308'; vixLabel = 'MODERATE'; }
+                    else { vixColor = '#10b981'; vixLabel = 'CALM'; }
+                    fearHtml += `<div class="dash-glass" style="padding:20px; text-align:center;">
+                        <div style="font-size:0.65rem; color:#64748b; text-transform:uppercase; letter-spacing:2px; margin-bottom:8px;">VIX &middot; Fear Index</div>
+                        <div class="dash-price" style="color:${vixColor};">${vix.price.toFixed(2)}</div>
+                        <div style="font-size:0.85rem; font-weight:700; color:${vixColor}; margin-top:6px;">${vixLabel}</div>
+                    </div>`;
+                }
+
+                // Breadth
+                const breadth = internals?.breadth;
+                if (breadth) {
+                    const bPct = breadth.pct || 0;
+                    const bColor = bPct >= 60 ? '#10b981' : bPct >= 40 ? '#eab308' : '#ef4444';
+                    fearHtml += `<div class="dash-glass" style="padding:20px; text-align:center;">
+                        <div style="font-size:0.65rem; color:#64748b; text-transform:uppercase; letter-spacing:2px; margin-bottom:8px;">Market Breadth &middot; Top 20</div>
+                        <div class="dash-price" style="color:${bColor};">${breadth.up}/${breadth.total}</div>
+                        <div class="dash-breadth-bar"><div class="dash-breadth-fill" style="width:${bPct}%; background:${bColor};"></div></div>
+                        <div style="font-size:0.75rem; color:#94a3b8; margin-top:6px;">${bPct}% stocks positive today</div>
+                    </div>`;
+                } else {
+                    fearHtml += `<div class="dash-glass" style="padding:20px; text-align:center;"><div style="color:#64748b;">Breadth unavailable</div></div>`;
+                }
+
+                // 10Y Treasury
+                const tnx = summary?.indicators?.['^TNX'];
+                if (tnx && tnx.price) {
+                    const tnxColor = tnx.change_pct > 0 ? '#ef4444' : tnx.change_pct < 0 ? '#10b981' : '#94a3b8';
+                    const tnxPrefix = tnx.change_pct > 0 ? '+' : '';
+                    fearHtml += `<div class="dash-glass" style="padding:20px; text-align:center;">
+                        <div style="font-size:0.65rem; color:#64748b; text-transform:uppercase; letter-spacing:2px; margin-bottom:8px;">10Y Treasury Yield</div>
+                        <div class="dash-price">${tnx.price.toFixed(2)}%</div>
+                        <div class="dash-change" style="color:${tnxColor};">${tnxPrefix}${tnx.change_pct.toFixed(2)}% today</div>
+                    </div>`;
+                }
+
+                document.getElementById('dash-fear').innerHTML = fearHtml;
+            }
+
+            // Row 4: Sector Heatmap
+            if (summary && summary.sectors) {
+                const sectorEntries = Object.entries(summary.sectors).sort((a, b) => b[1].change_pct - a[1].change_pct);
+                const sectorsHtml = sectorEntries.map(([name, d]) => {
+                    const chg = d.change_pct || 0;
+                    const color = chg > 0 ? '#10b981' : chg < 0 ? '#ef4444' : '#94a3b8';
+                    // Gradient intensity proportional to change (0% = neutral, 3% = max)
+                    const intensity = Math.min(Math.abs(chg) / 3, 1);
+                    const r = chg < 0 ? Math.round(239 * intensity) : 0;
+                    const g = chg > 0 ? Math.round(185 * intensity) : 0;
+                    const b = chg > 0 ? Math.round(129 * intensity * 0.3) : 0;
+                    const bgColor = chg === 0
+                        ? 'rgba(30,41,59,0.6)'
+                        : `rgba(${chg > 0 ? `16,${100 + Math.round(85*intensity)},${60 + Math.round(69*intensity)}` : `${180 + Math.round(59*intensity)},68,68`},${0.06 + intensity * 0.18})`;
+                    const prefix = chg > 0 ? '+' : '';
+                    return `<div class="dash-glass" style="padding:16px; text-align:center; background:${bgColor}; cursor:pointer;">
+                        <div style="font-size:0.7rem; font-weight:700; margin-bottom:2px;">${name}</div>
+                        <div style="font-size:0.6rem; color:#64748b; margin-bottom:8px;">${d.ticker}</div>
+                        <div style="font-size:1.2rem; font-weight:800; color:${color};">${prefix}${chg.toFixed(2)}%</div>
+                        <div style="font-size:0.7rem; color:#94a3b8; margin-top:4px;">\$${d.price.toFixed(2)}</div>
+                    </div>`;
+                }).join('');
+                document.getElementById('dash-sectors').innerHTML = sectorsHtml;
+            }
+        }
+
+        let hunterLoaded = false;
+
+        function showHunter() {
+            if (location.hash !== '#hunter') history.pushState(null, '', '#hunter');
+            hideAllViews();
+            document.getElementById('hunter-view').style.display = 'block';
+            updateActiveNav('hunter');
+
+            if (window.tvCheckInterval) {
+                clearInterval(window.tvCheckInterval);
+                window.tvCheckInterval = null;
+            }
+            const chartContainer = document.getElementById('tv-chart');
+            if (chartContainer) chartContainer.innerHTML = '';
+            window.tvWidget = null;
+
+            if (!hunterLoaded) {
+                hunterLoaded = true;
+                renderTable();
+                createIndustryFilters();
+                document.getElementById('stock-count').textContent = stocksData.length;
+            }
+        }
+
+        // Watchlist functionality
+        let watchlistData = null;
+        let currentBasketFilter = 'all';
+        let watchlistSortColumn = null;
+        let watchlistSortDirection = 'asc';
+
+        let liveRefreshTimer = null;
+
+        async function showWatchlist() {
+            if (location.hash !== '#portfolio') history.pushState(null, '', '#portfolio');
+            hideAllViews();
+            document.getElementById('watchlist-view').style.display = 'block';
+            updateActiveNav('portfolio');
+            
+            if (!watchlistData) {
+                try {
+                    // Load portfolio structure from Supabase
+                    const portfolioRes = await fetch('/api/portfolio');
+                    if (!portfolioRes.ok) throw new Error('Portfolio not available');
+                    const portfolio = await portfolioRes.json();
+                    
+                    // Load stock scores from all_stocks.json
+                    let allStocks = {};
+                    try {
+                        const allRes = await fetch('/api/all_stocks?criteria=compact');
+                        if (allRes.ok) {
+                            const allData = await allRes.json();
+                            allStocks = allData.stocks || {};
+                            const scoreTs = allData.last_scan || allData.iq_edge_updated || '';
+                            if (scoreTs) document.getElementById('wl-score-ts').textContent = scoreTs;
+                        }
+                    } catch(e) {}
+                    
+                    // Build watchlistData by merging portfolio + scores
+                    watchlistData = { baskets: {}, all: [] };
+                    for (const [name, basket] of Object.entries(portfolio.baskets || {})) {
+                        watchlistData.baskets[name] = [];
+                        for (const [ticker, pct] of Object.entries(basket.tickers || {})) {
+                            const scores = allStocks[ticker] || {};
+                            const stock = {
+                                ticker: ticker,
+                                basket: name,
+                                position_size: pct,
+                                name: scores.name || ticker,
+                                score: scores.score || 0,
+                                grade: scores.grade || 'N/A',
+                                technical_score: scores.technical_score || 0,
+                                growth_score: scores.growth_score || 0,
+                                quality_score: scores.quality_score || 0,
+                                context_score: scores.context_score || 0,
+                                ewros_score: scores.ewros_score || 0,
+                                moonshot_score: scores.moonshot_score || 0,
+                                forward_pe: scores.forward_pe || null,
+                                trailing_pe: scores.trailing_pe || null,
+                                revenue_growth: scores.revenue_growth || null,
+                                earnings_growth: scores.earnings_growth || null,
+                                peg_ratio: scores.peg_ratio || null,
+                                price: scores.current_price || null,
+                                daily_change: null,
+                                sector: scores.sector || '',
+                                industry: scores.industry || '',
+                                ins_score: scores.ins_score || 0,
+                                insider_signal: scores.insider_signal || 'neutral',
+                                ewros_score: scores.ewros_score || 0,
+                                ewros_trend: scores.ewros_trend || 0,
+                                ewros_prior: scores.ewros_prior || 0,
+                                ewros_stats: scores.ewros_stats || {},
+                                iq_edge: scores.iq_edge || 0,
+                                iq_edge_raw: scores.iq_edge_raw || 0,
+                                basket_metadata: { icon: basket.icon, weight: basket.weight }
+                            };
+                            watchlistData.baskets[name].push(stock);
+                            watchlistData.all.push(stock);
+                        }
+                    }
+                    
+                    document.getElementById('watchlist-updated').textContent = 'Fetching live prices...';
+                    updateBasketFilters();
+                    renderWatchlist();
+                } catch (err) {
+                    document.getElementById('watchlist-tbody').innerHTML = 
+                        '<tr><td colspan="12" style="text-align: center; padding: 40px; color: #dc2626;">Error loading portfolio: ' + err.message + '</td></tr>';
+                    return;
+                }
+            } else {
+                renderWatchlist();
+            }
+            
+            // Fetch live prices and overlay
+            fetchLivePrices();
+            if (liveRefreshTimer) clearInterval(liveRefreshTimer);
+            liveRefreshTimer = setInterval(fetchLivePrices, 60000);
+        }
+
+        async function fetchLivePrices() {
+            try {
+                const res = await fetch('/api/watchlist/live');
+                if (!res.ok) return;
+                const live = await res.json();
+                
+                if (!live.prices || !watchlistData) return;
+                
+                // Update watchlistData with live prices
+                for (const stock of watchlistData.all) {
+                    const lp = live.prices[stock.ticker];
+                    if (lp) {
+                        stock.price = lp.price;
+                        stock.previous_close = lp.previous_close;
+                        stock.daily_change = lp.daily_change;
+                        if (lp.ins_score !== undefined) stock.ins_score = lp.ins_score;
+                        if (lp.insider_signal) stock.insider_signal = lp.insider_signal;
+                    }
+                }
+                // Also update basket arrays (they share object references)
+                for (const [basket, stocks] of Object.entries(watchlistData.baskets)) {
+                    for (const stock of stocks) {
+                        const lp = live.prices[stock.ticker];
+                        if (lp) {
+                            stock.price = lp.price;
+                            stock.previous_close = lp.previous_close;
+                            stock.daily_change = lp.daily_change;
+                            if (lp.ins_score !== undefined) stock.ins_score = lp.ins_score;
+                            if (lp.insider_signal) stock.insider_signal = lp.insider_signal;
+                        }
+                    }
+                }
+                
+                document.getElementById('watchlist-updated').textContent = live.timestamp + ' (LIVE)';
+                renderWatchlist();
+            } catch (e) {
+                console.log('Live price fetch failed:', e);
+            }
+        }
+
+        function renderStockRow(stock) {
+            const dc = stock.daily_change;
+            const changeColor = dc > 0 ? '#10b981' : dc < 0 ? '#ef4444' : 'var(--text-dim)';
+            const changePrefix = dc > 0 ? '+' : '';
+            const pegColor = stock.peg_ratio === null ? 'var(--text-dim)' :
+                             stock.peg_ratio < 1.5 ? '#10b981' :
+                             stock.peg_ratio < 2.5 ? '#eab308' : '#ef4444';
+            const revGrowthColor = stock.revenue_growth === null ? 'var(--text-dim)' :
+                                   stock.revenue_growth > 0 ? '#10b981' : '#ef4444';
+            const earnGrowthColor = stock.earnings_growth === null ? 'var(--text-dim)' :
+                                    stock.earnings_growth > 0 ? '#10b981' : '#ef4444';
+            const scorePercent = Math.min(stock.score, 100);
+            const scoreColor = scorePercent >= 70 ? '#059669' : 
+                               scorePercent >= 50 ? '#0284c7' : 
+                               scorePercent >= 30 ? '#d97706' : '#dc2626';
+            const na = '<span style="color: var(--text-dim);">N/A</span>';
+            
+            // Edit mode: editable position size
+            let posSize;
+            if (editMode) {
+                const val = stock.position_size !== null && stock.position_size !== undefined ? stock.position_size : 0;
+                posSize = `<input type="number" class="edit-input" value="${val.toFixed(2)}" 
+                    onchange="updateTickerPosition('${stock.basket}', '${stock.ticker}', this.value)" 
+                    step="0.01" min="0" max="100">`;
+            } else {
+                posSize = stock.position_size !== null && stock.position_size !== undefined 
+                    ? stock.position_size.toFixed(1) + '%' 
+                    : '<span style="color: var(--text-dim);">—</span>';
+            }
+            
+            // Edit mode: delete button in ticker column
+            const tickerCell = editMode 
+                ? `<a href="#" onclick="viewStock('${stock.ticker}'); return false;" class="text-sky-400 hover:text-sky-300 font-bold">${stock.ticker}</a>
+                   <span class="edit-delete-btn" onclick="deleteTickerFromBasket('${stock.basket}', '${stock.ticker}')">✕</span>`
+                : `<a href="#" onclick="viewStock('${stock.ticker}'); return false;" class="text-sky-400 hover:text-sky-300 font-bold">${stock.ticker}</a>`;
+            
+            return `
+                <tr data-ticker="${stock.ticker}">
+                    <td class="sticky-col">${tickerCell}</td>
+                    <td style="font-weight: 500;">${posSize}</td>
+                    <td class="live-change" style="color: ${changeColor}; font-weight: 600;">${dc !== null && dc !== undefined ? changePrefix + dc.toFixed(2) + '%' : na}</td>
+                    <td>${stock.trailing_pe !== null ? stock.trailing_pe.toFixed(2) : na}</td>
+                    <td>${stock.forward_pe !== null ? stock.forward_pe.toFixed(2) : na}</td>
+                    <td style="color: ${revGrowthColor};">${stock.revenue_growth !== null ? stock.revenue_growth.toFixed(1) + '%' : na}</td>
+                    <td style="color: ${earnGrowthColor};">${stock.earnings_growth !== null ? stock.earnings_growth.toFixed(1) + '%' : na}</td>
+                    <td style="color: ${pegColor}; font-weight: 600;">${stock.peg_ratio !== null ? stock.peg_ratio.toFixed(2) : na}</td>
+                    <td>
+                        ${stock.score == null ? `<span style="color:var(--text-dim); font-size:0.8rem;">ETF</span>` : `
+                        <div class="score-container">
+                            <div class="score-bar-bg">
+                                <div class="score-bar-fill" style="width: ${scorePercent}%; background: ${scoreColor};"></div>
+                            </div>
+                            <span class="score-text">${stock.score}/100</span>
+                        </div>
+                        <div class="score-breakdown">T:${stock.technical_score || 0} G:${stock.growth_score || 0} Q:${stock.quality_score || 0} C:${stock.context_score || 0}</div>`}
+                    </td>
+                    <td class="text-center font-bold text-amber-400">${stock.score == null ? '—' : (stock.moonshot_score || 0) + '%'}</td>
+                    <td class="text-center">${renderEwros(stock.ewros_score, stock.ewros_trend, stock.ticker)}</td>
+                    <td class="text-center" style="font-weight:700; color:${(stock.iq_edge||0) >= 90 ? '#a855f7' : (stock.iq_edge||0) >= 70 ? '#10b981' : (stock.iq_edge||0) >= 40 ? '#eab308' : '#64748b'};">${stock.iq_edge != null && stock.iq_edge > 0 ? stock.iq_edge : '—'}</td>
+                    <td>${stock.grade === 'ETF'
+                        ? `<span class="grade-badge" style="background:#1e3a5f;color:#38bdf8;">ETF</span>`
+                        : `<span class="grade-badge grade-${stock.grade}">${stock.grade}</span>`}</td>
+                    <td>${getPortfolioSignalBadge(stock)}</td>
+                    <td>${renderInsiderBadge(stock.ins_score, stock.insider_signal, true)}</td>
+                </tr>
+            `;
+        }
+
+        const basketIcons = {
+            'Trading Account': '📈',
+            'IRA Core ETFs': '📦',
+            'Grid-to-Chip': '⚡',
+            'Defense & Aerospace': '🛡️',
+            'AI Semis': '🧠',
+            'Biotech': '🧬'
+        };
+        
+        function isEtf(stock) {
+            // ETFs have no meaningful fundamental data
+            return !stock.trailing_pe && !stock.revenue_growth && !stock.peg_ratio;
+        }
+
+        // ===== SIGNAL POPUP (same pattern as EWROS popup) =====
+        function showSignalPopup(ticker, tier, reasons) {
+            const existing = document.getElementById('signal-popup');
+            if (existing) existing.remove();
+
+            const cfg = {
+                'HOLD':  { color: '#10b981', emoji: '🟢', desc: 'Thesis intact — strong relative momentum' },
+                'WATCH': { color: '#eab308', emoji: '🟡', desc: 'Weakening — monitor for exit triggers' },
+                'EXIT':  { color: '#ef4444', emoji: '🔴', desc: 'Momentum collapsed — consider exiting' },
+                'SELL':  { color: '#ef4444', emoji: '🔴', desc: 'Sell signal triggered' }
+            }[tier] || { color: '#94a3b8', emoji: '⚪', desc: '' };
+
+            const popup = document.createElement('div');
+            popup.id = 'signal-popup';
+            popup.style.cssText = 'position:fixed; top:0; left:0; right:0; bottom:0; z-index:10000; display:flex; align-items:center; justify-content:center; background:rgba(0,0,0,0.6); backdrop-filter:blur(4px);';
+            popup.onclick = (e) => { if (e.target === popup) popup.remove(); };
+
+            popup.innerHTML = `
+                <div style="background:#1e293b; border:1px solid #374151; border-radius:16px; padding:24px; max-width:340px; width:90%; box-shadow:0 20px 60px rgba(0,0,0,0.5);">
+                    <div style="display:flex; justify-content:space-between; align-items:center; margin-bottom:16px;">
+                        <div>
+                            <span style="font-size:1.2rem; font-weight:800; color:var(--accent);">${ticker}</span>
+                            <span style="font-size:0.8rem; color:var(--text-dim); margin-left:8px;">Signal</span>
+                        </div>
+                        <span onclick="this.closest('#signal-popup').remove()" style="cursor:pointer; color:var(--text-dim); font-size:1.2rem;">✕</span>
+                    </div>
+                    <div style="text-align:center; margin-bottom:16px;">
+                        <div style="font-size:2rem;">${cfg.emoji}</div>
+                        <div style="font-size:1.4rem; font-weight:800; color:${cfg.color}; margin-top:4px;">${tier}</div>
+                        <div style="font-size:0.8rem; color:var(--text-dim); margin-top:4px;">${cfg.desc}</div>
+                    </div>
+                    <div style="background:#0f172a; border-radius:10px; padding:14px;">
+                        <div style="font-size:0.7rem; color:#64748b; text-transform:uppercase; letter-spacing:0.05em; margin-bottom:10px; font-weight:600;">Why this signal</div>
+                        ${reasons.map(r => `<div style="font-size:0.82rem; color:#e2e8f0; padding:5px 0; border-bottom:1px solid #1e293b;">• ${r}</div>`).join('')}
+                    </div>
+                    <div style="margin-top:14px; text-align:center; font-size:0.7rem; color:#475569;">
+                        Exit rules: below 50d MA (5d hold) · EWROS &lt; 50 (10d hold)
+                    </div>
+                </div>
+            `;
+            document.body.appendChild(popup);
+        }
+
+        function sigBadge(color, bg, label, reasons, ticker) {
+            const tier = label.replace(/[^\w]/g, '').trim();
+            const reasonsEsc = reasons.map(r => r.replace(/'/g, "\\&#39;").replace(/"/g, '&quot;')).join('|||');
+            return `<span onclick="showSignalPopup('${ticker}','${tier}','${reasonsEsc}'.split('|||'))"
+                style="background:${bg};color:${color};border:1px solid ${color};padding:2px 8px;border-radius:4px;font-size:0.75rem;font-weight:700;cursor:pointer;user-select:none;">${label}</span>`;
+        }
+
+        function getPortfolioSignalBadge(stock) {
+            const ticker = stock.ticker || '';
+            if (isEtf(stock)) {
+                // ETFs: use EWROS for signal (no fundamental/technical score available)
+                const ewros = stock.ewros_score || 0;
+                const reasons = [`EWROS: ${ewros} (momentum vs SPY)`];
+                if (ewros >= 65) { reasons.push('Trend intact — outperforming SPY'); return sigBadge('#10b981', 'rgba(16,185,129,0.15)', '🟢 HOLD', reasons, ticker); }
+                if (ewros >= 40) { reasons.push('Momentum weakening — monitor'); return sigBadge('#eab308', 'rgba(234,179,8,0.15)', '🟡 WATCH', reasons, ticker); }
+                if (ewros === 0) { reasons.push('Score pending — awaiting EWROS data'); return sigBadge('#475569', 'rgba(71,85,105,0.15)', '⚪ N/A', reasons, ticker); }
+                reasons.push('Underperforming SPY — consider reducing'); return sigBadge('#ef4444', 'rgba(239,68,68,0.15)', '🔴 EXIT', reasons, ticker);
+            } else {
+                const ewros = stock.ewros_score || 0;
+                const iq = stock.iq_edge || 0;
+                const reasons = [`EWROS: ${ewros.toFixed ? ewros.toFixed(0) : ewros} (relative momentum vs SPY)`];
+                if (iq) reasons.push(`IQ Edge: ${iq} (breakout probability)`);
+                if (ewros >= 60) {
+                    reasons.push('Strong relative outperformance — hold');
+                    return sigBadge('#10b981', 'rgba(16,185,129,0.15)', '🟢 HOLD', reasons, ticker);
+                }
+                if (ewros >= 40) {
+                    reasons.push('Momentum fading — monitor for exit triggers');
+                    if (ewros < 50) reasons.push('⚠️ Below 50 threshold — exit if held 10+ days');
+                    return sigBadge('#eab308', 'rgba(234,179,8,0.15)', '🟡 WATCH', reasons, ticker);
+                }
+                reasons.push('Momentum collapsed — underperforming SPY');
+                reasons.push('Exit: below 50d MA or EWROS < 50');
+                return sigBadge('#ef4444', 'rgba(239,68,68,0.15)', '🔴 EXIT', reasons, ticker);
+            }
+        }
+
+        function renderEwros(score, trend, ticker) {
+            if (!score) return '—';
+            const color = score >= 70 ? '#10b981' : score >= 40 ? '#eab308' : '#ef4444';
+            let trendHtml = '';
+            if (trend != null && trend !== 0) {
+                const tArrow = trend > 0 ? '▲' : '▼';
+                const tColor = trend > 0 ? '#10b981' : '#ef4444';
+                trendHtml = '<span style="font-size:0.65rem; margin-left:3px; color:' + tColor + ';">' + tArrow + '</span>';
+            }
+            const clickAttr = ticker ? ' onclick="showEwrosPopup(\'' + ticker + '\')" style="cursor:pointer;"' : '';
+            return '<span' + clickAttr + ' style="font-weight:600; color:' + color + '; cursor:pointer;">' + score + '</span>' + trendHtml;
+        }
+
+        function showEwrosPopup(ticker) {
+            // Find stock data from either stocksData or watchlistData
+            let stock = null;
+            if (typeof stocksData !== 'undefined') {
+                stock = stocksData.find(s => s.ticker === ticker);
+            }
+            if (!stock && typeof watchlistData !== 'undefined' && watchlistData.all) {
+                stock = watchlistData.all.find(s => s.ticker === ticker);
+            }
+            // Also check allStocks from rotation
+            if (!stock && typeof allStocks !== 'undefined') {
+                stock = allStocks.find(s => s.ticker === ticker);
+            }
+            if (!stock) return;
+
+            const score = stock.ewros_score || 0;
+            const trend = stock.ewros_trend || 0;
+            const prior = stock.ewros_prior || (score - trend);
+            const stats = stock.ewros_stats || {};
+            const raw = stock.ewros_raw || 0;
+
+            const scoreColor = score >= 70 ? '#10b981' : score >= 40 ? '#eab308' : '#ef4444';
+            const trendArrow = trend > 0 ? '▲' : trend < 0 ? '▼' : '=';
+            const trendColor = trend > 0 ? '#10b981' : trend < 0 ? '#ef4444' : '#94a3b8';
+            const trendLabel = trend > 0 ? 'Improving' : trend < 0 ? 'Declining' : 'Stable';
+
+            const winRate = stats.win_rate || 0;
+            const winColor = winRate >= 55 ? '#10b981' : winRate >= 45 ? '#eab308' : '#ef4444';
+
+            const stockRet = stats.stock_return_3mo != null ? stats.stock_return_3mo.toFixed(1) + '%' : '—';
+            const spyRet = stats.spy_return_3mo != null ? stats.spy_return_3mo.toFixed(1) + '%' : '—';
+            const stockRetColor = (stats.stock_return_3mo || 0) > 0 ? '#10b981' : '#ef4444';
+            const spyRetColor = (stats.spy_return_3mo || 0) > 0 ? '#10b981' : '#ef4444';
+
+            // Remove existing popup if any
+            const existing = document.getElementById('ewros-popup');
+            if (existing) existing.remove();
+
+            const popup = document.createElement('div');
+            popup.id = 'ewros-popup';
+            popup.style.cssText = 'position:fixed; top:0; left:0; right:0; bottom:0; z-index:10000; display:flex; align-items:center; justify-content:center; background:rgba(0,0,0,0.6); backdrop-filter:blur(4px);';
+            popup.onclick = (e) => { if (e.target === popup) popup.remove(); };
+
+            popup.innerHTML = `
+                <div style="background:#1e293b; border:1px solid #374151; border-radius:16px; padding:28px; max-width:380px; width:90%; box-shadow:0 20px 60px rgba(0,0,0,0.5);">
+                    <div style="display:flex; justify-content:space-between; align-items:center; margin-bottom:20px;">
+                        <div>
+                            <span style="font-size:1.2rem; font-weight:800; color:var(--accent);">${ticker}</span>
+                            <span style="font-size:0.8rem; color:var(--text-dim); margin-left:8px;">EWROS</span>
+                        </div>
+                        <span onclick="this.parentElement.parentElement.parentElement.remove()" style="cursor:pointer; color:var(--text-dim); font-size:1.2rem;">✕</span>
+                    </div>
+
+                    <div style="display:flex; gap:16px; margin-bottom:20px;">
+                        <div style="flex:1; text-align:center; background:#161b2a; border-radius:10px; padding:14px;">
+                            <div style="font-size:0.6rem; text-transform:uppercase; letter-spacing:1px; color:var(--text-dim); margin-bottom:6px;">Score</div>
+                            <div style="font-size:2rem; font-weight:800; color:${scoreColor};">${score}</div>
+                        </div>
+                        <div style="flex:1; text-align:center; background:#161b2a; border-radius:10px; padding:14px;">
+                            <div style="font-size:0.6rem; text-transform:uppercase; letter-spacing:1px; color:var(--text-dim); margin-bottom:6px;">1mo Ago</div>
+                            <div style="font-size:2rem; font-weight:800; color:var(--text-dim);">${prior}</div>
+                        </div>
+                        <div style="flex:1; text-align:center; background:#161b2a; border-radius:10px; padding:14px;">
+                            <div style="font-size:0.6rem; text-transform:uppercase; letter-spacing:1px; color:var(--text-dim); margin-bottom:6px;">Trend</div>
+                            <div style="font-size:1.4rem; font-weight:800; color:${trendColor};">${trendArrow}${Math.abs(trend)}</div>
+                            <div style="font-size:0.65rem; color:${trendColor};">${trendLabel}</div>
+                        </div>
+                    </div>
+
+                    <div style="background:#161b2a; border-radius:10px; padding:14px; margin-bottom:12px;">
+                        <div style="font-size:0.65rem; text-transform:uppercase; letter-spacing:1px; color:var(--text-dim); margin-bottom:10px;">3-Month Returns</div>
+                        <div style="display:flex; justify-content:space-between; font-size:0.85rem; margin-bottom:6px;">
+                            <span>${ticker}</span>
+                            <span style="font-weight:700; color:${stockRetColor};">${stockRet}</span>
+                        </div>
+                        <div style="display:flex; justify-content:space-between; font-size:0.85rem;">
+                            <span>SPY</span>
+                            <span style="font-weight:700; color:${spyRetColor};">${spyRet}</span>
+                        </div>
+                    </div>
+
+                    <div style="background:#161b2a; border-radius:10px; padding:14px; margin-bottom:12px;">
+                        <div style="font-size:0.65rem; text-transform:uppercase; letter-spacing:1px; color:var(--text-dim); margin-bottom:10px;">Daily Alpha vs SPY</div>
+                        <div style="display:flex; justify-content:space-between; font-size:0.85rem; margin-bottom:6px;">
+                            <span>Beat SPY</span>
+                            <span style="font-weight:700; color:${winColor};">${stats.win_days || 0} of ${stats.total_days || 63} days (${winRate}%)</span>
+                        </div>
+                        <div style="display:flex; justify-content:space-between; font-size:0.85rem; margin-bottom:6px;">
+                            <span>Avg Daily Alpha</span>
+                            <span style="font-weight:700; color:${(stats.avg_alpha_bps||0) >= 0 ? '#10b981' : '#ef4444'};">${(stats.avg_alpha_bps||0) > 0 ? '+' : ''}${stats.avg_alpha_bps || 0} bps</span>
+                        </div>
+                        <div style="display:flex; justify-content:space-between; font-size:0.85rem; margin-bottom:6px;">
+                            <span>Best Day</span>
+                            <span style="color:#10b981;">+${stats.best_alpha_pct || 0}%</span>
+                        </div>
+                        <div style="display:flex; justify-content:space-between; font-size:0.85rem;">
+                            <span>Worst Day</span>
+                            <span style="color:#ef4444;">${stats.worst_alpha_pct || 0}%</span>
+                        </div>
+                    </div>
+
+                    <div style="text-align:center; font-size:0.65rem; color:var(--text-dim);">
+                        EWROS = Exponential Weighted Relative Outperformance · λ=${0.03} · ${stats.total_days || 63}d lookback
+                    </div>
+                </div>
+            `;
+            document.body.appendChild(popup);
+        }
+
+        function getEwrosColor(score) {
+            if (score >= 80) return '#10b981';
+            if (score >= 60) return '#eab308';
+            if (score >= 40) return '#94a3b8';
+            return '#64748b';
+        }
+        
+        function getEwrosWeight(score) {
+            if (score >= 80) return '700';
+            if (score >= 60) return '600';
+            return '400';
+        }
+
+        function renderWatchlist() {
+            const dataSource = editMode ? editModeData : watchlistData;
+            if (!dataSource) return;
+            
+            const tbody = document.getElementById('watchlist-tbody');
+            
+            // Single basket filter — flat list, no headers
+            if (currentBasketFilter !== 'all') {
+                const stocks = dataSource.baskets[currentBasketFilter] || [];
+                if (stocks.length === 0) {
+                    tbody.innerHTML = '<tr><td colspan="15" style="text-align: center; padding: 40px; color: var(--text-dim);">No holdings in this basket</td></tr>';
+                    return;
+                }
+                
+                // Add "Add Ticker" button when in edit mode for single basket view
+                let html = '';
+                if (editMode) {
+                    html += `
+                        <tr>
+                            <td colspan="15" style="padding: 12px; text-align: center;">
+                                <button class="edit-add-btn" onclick="showAddTickerModal('${currentBasketFilter}')">+ Add Ticker to ${currentBasketFilter}</button>
+                            </td>
+                        </tr>
+                    `;
+                }
+                html += stocks.map(renderStockRow).join('');
+                tbody.innerHTML = html;
+                setNavContext(stocks.map(s => s.ticker));
+                return;
+            }
+            
+            // "Show All" — grouped by basket with section headers
+            let html = '';
+            const basketOrder = ['Trading Account', 'IRA Core ETFs', 'Grid-to-Chip', 'Defense & Aerospace', 'AI Semis', 'Biotech'];
+            
+            // Include all baskets (standard + any new ones)
+            const allBaskets = [...basketOrder];
+            for (const basket in dataSource.baskets) {
+                if (!allBaskets.includes(basket)) allBaskets.push(basket);
+            }
+            
+            for (const basket of allBaskets) {
+                const stocks = dataSource.baskets[basket];
+                if (!stocks) continue;
+                // Show empty baskets always (they exist in DB), just with a message
+                
+                // Get icon/weight from data (supports new baskets from Supabase)
+                const meta = (stocks.length > 0 && stocks[0].basket_metadata) ? stocks[0].basket_metadata : 
+                             (editMode && editModeData?.basket_metadata?.[basket]) ? editModeData.basket_metadata[basket] : {};
+                const icon = meta.icon || basketIcons[basket] || '📋';
+                // Weighted average: sum(change * position%) / sum(position%)
+                const totalWeight = stocks.reduce((s, st) => s + (st.position_size || 0), 0);
+                const avgChange = totalWeight > 0 
+                    ? stocks.reduce((s, st) => s + (st.daily_change || 0) * (st.position_size || 0), 0) / totalWeight 
+                    : 0;
+                const avgColor = avgChange > 0 ? '#10b981' : avgChange < 0 ? '#ef4444' : 'var(--text-dim)';
+                const avgPrefix = avgChange > 0 ? '+' : '';
+                
+                const basketWeights = {
+                    'Trading Account': '26% of portfolio',
+                    'IRA Core ETFs': '~41.5% of IRA',
+                    'Grid-to-Chip': '22.5% of IRA',
+                    'Defense & Aerospace': '18% of IRA',
+                    'AI Semis': '15% of IRA',
+                    'Biotech': '3% of IRA'
+                };
+                const weight = meta.weight || basketWeights[basket] || '';
+                
+                // Edit mode: Add controls to basket header
+                const basketControls = editMode 
+                    ? `<button class="edit-add-btn" onclick="showAddTickerModal('${basket}')" style="margin-left: 16px;">+ Add Ticker</button>
+                       <button class="edit-add-btn" onclick="deleteBasket('${basket}')" style="margin-left: 8px; border-color: #dc2626; color: #dc2626;">Delete Basket</button>`
+                    : '';
+                
+                const safeBasket = basket.replace(/'/g, "\\'");
+                const collapsed = collapsedBaskets.has(basket);
+                html += `
+                    <tr class="basket-header" data-basket="${basket}" onclick="toggleBasketCollapse('${safeBasket}')" style="cursor:pointer;">
+                        <td colspan="15" style="background: #0a0f1d; padding: 10px 16px; border-bottom: 2px solid var(--accent); font-weight: 700; font-size: 0.9rem;">
+                            <span style="display:inline-block;width:16px;font-size:0.7rem;color:var(--text-dim);">${collapsed ? '▶' : '▼'}</span>
+                            ${icon} ${basket} 
+                            <span style="font-size: 0.75rem; color: var(--accent); font-weight: 600; margin-left: 8px;">${weight}</span>
+                            <span style="font-size: 0.75rem; color: var(--text-dim); font-weight: 400; margin-left: 8px;">· ${stocks.length} holdings</span>
+                            <span class="basket-avg" style="font-size: 0.75rem; color: ${avgColor}; font-weight: 600; margin-left: 12px;">Avg: ${avgPrefix}${avgChange.toFixed(2)}%</span>
+                            ${basketControls}
+                        </td>
+                    </tr>
+                `;
+                if (!collapsed) {
+                    if (stocks.length === 0) {
+                        html += `<tr data-basket-row="${basket}"><td colspan="15" style="text-align: center; padding: 14px; color: var(--text-dim); font-style: italic;">
+                            ${editMode ? 'Use "+ Add Ticker" above to add holdings' : 'No holdings — tap ✏️ Edit to add tickers'}
+                        </td></tr>`;
+                    } else {
+                        html += stocks.map(renderStockRow).join('');
+                    }
+                }
+            }
+            
+            tbody.innerHTML = html;
+            // Set nav context to all visible holdings across all baskets
+            const allTickers = [];
+            for (const basket of allBaskets) {
+                const stocks = dataSource.baskets[basket];
+                if (stocks && !collapsedBaskets.has(basket)) {
+                    stocks.forEach(s => allTickers.push(s.ticker));
+                }
+            }
+            setNavContext(allTickers);
+        }
+
+        function filterWatchlist(basket) {
+            currentBasketFilter = basket;
+            
+            // Update pill active states
+            document.querySelectorAll('#basket-filters .filter-pill').forEach(pill => {
+                pill.classList.remove('active');
+            });
+            event.target.classList.add('active');
+            
+            renderWatchlist();
+        }
+
+        function sortWatchlist(column) {
+            if (!watchlistData) return;
+            
+            // Toggle direction if same column, otherwise default to descending (high to low first)
+            if (watchlistSortColumn === column) {
+                watchlistSortDirection = watchlistSortDirection === 'desc' ? 'asc' : 'desc';
+            } else {
+                watchlistSortColumn = column;
+                watchlistSortDirection = column === 'ticker' ? 'asc' : 'desc';  // A-Z for ticker, high-to-low for numbers
+            }
+            
+            // Update header indicators
+            document.querySelectorAll('#watchlist-table th').forEach(th => {
+                th.classList.remove('sort-asc', 'sort-desc');
+            });
+            event.target.classList.add(watchlistSortDirection === 'asc' ? 'sort-asc' : 'sort-desc');
+            
+            // Sort the data
+            const sortData = (stocks) => {
+                return [...stocks].sort((a, b) => {
+                    let aVal = a[column];
+                    let bVal = b[column];
+                    
+                    // Handle null values
+                    if (aVal === null && bVal === null) return 0;
+                    if (aVal === null) return 1;
+                    if (bVal === null) return -1;
+                    
+                    // String comparison
+                    if (typeof aVal === 'string') {
+                        aVal = aVal.toLowerCase();
+                        bVal = bVal.toLowerCase();
+                    }
+                    
+                    const comparison = aVal < bVal ? -1 : aVal > bVal ? 1 : 0;
+                    return watchlistSortDirection === 'asc' ? comparison : -comparison;
+                });
+            };
+            
+            // Apply sort — sort within each basket so grouped view stays grouped
+            if (currentBasketFilter === 'all') {
+                for (const basket in watchlistData.baskets) {
+                    watchlistData.baskets[basket] = sortData(watchlistData.baskets[basket]);
+                }
+            } else {
+                watchlistData.baskets[currentBasketFilter] = sortData(watchlistData.baskets[currentBasketFilter]);
+            }
+            
+            renderWatchlist();
+        }
+
+        // ===== EDIT MODE FUNCTIONALITY =====
+        const collapsedBaskets = new Set();
+        function toggleBasketCollapse(basket) {
+            if (editMode) return; // Don't collapse in edit mode
+            if (collapsedBaskets.has(basket)) collapsedBaskets.delete(basket);
+            else collapsedBaskets.add(basket);
+            renderWatchlist();
+        }
+
+        let editMode = false;
+        let editModeData = null; // Snapshot of portfolio for editing
+        let currentEditBasket = null; // Track which basket we're adding to
+
+        function toggleEditMode() {
+            editMode = !editMode;
+            
+            if (editMode) {
+                // Enter edit mode - take snapshot of current data
+                editModeData = JSON.parse(JSON.stringify(watchlistData));
+                // Build basket_metadata from existing stocks
+                editModeData.basket_metadata = {};
+                for (const [name, stocks] of Object.entries(editModeData.baskets)) {
+                    if (stocks.length > 0 && stocks[0].basket_metadata) {
+                        editModeData.basket_metadata[name] = stocks[0].basket_metadata;
+                    }
+                }
+                document.getElementById('edit-portfolio-btn').textContent = '❌ Cancel Edit';
+                document.getElementById('edit-portfolio-btn').classList.add('edit-mode-active');
+                
+                // Show floating bar
+                if (!document.getElementById('edit-floating-bar')) {
+                    const bar = document.createElement('div');
+                    bar.id = 'edit-floating-bar';
+                    bar.className = 'edit-floating-bar';
+                    bar.innerHTML = `
+                        <button class="edit-btn edit-btn-secondary" onclick="showAddBasketModal()">+ Add Basket</button>
+                        <button class="edit-btn edit-btn-primary" onclick="savePortfolioEdits()">💾 Save Changes</button>
+                        <button class="edit-btn edit-btn-danger" onclick="cancelEditMode()">Cancel</button>
+                    `;
+                    document.body.appendChild(bar);
+                }
+            } else {
+                cancelEditMode();
+            }
+            
+            renderWatchlist();
+        }
+
+        function cancelEditMode() {
+            editMode = false;
+            editModeData = null;
+            document.getElementById('edit-portfolio-btn').textContent = '✏️ Edit';
+            document.getElementById('edit-portfolio-btn').classList.remove('edit-mode-active');
+            
+            const bar = document.getElementById('edit-floating-bar');
+            if (bar) bar.remove();
+            
+            renderWatchlist();
+        }
+
+        function collectPortfolioData() {
+            // Build portfolio object from current DOM state when in edit mode
+            if (!editModeData) return null;
+            
+            const portfolio = { baskets: {} };
+            
+            // Read from editModeData (which has been modified via the edit functions)
+            for (const [basketName, basketStocks] of Object.entries(editModeData.baskets)) {
+                // Get basket metadata from DOM or original data
+                const basketHeader = document.querySelector(`tr.basket-header[data-basket="${basketName}"]`);
+                let icon = '📋';
+                let weight = '';
+                
+                if (basketHeader) {
+                    const headerText = basketHeader.textContent;
+                    const iconMatch = headerText.match(/^([^\s]+)/);
+                    if (iconMatch) icon = iconMatch[1];
+                    const weightMatch = headerText.match(/·\s*([^·]+?)(?:\s*·|$)/);
+                    if (weightMatch) weight = weightMatch[1].trim();
+                }
+                
+                // Check stored metadata (safely) — from basket_metadata or first stock
+                if (editModeData.basket_metadata?.[basketName]) {
+                    icon = editModeData.basket_metadata[basketName].icon || icon;
+                    weight = editModeData.basket_metadata[basketName].weight || weight;
+                } else {
+                    const originalBasket = watchlistData?.baskets?.[basketName];
+                    if (originalBasket && originalBasket.length > 0 && originalBasket[0]?.basket_metadata) {
+                        icon = originalBasket[0].basket_metadata.icon || icon;
+                        weight = originalBasket[0].basket_metadata.weight || weight;
+                    }
+                }
+                
+                // Build tickers object from editModeData
+                const tickers = {};
+                for (const stock of basketStocks) {
+                    tickers[stock.ticker] = stock.position_size || 0;
+                }
+                
+                portfolio.baskets[basketName] = {
+                    icon: icon,
+                    weight: weight,
+                    tickers: tickers
+                };
+            }
+            
+            return portfolio;
+        }
+
+        async function savePortfolioEdits() {
+            const portfolio = collectPortfolioData();
+            if (!portfolio) {
+                alert('No portfolio data to save');
+                return;
+            }
+            
+            try {
+                const response = await fetch('/api/portfolio', {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/json' },
+                    body: JSON.stringify(portfolio)
+                });
+                
+                const result = await response.json();
+                if (!response.ok) throw new Error(result.error || 'Save failed');
+                
+                // Success - force full reload from Supabase
+                cancelEditMode();
+                watchlistData = null;  // Clear cache to force reload
+                await showWatchlist();
+                
+                alert('✅ Portfolio saved!');
+            } catch (err) {
+                alert('Error saving portfolio: ' + err.message);
+            }
+        }
+
+        // Modal functions
+        function showAddTickerModal(basketName) {
+            currentEditBasket = basketName;
+            document.getElementById('new-ticker-symbol').value = '';
+            document.getElementById('new-ticker-position').value = '';
+            document.getElementById('add-ticker-modal').classList.add('active');
+        }
+
+        function closeAddTickerModal() {
+            document.getElementById('add-ticker-modal').classList.remove('active');
+            currentEditBasket = null;
+        }
+
+        function addTickerToBasket() {
+            const ticker = document.getElementById('new-ticker-symbol').value.trim().toUpperCase();
+            const position = parseFloat(document.getElementById('new-ticker-position').value);
+            
+            if (!ticker || isNaN(position) || position < 0) {
+                alert('Please enter valid ticker and position %');
+                return;
+            }
+            
+            if (!currentEditBasket || !editModeData.baskets[currentEditBasket]) {
+                alert('No basket selected');
+                return;
+            }
+            
+            // Check if ticker already exists in this basket
+            const exists = editModeData.baskets[currentEditBasket].find(s => s.ticker === ticker);
+            if (exists) {
+                alert('Ticker already exists in this basket');
+                return;
+            }
+            
+            // Add new ticker entry
+            editModeData.baskets[currentEditBasket].push({
+                ticker: ticker,
+                name: ticker, // Will be fetched on next scan
+                position_size: position,
+                basket: currentEditBasket,
+                // Placeholder values
+                sector: '—',
+                score: 0,
+                grade: '—'
+            });
+            
+            // Also add to 'all'
+            editModeData.all.push(editModeData.baskets[currentEditBasket][editModeData.baskets[currentEditBasket].length - 1]);
+            
+            closeAddTickerModal();
+            renderWatchlist();
+        }
+
+        function deleteTickerFromBasket(basketName, ticker) {
+            if (!confirm(`Remove ${ticker} from ${basketName}?`)) return;
+            
+            // Remove from basket
+            editModeData.baskets[basketName] = editModeData.baskets[basketName].filter(s => s.ticker !== ticker);
+            
+            // Remove from 'all'
+            editModeData.all = editModeData.all.filter(s => !(s.ticker === ticker && s.basket === basketName));
+            
+            renderWatchlist();
+        }
+
+        function updateTickerPosition(basketName, ticker, newValue) {
+            const stock = editModeData.baskets[basketName].find(s => s.ticker === ticker);
+            if (stock) {
+                stock.position_size = parseFloat(newValue) || 0;
+            }
+            
+            // Also update in 'all'
+            const stockInAll = editModeData.all.find(s => s.ticker === ticker && s.basket === basketName);
+            if (stockInAll) {
+                stockInAll.position_size = parseFloat(newValue) || 0;
+            }
+        }
+
+        function showAddBasketModal() {
+            document.getElementById('new-basket-name').value = '';
+            document.getElementById('new-basket-icon').selectedIndex = 0;
+            document.getElementById('new-basket-weight').value = '';
+            document.getElementById('add-basket-modal').classList.add('active');
+        }
+
+        function closeAddBasketModal() {
+            document.getElementById('add-basket-modal').classList.remove('active');
+        }
+
+        function addNewBasket() {
+            const name = document.getElementById('new-basket-name').value.trim();
+            const icon = document.getElementById('new-basket-icon').value;
+            const weight = document.getElementById('new-basket-weight').value.trim();
+            
+            if (!name) {
+                alert('Please enter a basket name');
+                return;
+            }
+            
+            if (editModeData.baskets[name]) {
+                alert('Basket already exists');
+                return;
+            }
+            
+            // Create new basket
+            editModeData.baskets[name] = [];
+            
+            // Store metadata for this basket (we'll use it when collecting data)
+            // For now, we'll add it to the first stock that gets added, or handle it specially
+            // Actually, let's store it in a separate structure
+            if (!editModeData.basket_metadata) editModeData.basket_metadata = {};
+            editModeData.basket_metadata[name] = { icon, weight };
+            
+            closeAddBasketModal();
+            renderWatchlist();
+            
+            // Update filter pills
+            updateBasketFilters();
+        }
+
+        function deleteBasket(basketName) {
+            if (!confirm(`Delete entire basket "${basketName}"? This will remove all ${editModeData.baskets[basketName].length} holdings.`)) return;
+            
+            // Remove all stocks from this basket in 'all'
+            editModeData.all = editModeData.all.filter(s => s.basket !== basketName);
+            
+            // Delete the basket
+            delete editModeData.baskets[basketName];
+            
+            // If we're filtering by this basket, switch to 'all'
+            if (currentBasketFilter === basketName) {
+                currentBasketFilter = 'all';
+            }
+            
+            renderWatchlist();
+            updateBasketFilters();
+        }
+
+        function updateBasketFilters() {
+            if (!watchlistData) return;
+            
+            const container = document.getElementById('basket-filters');
+            const basketOrder = ['Trading Account', 'IRA Core ETFs', 'Grid-to-Chip', 'Defense & Aerospace', 'AI Semis', 'Biotech'];
+            const basketIcons = {
+                'Trading Account': '📈',
+                'IRA Core ETFs': '📦',
+                'Grid-to-Chip': '⚡',
+                'Defense & Aerospace': '🛡️',
+                'AI Semis': '🧠',
+                'Biotech': '🧬'
+            };
+            
+            container.innerHTML = '<span class="filter-pill active" onclick="filterWatchlist(\'all\')">Show All</span>';
+            
+            const baskets = editMode ? editModeData.baskets : watchlistData.baskets;
+            
+            for (const basketName of basketOrder) {
+                if (baskets[basketName]) {
+                    const icon = basketIcons[basketName] || '📋';
+                    const pill = document.createElement('span');
+                    pill.className = 'filter-pill';
+                    if (currentBasketFilter === basketName) pill.classList.add('active');
+                    pill.textContent = `${icon} ${basketName}`;
+                    pill.onclick = () => filterWatchlist(basketName);
+                    container.appendChild(pill);
+                }
+            }
+            
+            // Add any new baskets not in the standard order
+            for (const basketName in baskets) {
+                if (!basketOrder.includes(basketName)) {
+                    const pill = document.createElement('span');
+                    pill.className = 'filter-pill';
+                    if (currentBasketFilter === basketName) pill.classList.add('active');
+                    pill.textContent = `📋 ${basketName}`;
+                    pill.onclick = () => filterWatchlist(basketName);
+                    container.appendChild(pill);
+                }
+            }
+        }
+
+        // showMarketPulse removed — merged into Dashboard
+
+        // ===== CATALYST CALENDAR =====
+        async function showCalendar() {
+            if (location.hash !== '#calendar') history.pushState(null, '', '#calendar');
+            hideAllViews();
+            document.getElementById('calendar-view').style.display = 'block';
+            updateActiveNav('calendar');
+
+            try {
+                const res = await fetch('/api/catalyst_calendar');
+                const data = await res.json();
+                if (data.error) throw new Error(data.error);
+                renderCalendar(data);
+            } catch(e) {
+                document.getElementById('cal-updated').textContent = 'Error loading: ' + e.message;
+            }
+
+            // Fetch insider data in background
+            fetchInsiderData();
+        }
+
+        async function fetchInsiderData() {
+            try {
+                const res = await fetch('/api/insider_signals');
+                const data = await res.json();
+                renderInsiderSignals(data);
+            } catch(e) {
+                document.getElementById('cal-insider-summary').innerHTML = '<div style="text-align:center; padding:20px; color:var(--text-dim);">Insider data unavailable</div>';
+            }
+        }
+
+        function isSignificantSell(d) {
+            if (d.type !== 'SELL') return false;
+            // C-suite titles
+            const title = (d.title || '').toLowerCase();
+            const cSuite = ['chief', 'ceo', 'cfo', 'coo', 'cto', 'president', 'chairman'];
+            const isCsuite = cSuite.some(t => title.includes(t));
+            // Large value (>$1M)
+            const isLargeValue = (d.value || 0) >= 1000000;
+            return isCsuite || isLargeValue;
+        }
+
+        function renderInsiderDetails(s) {
+            const details = s.details || [];
+            const reasons = s.reasons || [];
+            if (details.length === 0) {
+                if (reasons.length === 0) return '';
+                return '<div style="font-size:0.75rem; color:var(--text-dim); margin-top:4px;">' +
+                    reasons.map(r => '<div style="margin-bottom:2px;">• ' + r + '</div>').join('') + '</div>';
+            }
+
+            // Check for cluster sell (3+ unique insiders selling)
+            const sellInsiders = new Set();
+            for (const d of details) {
+                if (d.type === 'SELL' && d.owner) sellInsiders.add(d.owner);
+            }
+            const isClusterSell = sellInsiders.size >= 3;
+
+            const fv = (v) => v >= 1e6 ? '$' + (v/1e6).toFixed(1) + 'M' : v >= 1e3 ? '$' + (v/1e3).toFixed(0) + 'K' : '$' + (v || 0);
+            const isMobile = window.innerWidth <= 768;
+
+            if (isMobile) {
+                // Card layout for mobile
+                let html = '';
+                const shown = details.slice(0, 10);
+                for (const d of shown) {
+                    const significant = isSignificantSell(d) || (d.type === 'SELL' && isClusterSell);
+                    const cardBorder = significant ? 'border-left:3px solid #ef4444;' : 'border-left:3px solid #2d3748;';
+                    const tc = d.type === 'BUY' ? '#10b981' : '#ef4444';
+                    const flag = significant ? ' ⚠️' : '';
+                    const valStyle = significant ? 'color:#ef4444; font-weight:700;' : '';
+                    html += '<div style="padding:8px 12px; margin-bottom:6px; background:#1a1f2e; border-radius:6px; ' + cardBorder + '">' +
+                        '<div style="display:flex; justify-content:space-between; align-items:center; margin-bottom:4px;">' +
+                        '<span style="font-weight:600; font-size:0.8rem;">' + (d.owner || '—') + '</span>' +
+                        '<span style="color:' + tc + '; font-weight:700; font-size:0.8rem;">' + (d.type || '') + flag + '</span>' +
+                        '</div>' +
+                        '<div style="font-size:0.7rem; color:var(--text-dim); margin-bottom:2px;">' + (d.title || '') + ' · ' + (d.date || '') + '</div>' +
+                        '<div style="font-size:0.8rem;' + valStyle + '">' + (d.shares || 0).toLocaleString() + ' shares · ' + fv(d.value || 0) + '</div>' +
+                        '</div>';
+                }
+                if (details.length > 10) {
+                    html += '<div style="text-align:center; padding:6px; color:var(--text-dim); font-size:0.75rem;">+ ' + (details.length - 10) + ' more transactions</div>';
+                }
+                return html;
+            }
+
+            // Table layout for desktop
+            let html = '<div style="overflow-x:auto;"><table style="width:100%; min-width:auto; margin:0; font-size:0.8rem;"><thead><tr>' +
+                '<th style="font-size:0.65rem; padding:4px 8px; white-space:nowrap;">Date</th>' +
+                '<th style="font-size:0.65rem; padding:4px 8px;">Insider</th>' +
+                '<th style="font-size:0.65rem; padding:4px 8px;">Title</th>' +
+                '<th style="font-size:0.65rem; padding:4px 8px; white-space:nowrap;">Type</th>' +
+                '<th style="font-size:0.65rem; padding:4px 8px; white-space:nowrap;">Shares</th>' +
+                '<th style="font-size:0.65rem; padding:4px 8px; white-space:nowrap;">Value</th>' +
+                '</tr></thead><tbody>';
+            const shown = details.slice(0, 10);
+            for (const d of shown) {
+                const significant = isSignificantSell(d) || (d.type === 'SELL' && isClusterSell);
+                const rowBg = significant ? 'background:rgba(239,68,68,0.08);' : '';
+                const tc = d.type === 'BUY' ? '#10b981' : '#ef4444';
+                const nameStyle = significant ? 'font-weight:700; color:#ef4444;' : '';
+                const valStyle = significant ? 'font-weight:700; color:#ef4444;' : '';
+                const flag = significant ? ' ⚠️' : '';
+                html += '<tr style="' + rowBg + '">' +
+                    '<td style="padding:4px 8px; white-space:nowrap;">' + (d.date || '—') + '</td>' +
+                    '<td style="padding:4px 8px;' + nameStyle + '">' + (d.owner || '—') + '</td>' +
+                    '<td style="padding:4px 8px; color:var(--text-dim); font-size:0.75rem;">' + (d.title || '—') + '</td>' +
+                    '<td style="padding:4px 8px; color:' + tc + '; font-weight:600; white-space:nowrap;">' + (d.type || '—') + flag + '</td>' +
+                    '<td style="padding:4px 8px; white-space:nowrap;">' + (d.shares || 0).toLocaleString() + '</td>' +
+                    '<td style="padding:4px 8px; white-space:nowrap;' + valStyle + '">' + fv(d.value || 0) + '</td>' +
+                    '</tr>';
+            }
+            if (details.length > 10) {
+                html += '<tr><td colspan="6" style="text-align:center; padding:8px; color:var(--text-dim); font-size:0.75rem;">+ ' + (details.length - 10) + ' more transactions</td></tr>';
+            }
+            html += '</tbody></table></div>';
+            return html;
+        }
+
+        function renderInsiderSignals(data) {
+            const clusterEl = document.getElementById('cal-cluster-buys');
+            const summaryEl = document.getElementById('cal-insider-summary');
+            const signals = data.signals || {};
+            const entries = Object.entries(signals).filter(([t, s]) => s.ins_score !== 0);
+
+            if (entries.length === 0) {
+                clusterEl.innerHTML = '';
+                summaryEl.innerHTML = '<div style="text-align:center; padding:20px; color:var(--text-dim);">No insider activity found.</div>';
+                return;
+            }
+
+            // Sort by score (most negative first = heaviest selling)
+            entries.sort((a, b) => a[1].ins_score - b[1].ins_score);
+
+            // Cluster buys (score >= 5)
+            const clusterBuys = entries.filter(([t, s]) => s.ins_score >= 5);
+            if (clusterBuys.length > 0) {
+                clusterEl.innerHTML = clusterBuys.map(([ticker, s]) => `
+                    <div style="background:rgba(16,185,129,0.1); border:1px solid rgba(16,185,129,0.3); border-radius:8px; padding:10px 14px; margin-bottom:8px;">
+                        <span style="color:#10b981; font-weight:700;">🔥 CLUSTER BUY: ${ticker}</span>
+                        <span style="color:var(--text-dim); font-size:0.8rem; margin-left:8px;">${s.buys} insider buys · Score ${s.ins_score}</span>
+                    </div>
+                `).join('');
+            } else {
+                clusterEl.innerHTML = '';
+            }
+
+            // Summary cards per ticker
+            let html = `<div style="font-size:0.75rem; color:var(--text-dim); margin-bottom:12px;">${entries.length} tickers with insider activity · Updated: ${data.generated || ''}</div>`;
+            
+            for (const [ticker, s] of entries) {
+                const score = s.ins_score || 0;
+                const buys = s.buys || 0;
+                const sells = s.sells || 0;
+                const reasons = s.reasons || [];
+                const buyVal = s.total_buy_value || 0;
+                const sellVal = s.total_sell_value || 0;
+
+                // Check if this ticker has significant sells
+                const details = s.details || [];
+                const hasSignificant = details.some(d => isSignificantSell(d));
+                const sellInsiders = new Set();
+                for (const d of details) { if (d.type === 'SELL' && d.owner) sellInsiders.add(d.owner); }
+                const isCluster = sellInsiders.size >= 3;
+                const isWarning = hasSignificant || isCluster;
+
+                const scoreColor = score > 0 ? '#10b981' : score < 0 ? '#ef4444' : '#94a3b8';
+                const tickerId = 'ins-detail-' + ticker.replace(/[^a-zA-Z0-9]/g, '');
+                const rowBorder = isWarning ? 'border:1px solid rgba(239,68,68,0.4);' : 'border:1px solid #2d3748;';
+                const warningBadge = isWarning ? ' <span style="font-size:0.7rem; color:#ef4444;">⚠️</span>' : '';
+
+                const fmtVal = (v) => v >= 1e6 ? '$' + (v/1e6).toFixed(1) + 'M' : v >= 1e3 ? '$' + (v/1e3).toFixed(0) + 'K' : '$' + v;
+
+                html += `
+                <div style="${rowBorder} border-radius:8px; margin-bottom:6px; overflow:hidden;">
+                    <div onclick="document.getElementById('${tickerId}').style.display = document.getElementById('${tickerId}').style.display === 'none' ? 'block' : 'none'"
+                         style="padding:10px 16px; cursor:pointer; display:flex; justify-content:space-between; align-items:center; transition:background 0.2s;"
+                         onmouseover="this.style.background='#1e293b'" onmouseout="this.style.background='transparent'">
+                        <div style="display:flex; align-items:center; gap:10px;">
+                            <span style="font-weight:700; color:var(--accent); cursor:pointer;" onclick="event.stopPropagation(); viewStock('${ticker}')">${ticker}</span>${warningBadge}
+                        </div>
+                        <div style="display:flex; align-items:center; gap:10px;">
+                            <span style="font-size:0.8rem; color:var(--text-dim);">${buys} buy${buys !== 1 ? 's' : ''} · ${sells} sell${sells !== 1 ? 's' : ''}</span>
+                            <span style="color:var(--text-dim); font-size:0.7rem;">▼</span>
+                        </div>
+                    </div>
+                    <div id="${tickerId}" style="display:none; border-top:1px solid #2d3748; padding:12px 16px; background:#161b2a;">
+                        <div style="display:flex; gap:20px; margin-bottom:10px; font-size:0.8rem;">
+                            <div><span style="color:#10b981;">Buys:</span> ${buys} (${fmtVal(buyVal)})</div>
+                            <div><span style="color:#ef4444;">Sells:</span> ${sells} (${fmtVal(sellVal)})</div>
+                            <div style="color:var(--text-dim);">Score: <span style="color:${scoreColor}; font-weight:700;">${score > 0 ? '+' : ''}${score}</span></div>
+                        </div>
+                        ${renderInsiderDetails(s)}
+                    </div>
+                </div>`;
+            }
+            summaryEl.innerHTML = html;
+        }
+
+        // ===== EWROS TAB =====
+        let ewrosSort = { column: 'ewros_score', direction: 'desc' };
+        let ewrosData = null;
+
+        async function showEwrosTab() {
+            if (location.hash !== '#ewros') history.pushState(null, '', '#ewros');
+            hideAllViews();
+            document.getElementById('ewros-view').style.display = 'block';
+            updateActiveNav('ewros');
+
+            if (!ewrosData) {
+                try {
+                    const data = await loadAllStocks();
+                    const stocks = data.stocks || data;
+                    ewrosData = Object.values(stocks).filter(s => s.ewros_score != null).sort((a,b) => (b.ewros_score||0) - (a.ewros_score||0));
+                } catch(e) {
+                    document.getElementById('ewros-tbody').innerHTML = '<tr><td colspan="8" style="text-align:center;padding:40px;color:var(--text-dim);">Error loading data</td></tr>';
+                    return;
+                }
+            }
+            renderEwrosTab();
+        }
+
+        function renderEwrosTab() {
+            const all = ewrosData;
+            const top20 = all.slice(0, 20);
+            const leaders = all.filter(s => s.ewros_score >= 80).length;
+            const improving = all.filter(s => (s.ewros_trend||0) > 10).length;
+            const declining = all.filter(s => (s.ewros_trend||0) < -10).length;
+
+            // Summary
+            document.getElementById('ewros-summary').innerHTML = [
+                { label: 'Leaders (≥80)', value: leaders, color: '#10b981' },
+                { label: 'Improving (▲10+)', value: improving, color: '#38bdf8' },
+                { label: 'Declining (▼10+)', value: declining, color: '#ef4444' }
+            ].map(c => `<div class="card" style="text-align:center;padding:16px;">
+                <div style="font-size:2rem;font-weight:800;color:${c.color};">${c.value}</div>
+                <div style="font-size:0.7rem;color:var(--text-dim);margin-top:4px;">${c.label}</div>
+            </div>`).join('');
+
+            // Top 20 leader cards with full stats
+            document.getElementById('ewros-leaders-cards').innerHTML = `
+                <h3 style="font-weight:700; margin-bottom:14px; font-size:0.9rem;">🏆 Top 20 EWROS Leaders</h3>
+                <div style="display:grid; grid-template-columns:repeat(auto-fill,minmax(300px,1fr)); gap:14px;">
+                    ${top20.map(s => {
+                        const st = s.ewros_stats || {};
+                        const score = s.ewros_score || 0;
+                        const trend = s.ewros_trend || 0;
+                        const prior = s.ewros_prior || (score - trend);
+                        const scoreColor = score >= 70 ? '#10b981' : score >= 40 ? '#eab308' : '#ef4444';
+                        const trendArrow = trend > 0 ? '▲' : trend < 0 ? '▼' : '=';
+                        const trendColor = trend > 0 ? '#10b981' : trend < 0 ? '#ef4444' : '#94a3b8';
+                        const winColor = (st.win_rate||0) >= 55 ? '#10b981' : (st.win_rate||0) >= 45 ? '#eab308' : '#ef4444';
+                        const sRetColor = (st.stock_return_3mo||0) > 0 ? '#10b981' : '#ef4444';
+                        const spyRetColor = (st.spy_return_3mo||0) > 0 ? '#10b981' : '#ef4444';
+                        const gradeColor = s.grade === 'A' ? '#10b981' : s.grade === 'B' ? '#38bdf8' : '#94a3b8';
+                        return `<div class="card" style="padding:16px;">
+                            <div style="display:flex; justify-content:space-between; align-items:center; margin-bottom:10px;">
+                                <div>
+                                    <a href="#" onclick="viewStock('${s.ticker}'); return false;" style="font-size:1.1rem; font-weight:800; color:var(--accent); text-decoration:none;">${s.ticker}</a>
+                                    <span style="font-size:0.75rem; color:var(--text-dim); margin-left:6px;">${s.name || ''}</span>
+                                </div>
+                                <span style="color:${gradeColor}; font-weight:700; font-size:0.8rem;">${s.grade || ''}</span>
+                            </div>
+                            <div style="display:flex; gap:10px; margin-bottom:12px;">
+                                <div style="flex:1; text-align:center; background:#161b2a; border-radius:8px; padding:10px;">
+                                    <div style="font-size:0.55rem; text-transform:uppercase; color:var(--text-dim); margin-bottom:4px;">EWROS</div>
+                                    <div style="font-size:1.5rem; font-weight:800; color:${scoreColor};">${score}</div>
+                                </div>
+                                <div style="flex:1; text-align:center; background:#161b2a; border-radius:8px; padding:10px;">
+                                    <div style="font-size:0.55rem; text-transform:uppercase; color:var(--text-dim); margin-bottom:4px;">1mo Ago</div>
+                                    <div style="font-size:1.5rem; font-weight:800; color:var(--text-dim);">${prior}</div>
+                                </div>
+                                <div style="flex:1; text-align:center; background:#161b2a; border-radius:8px; padding:10px;">
+                                    <div style="font-size:0.55rem; text-transform:uppercase; color:var(--text-dim); margin-bottom:4px;">Trend</div>
+                                    <div style="font-size:1.2rem; font-weight:800; color:${trendColor};">${trendArrow}${Math.abs(trend)}</div>
+                                </div>
+                            </div>
+                            <div style="display:grid; grid-template-columns:1fr 1fr; gap:8px; font-size:0.8rem;">
+                                <div style="display:flex; justify-content:space-between;">
+                                    <span style="color:var(--text-dim);">3mo Return</span>
+                                    <span style="font-weight:700; color:${sRetColor};">${st.stock_return_3mo != null ? st.stock_return_3mo + '%' : '—'}</span>
+                                </div>
+                                <div style="display:flex; justify-content:space-between;">
+                                    <span style="color:var(--text-dim);">SPY 3mo</span>
+                                    <span style="font-weight:700; color:${spyRetColor};">${st.spy_return_3mo != null ? st.spy_return_3mo + '%' : '—'}</span>
+                                </div>
+                                <div style="display:flex; justify-content:space-between;">
+                                    <span style="color:var(--text-dim);">Beat SPY</span>
+                                    <span style="font-weight:700; color:${winColor};">${st.win_days||0}/${st.total_days||63} (${st.win_rate||0}%)</span>
+                                </div>
+                                <div style="display:flex; justify-content:space-between;">
+                                    <span style="color:var(--text-dim);">Avg Alpha</span>
+                                    <span style="font-weight:700; color:${(st.avg_alpha_bps||0) >= 0 ? '#10b981' : '#ef4444'};">${(st.avg_alpha_bps||0) > 0 ? '+' : ''}${st.avg_alpha_bps||0} bps</span>
+                                </div>
+                            </div>
+                            <div style="font-size:0.7rem; color:var(--text-dim); margin-top:8px;">${s.sector || ''} · ${s.industry || ''}</div>
+                        </div>`;
+                    }).join('')}
+                </div>`;
+
+            // Power Matrix — 4 quadrants
+            const EWROS_THRESH = 70;
+            const ROT_THRESH = 60;
+            const powerZone = all.filter(s => (s.ewros_score||0) >= EWROS_THRESH && (s.ewros_score||0) >= ROT_THRESH)
+                .sort((a,b) => ((b.ewros_score||0) + (b.ewros_score||0)) - ((a.ewros_score||0) + (a.ewros_score||0)));
+            const earlySignal = all.filter(s => (s.ewros_score||0) < EWROS_THRESH && (s.ewros_score||0) >= ROT_THRESH)
+                .sort((a,b) => (b.ewros_score||0) - (a.ewros_score||0));
+            const extended = all.filter(s => (s.ewros_score||0) >= EWROS_THRESH && (s.ewros_score||0) < ROT_THRESH)
+                .sort((a,b) => (b.ewros_score||0) - (a.ewros_score||0));
+            const avoid = all.filter(s => (s.ewros_score||0) < EWROS_THRESH && (s.ewros_score||0) < ROT_THRESH).length;
+
+            function matrixCard(stock) {
+                const e = stock.ewros_score || 0;
+                const r = (stock.ewros_score || 0).toFixed(1);
+                const t = stock.ewros_trend || 0;
+                const tArrow = t > 0 ? '▲' : t < 0 ? '▼' : '';
+                const tColor = t > 0 ? '#10b981' : t < 0 ? '#ef4444' : '#94a3b8';
+                const eColor = e >= 70 ? '#10b981' : e >= 40 ? '#eab308' : '#ef4444';
+                const gr = stock.grade || '';
+                const grColor = gr === 'A' ? '#10b981' : gr === 'B' ? '#38bdf8' : '#94a3b8';
+                return `<div style="background:#161b2a; border-radius:8px; padding:10px 12px; display:flex; justify-content:space-between; align-items:center;">
+                    <div>
+                        <a href="#" onclick="viewStock('${stock.ticker}'); return false;" style="font-weight:700; color:var(--accent); text-decoration:none; font-size:0.9rem;">${stock.ticker}</a>
+                        <span style="color:${grColor}; font-weight:700; font-size:0.7rem; margin-left:6px;">${gr}</span>
+                    </div>
+                    <div style="display:flex; gap:12px; align-items:center; font-size:0.8rem;">
+                        <span style="color:var(--text-dim);">E:<span style="color:${eColor}; font-weight:700;">${e}</span></span>
+                        <span style="color:var(--text-dim);">R:<span style="font-weight:700;">${r}</span></span>
+                        <span style="color:${tColor}; font-size:0.7rem;">${tArrow}${t !== 0 ? Math.abs(t) : ''}</span>
+                    </div>
+                </div>`;
+            }
+
+            document.getElementById('ewros-matrix').innerHTML = `
+                <h3 style="font-weight:700; margin-bottom:14px; font-size:0.9rem;">⚡ Power Matrix — EWROS × Rotation</h3>
+                <div style="display:grid; grid-template-columns:1fr 1fr; gap:16px;">
+                    <div class="card" style="padding:16px; border-color:rgba(16,185,129,0.3);">
+                        <div style="display:flex; justify-content:space-between; align-items:center; margin-bottom:12px;">
+                            <h4 style="margin:0; font-size:0.85rem; color:#10b981;">🎯 Power Zone</h4>
+                            <span style="font-size:0.7rem; color:var(--text-dim);">EWROS≥${EWROS_THRESH} + Rot≥${ROT_THRESH}</span>
+                        </div>
+                        <div style="font-size:0.7rem; color:#10b981; margin-bottom:10px; font-weight:600;">Momentum + Fresh Setup → BUY</div>
+                        <div style="display:flex; flex-direction:column; gap:6px;">
+                            ${powerZone.length > 0 ? powerZone.slice(0,10).map(matrixCard).join('') : '<div style="color:var(--text-dim); font-size:0.8rem; padding:10px;">No stocks currently in Power Zone</div>'}
+                            ${powerZone.length > 10 ? '<div style="text-align:center; font-size:0.75rem; color:var(--text-dim); padding:6px;">+ ' + (powerZone.length - 10) + ' more</div>' : ''}
+                        </div>
+                    </div>
+
+                    <div class="card" style="padding:16px; border-color:rgba(56,189,248,0.3);">
+                        <div style="display:flex; justify-content:space-between; align-items:center; margin-bottom:12px;">
+                            <h4 style="margin:0; font-size:0.85rem; color:#38bdf8;">⏳ Early Signal</h4>
+                            <span style="font-size:0.7rem; color:var(--text-dim);">EWROS<${EWROS_THRESH} + Rot≥${ROT_THRESH}</span>
+                        </div>
+                        <div style="font-size:0.7rem; color:#38bdf8; margin-bottom:10px; font-weight:600;">Setting up, hasn't moved yet → WATCH</div>
+                        <div style="display:flex; flex-direction:column; gap:6px;">
+                            ${earlySignal.length > 0 ? earlySignal.slice(0,10).map(matrixCard).join('') : '<div style="color:var(--text-dim); font-size:0.8rem; padding:10px;">No early signals right now</div>'}
+                            ${earlySignal.length > 10 ? '<div style="text-align:center; font-size:0.75rem; color:var(--text-dim); padding:6px;">+ ' + (earlySignal.length - 10) + ' more</div>' : ''}
+                        </div>
+                    </div>
+
+                    <div class="card" style="padding:16px; border-color:rgba(234,179,8,0.3);">
+                        <div style="display:flex; justify-content:space-between; align-items:center; margin-bottom:12px;">
+                            <h4 style="margin:0; font-size:0.85rem; color:#eab308;">⚠️ Extended</h4>
+                            <span style="font-size:0.7rem; color:var(--text-dim);">EWROS≥${EWROS_THRESH} + Rot<${ROT_THRESH}</span>
+                        </div>
+                        <div style="font-size:0.7rem; color:#eab308; margin-bottom:10px; font-weight:600;">Already ran, no fresh setup → TAKE PROFIT</div>
+                        <div style="display:flex; flex-direction:column; gap:6px;">
+                            ${extended.slice(0,10).map(matrixCard).join('')}
+                            ${extended.length > 10 ? '<div style="text-align:center; font-size:0.75rem; color:var(--text-dim); padding:6px;">+ ' + (extended.length - 10) + ' more</div>' : ''}
+                        </div>
+                    </div>
+
+                    <div class="card" style="padding:16px; border-color:rgba(239,68,68,0.2);">
+                        <div style="display:flex; justify-content:space-between; align-items:center; margin-bottom:12px;">
+                            <h4 style="margin:0; font-size:0.85rem; color:#ef4444;">💀 Avoid</h4>
+                            <span style="font-size:0.7rem; color:var(--text-dim);">Both below threshold</span>
+                        </div>
+                        <div style="font-size:0.7rem; color:#ef4444; margin-bottom:10px; font-weight:600;">No momentum, no setup → SKIP</div>
+                        <div style="text-align:center; padding:20px;">
+                            <div style="font-size:2rem; font-weight:800; color:#ef4444;">${avoid}</div>
+                            <div style="font-size:0.75rem; color:var(--text-dim);">stocks to avoid</div>
+                        </div>
+                    </div>
+                </div>`;
+
+            // Biggest movers (improving + declining)
+            const topImprovers = [...all].sort((a,b) => (b.ewros_trend||0) - (a.ewros_trend||0)).slice(0,5);
+            const topDecliners = [...all].sort((a,b) => (a.ewros_trend||0) - (b.ewros_trend||0)).slice(0,5);
+
+            document.getElementById('ewros-movers').innerHTML = `
+                <div style="display:grid; grid-template-columns:1fr 1fr; gap:16px;">
+                    <div class="card" style="padding:16px;">
+                        <h3 style="font-size:0.85rem; font-weight:700; margin-bottom:10px;">🚀 Biggest Improvers</h3>
+                        ${topImprovers.map(s => {
+                            const t = s.ewros_trend || 0;
+                            return `<div style="display:flex; justify-content:space-between; padding:6px 0; border-bottom:1px solid #2d3748; font-size:0.85rem;">
+                                <a href="#" onclick="viewStock('${s.ticker}'); return false;" style="color:var(--accent); font-weight:700; text-decoration:none;">${s.ticker}</a>
+                                <span>${s.ewros_score}</span>
+                                <span style="color:#10b981; font-weight:700;">▲+${t}</span>
+                            </div>`;
+                        }).join('')}
+                    </div>
+                    <div class="card" style="padding:16px;">
+                        <h3 style="font-size:0.85rem; font-weight:700; margin-bottom:10px;">📉 Biggest Decliners</h3>
+                        ${topDecliners.map(s => {
+                            const t = s.ewros_trend || 0;
+                            return `<div style="display:flex; justify-content:space-between; padding:6px 0; border-bottom:1px solid #2d3748; font-size:0.85rem;">
+                                <a href="#" onclick="viewStock('${s.ticker}'); return false;" style="color:var(--accent); font-weight:700; text-decoration:none;">${s.ticker}</a>
+                                <span>${s.ewros_score}</span>
+                                <span style="color:#ef4444; font-weight:700;">▼${t}</span>
+                            </div>`;
+                        }).join('')}
+                    </div>
+                </div>`;
+
+            // Full sortable table
+            const cols = [
+                { key: 'ticker', label: 'Ticker' },
+                { key: 'ewros_score', label: 'EWROS' },
+                { key: 'ewros_trend', label: 'Trend' },
+                { key: 'iq_edge', label: 'IQ Edge' },
+                { key: 'score', label: 'Quality' },
+                { key: 'grade', label: 'Grade' },
+                { key: 'ewros_score', label: 'EWROS' },
+                { key: 'sector', label: 'Sector' },
+                { key: 'current_price', label: 'Price' }
+            ];
+
+            document.getElementById('ewros-thead').innerHTML = '<tr>' + cols.map(c => {
+                const arrow = ewrosSort.column === c.key ? (ewrosSort.direction === 'desc' ? ' ▼' : ' ▲') : '';
+                return `<th onclick="sortEwrosTable('${c.key}')" style="cursor:pointer;">${c.label}${arrow}</th>`;
+            }).join('') + '</tr>';
+
+            const sorted = [...all].sort((a, b) => {
+                const col = ewrosSort.column;
+                let va = a[col], vb = b[col];
+                if (typeof va === 'string') va = (va||'').toLowerCase();
+                if (typeof vb === 'string') vb = (vb||'').toLowerCase();
+                if (col === 'ticker') return ewrosSort.direction === 'asc' ? (va < vb ? -1 : 1) : (va > vb ? -1 : 1);
+                return ewrosSort.direction === 'desc' ? ((vb||0) - (va||0)) : ((va||0) - (vb||0));
+            });
+
+            document.getElementById('ewros-tbody').innerHTML = sorted.slice(0, 100).map(s => {
+                const sc = s.ewros_score || 0;
+                const t = s.ewros_trend || 0;
+                const scColor = sc >= 70 ? '#10b981' : sc >= 40 ? '#eab308' : '#ef4444';
+                const tColor = t > 0 ? '#10b981' : t < 0 ? '#ef4444' : '#94a3b8';
+                const tArrow = t > 0 ? '▲' : t < 0 ? '▼' : '';
+                const gradeColor = s.grade === 'A' ? '#10b981' : s.grade === 'B' ? '#38bdf8' : '#94a3b8';
+                const rotColor = (s.ewros_score||0) >= 60 ? '#10b981' : (s.ewros_score||0) >= 40 ? '#eab308' : '#94a3b8';
+                return `<tr>
+                    <td><a href="#" onclick="viewStock('${s.ticker}'); return false;" style="color:var(--accent); font-weight:700; text-decoration:none;">${s.ticker}</a></td>
+                    <td style="font-weight:700; color:${scColor}; cursor:pointer;" onclick="showEwrosPopup('${s.ticker}')">${sc}</td>
+                    <td style="font-weight:600; color:${tColor};">${tArrow}${t !== 0 ? Math.abs(t) : '—'}</td>
+                    <td style="font-weight:700; color:${(s.iq_edge||0) >= 90 ? '#a855f7' : (s.iq_edge||0) >= 70 ? '#10b981' : (s.iq_edge||0) >= 40 ? '#eab308' : '#64748b'};">${s.iq_edge || '—'}</td>
+                    <td>${s.score || '—'}</td>
+                    <td style="color:${gradeColor}; font-weight:700;">${s.grade || '—'}</td>
+                    <td style="color:${rotColor};">${s.ewros_score ? s.ewros_score.toFixed(1) : '—'}</td>
+                    <td style="font-size:0.75rem; color:var(--text-dim);">${s.sector || '—'}</td>
+                    <td>$${s.current_price ? s.current_price.toFixed(2) : '—'}</td>
+                </tr>`;
+            }).join('');
+        }
+
+        function sortEwrosTable(col) {
+            if (ewrosSort.column === col) {
+                ewrosSort.direction = ewrosSort.direction === 'desc' ? 'asc' : 'desc';
+            } else {
+                ewrosSort.column = col;
+                ewrosSort.direction = col === 'ticker' ? 'asc' : 'desc';
+            }
+            renderEwrosTab();
+        }
+
+        let calEarningsExpanded = false;
+        let calEarningsData = [];
+
+        function toggleAllEarnings() {
+            calEarningsExpanded = !calEarningsExpanded;
+            renderEarningsRows();
+        }
+
+        function renderEarningsRows() {
+            const tbody = document.getElementById('cal-earnings-tbody');
+            const upcoming = calEarningsData.filter(e => e.days_until >= 0);
+            const passed = calEarningsData.filter(e => e.days_until < 0);
+            const VISIBLE_COUNT = 5;
+
+            if (upcoming.length === 0) {
+                tbody.innerHTML = '<tr><td colspan="4" style="text-align:center; padding:30px; color:var(--text-dim);">No upcoming earnings found for portfolio tickers.</td></tr>';
+                document.getElementById('cal-earnings-expand').style.display = 'none';
+                return;
+            }
+
+            const visible = calEarningsExpanded ? upcoming : upcoming.slice(0, VISIBLE_COUNT);
+            let rows = '';
+            for (const e of visible) {
+                let dayColor = '#10b981';
+                if (e.days_until < 7) dayColor = '#ef4444';
+                else if (e.days_until < 14) dayColor = '#eab308';
+                const dayLabel = e.days_until === 0 ? 'TODAY' : e.days_until + 'd';
+                rows += `<tr>
+                    <td><span style="font-weight:700; cursor:pointer; color:var(--accent);" onclick="viewStock('${e.ticker}')">${e.ticker}</span></td>
+                    <td style="color:var(--text-dim);">${e.basket || '—'}</td>
+                    <td>${e.earnings_date}</td>
+                    <td><span style="color:${dayColor}; font-weight:700;">${dayLabel}</span></td>
+                </tr>`;
+            }
+            tbody.innerHTML = rows;
+
+            // Show/hide expand button
+            const expandEl = document.getElementById('cal-earnings-expand');
+            if (upcoming.length > VISIBLE_COUNT) {
+                expandEl.style.display = 'block';
+                const remaining = upcoming.length - VISIBLE_COUNT;
+                document.getElementById('cal-earnings-remaining').textContent = remaining;
+                document.getElementById('cal-earnings-toggle-btn').innerHTML = calEarningsExpanded
+                    ? 'Show less ▲'
+                    : `Show all ${remaining} more ▼`;
+            } else {
+                expandEl.style.display = 'none';
+            }
+        }
+
+        function renderCalendar(data) {
+            document.getElementById('cal-updated').textContent = 'Updated: ' + (data.timestamp || '');
+
+            // Earnings first — store data and render top 5
+            calEarningsData = data.earnings || [];
+            calEarningsExpanded = false;
+            renderEarningsRows();
+
+            // FOMC dates
+            const fomcEl = document.getElementById('cal-fomc');
+            let fomcHTML = '';
+            for (const f of (data.fomc || [])) {
+                let color = '#10b981', bg = 'rgba(16,185,129,0.1)';
+                if (f.days_until < 0) { color = 'var(--text-dim)'; bg = 'rgba(100,100,100,0.1)'; }
+                else if (f.days_until < 14) { color = '#ef4444'; bg = 'rgba(239,68,68,0.12)'; }
+                else if (f.days_until < 30) { color = '#eab308'; bg = 'rgba(234,179,8,0.12)'; }
+                const label = f.days_until < 0 ? 'Passed' : f.days_until === 0 ? 'TODAY' : f.days_until + 'd';
+                fomcHTML += `
+                    <div style="background:${bg}; border:1px solid ${color}40; border-radius:8px; padding:10px 16px; text-align:center; min-width:140px;">
+                        <div style="font-size:0.8rem; font-weight:700; color:${color};">${f.label}</div>
+                        <div style="font-size:0.75rem; color:var(--text-dim); margin-top:2px;">${label}</div>
+                    </div>`;
+            }
+            fomcEl.innerHTML = fomcHTML;
+        }
+
+        // Landing page loader
+        async function showLanding() {
+            hideAllViews();
+            document.getElementById('landing-view').style.display = 'block';
+            document.getElementById('top-nav').style.display = 'none';
+
+            try {
+                const data = await loadAllStocks();
+                const stocks = Object.values(data.stocks || {}).filter(s => s.ewros_score != null);
+
+                // Power Zone stocks
+                const EWROS_T = 70, ROT_T = 60;
+                const powerZone = stocks.filter(s => (s.ewros_score||0) >= EWROS_T && (s.ewros_score||0) >= ROT_T)
+                    .sort((a,b) => ((b.ewros_score||0) + (b.ewros_score||0)) - ((a.ewros_score||0) + (a.ewros_score||0)))
+                    .slice(0, 8);
+
+                const pzEl = document.getElementById('landing-power-stocks');
+                if (powerZone.length > 0) {
+                    pzEl.innerHTML = powerZone.map(s => {
+                        const e = s.ewros_score || 0;
+                        const r = (s.ewros_score || 0).toFixed(1);
+                        const t = s.ewros_trend || 0;
+                        const tArrow = t > 0 ? '▲' : t < 0 ? '▼' : '';
+                        const tColor = t > 0 ? '#10b981' : t < 0 ? '#ef4444' : '#94a3b8';
+                        const eColor = e >= 70 ? '#10b981' : e >= 40 ? '#eab308' : '#ef4444';
+                        const st = s.ewros_stats || {};
+                        const retColor = (st.stock_return_3mo||0) > 0 ? '#10b981' : '#ef4444';
+                        return `<div class="card" style="padding:16px; cursor:pointer;" onclick="viewStock('${s.ticker}')">
+                            <div style="display:flex; justify-content:space-between; align-items:center; margin-bottom:10px;">
+                                <div>
+                                    <span style="font-size:1.1rem; font-weight:800; color:var(--accent);">${s.ticker}</span>
+                                    <span style="font-size:0.7rem; color:var(--text-dim); margin-left:6px;">${s.name || ''}</span>
+                                </div>
+                                <span style="color:${s.grade === 'A' ? '#10b981' : '#38bdf8'}; font-weight:700; font-size:0.8rem;">${s.grade || ''}</span>
+                            </div>
+                            <div style="display:flex; gap:8px; margin-bottom:8px;">
+                                <div style="flex:1; text-align:center; background:#161b2a; border-radius:6px; padding:8px;">
+                                    <div style="font-size:0.5rem; text-transform:uppercase; color:var(--text-dim);">EWROS</div>
+                                    <div style="font-size:1.3rem; font-weight:800; color:${eColor};">${e}</div>
+                                </div>
+                                <div style="flex:1; text-align:center; background:#161b2a; border-radius:6px; padding:8px;">
+                                    <div style="font-size:0.5rem; text-transform:uppercase; color:var(--text-dim);">EWROS</div>
+                                    <div style="font-size:1.3rem; font-weight:800;">${r}</div>
+                                </div>
+                                <div style="flex:1; text-align:center; background:#161b2a; border-radius:6px; padding:8px;">
+                                    <div style="font-size:0.5rem; text-transform:uppercase; color:var(--text-dim);">Trend</div>
+                                    <div style="font-size:1.1rem; font-weight:800; color:${tColor};">${tArrow}${Math.abs(t)}</div>
+                                </div>
+                            </div>
+                            <div style="display:flex; justify-content:space-between; font-size:0.75rem; color:var(--text-dim);">
+                                <span>3mo: <span style="color:${retColor}; font-weight:600;">${st.stock_return_3mo != null ? st.stock_return_3mo + '%' : '—'}</span></span>
+                                <span>Win Rate: <span style="font-weight:600;">${st.win_rate || '—'}%</span></span>
+                                <span>${s.sector || ''}</span>
+                            </div>
+                        </div>`;
+                    }).join('');
+                } else {
+                    pzEl.innerHTML = '<div style="text-align:center; padding:40px; color:var(--text-dim);">No Power Zone stocks today — check back after market close.</div>';
+                }
+
+                // Top rated stocks table
+                const topRated = [...stocks].sort((a,b) => (b.score||0) - (a.score||0)).slice(0, 10);
+                document.getElementById('landing-top-rated').innerHTML = `
+                    <table style="min-width:auto;">
+                        <thead>
+                            <tr>
+                                <th>#</th>
+                                <th>Ticker</th>
+                                <th>Company</th>
+                                <th>Score</th>
+                                <th>Grade</th>
+                                <th>EWROS</th>
+                                <th>Sector</th>
+                            </tr>
+                        </thead>
+                        <tbody>
+                            ${topRated.map((s, i) => {
+                                const eColor = (s.ewros_score||0) >= 70 ? '#10b981' : (s.ewros_score||0) >= 40 ? '#eab308' : '#64748b';
+                                const gradeColor = s.grade === 'A' ? '#10b981' : s.grade === 'B' ? '#38bdf8' : '#94a3b8';
+                                return `<tr style="cursor:pointer;" onclick="viewStock('${s.ticker}')">
+                                    <td style="color:var(--text-dim);">${i + 1}</td>
+                                    <td style="font-weight:700; color:var(--accent);">${s.ticker}</td>
+                                    <td style="font-size:0.8rem;">${s.name || ''}</td>
+                                    <td style="font-weight:700;">${s.score || '—'}</td>
+                                    <td style="color:${gradeColor}; font-weight:700;">${s.grade || '—'}</td>
+                                    <td style="color:${eColor}; font-weight:700;">${s.ewros_score || '—'}</td>
+                                    <td style="font-size:0.75rem; color:var(--text-dim);">${s.sector || ''}</td>
+                                </tr>`;
+                            }).join('')}
+                        </tbody>
+                    </table>`;
+            } catch(e) {
+                console.error('Landing data error:', e);
+            }
+        }
+
+        function hideLanding() {
+            document.getElementById('landing-view').style.display = 'none';
+            document.getElementById('top-nav').style.display = '';
+        }
+
+        // Hash-based routing — preserves page on refresh and enables back button
+        function handleRoute() {
+            const hash = location.hash.replace('#', '') || '';
+            // No hash = landing page for visitors
+            if (!hash) { showLanding(); return; }
+            hideLanding();
+            if (hash === 'dashboard') showDashboard();
+            else if (hash === 'hunter') showHunter();
+            else if (hash === 'portfolio') showWatchlist();
+            else if (hash === 'rotation') showRotation();
+            else if (hash === 'ewros') showEwrosTab();
+            else if (hash === 'watchlist') showWatchlistEntries();
+            else if (hash === 'pulse') showDashboard();
+            else if (hash === 'calendar') showCalendar();
+            else if (hash === 'journal') showJournal();
+            else if (hash === 'risk') showRiskDashboard();
+            else if (hash === 'screener') showScreener();
+            else if (hash === 'alerts') showAlerts();
+            else if (hash === 'research') showResearch();
+            else if (hash.startsWith('report/')) showReportCard(hash.split('/')[1]);
+            else if (hash.startsWith('stock/')) viewStock(hash.split('/')[1]);
+            else showDashboard();
+        }
+        window.addEventListener('hashchange', handleRoute);
+        window.addEventListener('popstate', handleRoute);
+
+        document.addEventListener('DOMContentLoaded', function() {
+            init();
+            
+            // Route to correct page based on URL hash
+            handleRoute();
+            
+            // Preload all stocks data in background, then draw sparklines
+            loadAllStocks().then(() => loadSparklines()).catch(err => console.log('Background preload failed:', err));
+            
+            document.getElementById('quick-ticker').addEventListener('keypress', function(e) {
+                if (e.key === 'Enter') viewStock(this.value);
+            });
+            document.getElementById('detail-ticker').addEventListener('keypress', function(e) {
+                if (e.key === 'Enter') viewStock(this.value);
+            });
+
+            // Keyboard nav
+            document.addEventListener('keydown', function(e) {
+                const fsOverlay = document.getElementById('chart-fullscreen-overlay');
+                const fsActive = fsOverlay && fsOverlay.style.display === 'flex';
+                const activeEl = document.activeElement;
+                const inInput = activeEl && (activeEl.tagName === 'INPUT' || activeEl.tagName === 'TEXTAREA');
+
+                if (e.key === 'Escape') { if (fsActive) closeChartFullscreen(); return; }
+
+                if (fsActive) {
+                    if (inInput) return; // let input handle own keys
+                    if (e.key === 'ArrowLeft')  { e.preventDefault(); fsNavDetail(-1); }
+                    if (e.key === 'ArrowRight') { e.preventDefault(); fsNavDetail(+1); }
+                    return;
+                }
+                const detailVisible = document.getElementById('detail-view') &&
+                    document.getElementById('detail-view').style.display !== 'none';
+                if (!detailVisible || inInput) return;
+                if (e.key === 'ArrowLeft')  { e.preventDefault(); navDetail(-1); }
+                if (e.key === 'ArrowRight') { e.preventDefault(); navDetail(+1); }
+            });
+        });
+
+        // Criteria arrive packed (?criteria=compact, see criteria_codec.py): payload.criteria_schema holds
+        // [name, category, threshold] rows, each stock [[schema_id, passed, points, value], ...]
+        function expandCriteria(payload, stock) {
+            const schema = payload && payload.criteria_schema;
+            const rows = (stock && stock.criteria) || [];
+            if (!schema) return rows;
+            return rows.map(([id, passed, points, value]) => {
+                const [name, category, threshold] = schema[id];
+                return { name, category, passed: !!passed, value, threshold, points };
+            });
+        }
+
+        // Global cache for all stocks data
+        let allStocksCache = null;
+        let allStocksLoading = null;
+        
+        async function loadAllStocks() {
+            if (allStocksCache) return allStocksCache;
+            if (allStocksLoading) return allStocksLoading;
+            
+            allStocksLoading = fetch('/api/all_stocks?criteria=compact')
+                .then(res => {
+                    if (!res.ok) throw new Error(`HTTP ${res.status}`);
+                    return res.json();
+                })
+                .then(data => {
+                    allStocksCache = data;
+                    console.log(`Loaded ${data.total_stocks} stocks`);
+                    return data;
+                })
+                .catch(err => {
+                    console.error('Failed to load stock data:', err);
+                    throw err;
+                });
+            return allStocksLoading;
+        }
+
+        // Navigation context: explicitly set by each list renderer
+        let detailNavContext = [];
+        let detailNavIndex = -1;
+
+        function setNavContext(tickers) {
+            if (tickers && tickers.length > 1) detailNavContext = tickers;
+        }
+
+        function navDetail(dir) {
+            if (!detailNavContext || detailNavContext.length === 0) return;
+            detailNavIndex = (detailNavIndex + dir + detailNavContext.length) % detailNavContext.length;
+            viewStock(detailNavContext[detailNavIndex]);
+        }
+
+        let fsTvWidget = null;
+
+        function _fsSpawnChart(ticker) {
+            if (fsTvWidget) { try { fsTvWidget.remove(); } catch(e) {} fsTvWidget = null; }
+            const fsBody = document.getElementById('tv-chart-fs');
+            fsBody.innerHTML = '';
+            const savedSettings = JSON.parse(localStorage.getItem('tv_chart_settings') || '{}');
+            // Measure available height for fullscreen body
+            const fsBodyEl = fsBody.parentElement;
+            const h = fsBodyEl ? fsBodyEl.offsetHeight || window.innerHeight - 90 : window.innerHeight - 90;
+            fsTvWidget = new TradingView.widget({
+                "width": "100%", "height": h,
+                "symbol": ticker,
+                "interval": savedSettings.interval || "D",
+                "timezone": "Etc/UTC",
+                "theme": "light",
+                "style": "1",
+                "locale": "en",
+                "enable_publishing": false,
+                "hide_top_toolbar": false,
+                "save_image": false,
+                "container_id": "tv-chart-fs",
+                "hide_side_toolbar": false,
+                "allow_symbol_change": true,
+                "hideideas": true,
+                "hide_legend": false,
+                "overrides": {
+                    "paneProperties.background": "#f2f0eb",
+                    "paneProperties.backgroundGradientStartColor": "#f2f0eb",
+                    "paneProperties.backgroundGradientEndColor": "#f2f0eb",
+                    "paneProperties.backgroundType": "solid"
+                }
+            });
+        }
+
+        function _fsUpdateHeader(ticker) {
+            // Try to pull info from all_stocks cache or watchlist
+            const allData = allStocksCache;
+            const stock = allData && allData.stocks ? allData.stocks[ticker.toUpperCase()] : null;
+            const name = stock ? stock.name : ticker;
+            const ewros = stock ? (stock.ewros_score || 0) : 0;
+            const grade = stock ? (stock.grade || '—') : '—';
+
+            document.getElementById('fs-ticker').textContent = ticker.toUpperCase();
+            document.getElementById('fs-name').textContent = name;
+            document.getElementById('fs-ticker-input').value = ticker.toUpperCase();
+
+            const ewrosBadge = document.getElementById('fs-ewros-badge');
+            ewrosBadge.textContent = `RS ${ewros}`;
+            // TV-style: muted bg, colored text
+            ewrosBadge.style.background = ewros >= 80 ? 'rgba(38,166,154,0.15)' : ewros >= 60 ? 'rgba(246,187,77,0.12)' : ewros >= 40 ? 'rgba(120,123,134,0.15)' : 'rgba(42,46,57,0.8)';
+            ewrosBadge.style.color = ewros >= 80 ? '#26a69a' : ewros >= 60 ? '#f6bb4d' : ewros >= 40 ? '#787b86' : '#4c525e';
+            ewrosBadge.style.border = `1px solid ${ewros >= 80 ? 'rgba(38,166,154,0.3)' : ewros >= 60 ? 'rgba(246,187,77,0.25)' : '#2a2e39'}`;
+
+            const gradeBadge = document.getElementById('fs-grade-badge');
+            // TV-style grade: clean colored badge
+            const tvGradeColors = {A:['#26a69a','rgba(38,166,154,0.15)'], B:['#2962ff','rgba(41,98,255,0.15)'], C:['#f6bb4d','rgba(246,187,77,0.12)'], D:['#f7525f','rgba(247,82,95,0.12)'], F:['#f7525f','rgba(247,82,95,0.18)']};
+            if (grade === 'ETF') {
+                gradeBadge.textContent = 'ETF';
+                gradeBadge.style.background = 'rgba(41,98,255,0.12)';
+                gradeBadge.style.color = '#2962ff';
+                gradeBadge.style.border = '1px solid rgba(41,98,255,0.25)';
+            } else {
+                const [gc, gb] = tvGradeColors[grade] || ['#787b86','rgba(120,123,134,0.15)'];
+                gradeBadge.textContent = grade;
+                gradeBadge.style.background = gb;
+                gradeBadge.style.color = gc;
+                gradeBadge.style.border = `1px solid ${gc}44`;
+            }
+
+            // Bottom nav bar
+            const navIdx = detailNavContext.indexOf(ticker.toUpperCase());
+            const fsBottomBar = document.getElementById('fs-bottom-bar');
+            if (detailNavContext.length > 1 && navIdx >= 0) {
+                detailNavIndex = navIdx;
+                fsBottomBar.style.display = 'flex';
+                document.getElementById('fs-nav-pos').textContent = `${navIdx + 1}  /  ${detailNavContext.length}`;
+            } else {
+                fsBottomBar.style.display = 'none';
+            }
+        }
+
+        let fsKbdTimer = null;
+
+        function openChartFullscreen() {
+            const overlay = document.getElementById('chart-fullscreen-overlay');
+            overlay.style.display = 'flex';
+            document.body.style.overflow = 'hidden';
+            const ticker = window.currentTicker || '';
+            _fsUpdateHeader(ticker);
+            _fsSpawnChart(ticker);
+            // Focus input for immediate typing
+            setTimeout(() => { const inp = document.getElementById('fs-ticker-input'); if(inp) inp.select(); }, 200);
+
+            // Keyboard focus recovery — when TV iframe steals focus, recapture after 300ms
+            // This lets arrow keys work even after interacting with chart
+            window.addEventListener('blur', _fsFocusRecovery);
+        }
+
+        function _fsFocusRecovery() {
+            // When window loses focus (iframe took it), schedule recapture
+            if (fsKbdTimer) clearTimeout(fsKbdTimer);
+            fsKbdTimer = setTimeout(() => {
+                const overlay = document.getElementById('chart-fullscreen-overlay');
+                if (overlay && overlay.style.display === 'flex') {
+                    // Don't steal from input box
+                    const inp = document.getElementById('fs-ticker-input');
+                    if (document.activeElement !== inp) {
+                        overlay.focus();
+                    }
+                }
+            }, 300);
+        }
+
+        function fsLoadTicker(raw) {
+            const ticker = (raw || '').trim().toUpperCase();
+            if (!ticker) return;
+            window.currentTicker = ticker;
+            _fsUpdateHeader(ticker);
+            _fsSpawnChart(ticker);
+            document.getElementById('fs-ticker-input').blur();
+        }
+
+        function fsNavDetail(dir) {
+            if (!detailNavContext || detailNavContext.length === 0) return;
+            detailNavIndex = (detailNavIndex + dir + detailNavContext.length) % detailNavContext.length;
+            const ticker = detailNavContext[detailNavIndex];
+            _fsUpdateHeader(ticker);
+            _fsSpawnChart(ticker);
+        }
+
+        function closeChartFullscreen() {
+            const overlay = document.getElementById('chart-fullscreen-overlay');
+            if (!overlay || overlay.style.display === 'none') return;
+            overlay.style.display = 'none';
+            document.body.style.overflow = '';
+            window.removeEventListener('blur', _fsFocusRecovery);
+            if (fsKbdTimer) { clearTimeout(fsKbdTimer); fsKbdTimer = null; }
+            if (fsTvWidget) { try { fsTvWidget.remove(); } catch(e) {} fsTvWidget = null; }
+            document.getElementById('tv-chart-fs').innerHTML = '';
+        }
+
+        async function viewStock(ticker) {
+            if (location.hash !== `#stock/${ticker}`) history.pushState(null, '', `#stock/${ticker}`);
+            hideAllViews();
+            document.getElementById('detail-view').style.display = 'block';
+            
+            document.getElementById('criteria-list').innerHTML = 'Loading intelligence...';
+            document.getElementById('news-list').innerHTML = '';
+
+            try {
+                // Load from cached all_stocks.json (loads once, caches forever)
+                const allData = await loadAllStocks();
+                // Use `let` so we can assign the fallback stub if ticker is missing
+                let data = allData.stocks[ticker.toUpperCase()];
+
+                // Graceful fallback for ETFs / unknown tickers not in all_stocks.json
+                if (!data) {
+                    // Try fetching basic info from stock_price API
+                    let name = ticker.toUpperCase();
+                    try {
+                        const pr = await fetch(`/api/stock_price/${ticker}`);
+                        if (pr.ok) { const pj = await pr.json(); name = pj.name || name; }
+                    } catch(e) {}
+                    data = {
+                        ticker: ticker.toUpperCase(), name, sector: 'ETF', industry: 'Exchange Traded Fund',
+                        grade: 'ETF', score: null, ewros_score: 0, iq_edge: null,
+                        technical_score: null, growth_score: null, quality_score: null,
+                        context_score: null, moonshot_score: null, criteria: [],
+                        forward_pe: null, trailing_pe: null, peg_ratio: null,
+                        recommendation: null, target_mean: null, analyst_count: null,
+                    };
+                }
+
+                // Compute AFTER data is guaranteed to be set
+                const isEtfMode = data.grade === 'ETF' || !data.score;
+
+                document.getElementById('detail-name').innerText = data.name;
+                document.getElementById('detail-ticker-sector').innerText = `${data.ticker} • ${data.sector}${data.industry ? ' • ' + data.industry : ''}`;
+                document.getElementById('detail-grade').innerText = isEtfMode ? 'ETF' : data.grade;
+                document.getElementById('detail-grade').className = isEtfMode
+                    ? 'grade-badge text-xl px-6 py-2' + ' ' + 'grade-D'
+                    : `grade-badge text-xl px-6 py-2 grade-${data.grade}`;
+                if (isEtfMode) {
+                    document.getElementById('detail-grade').style.background = '#1e3a5f';
+                    document.getElementById('detail-grade').style.color = '#38bdf8';
+                } else {
+                    document.getElementById('detail-grade').style.background = '';
+                    document.getElementById('detail-grade').style.color = '';
+                }
+
+                // EWROS badge in chart header
+                const hdrEwros = data.ewros_score || 0;
+                const ewrosBadge = document.getElementById('detail-ewros-badge');
+                ewrosBadge.textContent = `RS ${hdrEwros}`;
+                ewrosBadge.style.background = hdrEwros >= 80 ? 'rgba(16,185,129,0.18)' : hdrEwros >= 60 ? 'rgba(234,179,8,0.15)' : hdrEwros >= 40 ? 'rgba(100,116,139,0.15)' : 'rgba(51,65,85,0.4)';
+                ewrosBadge.style.color = hdrEwros >= 80 ? '#10b981' : hdrEwros >= 60 ? '#eab308' : hdrEwros >= 40 ? '#94a3b8' : '#64748b';
+
+                // Score timestamp
+                const scoreTs = (allStocksCache && (allStocksCache.last_scan || allStocksCache.iq_edge_updated)) || '';
+                document.getElementById('detail-score-ts').textContent = scoreTs ? `Scores as of ${scoreTs}` : '';
+
+                // Navigation bar
+                const navIdx = detailNavContext.indexOf(ticker.toUpperCase());
+                const navBar = document.getElementById('detail-nav-bar');
+                if (detailNavContext.length > 1 && navIdx >= 0) {
+                    detailNavIndex = navIdx;
+                    navBar.style.visibility = 'visible';
+                    document.getElementById('detail-nav-pos').textContent = `${navIdx + 1} / ${detailNavContext.length}`;
+                } else {
+                    navBar.style.visibility = 'hidden';
+                }
+
+                if (isEtfMode) {
+                    // ETFs: hide sub-scores, show N/A
+                    ['tech-score','growth-score','quality-score','context-score'].forEach(id => {
+                        const el = document.getElementById(id);
+                        el.innerText = '—'; el.style.color = '#475569';
+                    });
+                    document.getElementById('moonshot-score').innerText = '—';
+                    document.getElementById('moonshot-score').style.color = '#475569';
+                    document.getElementById('criteria-list').innerHTML =
+                        '<div class="card py-6 text-center" style="color:#64748b;">' +
+                        '<div style="font-size:1.5rem; margin-bottom:8px;">📦</div>' +
+                        '<div style="font-weight:600; margin-bottom:4px;">ETF — Technical Signals Only</div>' +
+                        '<div style="font-size:0.8rem;">Fundamental scoring not applicable for ETFs.<br>Use EWROS momentum and chart for analysis.</div>' +
+                        '</div>';
+                } else {
+                    document.getElementById('tech-score').innerText = data.technical_score || 0;
+                    document.getElementById('growth-score').innerText = data.growth_score || 0;
+                    document.getElementById('quality-score').innerText = data.quality_score || 0;
+                    document.getElementById('context-score').innerText = data.context_score || 0;
+                    document.getElementById('moonshot-score').innerText = (data.moonshot_score || 0) + '%';
+                    document.getElementById('moonshot-score').style.color = '';
+                }
+                
+                const rotScore = data.ewros_score || 0;
+                const rotSignal = data.ewros_signal || 'N/A';
+                document.getElementById('ewros-score').innerText = rotScore.toFixed ? rotScore.toFixed(1) : rotScore;
+                document.getElementById('ewros-signal').innerText = rotSignal;
+                const rotEl = document.getElementById('ewros-score');
+                rotEl.style.color = rotScore >= 80 ? '#10b981' : rotScore >= 60 ? '#eab308' : rotScore >= 40 ? '#94a3b8' : '#64748b';
+
+                // Insider score card
+                const insScore = data.ins_score || 0;
+                const insSignal = data.insider_signal || 'neutral';
+                const insCard = document.getElementById('insider-score-card');
+                const insLabel = document.getElementById('insider-card-label');
+                const insValue = document.getElementById('insider-score-value');
+                const insSignalLabel = document.getElementById('insider-signal-label');
+                
+                let insColor, insEmoji, insText;
+                if (insSignal === 'dumping' || insScore <= -3) {
+                    insColor = '#ef4444'; insEmoji = '🔴'; insText = 'Dumping';
+                    insCard.style.background = 'linear-gradient(135deg, #1e293b, rgba(239,68,68,0.15))';
+                    insCard.style.borderColor = '#ef444466';
+                } else if (insSignal === 'accumulating' || insScore >= 3) {
+                    insColor = '#10b981'; insEmoji = '🟢'; insText = 'Buying';
+                    insCard.style.background = 'linear-gradient(135deg, #1e293b, rgba(16,185,129,0.15))';
+                    insCard.style.borderColor = '#10b98166';
+                } else {
+                    insColor = '#94a3b8'; insEmoji = '⚪'; insText = 'Neutral';
+                    insCard.style.background = '';
+                    insCard.style.borderColor = '#333';
+                }
+                insLabel.style.color = insColor;
+                insValue.innerHTML = `${insEmoji} ${insScore >= 0 ? '+' : ''}${insScore}`;
+                insValue.style.color = insColor;
+                insSignalLabel.textContent = `${insText} · Click for details`;
+                insSignalLabel.style.color = insColor + '99';
+
+                // EWROS card
+                const rsRating = data.ewros_score || 0;
+                const rsCard = document.getElementById('rs-score-card');
+                const rsLabel = document.getElementById('rs-card-label');
+                const rsValue = document.getElementById('rs-score-value');
+                const rsSignal = document.getElementById('rs-signal-label');
+                let rsColor;
+                if (rsRating >= 80) { rsColor = '#10b981'; rsCard.style.background = 'linear-gradient(135deg, #1e293b, rgba(16,185,129,0.15))'; rsCard.style.borderColor = '#10b98166'; }
+                else if (rsRating >= 50) { rsColor = '#eab308'; rsCard.style.background = 'linear-gradient(135deg, #1e293b, rgba(234,179,8,0.1))'; rsCard.style.borderColor = '#eab30844'; }
+                else { rsColor = '#94a3b8'; rsCard.style.background = ''; rsCard.style.borderColor = '#333'; }
+                rsLabel.style.color = rsColor;
+                rsValue.textContent = rsRating || '—';
+                rsValue.style.color = rsColor;
+                rsSignal.textContent = rsRating >= 80 ? 'Leader' : rsRating >= 50 ? 'Average' : rsRating > 0 ? 'Laggard' : 'N/A';
+                rsSignal.style.color = rsColor + '99';
+
+                // IQ Edge card
+                const iqEdge = data.iq_edge || 0;
+                const iqEdgeRaw = data.iq_edge_raw || 0;
+                const iqEdgeCard = document.getElementById('iq-edge-card');
+                const iqEdgeValue = document.getElementById('iq-edge-value');
+                const iqEdgeLabel = document.getElementById('iq-edge-label');
+                let iqColor;
+                if (iqEdge >= 90) { iqColor = '#a855f7'; iqEdgeCard.style.borderColor = '#a855f766'; }
+                else if (iqEdge >= 70) { iqColor = '#10b981'; iqEdgeCard.style.borderColor = '#10b98144'; }
+                else if (iqEdge >= 40) { iqColor = '#eab308'; iqEdgeCard.style.borderColor = '#eab30844'; }
+                else { iqColor = '#94a3b8'; iqEdgeCard.style.borderColor = '#333'; }
+                iqEdgeValue.textContent = iqEdge || '—';
+                iqEdgeValue.style.color = iqColor;
+                iqEdgeLabel.textContent = iqEdge >= 90 ? `Prime Setup · ${(iqEdgeRaw*100).toFixed(0)}% prob` : iqEdge >= 70 ? `Strong Setup · ${(iqEdgeRaw*100).toFixed(0)}% prob` : iqEdge >= 40 ? `Moderate · ${(iqEdgeRaw*100).toFixed(0)}% prob` : 'Low probability';
+                iqEdgeLabel.style.color = iqColor + '99';
+
+                // Store ticker for detail fetch
+                window.currentInsiderTicker = ticker.toUpperCase();
+                document.getElementById('insider-details-panel').style.display = 'none';
+
+                // Analyst data from cache
+                const na = isEtfMode ? '—' : 'N/A';
+                document.getElementById('rec-key').innerText = data.recommendation ? data.recommendation.toUpperCase() : na;
+                document.getElementById('target-price').innerText = data.target_mean ? `$${data.target_mean.toFixed(2)}` : na;
+                document.getElementById('analyst-count').innerText = isEtfMode ? '—' : (data.analyst_count || '0');
+
+                // Valuation data from cache
+                document.getElementById('forward-pe').innerText = data.forward_pe ? data.forward_pe.toFixed(2) : na;
+                document.getElementById('trailing-pe').innerText = data.trailing_pe ? data.trailing_pe.toFixed(2) : na;
+                document.getElementById('peg-ratio').innerText = data.peg_ratio ? data.peg_ratio.toFixed(2) : na;
+
+                const criteria = expandCriteria(allData, data);
+                if (!isEtfMode) document.getElementById('criteria-list').innerHTML = criteria.length > 0 ? criteria.map(r => `
+                    <div class="card flex justify-between items-center py-4">
+                        <div>
+                            <div class="font-bold text-sm">${r.name}</div>
+                            <div class="text-xs text-slate-500">${r.category} • ${r.threshold}</div>
+                        </div>
+                        <div class="text-right">
+                            <div class="font-bold ${r.passed ? 'text-emerald-400' : 'text-rose-400'}">${r.value}</div>
+                            <div class="text-xs ${r.passed ? 'text-emerald-600' : 'text-rose-600'}">${r.passed ? '✓ PASSED' : '✗ FAILED'} (${r.points > 0 ? '+' : ''}${r.points})</div>
+                        </div>
+                    </div>
+                `).join('') : '<div class="card py-4 text-center text-slate-500">Criteria breakdown available for top-rated stocks only.<br>Score: ' + (data.score || 0) + '/100 | T:' + (data.technical_score||0) + ' G:' + (data.growth_score||0) + ' Q:' + (data.quality_score||0) + ' C:' + (data.context_score||0) + '</div>';
+
+                // Show loading state for news
+                document.getElementById('news-list').innerHTML = '<p class="text-slate-500 text-sm">Loading news...</p>';
+                
+                // Fetch live news separately
+                fetch(`/api/news/${ticker}`)
+                    .then(res => res.json())
+                    .then(newsData => {
+                        if (newsData.news && newsData.news.length > 0) {
+                            document.getElementById('news-list').innerHTML = newsData.news.map(n => `
+                                <div class="news-item">
+                                    <a href="${n.link}" target="_blank" class="news-link text-sm">${n.title}</a>
+                                    <div class="news-meta">${n.publisher} • ${n.time}</div>
+                                </div>
+                            `).join('');
+                        } else {
+                            document.getElementById('news-list').innerHTML = '<p class="text-slate-500 text-sm">No recent news available.</p>';
+                        }
+                    })
+                    .catch(err => {
+                        document.getElementById('news-list').innerHTML = '<p class="text-slate-500 text-sm">News unavailable.</p>';
+                    });
+
+                const savedSettings = JSON.parse(localStorage.getItem('tv_chart_settings') || '{}');
+                const chartInterval = savedSettings.interval || "D";
+                window.currentTicker = data.ticker;
+                
+                const tvChartEl = document.getElementById('tv-chart');
+                const tvH = tvChartEl ? tvChartEl.offsetHeight || 620 : 620;
+                window.tvWidget = new TradingView.widget({
+                    "width": "100%", "height": tvH, "symbol": data.ticker, "interval": chartInterval,
+                    "timezone": "Etc/UTC", "theme": "dark", "style": "1", "locale": "en",
+                    "toolbar_bg": "#f1f3f6", "enable_publishing": false, "hide_top_toolbar": false,
+                    "save_image": false, "container_id": "tv-chart",
+                    "hide_side_toolbar": false, "allow_symbol_change": false, "hideideas": true,
+                    "hide_legend": false
+                });
+                
+                window.tvCheckInterval = setInterval(() => {
+                    try {
+                        const chart = window.tvWidget.chart && window.tvWidget.chart();
+                        if (chart && chart.getResolution) {
+                            const currentInterval = chart.getResolution();
+                            if (currentInterval && currentInterval !== savedSettings.interval) {
+                                savedSettings.interval = currentInterval;
+                                localStorage.setItem('tv_chart_settings', JSON.stringify(savedSettings));
+                            }
+                        }
+                    } catch(e) {}
+                }, 2000);
+
+            // Load earnings strip asynchronously (non-blocking)
+            loadEarningsStrip(data.ticker);
+
+            } catch (err) {
+                showAlert("Error loading stock data: " + err.message);
+                showDashboard();
+            }
+        }
+
+        // ===== EARNINGS STRIP =====
+        async function loadEarningsStrip(ticker) {
+            const strip = document.getElementById('earnings-strip');
+            const timeline = document.getElementById('earnings-timeline');
+            const popup = document.getElementById('earnings-popup');
+            if (!strip || !timeline) return;
+            strip.style.display = 'none';
+            popup.style.display = 'none';
+            popup.innerHTML = '';
+            timeline.innerHTML = '';
+
+            try {
+                const resp = await fetch(`/data/earnings/${ticker}.json`);
+                if (!resp.ok) return;
+                const json = await resp.json();
+                const quarters = (json.quarters || []).filter(q => q.eps_actual !== null).slice(0, 10);
+                if (quarters.length < 2) return;
+
+                strip.style.display = 'block';
+                const future = (json.quarters || []).filter(q => q.eps_actual === null).slice(0, 1);
+
+                // Build combined list: past (reversed = oldest first) + upcoming future
+                const allMarkers = [...[...quarters].reverse(), ...future];
+                const n = allMarkers.length;
+
+                allMarkers.forEach((q, i) => {
+                    const isFuture = q.eps_actual === null;
+                    const pct = (i / Math.max(n - 1, 1)) * 90 + 5;  // 5%..95%
+                    const beat = !isFuture && q.eps_surprise_pct > 0;
+                    const miss = !isFuture && q.eps_surprise_pct !== null && q.eps_surprise_pct <= 0;
+
+                    const cls = isFuture ? 'future' : beat ? 'beat' : miss ? 'miss' : 'inline';
+                    const label = isFuture ? '?' : 'E';
+
+                    const marker = document.createElement('div');
+                    marker.className = `earn-marker ${cls}`;
+                    marker.style.left = pct + '%';
+                    marker.title = q.date;
+                    marker.textContent = label;
+                    marker.dataset.idx = i;
+
+                    const tick = document.createElement('div');
+                    tick.className = 'earn-date-tick';
+                    tick.style.left = pct + '%';
+                    // Show month/year label
+                    const d = new Date(q.date);
+                    tick.textContent = d.toLocaleDateString('en-US', {month:'short', year:'2-digit'});
+                    marker.appendChild(tick);
+
+                    marker.addEventListener('click', (e) => {
+                        e.stopPropagation();
+                        document.querySelectorAll('.earn-marker').forEach(m => m.classList.remove('active'));
+                        marker.classList.add('active');
+                        renderEarningsPopup(q, isFuture);
+                    });
+                    timeline.appendChild(marker);
+                });
+
+                // Auto-show most recent past quarter
+                if (quarters.length > 0) {
+                    const lastIdx = allMarkers.findIndex(q => q.date === quarters[0].date);
+                    if (lastIdx >= 0) {
+                        timeline.querySelectorAll('.earn-marker')[lastIdx]?.click();
+                    }
+                }
+            } catch(e) {
+                console.warn('Earnings strip error:', e);
+            }
+        }
+
+        function renderEarningsPopup(q, isFuture) {
+            const popup = document.getElementById('earnings-popup');
+            if (!popup) return;
+
+            const surpriseColor = q.eps_surprise_pct > 0 ? '#4ade80' : '#f87171';
+            const surpriseIcon = q.eps_surprise_pct > 0 ? '▲' : '▼';
+            const revGrowthColor = (q.revenue_yoy || 0) > 0 ? '#4ade80' : '#f87171';
+
+            const fmt = (v, digits=2) => v !== null && v !== undefined ? v.toFixed(digits) : '—';
+            const fmtRev = (v) => {
+                if (!v) return '—';
+                if (v >= 1e9) return `$${(v/1e9).toFixed(2)}B`;
+                if (v >= 1e6) return `$${(v/1e6).toFixed(1)}M`;
+                return `$${v.toLocaleString()}`;
+            };
+
+            const d = new Date(q.date);
+            const dateLabel = d.toLocaleDateString('en-US', {month:'long', day:'numeric', year:'numeric'});
+            const timeLabel = q.time && q.time !== '00:00' ? ` ${q.time} ET` : '';
+
+            popup.style.display = 'block';
+            popup.innerHTML = `
+                <div style="display:flex; align-items:center; gap:16px; flex-wrap:wrap;">
+                    <div style="font-size:0.85rem; color:#94a3b8; white-space:nowrap;">
+                        📅 <strong style="color:#e2e8f0;">${dateLabel}${timeLabel}</strong>
+                    </div>
+                    ${isFuture ? `<span style="font-size:0.75rem; background:#1e3a5f; color:#60a5fa; border-radius:4px; padding:2px 10px;">Upcoming</span>` : ''}
+                </div>
+                ${!isFuture ? `
+                <div style="display:grid; grid-template-columns:repeat(auto-fit,minmax(150px,1fr)); gap:14px; margin-top:12px;">
+                    <div style="background:#111827; border-radius:6px; padding:10px 14px;">
+                        <div style="font-size:0.65rem; color:#475569; text-transform:uppercase; font-weight:700; letter-spacing:0.06em; margin-bottom:6px;">EPS</div>
+                        <div style="font-size:1.2rem; font-weight:800; color:#e2e8f0;">$${fmt(q.eps_actual)}</div>
+                        <div style="font-size:0.75rem; color:#64748b; margin-top:2px;">Est $${fmt(q.eps_estimate)}</div>
+                        ${q.eps_surprise_pct !== null ? `
+                        <div style="font-size:0.78rem; font-weight:700; color:${surpriseColor}; margin-top:4px;">
+                            ${surpriseIcon} ${Math.abs(q.eps_surprise_pct).toFixed(1)}% ${q.eps_surprise_pct > 0 ? 'Beat' : 'Miss'}
+                        </div>` : ''}
+                    </div>
+                    <div style="background:#111827; border-radius:6px; padding:10px 14px;">
+                        <div style="font-size:0.65rem; color:#475569; text-transform:uppercase; font-weight:700; letter-spacing:0.06em; margin-bottom:6px;">Revenue</div>
+                        <div style="font-size:1.2rem; font-weight:800; color:#e2e8f0;">${fmtRev(q.revenue)}</div>
+                        ${q.revenue_yoy !== null ? `
+                        <div style="font-size:0.78rem; font-weight:700; color:${revGrowthColor}; margin-top:4px;">
+                            ${q.revenue_yoy > 0 ? '▲' : '▼'} ${Math.abs(q.revenue_yoy).toFixed(1)}% YoY
+                        </div>` : ''}
+                    </div>
+                </div>` : `
+                <div style="margin-top:8px; font-size:0.8rem; color:#64748b;">
+                    ${q.eps_estimate !== null ? `EPS Estimate: <strong style="color:#93c5fd;">$${fmt(q.eps_estimate)}</strong>` : 'No estimate yet'}
+                </div>`}
+            `;
+        }
+
+        // ===== ROTATION SCAN =====
+        let rotationData = null;
+        let rotationSort = { column: 'ewros_score', direction: 'desc' };
+
+        async function showRotation() {
+            if (location.hash !== '#rotation') history.pushState(null, '', '#rotation');
+            hideAllViews();
+            document.getElementById('rotation-view').style.display = 'block';
+            updateActiveNav('rotation');
+
+            if (!rotationData) {
+                try {
+                    const resp = await fetch('/api/rotation');
+                    if (!resp.ok) throw new Error('Rotation data unavailable');
+                    rotationData = await resp.json();
+                } catch(e) {
+                    document.getElementById('rotation-tbody').innerHTML = `<tr><td colspan="9" style="text-align:center;padding:40px;color:var(--text-dim);">Error: ${e.message}</td></tr>`;
+                    return;
+                }
+            }
+            renderRotation();
+        }
+
+        function renderRotation() {
+            const d = rotationData;
+            document.getElementById('rotation-last-scan').textContent = d.last_scan || '—';
+
+            const allStocks = [...d.strong_buys, ...d.watch];
+            const dreamSetups = allStocks.filter(s => s.ewros_score >= 60 && s.grade === 'A');
+            const industryCount = Object.keys(d.industry_breakdown).length;
+
+            // Update collapsible table title
+            document.getElementById('rotation-table-title').textContent = `👀 EWROS WATCH — ${allStocks.length} stocks`;
+
+            // Summary cards
+            document.getElementById('rotation-summary').innerHTML = [
+                { label: 'Strong Rotation Buys', value: d.strong_buys.length, color: '#10b981' },
+                { label: 'Rotation Watch', value: d.watch.length, color: '#38bdf8' },
+                { label: 'Industries Rotating', value: industryCount, color: '#a78bfa' }
+            ].map(c => `<div class="card" style="text-align:center;padding:16px;">
+                <div style="font-size:2rem;font-weight:800;color:${c.color};">${c.value}</div>
+                <div style="font-size:0.75rem;color:var(--text-dim);margin-top:4px;">${c.label}</div>
+            </div>`).join('');
+
+            // Dream Setups
+            if (dreamSetups.length > 0) {
+                document.getElementById('rotation-dream').innerHTML = `
+                    <h3 style="font-size:1rem;font-weight:700;margin-bottom:12px;">⭐ Dream Setups <span style="font-size:0.75rem;color:var(--text-dim);">(Rotation ≥ 60 + Grade A)</span></h3>
+                    <div style="display:grid;grid-template-columns:repeat(auto-fill,minmax(220px,1fr));gap:12px;">
+                        ${dreamSetups.map(s => `<div class="card" style="padding:14px;">
+                            <div style="display:flex;justify-content:space-between;align-items:center;margin-bottom:8px;">
+                                <a href="#" onclick="viewStock('${s.ticker}'); return false;" class="text-sky-400 hover:text-sky-300 font-bold" style="font-size:1.1rem;">${s.ticker}</a>
+                                <span style="background:#10b981;color:#000;padding:2px 8px;border-radius:4px;font-weight:700;font-size:0.75rem;">A</span>
+                            </div>
+                            <div style="font-size:0.75rem;color:var(--text-dim);margin-bottom:6px;">${s.name}</div>
+                            <div style="display:flex;justify-content:space-between;font-size:0.8rem;">
+                                <span>EWROS: <b style="color:#10b981;">${s.ewros_score}</b></span>
+                                <span>Quality: <b>${s.score}</b></span>
+                            </div>
+                            <div style="display:flex;justify-content:space-between;align-items:center;margin-top:6px;">
+                                <span style="font-size:0.7rem;color:var(--text-dim);">${s.sector}</span>
+                                ${renderInsiderBadge(s.ins_score, s.insider_signal, true)}
+                            </div>
+                        </div>`).join('')}
+                    </div>`;
+            } else {
+                document.getElementById('rotation-dream').innerHTML = '';
+            }
+
+            // Table header
+            const cols = [
+                { key: 'ticker', label: 'Ticker' },
+                { key: 'ewros_score', label: 'EWROS' },
+                { key: 'ewros_convergence', label: 'IQ Edge' },
+                { key: 'ewros_score', label: 'EWROS' },
+                { key: 'iq_edge', label: 'IQ Edge' },
+                { key: 'score', label: 'Quality' },
+                { key: 'grade', label: 'Grade' },
+                { key: 'ins_score', label: 'Insider' },
+                { key: 'sector', label: 'Sector' },
+                { key: 'industry', label: 'Industry' },
+                { key: 'current_price', label: 'Price' }
+            ];
+            document.getElementById('rotation-thead').innerHTML = cols.map(c => {
+                const arrow = rotationSort.column === c.key ? (rotationSort.direction === 'desc' ? ' ▼' : ' ▲') : '';
+                return `<th onclick="sortRotation('${c.key}')" style="cursor:pointer;padding:10px 8px;text-align:left;white-space:nowrap;border-bottom:1px solid rgba(255,255,255,0.05);color:var(--text-dim);font-size:0.7rem;text-transform:uppercase;">${c.label}${arrow}</th>`;
+            }).join('');
+
+            // Sort
+            const sorted = [...allStocks].sort((a, b) => {
+                const col = rotationSort.column;
+                let va = a[col], vb = b[col];
+                if (typeof va === 'string') va = va.toLowerCase();
+                if (typeof vb === 'string') vb = vb.toLowerCase();
+                if (col === 'ticker') {
+                    return rotationSort.direction === 'asc' ? (va < vb ? -1 : 1) : (va > vb ? -1 : 1);
+                }
+                return rotationSort.direction === 'desc' ? (vb > va ? 1 : vb < va ? -1 : 0) : (va > vb ? 1 : va < vb ? -1 : 0);
+            });
+
+            // Table body
+            document.getElementById('rotation-tbody').innerHTML = sorted.map(s => {
+                const gradeColor = s.grade === 'A' ? '#10b981' : s.grade === 'B' ? '#38bdf8' : s.grade === 'C' ? '#f59e0b' : '#ef4444';
+                return `<tr style="border-bottom:1px solid rgba(255,255,255,0.03);">
+                    <td style="padding:8px;"><a href="#" onclick="viewStock('${s.ticker}'); return false;" class="text-sky-400 hover:text-sky-300 font-bold">${s.ticker}</a></td>
+                    <td style="padding:8px;font-weight:700;color:#10b981;">${s.ewros_score}</td>
+                    <td style="padding:8px;">${s.ewros_convergence}</td>
+                    <td style="padding:8px;font-weight:600;color:${(s.ewros_score||0) >= 80 ? '#10b981' : (s.ewros_score||0) >= 50 ? '#eab308' : '#64748b'};">${s.ewros_score || '—'}</td>
+                    <td style="padding:8px;font-weight:700;color:${(s.iq_edge||0) >= 90 ? '#a855f7' : (s.iq_edge||0) >= 70 ? '#10b981' : (s.iq_edge||0) >= 40 ? '#eab308' : '#64748b'};">${s.iq_edge || '—'}</td>
+                    <td style="padding:8px;">${s.score}</td>
+                    <td style="padding:8px;"><span style="color:${gradeColor};font-weight:700;">${s.grade}</span></td>
+                    <td style="padding:8px;">${renderInsiderBadge(s.ins_score, s.insider_signal, true)}</td>
+                    <td style="padding:8px;font-size:0.75rem;color:var(--text-dim);">${s.sector}</td>
+                    <td style="padding:8px;font-size:0.75rem;color:var(--text-dim);">${s.industry}</td>
+                    <td style="padding:8px;">$${s.current_price ? s.current_price.toFixed(2) : '—'}</td>
+                </tr>`;
+            }).join('');
+
+            // Industry Dominance
+            const indEntries = Object.entries(d.industry_breakdown).sort((a, b) => b[1].pct - a[1].pct).slice(0, 15);
+            const secEntries = Object.entries(d.sector_breakdown).sort((a, b) => b[1].pct - a[1].pct);
+            document.getElementById('rotation-industries').innerHTML = `
+                <div class="card" style="padding:20px;font-family:'SF Mono','Fira Code','Consolas',monospace;font-size:0.82rem;line-height:1.8;">
+                    <div style="font-weight:800;font-size:0.95rem;margin-bottom:4px;color:#e2e8f0;">SECTOR BREAKDOWN</div>
+                    <div style="border-top:2px double rgba(255,255,255,0.15);margin-bottom:12px;"></div>
+                    ${secEntries.map(([name, v]) => {
+                        const pctColor = v.pct >= 15 ? '#10b981' : v.pct >= 7 ? '#f59e0b' : '#94a3b8';
+                        return `<div style="display:flex;justify-content:space-between;padding:3px 0;"><span style="color:#e2e8f0;font-weight:600;">${name}</span><span><span style="color:${pctColor};font-weight:700;">${v.count} (${v.pct}%)</span> <span style="color:var(--text-dim);margin-left:10px;">avg ${v.avg_rotation}</span></span></div>`;
+                    }).join('')}
+                    <div style="font-weight:800;font-size:0.95rem;margin:24px 0 4px 0;color:#e2e8f0;">INDUSTRY DOMINANCE</div>
+                    <div style="border-top:2px double rgba(255,255,255,0.15);margin-bottom:12px;"></div>
+                    ${indEntries.map(([name, v]) => {
+                        const pctColor = v.pct >= 25 ? '#10b981' : v.pct >= 12 ? '#f59e0b' : '#94a3b8';
+                        return `<div style="display:flex;justify-content:space-between;padding:3px 0;"><span style="color:#e2e8f0;font-weight:600;">${name}</span><span><span style="color:${pctColor};font-weight:700;">${v.count} (${v.pct}%)</span> <span style="color:var(--text-dim);margin-left:10px;">avg ${v.avg_rotation}</span></span></div>`;
+                    }).join('')}
+                </div>`;
+        }
+
+        function sortRotation(col) {
+            if (rotationSort.column === col) {
+                rotationSort.direction = rotationSort.direction === 'desc' ? 'asc' : 'desc';
+            } else {
+                rotationSort.column = col;
+                rotationSort.direction = col === 'ticker' ? 'asc' : 'desc';
+            }
+            renderRotation();
+        }
+
+        // ===== WATCHLISTS (GROUPED) =====
+        let wlData = null;  // { watchlists: { "name": { id, icon, items: [...] } } }
+        let wlLivePrices = {};
+        let currentWLFilter = 'all';
+        let currentWLId = null;  // For adding tickers
+        let pendingSnapshot = {};
+
+        async function showWatchlistEntries() {
+            if (location.hash !== '#watchlist') history.pushState(null, '', '#watchlist');
+            hideAllViews();
+            document.getElementById('watchlist-entries-view').style.display = 'block';
+            updateActiveNav('watchlist');
+            document.querySelectorAll('.nav-item').forEach(n => n.classList.remove('active'));
+
+            if (!wlData) {
+                try {
+                    const res = await fetch('/api/watchlists');
+                    wlData = await res.json();
+                } catch(e) {
+                    wlData = { watchlists: {} };
+                }
+            }
+            updateWLFilters();
+            renderWL();
+            fetchWLLivePrices();
+            loadSellSignals();
+        }
+
+        function updateWLFilters() {
+            const container = document.getElementById('wl-filters');
+            container.innerHTML = '<span class="filter-pill ' + (currentWLFilter === 'all' ? 'active' : '') + '" onclick="filterWL(\'all\')">Show All</span>';
+            for (const [name, wl] of Object.entries(wlData?.watchlists || {})) {
+                const pill = document.createElement('span');
+                pill.className = 'filter-pill' + (currentWLFilter === name ? ' active' : '');
+                pill.textContent = `${wl.icon || '👁️'} ${name}`;
+                pill.onclick = () => filterWL(name);
+                container.appendChild(pill);
+            }
+        }
+
+        function filterWL(name) {
+            currentWLFilter = name;
+            updateWLFilters();
+            renderWL();
+        }
+
+        // Sell signals data (loaded async)
+        let sellSignals = {};
+        async function loadSellSignals() {
+            try {
+                const res = await fetch('/api/sell_signals');
+                const data = await res.json();
+                sellSignals = {};
+                for (const s of (data.signals || [])) {
+                    sellSignals[s.ticker] = s;
+                }
+                renderWL();
+            } catch(e) {}
+        }
+
+        function getSellSignalBadge(ticker) {
+            const s = sellSignals[ticker];
+            if (!s) return '<span style="color:var(--text-dim); font-size:0.8rem;">—</span>';
+            const cfg = {
+                'SELL':  { color: '#ef4444', bg: 'rgba(239,68,68,0.15)',  label: '🔴 SELL'  },
+                'WATCH': { color: '#eab308', bg: 'rgba(234,179,8,0.15)',  label: '🟡 WATCH' },
+                'HOLD':  { color: '#10b981', bg: 'rgba(16,185,129,0.15)', label: '🟢 HOLD'  }
+            }[s.tier] || { color: 'var(--text-dim)', bg: 'transparent', label: s.tier };
+            const reasons = s.reasons && s.reasons.length ? [...s.reasons] : ['Thesis intact — EWROS strong, above 50d MA'];
+            if (s.ewros_score != null) reasons.unshift(`EWROS: ${s.ewros_score.toFixed ? s.ewros_score.toFixed(0) : s.ewros_score}`);
+            if (s.pct_from_entry != null) reasons.push(`P&L: ${s.pct_from_entry >= 0 ? '+' : ''}${s.pct_from_entry.toFixed(1)}% from entry`);
+            if (s.days_held != null) reasons.push(`Held: ${s.days_held} days`);
+            return sigBadge(cfg.color, cfg.bg, cfg.label, reasons, 'wl-' + ticker);
+        }
+
+        function renderWL() {
+            const tbody = document.getElementById('wl-tbody');
+            const watchlists = wlData?.watchlists || {};
+
+            if (Object.keys(watchlists).length === 0) {
+                tbody.innerHTML = '<tr><td colspan="12" style="text-align:center; padding:40px; color:var(--text-dim);">No watchlists yet. Click "+ New Watchlist" to create one.</td></tr>';
+                return;
+            }
+
+            let html = '';
+            const wlNames = currentWLFilter === 'all' ? Object.keys(watchlists) : [currentWLFilter];
+
+            for (const name of wlNames) {
+                const wl = watchlists[name];
+                if (!wl) continue;
+                const items = wl.items || [];
+
+                // Section header
+                html += `<tr class="basket-header">
+                    <td colspan="12" style="background:#0a0f1d; padding:14px 16px; border-bottom:2px solid var(--accent); font-weight:700; font-size:0.95rem;">
+                        ${wl.icon || '👁️'} ${name}
+                        <span style="font-size:0.75rem; color:var(--text-dim); margin-left:8px;">· ${items.length} stocks</span>
+                        <button onclick="showAddWLTickerModal('${name}', ${wl.id})" style="margin-left:16px; background:transparent; border:1px solid var(--accent); color:var(--accent); padding:3px 10px; border-radius:4px; cursor:pointer; font-size:0.75rem;">+ Add Ticker</button>
+                        <button onclick="deleteWatchlist(${wl.id}, '${name}')" style="margin-left:8px; background:transparent; border:1px solid #dc2626; color:#dc2626; padding:3px 10px; border-radius:4px; cursor:pointer; font-size:0.75rem;">Delete List</button>
+                    </td>
+                </tr>`;
+
+                if (items.length === 0) {
+                    html += `<tr><td colspan="12" style="text-align:center; padding:20px; color:var(--text-dim); font-style:italic;">Empty — add tickers above</td></tr>`;
+                } else {
+                    for (const item of items) {
+                        const lp = wlLivePrices[item.ticker];
+                        const currPrice = lp ? lp.price : null;
+                        const ep = item.entry_price;
+                        const pl = (currPrice && ep && ep > 0) ? ((currPrice - ep) / ep * 100) : null;
+                        const plColor = pl > 0 ? '#10b981' : pl < 0 ? '#ef4444' : 'var(--text-dim)';
+                        const plText = pl !== null ? `${pl > 0 ? '+' : ''}${pl.toFixed(2)}%` : '—';
+                        const gradeColor = {'A':'#10b981','B':'#22d3ee','C':'#eab308','D':'#f97316','F':'#ef4444'}[item.grade] || 'var(--text-dim)';
+
+                        html += `<tr>
+                            <td class="sticky-col" style="font-weight:700; color:var(--accent); cursor:pointer;" onclick="viewStock('${item.ticker}')">${item.ticker}</td>
+                            <td style="color:var(--text-dim); font-size:0.85rem;">${item.name || item.ticker}</td>
+                            <td style="color:var(--text-dim); font-size:0.8rem;">${item.added_date || '—'}</td>
+                            <td>${ep ? '$' + ep.toFixed(2) : '—'}</td>
+                            <td>${currPrice ? '$' + currPrice.toFixed(2) : '—'}</td>
+                            <td style="color:${plColor}; font-weight:700;">${plText}</td>
+                            <td>${item.score || '—'}</td>
+                            <td style="color:${gradeColor}; font-weight:700;">${item.grade || '—'}</td>
+                            <td>${item.ewros_score ? item.ewros_score.toFixed(1) : '—'}</td>
+                            <td>${renderInsiderBadge(wlLivePrices[item.ticker]?.ins_score ?? item.ins_score, wlLivePrices[item.ticker]?.insider_signal ?? item.insider_signal, true)}</td>
+                            <td>${getSellSignalBadge(item.ticker)}</td>
+                            <td><button onclick="removeWLItem(${item.id || 0}, '${item.ticker}', '${name}')" style="background:transparent; border:1px solid #374151; color:#ef4444; padding:4px 8px; border-radius:4px; cursor:pointer; font-size:0.75rem;">✕</button></td>
+                        </tr>`;
+                    }
+                }
+            }
+            tbody.innerHTML = html;
+        }
+
+        async function fetchWLLivePrices() {
+            try {
+                const res = await fetch('/api/watchlists/live');
+                const data = await res.json();
+                wlLivePrices = data.prices || {};
+                if (data.timestamp) document.getElementById('wl-updated').textContent = data.timestamp + ' (LIVE)';
+                renderWL();
+            } catch(e) {}
+        }
+
+        // Create watchlist
+        function showCreateWatchlistModal() {
+            document.getElementById('create-wl-name').value = '';
+            document.getElementById('create-wl-modal').style.display = 'flex';
+            document.getElementById('create-wl-name').focus();
+        }
+
+        async function createWatchlist() {
+            const name = document.getElementById('create-wl-name').value.trim();
+            const icon = document.getElementById('create-wl-icon').value;
+            if (!name) { alert('Enter a name'); return; }
+
+            try {
+                const res = await fetch('/api/watchlists', {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/json' },
+                    body: JSON.stringify({ name, icon })
+                });
+                const result = await res.json();
+                if (!res.ok) throw new Error(result.error || 'Failed');
+
+                // Add to local data and re-render
+                if (!wlData) wlData = { watchlists: {} };
+                wlData.watchlists[name] = { id: result.id, icon, items: [] };
+                document.getElementById('create-wl-modal').style.display = 'none';
+                updateWLFilters();
+                renderWL();
+            } catch(e) {
+                alert('Error: ' + e.message);
+            }
+        }
+
+        // Delete watchlist
+        async function deleteWatchlist(wlId, name) {
+            if (!confirm(`Delete watchlist "${name}" and all its stocks?`)) return;
+            try {
+                const res = await fetch(`/api/watchlists/${wlId}`, { method: 'DELETE' });
+                if (!res.ok) throw new Error('Delete failed');
+                delete wlData.watchlists[name];
+                if (currentWLFilter === name) currentWLFilter = 'all';
+                updateWLFilters();
+                renderWL();
+            } catch(e) {
+                alert('Error: ' + e.message);
+            }
+        }
+
+        // Add ticker to watchlist — now with thesis modal option
+        let thesisWLName = '';
+        function showAddWLTickerModal(wlName, wlId) {
+            currentWLId = wlId;
+            thesisWLName = wlName;
+            document.getElementById('add-wl-ticker-title').textContent = `Add to ${wlName}`;
+            document.getElementById('wl-ticker').value = '';
+            document.getElementById('wl-entry-price').value = '';
+            document.getElementById('wl-ticker-info').style.display = 'none';
+            document.getElementById('add-wl-ticker-modal').style.display = 'flex';
+            document.getElementById('wl-ticker').focus();
+        }
+
+        async function fetchWLTickerPrice() {
+            const ticker = document.getElementById('wl-ticker').value.trim().toUpperCase();
+            if (!ticker) return;
+            try {
+                const res = await fetch(`/api/stock_price/${ticker}`);
+                const data = await res.json();
+                if (data.price) document.getElementById('wl-entry-price').value = data.price;
+                pendingSnapshot = data.snapshot || {};
+                const s = pendingSnapshot;
+                document.getElementById('wl-stock-name').textContent = data.name || ticker;
+                document.getElementById('wl-stock-details').innerHTML =
+                    `Score: ${s.score || 'N/A'} | Grade: ${s.grade || 'N/A'} | Rotation: ${s.ewros_score ? Number(s.ewros_score).toFixed(1) : 'N/A'}`;
+                document.getElementById('wl-ticker-info').style.display = 'block';
+            } catch(e) {}
+        }
+
+        async function addTickerToWL() {
+            const ticker = document.getElementById('wl-ticker').value.trim().toUpperCase();
+            const price = parseFloat(document.getElementById('wl-entry-price').value);
+            if (!ticker) { alert('Enter a ticker'); return; }
+
+            // Close add modal, open thesis modal
+            document.getElementById('add-wl-ticker-modal').style.display = 'none';
+            openThesisModal(ticker, price);
+        }
+
+        function openThesisModal(ticker, entryPrice) {
+            document.getElementById('thesis-ticker-display').textContent = `${ticker} — Entry: $${entryPrice ? entryPrice.toFixed(2) : '—'}`;
+            document.getElementById('thesis-entry-price').value = entryPrice || '';
+            document.getElementById('thesis-target-price').value = '';
+            document.getElementById('thesis-stop-loss').value = '';
+            document.getElementById('thesis-text').value = '';
+            document.getElementById('thesis-catalyst').value = '';
+            document.getElementById('thesis-timeline').value = '1 month';
+            document.getElementById('thesis-prove-wrong').value = '';
+            document.getElementById('rr-display').textContent = 'R/R Ratio: —';
+            document.getElementById('rr-display').style.borderColor = '#374151';
+            // Reset checklist
+            ['chk-ewros','chk-distribution','chk-market','chk-rr','chk-position','chk-earnings','chk-thesis'].forEach(id => {
+                document.getElementById(id).checked = false;
+            });
+            document.getElementById('checklist-score').textContent = '0/7 checks passed';
+            document.getElementById('thesis-modal').style.display = 'block';
+            document.getElementById('thesis-modal')._ticker = ticker;
+            document.getElementById('thesis-modal')._entryPrice = entryPrice;
+        }
+
+        function calcRR() {
+            const entry = parseFloat(document.getElementById('thesis-entry-price').value);
+            const target = parseFloat(document.getElementById('thesis-target-price').value);
+            const stop = parseFloat(document.getElementById('thesis-stop-loss').value);
+            const display = document.getElementById('rr-display');
+
+            if (!entry || !target || !stop || entry === stop) {
+                display.textContent = 'R/R Ratio: —';
+                display.style.borderColor = '#374151';
+                display.style.color = 'var(--text-dim)';
+                return;
+            }
+
+            const reward = target - entry;
+            const risk = entry - stop;
+            if (risk <= 0) {
+                display.textContent = 'R/R Ratio: Invalid (stop ≥ entry)';
+                display.style.borderColor = '#ef4444';
+                display.style.color = '#ef4444';
+                return;
+            }
+
+            const rr = reward / risk;
+            let color = '#ef4444', label = 'POOR';
+            if (rr >= 3) { color = '#10b981'; label = 'EXCELLENT'; }
+            else if (rr >= 2) { color = '#eab308'; label = 'ACCEPTABLE'; }
+
+            display.innerHTML = `R/R Ratio: <span style="color:${color}; font-size:1.2rem;">${rr.toFixed(1)}:1</span> <span style="font-size:0.8rem; color:${color};">${label}</span>`;
+            display.style.borderColor = color;
+        }
+
+        async function submitThesisAndAdd() {
+            const modal = document.getElementById('thesis-modal');
+            const ticker = modal._ticker;
+            const entryPrice = modal._entryPrice;
+            const thesis = document.getElementById('thesis-text').value.trim();
+            const targetPrice = parseFloat(document.getElementById('thesis-target-price').value);
+            const stopLoss = parseFloat(document.getElementById('thesis-stop-loss').value);
+
+            // Count checklist
+            const checks = ['chk-ewros','chk-distribution','chk-market','chk-rr','chk-position','chk-earnings','chk-thesis'];
+            const checklist = {};
+            let passed = 0;
+            checks.forEach(id => {
+                checklist[id.replace('chk-', '')] = document.getElementById(id).checked;
+                if (document.getElementById(id).checked) passed++;
+            });
+
+            // Calculate R/R
+            let rrRatio = 0;
+            if (entryPrice && targetPrice && stopLoss && entryPrice !== stopLoss) {
+                rrRatio = (targetPrice - entryPrice) / (entryPrice - stopLoss);
+            }
+
+            // Save thesis (optional — don't block if thesis is empty)
+            if (thesis || targetPrice || stopLoss) {
+                try {
+                    await fetch('/api/thesis', {
+                        method: 'POST',
+                        headers: { 'Content-Type': 'application/json' },
+                        body: JSON.stringify({
+                            ticker,
+                            thesis: thesis || 'No thesis provided',
+                            target_price: targetPrice || 0,
+                            stop_loss: stopLoss || 0,
+                            entry_price: entryPrice || 0,
+                            catalyst: document.getElementById('thesis-catalyst').value,
+                            timeline: document.getElementById('thesis-timeline').value,
+                            prove_wrong: document.getElementById('thesis-prove-wrong').value,
+                            checklist,
+                            rr_ratio: rrRatio
+                        })
+                    });
+                } catch(e) {
+                    console.log('Thesis save failed:', e);
+                }
+            }
+
+            // Now add to watchlist
+            try {
+                const res = await fetch(`/api/watchlists/${currentWLId}/items`, {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/json' },
+                    body: JSON.stringify({ ticker, entry_price: entryPrice || null, snapshot: pendingSnapshot })
+                });
+                const result = await res.json();
+                if (!res.ok) throw new Error(result.error || 'Failed');
+
+                modal.style.display = 'none';
+                wlData = null;
+                await showWatchlistEntries();
+            } catch(e) {
+                alert('Error adding to watchlist: ' + e.message);
+            }
+        }
+
+        // Remove ticker — prompt to log exit trade
+        let pendingRemove = null;
+        async function removeWLItem(itemId, ticker, wlName) {
+            // Find entry price from watchlist data
+            const wl = wlData?.watchlists?.[wlName];
+            const item = wl?.items?.find(i => i.ticker === ticker);
+            const entryPrice = item?.entry_price || 0;
+
+            pendingRemove = { itemId, ticker, wlName, entryPrice };
+            document.getElementById('exit-ticker-display').textContent = ticker;
+            document.getElementById('exit-price').value = '';
+            document.getElementById('exit-date').value = new Date().toISOString().slice(0, 10);
+            document.getElementById('exit-reason').value = '';
+
+            // Try to auto-fill current price
+            try {
+                const lp = wlLivePrices[ticker];
+                if (lp?.price) document.getElementById('exit-price').value = lp.price;
+            } catch(e) {}
+
+            document.getElementById('exit-trade-modal').style.display = 'block';
+        }
+
+        async function skipExitLog() {
+            if (!pendingRemove) return;
+            document.getElementById('exit-trade-modal').style.display = 'none';
+            await doRemoveWLItem(pendingRemove.itemId, pendingRemove.ticker, pendingRemove.wlName);
+        }
+
+        async function submitExitAndRemove() {
+            if (!pendingRemove) return;
+            const exitPrice = parseFloat(document.getElementById('exit-price').value);
+            const exitDate = document.getElementById('exit-date').value;
+            const exitReason = document.getElementById('exit-reason').value;
+
+            // Log the trade
+            try {
+                await fetch('/api/trade_journal', {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/json' },
+                    body: JSON.stringify({
+                        ticker: pendingRemove.ticker,
+                        action: 'SELL',
+                        entry_price: pendingRemove.entryPrice,
+                        exit_price: exitPrice || null,
+                        entry_date: null,
+                        exit_date: exitDate || null,
+                        exit_reason: exitReason,
+                        notes: `Removed from watchlist ${pendingRemove.wlName}`
+                    })
+                });
+            } catch(e) {
+                console.log('Failed to log exit trade:', e);
+            }
+
+            document.getElementById('exit-trade-modal').style.display = 'none';
+            await doRemoveWLItem(pendingRemove.itemId, pendingRemove.ticker, pendingRemove.wlName);
+        }
+
+        async function doRemoveWLItem(itemId, ticker, wlName) {
+            try {
+                if (!itemId) {
+                    wlData = null;
+                    await showWatchlistEntries();
+                    return;
+                }
+                const res = await fetch(`/api/watchlist_items/${itemId}`, { method: 'DELETE' });
+                if (!res.ok) throw new Error('Delete failed');
+                const wl = wlData.watchlists[wlName];
+                if (wl) wl.items = wl.items.filter(i => i.ticker !== ticker);
+                renderWL();
+            } catch(e) {
+                alert('Error: ' + e.message);
+            }
+            pendingRemove = null;
+        }
+        // ===== TRADE JOURNAL =====
+        async function showJournal() {
+            if (location.hash !== '#journal') history.pushState(null, '', '#journal');
+            hideAllViews();
+            document.getElementById('journal-view').style.display = 'block';
+            updateActiveNav('journal');
+
+            try {
+                const res = await fetch('/api/trade_journal');
+                const data = await res.json();
+                renderJournal(data);
+            } catch(e) {
+                document.getElementById('journal-tbody').innerHTML = `<tr><td colspan="8" style="text-align:center;padding:40px;color:#ef4444;">Error: ${e.message}</td></tr>`;
+            }
+        }
+
+        function renderJournal(data) {
+            const stats = data.stats || {};
+            const statsEl = document.getElementById('journal-stats');
+            const statCards = [
+                { label: 'Total Trades', value: stats.total_trades || 0, color: 'var(--accent)' },
+                { label: 'Win Rate', value: (stats.win_rate || 0) + '%', color: stats.win_rate >= 50 ? '#10b981' : '#ef4444' },
+                { label: 'Avg Win', value: '+' + (stats.avg_win || 0) + '%', color: '#10b981' },
+                { label: 'Avg Loss', value: (stats.avg_loss || 0) + '%', color: '#ef4444' },
+                { label: 'Profit Factor', value: stats.profit_factor === Infinity ? '∞' : (stats.profit_factor || 0), color: stats.profit_factor >= 1.5 ? '#10b981' : '#eab308' },
+                { label: 'Total P&L', value: (stats.total_pl >= 0 ? '+' : '') + (stats.total_pl || 0) + '%', color: stats.total_pl >= 0 ? '#10b981' : '#ef4444' }
+            ];
+            statsEl.innerHTML = statCards.map(c => `
+                <div class="card" style="text-align:center; padding:14px;">
+                    <div style="font-size:1.4rem; font-weight:800; color:${c.color};">${c.value}</div>
+                    <div style="font-size:0.7rem; color:var(--text-dim); margin-top:4px; text-transform:uppercase;">${c.label}</div>
+                </div>
+            `).join('');
+
+            const trades = data.trades || [];
+            const tbody = document.getElementById('journal-tbody');
+            if (trades.length === 0) {
+                tbody.innerHTML = '<tr><td colspan="8" style="text-align:center; padding:40px; color:var(--text-dim);">No trades logged yet. Click "+ Log Trade" to start.</td></tr>';
+                return;
+            }
+
+            tbody.innerHTML = trades.sort((a, b) => (b.created_at || '').localeCompare(a.created_at || '')).map(t => {
+                const plColor = t.pl_pct > 0 ? '#10b981' : t.pl_pct < 0 ? '#ef4444' : 'var(--text-dim)';
+                const actionColor = t.action === 'BUY' ? '#10b981' : '#ef4444';
+                return `<tr>
+                    <td style="font-size:0.85rem;">${t.exit_date || t.entry_date || '—'}</td>
+                    <td style="font-weight:700; color:var(--accent); cursor:pointer;" onclick="viewStock('${t.ticker}')">${t.ticker}</td>
+                    <td style="color:${actionColor}; font-weight:600;">${t.action}</td>
+                    <td>${t.entry_price ? '$' + t.entry_price.toFixed(2) : '—'}</td>
+                    <td>${t.exit_price ? '$' + t.exit_price.toFixed(2) : '—'}</td>
+                    <td style="color:${plColor}; font-weight:700;">${t.pl_pct !== null ? (t.pl_pct > 0 ? '+' : '') + t.pl_pct + '%' : '—'}</td>
+                    <td>${t.days_held !== null ? t.days_held + 'd' : '—'}</td>
+                    <td style="font-size:0.8rem; color:var(--text-dim);">${t.exit_reason || t.notes || '—'}</td>
+                </tr>`;
+            }).join('');
+        }
+
+        function showLogTradeModal() {
+            document.getElementById('trade-ticker').value = '';
+            document.getElementById('trade-action').value = 'BUY';
+            document.getElementById('trade-entry-price').value = '';
+            document.getElementById('trade-exit-price').value = '';
+            document.getElementById('trade-entry-date').value = new Date().toISOString().slice(0, 10);
+            document.getElementById('trade-exit-date').value = '';
+            document.getElementById('trade-reason').value = '';
+            document.getElementById('log-trade-modal').style.display = 'block';
+        }
+
+        async function submitTrade() {
+            const ticker = document.getElementById('trade-ticker').value.trim().toUpperCase();
+            if (!ticker) { alert('Enter a ticker'); return; }
+
+            try {
+                const res = await fetch('/api/trade_journal', {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/json' },
+                    body: JSON.stringify({
+                        ticker,
+                        action: document.getElementById('trade-action').value,
+                        entry_price: parseFloat(document.getElementById('trade-entry-price').value) || 0,
+                        exit_price: parseFloat(document.getElementById('trade-exit-price').value) || null,
+                        entry_date: document.getElementById('trade-entry-date').value,
+                        exit_date: document.getElementById('trade-exit-date').value || null,
+                        exit_reason: document.getElementById('trade-reason').value
+                    })
+                });
+                const result = await res.json();
+                if (!res.ok) throw new Error(result.error || 'Failed');
+
+                document.getElementById('log-trade-modal').style.display = 'none';
+                await showJournal();
+            } catch(e) {
+                alert('Error: ' + e.message);
+            }
+        }
+
+        // ===== RISK DASHBOARD =====
+        // ═══ Insider Details Toggle & Fetch ═══
+        async function toggleInsiderDetails() {
+            const panel = document.getElementById('insider-details-panel');
+            if (panel.style.display === 'block') {
+                panel.style.display = 'none';
+                return;
+            }
+            panel.style.display = 'block';
+            const content = document.getElementById('insider-details-content');
+            content.innerHTML = 'Loading insider transactions...';
+
+            const ticker = window.currentInsiderTicker;
+            if (!ticker) { content.innerHTML = 'No ticker selected.'; return; }
+
+            try {
+                // Try universe data first, then portfolio data
+                let insiderData = null;
+                try {
+                    const res1 = await fetch('/api/insider_signals');
+                    const d1 = await res1.json();
+                    if (d1.signals && d1.signals[ticker]) insiderData = d1.signals[ticker];
+                } catch(e) {}
+
+                if (!insiderData) {
+                    content.innerHTML = `<p style="color:#666;">No insider data available for ${ticker}. Run the insider scan to populate.</p>`;
+                    return;
+                }
+
+                const score = insiderData.ins_score || 0;
+                const buys = insiderData.buys || 0;
+                const sells = insiderData.sells || 0;
+                const buyVal = insiderData.total_buy_value || 0;
+                const sellVal = insiderData.total_sell_value || 0;
+                const reasons = insiderData.reasons || [];
+                const details = insiderData.details || [];
+
+                let sigColor, sigEmoji, sigText;
+                if (score <= -3) { sigColor = '#ef4444'; sigEmoji = '🔴'; sigText = 'INSIDERS DUMPING'; }
+                else if (score >= 3) { sigColor = '#10b981'; sigEmoji = '🟢'; sigText = 'INSIDERS ACCUMULATING'; }
+                else { sigColor = '#94a3b8'; sigEmoji = '⚪'; sigText = 'NEUTRAL'; }
+
+                let html = `
+                    <div style="display:flex; gap:16px; margin-bottom:16px; flex-wrap:wrap;">
+                        <div style="background:${sigColor}15; border:1px solid ${sigColor}33; border-radius:8px; padding:12px 16px; flex:1; min-width:120px; text-align:center;">
+                            <div style="font-size:1.5rem; font-weight:800; color:${sigColor};">${sigEmoji} INS ${score >= 0 ? '+' : ''}${score}</div>
+                            <div style="font-size:0.7rem; color:${sigColor}; margin-top:4px;">${sigText}</div>
+                        </div>
+                        <div style="background:#1e293b; border-radius:8px; padding:12px 16px; flex:1; min-width:100px; text-align:center;">
+                            <div style="font-size:0.7rem; color:#666; text-transform:uppercase;">Buys</div>
+                            <div style="font-size:1.2rem; font-weight:700; color:#10b981;">${buys}</div>
+                            <div style="font-size:0.7rem; color:#666;">${buyVal >= 1e6 ? '$' + (buyVal/1e6).toFixed(1) + 'M' : '$' + buyVal.toLocaleString()}</div>
+                        </div>
+                        <div style="background:#1e293b; border-radius:8px; padding:12px 16px; flex:1; min-width:100px; text-align:center;">
+                            <div style="font-size:0.7rem; color:#666; text-transform:uppercase;">Sells</div>
+                            <div style="font-size:1.2rem; font-weight:700; color:#ef4444;">${sells}</div>
+                            <div style="font-size:0.7rem; color:#666;">${sellVal >= 1e6 ? '$' + (sellVal/1e6).toFixed(1) + 'M' : '$' + sellVal.toLocaleString()}</div>
+                        </div>
+                    </div>`;
+
+                if (reasons.length > 0) {
+                    html += '<div style="margin-bottom:12px;">';
+                    html += '<div style="font-size:0.75rem; color:#666; text-transform:uppercase; margin-bottom:6px;">Key Signals</div>';
+                    for (const r of reasons) {
+                        const isNeg = r.toLowerCase().includes('sell') || r.toLowerCase().includes('dump') || r.toLowerCase().includes('zero buy');
+                        const rColor = isNeg ? '#ef4444' : r.toLowerCase().includes('buy') ? '#10b981' : '#94a3b8';
+                        html += `<div style="padding:4px 0; font-size:0.8rem; color:${rColor};">• ${r}</div>`;
+                    }
+                    html += '</div>';
+                }
+
+                if (details.length > 0) {
+                    html += '<div style="font-size:0.75rem; color:#666; text-transform:uppercase; margin-bottom:6px; margin-top:12px;">Top Transactions</div>';
+                    html += '<table style="width:100%; font-size:0.8rem; border-collapse:collapse;">';
+                    html += '<tr style="color:#666; border-bottom:1px solid #222;"><th style="text-align:left; padding:4px;">Date</th><th style="text-align:left;">Insider</th><th>Type</th><th style="text-align:right;">Value</th></tr>';
+                    for (const d of details.slice(0, 8)) {
+                        const tColor = d.type === 'BUY' ? '#10b981' : '#ef4444';
+                        const val = d.value >= 1e6 ? '$' + (d.value/1e6).toFixed(1) + 'M' : '$' + (d.value || 0).toLocaleString();
+                        html += `<tr style="border-bottom:1px solid #1a1a1a;">
+                            <td style="padding:4px; color:#888;">${d.date || '—'}</td>
+                            <td style="padding:4px;">${(d.owner || '').substring(0, 20)}${d.title ? ' <span style=\"color:#555;\">(' + d.title.substring(0,15) + ')</span>' : ''}</td>
+                            <td style="padding:4px; color:${tColor}; font-weight:700; text-align:center;">${d.type}</td>
+                            <td style="padding:4px; text-align:right; color:${tColor};">${val}</td>
+                        </tr>`;
+                    }
+                    html += '</table>';
+                }
+
+                html += '<div style="font-size:0.65rem; color:#444; margin-top:12px;">Source: SEC EDGAR Form 4 · 90-day lookback · ⚠️ Some sales are pre-planned 10b5-1</div>';
+
+                content.innerHTML = html;
+            } catch(e) {
+                content.innerHTML = `<p style="color:#ef4444;">Error loading insider data: ${e.message}</p>`;
+            }
+        }
+
+        async function showRiskDashboard() {
+            if (location.hash !== '#risk') history.pushState(null, '', '#risk');
+            hideAllViews();
+            document.getElementById('risk-view').style.display = 'block';
+            updateActiveNav('risk');
+
+            try {
+                const res = await fetch('/api/portfolio_risk');
+                const data = await res.json();
+                if (data.error) throw new Error(data.error);
+                renderRiskDashboard(data);
+            } catch(e) {
+                document.getElementById('risk-updated').textContent = 'Error: ' + e.message;
+            }
+        }
+
+        function renderRiskDashboard(data) {
+            document.getElementById('risk-updated').textContent = 'Updated: ' + (data.timestamp || '');
+
+            // Summary cards
+            const beta = data.portfolio_beta;
+            const drop = data.estimated_drop_10pct;
+            const betaColor = beta > 1.3 ? '#ef4444' : beta > 1.0 ? '#eab308' : '#10b981';
+            const dropColor = drop > 12 ? '#ef4444' : drop > 8 ? '#eab308' : '#10b981';
+
+            document.getElementById('risk-summary').innerHTML = `
+                <div class="card" style="text-align:center; padding:16px;">
+                    <div style="font-size:0.8rem; color:var(--text-dim); text-transform:uppercase; margin-bottom:8px;">Portfolio Beta vs SPY</div>
+                    <div style="font-size:2.2rem; font-weight:800; color:${betaColor};">${beta !== null ? beta : '—'}</div>
+                    <div style="font-size:0.8rem; color:var(--text-dim); margin-top:4px;">${beta > 1 ? 'More volatile than market' : 'Less volatile than market'}</div>
+                </div>
+                <div class="card" style="text-align:center; padding:16px;">
+                    <div style="font-size:0.8rem; color:var(--text-dim); text-transform:uppercase; margin-bottom:8px;">If SPY drops 10%</div>
+                    <div style="font-size:2.2rem; font-weight:800; color:${dropColor};">~${drop !== null ? drop : '—'}%</div>
+                    <div style="font-size:0.8rem; color:var(--text-dim); margin-top:4px;">Estimated portfolio drawdown</div>
+                </div>
+                <div class="card" style="text-align:center; padding:16px;">
+                    <div style="font-size:0.8rem; color:var(--text-dim); text-transform:uppercase; margin-bottom:8px;">Top 5 Concentration</div>
+                    <div style="font-size:2.2rem; font-weight:800; color:${(data.concentration?.top5_total_pct || 0) > 50 ? '#ef4444' : '#10b981'};">${data.concentration?.top5_total_pct || 0}%</div>
+                    <div style="font-size:0.8rem; color:var(--text-dim); margin-top:4px;">of total portfolio weight</div>
+                </div>
+            `;
+
+            // Correlation heatmap
+            const names = data.basket_names || [];
+            const matrix = data.correlation_matrix || {};
+            if (names.length > 0) {
+                let tableHTML = '<table style="width:auto; font-size:0.8rem; border-collapse:collapse;">';
+                tableHTML += '<tr><th style="padding:8px;"></th>';
+                names.forEach(n => { tableHTML += `<th style="padding:8px; writing-mode:vertical-lr; transform:rotate(180deg); height:100px; font-size:0.7rem;">${n}</th>`; });
+                tableHTML += '</tr>';
+                names.forEach(row => {
+                    tableHTML += `<tr><td style="padding:8px; font-weight:600; white-space:nowrap; font-size:0.75rem;">${row}</td>`;
+                    names.forEach(col => {
+                        const val = matrix[row]?.[col];
+                        let bg = '#1e293b', textColor = 'var(--text-dim)';
+                        if (val !== null && val !== undefined) {
+                            if (val >= 0.7) { bg = 'rgba(239,68,68,0.3)'; textColor = '#ef4444'; }
+                            else if (val >= 0.4) { bg = 'rgba(234,179,8,0.2)'; textColor = '#eab308'; }
+                            else if (val >= 0) { bg = 'rgba(16,185,129,0.15)'; textColor = '#10b981'; }
+                            else { bg = 'rgba(56,189,248,0.15)'; textColor = '#38bdf8'; }
+                            if (row === col) { bg = '#334155'; textColor = 'white'; }
+                        }
+                        tableHTML += `<td style="padding:8px; text-align:center; background:${bg}; color:${textColor}; font-weight:600; min-width:50px; border:1px solid #1a1a2e;">${val !== null && val !== undefined ? val.toFixed(2) : '—'}</td>`;
+                    });
+                    tableHTML += '</tr>';
+                });
+                tableHTML += '</table>';
+                tableHTML += '<div style="margin-top:12px; font-size:0.75rem; color:var(--text-dim);"><span style="color:#ef4444;">■</span> High (>0.7) &nbsp; <span style="color:#eab308;">■</span> Moderate (0.4-0.7) &nbsp; <span style="color:#10b981;">■</span> Low (0-0.4) &nbsp; <span style="color:#38bdf8;">■</span> Negative</div>';
+                document.getElementById('risk-correlation').innerHTML = tableHTML;
+            } else {
+                document.getElementById('risk-correlation').innerHTML = '<p style="color:var(--text-dim);">Not enough data for correlation analysis.</p>';
+            }
+
+            // Concentration
+            const top5 = data.concentration?.top5 || [];
+            if (top5.length > 0) {
+                let concHTML = '<div style="display: flex; flex-direction: column; gap: 8px;">';
+                const maxWeight = Math.max(...top5.map(t => t.weight));
+                top5.forEach((t, i) => {
+                    const pct = maxWeight > 0 ? (t.weight / maxWeight * 100) : 0;
+                    concHTML += `
+                        <div style="display:flex; align-items:center; gap:12px;">
+                            <span style="font-weight:700; color:var(--accent); width:50px;">${t.ticker}</span>
+                            <div style="flex:1; height:20px; background:#1a1a2e; border-radius:4px; overflow:hidden;">
+                                <div style="height:100%; width:${pct}%; background: linear-gradient(90deg, var(--accent), #06b6d4); border-radius:4px;"></div>
+                            </div>
+                            <span style="font-weight:600; width:50px; text-align:right;">${t.weight.toFixed(1)}%</span>
+                        </div>`;
+                });
+                concHTML += '</div>';
+                document.getElementById('risk-concentration').innerHTML = concHTML;
+            }
+        }
+
+        // ===== SCREENER =====
+        let screenerData = [];
+        let screenerSort = { column: 'ewros_score', direction: 'desc' };
+
+        async function showScreener() {
+            if (location.hash !== '#screener') history.pushState(null, '', '#screener');
+            hideAllViews();
+            document.getElementById('screener-view').style.display = 'block';
+            updateActiveNav('screener');
+
+            // Populate sector dropdown from cached data
+            try {
+                const allData = await loadAllStocks();
+                const sectors = [...new Set(Object.values(allData.stocks || {}).map(s => s.sector).filter(Boolean))].sort();
+                const sel = document.getElementById('scr-sector');
+                if (sel.options.length <= 1) {
+                    sectors.forEach(s => {
+                        const opt = document.createElement('option');
+                        opt.value = s;
+                        opt.textContent = s;
+                        sel.appendChild(opt);
+                    });
+                }
+            } catch(e) {}
+        }
+
+        async function runScreener() {
+            const params = new URLSearchParams();
+            const priceMin = document.getElementById('scr-price-min').value;
+            const priceMax = document.getElementById('scr-price-max').value;
+            const volMin = document.getElementById('scr-vol-min').value;
+            const rotMin = document.getElementById('scr-rot-min').value;
+            const rotMax = document.getElementById('scr-rot-max').value;
+            const insMin = document.getElementById('scr-ins-min').value;
+            const insMax = document.getElementById('scr-ins-max').value;
+            const ewrosMin = document.getElementById('scr-ewros-min').value;
+            const ewrosMax = document.getElementById('scr-ewros-max').value;
+            const iqEdgeMin = document.getElementById('scr-iqedge-min').value;
+            const pegMax = document.getElementById('scr-peg-max').value;
+            const sector = document.getElementById('scr-sector').value;
+            const grades = [...document.querySelectorAll('.scr-grade:checked')].map(cb => cb.value).join(',');
+
+            if (priceMin) params.set('price_min', priceMin);
+            if (priceMax) params.set('price_max', priceMax);
+            if (volMin) params.set('vol_min', volMin);
+            if (rotMin) params.set('rotation_min', rotMin);
+            if (rotMax) params.set('rotation_max', rotMax);
+            if (insMin) params.set('ins_min', insMin);
+            if (insMax) params.set('ins_max', insMax);
+            if (ewrosMin) params.set('ewros_min', ewrosMin);
+            if (ewrosMax) params.set('ewros_max', ewrosMax);
+            if (iqEdgeMin) params.set('iq_edge_min', iqEdgeMin);
+            if (pegMax) params.set('peg_max', pegMax);
+            if (sector) params.set('sector', sector);
+            if (grades) params.set('grades', grades);
+            params.set('sort', screenerSort.column);
+            params.set('order', screenerSort.direction);
+
+            document.getElementById('screener-status').textContent = 'Screening...';
+
+            try {
+                const res = await fetch('/api/screener?' + params.toString());
+                const data = await res.json();
+                if (data.error) throw new Error(data.error);
+                screenerData = data.results;
+                document.getElementById('screener-status').textContent = `${data.total} matches found (showing ${data.results.length}) · ${data.timestamp}`;
+                renderScreenerTable();
+            } catch(e) {
+                document.getElementById('screener-status').textContent = 'Error: ' + e.message;
+            }
+        }
+
+        function renderScreenerTable() {
+            const tbody = document.getElementById('screener-tbody');
+            if (screenerData.length === 0) {
+                tbody.innerHTML = '<tr><td colspan="13" style="text-align:center; padding:40px; color:var(--text-dim);">No results. Adjust filters and try again.</td></tr>';
+                return;
+            }
+            tbody.innerHTML = screenerData.map(s => {
+                const rotColor = (s.ewros_score||0) >= 80 ? '#10b981' : (s.ewros_score||0) >= 60 ? '#eab308' : '#64748b';
+                const rsColor = (s.ewros_score||0) >= 80 ? '#10b981' : (s.ewros_score||0) >= 50 ? '#eab308' : '#64748b';
+                const gradeColor = s.grade === 'A' ? '#10b981' : s.grade === 'B' ? '#38bdf8' : s.grade === 'C' ? '#f59e0b' : '#ef4444';
+                const fmtVol = (v) => { if (!v) return '—'; if (v >= 1e6) return (v/1e6).toFixed(1)+'M'; if (v >= 1e3) return (v/1e3).toFixed(0)+'K'; return v.toFixed(0); };
+                return `<tr data-ticker="${s.ticker}">
+                    <td><a href="#" onclick="viewStock('${s.ticker}'); return false;" class="text-sky-400 hover:text-sky-300 font-bold">${s.ticker}</a></td>
+                    <td style="font-size:0.85rem; color:var(--text-dim);">${(s.name||'').substring(0, 25)}</td>
+                    <td style="font-weight:600;">$${(s.current_price||0).toFixed(2)}</td>
+                    <td style="font-size:0.85rem; color:var(--text-dim);">${fmtVol(s.avg_volume)}</td>
+                    <td style="font-size:0.8rem; color:var(--text-dim);">${s.sector || '—'}</td>
+                    <td style="font-weight:700; color:${rotColor};">${(s.ewros_score||0).toFixed(1)}</td>
+                    <td style="font-weight:600; color:${rsColor};">${s.ewros_score || '—'}</td>
+                    <td style="font-weight:700; color:${(s.iq_edge||0) >= 90 ? '#a855f7' : (s.iq_edge||0) >= 70 ? '#10b981' : (s.iq_edge||0) >= 40 ? '#eab308' : '#64748b'};">${s.iq_edge || '—'}</td>
+                    <td>${s.score || 0}</td>
+                    <td><span style="color:${gradeColor}; font-weight:700;">${s.grade || '—'}</span></td>
+                    <td>${renderInsiderBadge(s.ins_score, s.insider_signal, true)}</td>
+                    <td style="color:${(s.peg_ratio||0) < 1.5 ? '#10b981' : '#eab308'};">${s.peg_ratio ? s.peg_ratio.toFixed(2) : '—'}</td>
+                    <td class="text-amber-400 font-bold">${s.moonshot_score || 0}%</td>
+                    <td>
+                        <button onclick="viewStock('${s.ticker}')" class="text-xs bg-slate-700 px-3 py-1 rounded hover:bg-slate-600 transition">Analyze</button>
+                        <a href="#report/${s.ticker}" class="text-xs text-sky-400 hover:text-sky-300 ml-1">Report</a>
+                    </td>
+                </tr>`;
+            }).join('');
+            setNavContext(screenerData.map(s => s.ticker));
+        }
+
+        function sortScreener(col) {
+            if (screenerSort.column === col) {
+                screenerSort.direction = screenerSort.direction === 'desc' ? 'asc' : 'desc';
+            } else {
+                screenerSort.column = col;
+                screenerSort.direction = col === 'ticker' || col === 'name' || col === 'sector' ? 'asc' : 'desc';
+            }
+            if (screenerData.length > 0) runScreener();
+        }
+
+        // ===== REPORT CARD =====
+        async function showReportCard(ticker) {
+            if (!ticker) return;
+            ticker = ticker.toUpperCase();
+            if (location.hash !== `#report/${ticker}`) history.pushState(null, '', `#report/${ticker}`);
+            hideAllViews();
+            document.getElementById('report-view').style.display = 'block';
+            document.getElementById('report-content').innerHTML = '<p style="color:var(--text-dim);">Loading report card...</p>';
+
+            try {
+                const res = await fetch(`/api/report/${ticker}`);
+                const s = await res.json();
+                if (s.error) throw new Error(s.error);
+
+                const gradeColors = {A:'#059669',B:'#0284c7',C:'#d97706',D:'#7c3aed',F:'#dc2626'};
+                const gc = gradeColors[s.grade] || '#64748b';
+                const rotColor = (s.ewros_score||0) >= 80 ? '#10b981' : (s.ewros_score||0) >= 60 ? '#eab308' : '#64748b';
+                const rsColor = (s.ewros_score||0) >= 80 ? '#10b981' : (s.ewros_score||0) >= 50 ? '#eab308' : '#64748b';
+                let insColor, insEmoji, insText;
+                if ((s.ins_score||0) <= -3) { insColor = '#ef4444'; insEmoji = '🔴'; insText = 'Dumping'; }
+                else if ((s.ins_score||0) >= 3) { insColor = '#10b981'; insEmoji = '🟢'; insText = 'Buying'; }
+                else { insColor = '#94a3b8'; insEmoji = '⚪'; insText = 'Neutral'; }
+
+                document.getElementById('report-content').innerHTML = `
+                    <div style="margin-bottom:24px;">
+                        <div style="display:flex; align-items:center; gap:16px; flex-wrap:wrap;">
+                            <h1 style="font-size:2rem; font-weight:800; margin:0;">${s.name || ticker}</h1>
+                            <span class="grade-badge grade-${s.grade}" style="font-size:1.2rem; padding:6px 20px;">${s.grade}</span>
+                        </div>
+                        <div style="color:var(--text-dim); font-size:0.9rem; margin-top:4px;">${ticker} · ${s.sector || '—'} · ${s.industry || '—'}</div>
+                    </div>
+
+                    <div style="display:grid; grid-template-columns:repeat(auto-fill, minmax(140px, 1fr)); gap:12px; margin-bottom:24px;">
+                        <div class="card" style="text-align:center; padding:14px;">
+                            <div style="font-size:0.7rem; color:var(--text-dim); text-transform:uppercase;">Score</div>
+                            <div style="font-size:1.6rem; font-weight:800; color:${gc};">${s.score || 0}/100</div>
+                        </div>
+                        <div class="card" style="text-align:center; padding:14px;">
+                            <div style="font-size:0.7rem; color:var(--text-dim); text-transform:uppercase;">EWROS</div>
+                            <div style="font-size:1.6rem; font-weight:800; color:${rotColor};">${(s.ewros_score||0).toFixed(1)}</div>
+                        </div>
+                        <div class="card" style="text-align:center; padding:14px;">
+                            <div style="font-size:0.7rem; color:var(--text-dim); text-transform:uppercase;">EWROS</div>
+                            <div style="font-size:1.6rem; font-weight:800; color:${rsColor};">${s.ewros_score || '—'}</div>
+                        </div>
+                        <div class="card" style="text-align:center; padding:14px;">
+                            <div style="font-size:0.7rem; color:var(--text-dim); text-transform:uppercase;">Moonshot</div>
+                            <div style="font-size:1.6rem; font-weight:800; color:#f59e0b;">${s.moonshot_score || 0}%</div>
+                        </div>
+                        <div class="card" style="text-align:center; padding:14px;">
+                            <div style="font-size:0.7rem; color:var(--text-dim); text-transform:uppercase;">Insider</div>
+                            <div style="font-size:1.6rem; font-weight:800; color:${insColor};">${insEmoji} ${s.ins_score >= 0 ? '+' : ''}${s.ins_score||0}</div>
+                            <div style="font-size:0.65rem; color:${insColor};">${insText}</div>
+                        </div>
+                        <div class="card" style="text-align:center; padding:14px;">
+                            <div style="font-size:0.7rem; color:var(--text-dim); text-transform:uppercase;">Price</div>
+                            <div style="font-size:1.6rem; font-weight:800;">$${s.current_price ? s.current_price.toFixed(2) : '—'}</div>
+                        </div>
+                    </div>
+
+                    <div style="display:grid; grid-template-columns:1fr 1fr; gap:16px; margin-bottom:24px;">
+                        <div class="card">
+                            <h3 style="font-weight:700; font-size:0.9rem; margin-bottom:12px; color:var(--text-dim); text-transform:uppercase;">Factor Breakdown</h3>
+                            <div style="display:grid; grid-template-columns:1fr 1fr; gap:8px;">
+                                <div style="display:flex; justify-content:space-between;"><span style="color:var(--text-dim);">Technical</span><span style="font-weight:700; color:#38bdf8;">${s.technical_score || 0}</span></div>
+                                <div style="display:flex; justify-content:space-between;"><span style="color:var(--text-dim);">Growth</span><span style="font-weight:700; color:#10b981;">${s.growth_score || 0}</span></div>
+                                <div style="display:flex; justify-content:space-between;"><span style="color:var(--text-dim);">Quality</span><span style="font-weight:700; color:#a78bfa;">${s.quality_score || 0}</span></div>
+                                <div style="display:flex; justify-content:space-between;"><span style="color:var(--text-dim);">Context</span><span style="font-weight:700; color:#f59e0b;">${s.context_score || 0}</span></div>
+                            </div>
+                        </div>
+                        <div class="card">
+                            <h3 style="font-weight:700; font-size:0.9rem; margin-bottom:12px; color:var(--text-dim); text-transform:uppercase;">Valuation & Analyst</h3>
+                            <div style="display:grid; grid-template-columns:1fr 1fr; gap:8px;">
+                                <div style="display:flex; justify-content:space-between;"><span style="color:var(--text-dim);">Forward PE</span><span style="font-weight:700;">${s.forward_pe ? s.forward_pe.toFixed(2) : 'N/A'}</span></div>
+                                <div style="display:flex; justify-content:space-between;"><span style="color:var(--text-dim);">PEG Ratio</span><span style="font-weight:700; color:${s.peg_ratio && s.peg_ratio < 1.5 ? '#10b981' : '#eab308'};">${s.peg_ratio ? s.peg_ratio.toFixed(2) : 'N/A'}</span></div>
+                                <div style="display:flex; justify-content:space-between;"><span style="color:var(--text-dim);">Rev Growth</span><span style="font-weight:700; color:${(s.revenue_growth||0) > 0 ? '#10b981' : '#ef4444'};">${s.revenue_growth ? s.revenue_growth.toFixed(1) + '%' : 'N/A'}</span></div>
+                                <div style="display:flex; justify-content:space-between;"><span style="color:var(--text-dim);">Recommendation</span><span style="font-weight:700;">${s.recommendation ? s.recommendation.toUpperCase() : 'N/A'}</span></div>
+                                <div style="display:flex; justify-content:space-between;"><span style="color:var(--text-dim);">Target Price</span><span style="font-weight:700;">${s.target_mean ? '$' + s.target_mean.toFixed(2) : 'N/A'}</span></div>
+                                <div style="display:flex; justify-content:space-between;"><span style="color:var(--text-dim);">Analysts</span><span style="font-weight:700;">${s.analyst_count || 0}</span></div>
+                            </div>
+                        </div>
+                    </div>
+
+                    <div style="text-align:center; margin-top:16px;">
+                        <button onclick="viewStock('${ticker}')" style="background:var(--accent); color:#000; border:none; padding:10px 24px; border-radius:8px; font-weight:700; cursor:pointer; margin-right:8px;">Full Analysis</button>
+                    </div>
+                `;
+            } catch(e) {
+                document.getElementById('report-content').innerHTML = `<p style="color:#ef4444;">Error loading report: ${e.message}</p>`;
+            }
+        }
+
+        function shareReport() {
+            const url = window.location.href;
+            navigator.clipboard.writeText(url).then(() => {
+                const btn = document.getElementById('report-share-btn');
+                btn.textContent = 'Copied!';
+                setTimeout(() => { btn.textContent = 'Share Link'; }, 2000);
+            }).catch(() => {
+                prompt('Copy this URL:', url);
+            });
+        }
+
+        // ===== ALERTS =====
+        let alertsData = [];
+
+        async function showAlerts() {
+            if (location.hash !== '#alerts') history.pushState(null, '', '#alerts');
+            hideAllViews();
+            document.getElementById('alerts-view').style.display = 'block';
+            updateActiveNav('alerts');
+
+            try {
+                const res = await fetch('/api/alerts');
+                const data = await res.json();
+                alertsData = data.alerts || [];
+                renderAlerts();
+            } catch(e) {
+                document.getElementById('alerts-tbody').innerHTML = `<tr><td colspan="6" style="text-align:center; padding:40px; color:#ef4444;">Error: ${e.message}</td></tr>`;
+            }
+        }
+
+        function renderAlerts() {
+            // Triggered alerts banner
+            const triggered = alertsData.filter(a => a.triggered);
+            const triggeredEl = document.getElementById('triggered-alerts');
+            if (triggered.length > 0) {
+                triggeredEl.innerHTML = triggered.map(a => `
+                    <div style="background:rgba(234,179,8,0.1); border:1px solid rgba(234,179,8,0.3); border-radius:8px; padding:10px 14px; margin-bottom:8px; display:flex; justify-content:space-between; align-items:center;">
+                        <span>
+                            <span style="color:#eab308; font-weight:700;">${a.ticker}</span>
+                            <span style="color:var(--text-dim); font-size:0.85rem; margin-left:8px;">${formatAlertType(a.type)} ${a.threshold} — triggered at ${a.current_value}</span>
+                        </span>
+                        <span style="font-size:0.75rem; color:var(--text-dim);">${a.triggered_at ? new Date(a.triggered_at).toLocaleString() : ''}</span>
+                    </div>
+                `).join('');
+            } else {
+                triggeredEl.innerHTML = '';
+            }
+
+            // Table
+            const tbody = document.getElementById('alerts-tbody');
+            if (alertsData.length === 0) {
+                tbody.innerHTML = '<tr><td colspan="6" style="text-align:center; padding:40px; color:var(--text-dim);">No alerts configured. Create one above.</td></tr>';
+                return;
+            }
+            tbody.innerHTML = alertsData.map(a => {
+                const statusColor = a.triggered ? '#eab308' : '#10b981';
+                const statusLabel = a.triggered ? 'TRIGGERED' : 'ACTIVE';
+                return `<tr>
+                    <td style="font-weight:700; color:var(--accent); cursor:pointer;" onclick="viewStock('${a.ticker}')">${a.ticker}</td>
+                    <td style="font-size:0.85rem;">${formatAlertType(a.type)}</td>
+                    <td style="font-weight:600;">${a.threshold}</td>
+                    <td><span style="color:${statusColor}; font-weight:600; font-size:0.8rem;">${statusLabel}</span>${a.current_value !== null && a.triggered ? ` (${a.current_value})` : ''}</td>
+                    <td style="font-size:0.8rem; color:var(--text-dim);">${a.created_at ? new Date(a.created_at).toLocaleDateString() : '—'}</td>
+                    <td><button onclick="deleteAlert(${a.id})" style="background:transparent; border:1px solid #374151; color:#ef4444; padding:4px 8px; border-radius:4px; cursor:pointer; font-size:0.75rem;">Delete</button></td>
+                </tr>`;
+            }).join('');
+        }
+
+        function formatAlertType(type) {
+            const labels = {
+                'price_above': 'Price >=',
+                'price_below': 'Price <=',
+                'ewros_above': 'Rotation >=',
+                'ewros_below': 'Rotation <=',
+                'ins_above': 'INS >=',
+                'ins_below': 'INS <='
+            };
+            return labels[type] || type;
+        }
+
+        async function createAlert() {
+            const ticker = document.getElementById('alert-ticker').value.trim().toUpperCase();
+            const type = document.getElementById('alert-type').value;
+            const threshold = parseFloat(document.getElementById('alert-threshold').value);
+            if (!ticker || isNaN(threshold)) { alert('Enter ticker and threshold'); return; }
+
+            try {
+                const res = await fetch('/api/alerts', {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/json' },
+                    body: JSON.stringify({ ticker, type, threshold })
+                });
+                const result = await res.json();
+                if (!res.ok) throw new Error(result.error || 'Failed');
+                document.getElementById('alert-ticker').value = '';
+                document.getElementById('alert-threshold').value = '';
+                await showAlerts();
+            } catch(e) {
+                alert('Error: ' + e.message);
+            }
+        }
+
+        async function deleteAlert(id) {
+            try {
+                const res = await fetch(`/api/alerts/${id}`, { method: 'DELETE' });
+                if (!res.ok) throw new Error('Delete failed');
+                alertsData = alertsData.filter(a => a.id !== id);
+                renderAlerts();
+            } catch(e) {
+                alert('Error: ' + e.message);
+            }
+        }
+
+        // ═══════════════════════════════════════════════════════════
+        // DEEP RESEARCH TAB
+        // ═══════════════════════════════════════════════════════════
+
+        const RESEARCH_AGENTS_DEEP = ['Data Scout', 'Planner', 'Researcher', 'Quant Analyst', 'Qual Analyst', 'Moderator', 'Writer', 'Risk Analyst'];
+        const RESEARCH_AGENTS_QUICK = ["Data Scout", "Planner", "Data Gathering", "Researcher"];
+        let RESEARCH_AGENTS = RESEARCH_AGENTS_DEEP;
+        // Point to dedicated research server (Mac mini) — no Vercel timeout limits
+        // Set to null to use Vercel's built-in /api/research/stream (60s timeout)
+        window.RESEARCH_SERVER_URL = null;  // Will be set after we start the server
+        let researchEventSource = null;
+        let lastResearchQuery = '';
+        let lastReportMarkdown = '';
+
+        function showResearch() {
+            if (location.hash !== '#research') history.pushState(null, '', '#research');
+            hideAllViews();
+            document.getElementById('research-view').style.display = 'block';
+            updateActiveNav('research');
+            loadResearchHistory();
+        }
+
+        function stopResearch() {
+            if (researchEventSource) { researchEventSource.close(); researchEventSource = null; }
+            if (window._researchAbort) { window._researchAbort.abort(); window._researchAbort = null; }
+            const btn = document.getElementById('research-btn');
+            btn.disabled = false;
+            btn.textContent = '🔬 Research';
+            btn.style.opacity = '1';
+            btn.style.background = 'var(--accent)';
+        }
+
+        function startResearch() {
+            // If already running, stop it
+            if (researchEventSource || window._researchAbort) {
+                stopResearch();
+                return;
+            }
+
+            const query = document.getElementById('research-query').value.trim();
+            if (!query) return;
+            lastResearchQuery = query;
+
+            window._researchDone = false;
+            window._researchDraft = '';
+            // Set agent list based on mode
+            RESEARCH_AGENTS = (window._researchMode === 'fast') ? RESEARCH_AGENTS_QUICK : RESEARCH_AGENTS_DEEP;
+
+            // Reset UI
+            const btn = document.getElementById('research-btn');
+            btn.disabled = false;
+            btn.textContent = '⏹ Stop';
+            btn.style.opacity = '1';
+            btn.style.background = '#ef4444';
+
+            document.getElementById('research-progress').style.display = 'block';
+            document.getElementById('research-report').style.display = 'none';
+            document.getElementById('research-risk').style.display = 'none';
+            document.getElementById('research-error').style.display = 'none';
+            document.getElementById('research-substeps').innerHTML = '';
+
+            // Initialize agent status display
+            const agentsEl = document.getElementById('research-agents');
+            agentsEl.innerHTML = RESEARCH_AGENTS.map(name => `
+                <div id="ra-${name.replace(/\s/g,'')}" style="display:flex;align-items:center;gap:10px;padding:8px 12px;background:#0f172a;border-radius:8px;border:1px solid #2d3748;">
+                    <span class="ra-icon" style="font-size:1.1rem;">⏳</span>
+                    <span style="flex:1;font-weight:600;font-size:0.85rem;">${name}</span>
+                    <span class="ra-status" style="font-size:0.75rem;color:var(--text-dim);">Waiting</span>
+                </div>
+            `).join('');
+
+            updateResearchProgress(0);
+
+            // Start SSE
+            window._researchAbort = new AbortController();
+            window._researchSessionId = crypto.randomUUID();
+            // Auto-timeout (Vercel maxDuration: 300s)
+            window._researchTimeout = setTimeout(() => {
+                const reportVisible = document.getElementById('research-report').style.display === 'block';
+                if (window._researchAbort && !reportVisible) {
+                    handleResearchEvent('error', {message: 'Timed out after 5 minutes. Try a simpler query or fewer tickers.'});
+                    stopResearch();
+                }
+            }, 290000);
+            // Research API — use dedicated server if configured, otherwise local
+            window._researchLastEventId = 0;
+            openResearchStream({ query, session_id: window._researchSessionId, mode: window._researchMode || 'deep' }, 0);
+        }
+
+        function openResearchStream(body, attempt) {
+            // Reposting the same session_id re-attaches to the running job; Last-Event-ID skips what we already have
+            const RESEARCH_API = window.RESEARCH_SERVER_URL || '/api/research/stream';
+            const headers = { 'Content-Type': 'application/json' };
+            if (window._researchLastEventId) headers['Last-Event-ID'] = String(window._researchLastEventId);
+            const signal = window._researchAbort && window._researchAbort.signal;
+            const reconnect = (err) => {
+                if (window._researchDone || !window._researchAbort || window._researchAbort.signal !== signal) return;
+                if (attempt < 3) {
+                    setTimeout(() => openResearchStream(body, attempt + 1), 1000 * (attempt + 1));
+                    return;
+                }
+                handleResearchEvent('error', { message: err ? err.message : 'Connection lost' });
+                finishResearch();
+            };
+            fetch(RESEARCH_API, {
+                method: 'POST',
+                headers,
+                body: JSON.stringify(body),
+                signal
+            }).then(response => {
+                if (!response.ok) {
+                    // Rejected before streaming (busy queue, per-user limit, duplicate session)
+                    return response.json().catch(() => ({})).then(data => {
+                        handleResearchEvent('error', { message: data.error || `Research request failed (${response.status})` });
+                        finishResearch();
+                    });
+                }
+                const reader = response.body.getReader();
+                const decoder = new TextDecoder();
+                let buffer = '';
+
+                function readStream() {
+                    reader.read().then(({ done, value }) => {
+                        if (done) {
+                            if (window._researchDone) finishResearch(); else reconnect(null);
+                            return;
+                        }
+                        buffer += decoder.decode(value, { stream: true });
+                        const lines = buffer.split('\n');
+                        buffer = lines.pop();
+                        let eventType = '';
+                        let eventId = 0;
+                        for (const line of lines) {
+                            if (line.startsWith('id: ')) {
+                                eventId = parseInt(line.slice(4), 10) || 0;
+                            } else if (line.startsWith('event: ')) {
+                                eventType = line.slice(7).trim();
+                            } else if (line.startsWith('data: ') && eventType) {
+                                if (eventId) window._researchLastEventId = eventId;
+                                try {
+                                    const data = JSON.parse(line.slice(6));
+                                    handleResearchEvent(eventType, data);
+                                } catch(e) {}
+                                eventType = '';
+                                eventId = 0;
+                            }
+                        }
+                        readStream();
+                    }).catch(err => {
+                        if (err.name === 'AbortError') { finishResearch(); return; }
+                        reconnect(err);
+                    });
+                }
+                readStream();
+            }).catch(err => {
+                if (err.name === 'AbortError') { finishResearch(); return; }
+                reconnect(err);
+            });
+        }
+
+        function handleResearchEvent(type, data) {
+            // Ignore events from other sessions
+            if (data && data._session_id && data._session_id !== window._researchSessionId) return;
+            if (type === 'agent_start') {
+                const id = 'ra-' + data.agent.replace(/\s/g, '');
+                const el = document.getElementById(id);
+                if (el) {
+                    el.querySelector('.ra-icon').textContent = '🔄';
+                    el.querySelector('.ra-status').textContent = data.description || 'Running...';
+                    el.querySelector('.ra-status').style.color = 'var(--accent)';
+                    el.style.borderColor = 'var(--accent)';
+                }
+                // Update progress
+                const idx = RESEARCH_AGENTS.indexOf(data.agent);
+                if (idx >= 0) updateResearchProgress(Math.round((idx / RESEARCH_AGENTS.length) * 100));
+            }
+            else if (type === 'agent_done') {
+                const id = 'ra-' + data.agent.replace(/\s/g, '');
+                const el = document.getElementById(id);
+                if (el) {
+                    el.querySelector('.ra-icon').textContent = '✅';
+                    el.querySelector('.ra-status').textContent = 'Done';
+                    el.querySelector('.ra-status').style.color = '#10b981';
+                    el.style.borderColor = '#10b981';
+                }
+                const idx = RESEARCH_AGENTS.indexOf(data.agent);
+                if (idx >= 0) updateResearchProgress(Math.round(((idx + 1) / RESEARCH_AGENTS.length) * 100));
+            }
+            else if (type === 'queued') {
+                // Waiting for a free research worker
+                const el = document.getElementById('research-substeps');
+                let step = document.getElementById('research-queued');
+                if (!step) {
+                    step = document.createElement('div');
+                    step.id = 'research-queued';
+                    step.style.cssText = 'padding:2px 0;';
+                    el.appendChild(step);
+                }
+                step.textContent = `→ Queued: position ${data.position} of ${data.queue_depth} (~${Math.max(1, Math.round(data.eta_seconds / 60))} min)`;
+            }
+            else if (type === 'researcher_step') {
+                const el = document.getElementById('research-substeps');
+                const step = document.createElement('div');
+                step.textContent = '→ ' + data.step;
+                step.style.cssText = 'padding:2px 0;opacity:0;animation:fadeIn 0.3s forwards;';
+                el.appendChild(step);
+                el.scrollTop = el.scrollHeight;
+            }
+            else if (type === 'report_delta') {
+                // Live preview of the report while the Writer streams; replaced by the final 'complete' event
+                if (data.reset) window._researchDraft = '';
+                window._researchDraft = (window._researchDraft || '') + (data.text || '');
+                if (!window._researchDraftPending) {
+                    window._researchDraftPending = true;
+                    requestAnimationFrame(() => {
+                        window._researchDraftPending = false;
+                        if (window._researchDone) return;
+                        document.getElementById('research-report').style.display = 'block';
+                        document.getElementById('research-report-body').innerHTML =
+                            renderMarkdown(window._researchDraft.replace(/SELF_EVAL:\w*/g, ''));
+                    });
+                }
+            }
+            else if (type === 'complete') {
+                window._researchDone = true;
+                lastReportMarkdown = data.report || '';
+                document.getElementById('research-report').style.display = 'block';
+                document.getElementById("research-timestamp").textContent = new Date().toLocaleString("en-US", {weekday:"short", month:"short", day:"numeric", year:"numeric", hour:"2-digit", minute:"2-digit", timeZoneName:"short"});
+                document.getElementById('research-report-body').innerHTML = renderMarkdown(data.report || '');
+
+                if (data.risk_flags) {
+                    document.getElementById('research-risk').style.display = 'block';
+                    document.getElementById('research-risk-body').innerHTML = renderMarkdown(data.risk_flags);
+                }
+                updateResearchProgress(100);
+                loadResearchHistory();
+                finishResearch();
+            }
+            else if (type === 'error') {
+                if (window._researchDone) return;  // Ignore errors after successful completion
+                document.getElementById('research-error').style.display = 'block';
+                document.getElementById('research-error-msg').textContent = data.message || 'Unknown error';
+                finishResearch();
+            }
+        }
+
+        function finishResearch() {
+            if (window._researchTimeout) { clearTimeout(window._researchTimeout); window._researchTimeout = null; }
+            window._researchAbort = null;
+            researchEventSource = null;
+            const btn = document.getElementById('research-btn');
+            btn.disabled = false;
+            btn.textContent = '🔬 Research';
+            btn.style.opacity = '1';
+            btn.style.background = 'var(--accent)';
+        }
+
+        function updateResearchProgress(pct) {
+            document.getElementById('research-progress-bar').style.width = pct + '%';
+            document.getElementById('research-progress-pct').textContent = pct + '%';
+        }
+
+        function rerunResearch() {
+            if (lastResearchQuery) {
+                document.getElementById('research-query').value = lastResearchQuery;
+                startResearch();
+            }
+        }
+
+        function copyReport() {
+            if (lastReportMarkdown) {
+                navigator.clipboard.writeText(lastReportMarkdown).then(() => {
+                    const btn = event.target;
+                    btn.textContent = 'Copied!';
+                    setTimeout(() => btn.textContent = 'Copy', 1500);
+                });
+            }
+        }
+
+        function downloadReport() {
+            if (!lastReportMarkdown) return;
+            const blob = new Blob([lastReportMarkdown], { type: 'text/plain' });
+            const url = URL.createObjectURL(blob);
+            const a = document.createElement('a');
+            a.href = url;
+            a.download = `research_${lastResearchQuery.replace(/[^a-zA-Z0-9]/g, '_').slice(0, 40)}.txt`;
+            a.click();
+            URL.revokeObjectURL(url);
+        }
+
+        function _buildShareHTML() {
+            const body = document.getElementById('research-report-body').innerHTML;
+            const timestamp = document.getElementById('research-timestamp').textContent;
+            return `<!DOCTYPE html>
+<html><head><meta charset="utf-8"><meta name="viewport" content="width=device-width,initial-scale=1">
+<title>IQ Investor Research: ${lastResearchQuery}</title>
+<style>
+body{font-family:-apple-system,BlinkMacSystemFont,'Segoe UI',Roboto,sans-serif;max-width:800px;margin:0 auto;padding:20px 16px;color:#1a1a2e;line-height:1.6;background:#fafafa}
+h1{color:#0f172a;border-bottom:3px solid #3b82f6;padding-bottom:8px;font-size:1.5rem}
+h2{color:#1e293b;margin-top:28px;font-size:1.2rem;border-bottom:1px solid #e2e8f0;padding-bottom:4px}
+h3{color:#334155;font-size:1rem}
+table{border-collapse:collapse;width:100%;margin:12px 0;font-size:0.85rem}
+th,td{border:1px solid #cbd5e1;padding:8px 12px;text-align:left}
+th{background:#f1f5f9;font-weight:600}
+tr:nth-child(even){background:#f8fafc}
+ul,ol{padding-left:20px}
+li{margin:4px 0}
+strong{color:#0f172a}
+blockquote{border-left:4px solid #3b82f6;margin:12px 0;padding:8px 16px;background:#eff6ff;color:#1e40af}
+code{background:#f1f5f9;padding:2px 6px;border-radius:4px;font-size:0.85em}
+.header{text-align:center;margin-bottom:24px;padding:16px;background:linear-gradient(135deg,#0f172a,#1e293b);color:white;border-radius:8px}
+.header h1{color:white;border:none;margin:0}
+.header .meta{color:#94a3b8;font-size:0.85rem;margin-top:4px}
+.footer{margin-top:32px;padding-top:12px;border-top:1px solid #e2e8f0;color:#94a3b8;font-size:0.75rem;text-align:center}
+</style></head><body>
+<div class="header"><h1>🔬 IQ Investor Research</h1><div class="meta">${lastResearchQuery} • ${timestamp}</div></div>
+${body}
+<div class="footer">Generated by The IQ Investor • theiqinvestor.com</div>
+</body></html>`;
+        }
+
+        async function shareReport() {
+            if (!lastReportMarkdown) return;
+            const html = _buildShareHTML();
+            const filename = 'research_' + lastResearchQuery.replace(/[^a-zA-Z0-9]/g, '_').slice(0, 40) + '.html';
+
+            // Try native Web Share API (works on mobile + macOS Safari)
+            if (navigator.share && navigator.canShare) {
+                try {
+                    const file = new File([html], filename, { type: 'text/html' });
+                    if (navigator.canShare({ files: [file] })) {
+                        await navigator.share({
+                            title: 'IQ Investor Research: ' + lastResearchQuery,
+                            files: [file]
+                        });
+                        return;
+                    }
+                } catch(e) {
+                    if (e.name === 'AbortError') return; // user cancelled
+                }
+                // Fallback: share as text
+                try {
+                    await navigator.share({
+                        title: 'IQ Investor Research: ' + lastResearchQuery,
+                        text: lastReportMarkdown
+                    });
+                    return;
+                } catch(e) {
+                    if (e.name === 'AbortError') return;
+                }
+            }
+
+            // Fallback: email via mailto
+            const subject = encodeURIComponent('IQ Investor Research: ' + lastResearchQuery);
+            const body = encodeURIComponent(lastReportMarkdown.slice(0, 1500) + '\n\n... [Full report attached as HTML]');
+            window.open('mailto:?subject=' + subject + '&body=' + body);
+
+            // Also download the HTML file
+            const blob = new Blob([html], { type: 'text/html' });
+            const url = URL.createObjectURL(blob);
+            const a = document.createElement('a');
+            a.href = url;
+            a.download = filename;
+            a.click();
+            URL.revokeObjectURL(url);
+        }
+
+        async function loadResearchHistory() {
+            const el = document.getElementById('research-history');
+            try {
+                const res = await fetch('/api/reports');
+                const data = await res.json();
+                const reports = data.reports || [];
+                if (reports.length === 0) {
+                    el.innerHTML = '<div style="color:var(--text-dim);font-size:0.8rem;padding:8px;">No reports yet.</div>';
+                    return;
+                }
+                el.innerHTML = reports.map(r => `
+                    <div onclick="loadReport('${r.id}')" style="padding:10px 12px;background:#0f172a;border-radius:8px;cursor:pointer;border:1px solid #2d3748;transition:border-color 0.2s;"
+                         onmouseover="this.style.borderColor='var(--accent)'" onmouseout="this.style.borderColor='#2d3748'">
+                        <div style="font-size:0.82rem;font-weight:600;color:var(--text);margin-bottom:4px;overflow:hidden;text-overflow:ellipsis;white-space:nowrap;">${escapeHtml(r.query)}</div>
+                        <div style="font-size:0.7rem;color:var(--text-dim);">${r.tickers ? r.tickers.join(', ') : ''} · ${new Date(r.created_at).toLocaleDateString()}</div>
+                    </div>
+                `).join('');
+            } catch(e) {
+                el.innerHTML = '<div style="color:var(--text-dim);font-size:0.8rem;padding:8px;">Could not load history.</div>';
+            }
+        }
+
+        async function loadReport(id) {
+            try {
+                const res = await fetch(`/api/reports/${id}`);
+                const data = await res.json();
+                if (data.error) throw new Error(data.error);
+
+                lastReportMarkdown = data.report || '';
+                lastResearchQuery = data.query || '';
+                document.getElementById('research-query').value = data.query || '';
+
+                document.getElementById('research-progress').style.display = 'none';
+                document.getElementById('research-error').style.display = 'none';
+                document.getElementById('research-report').style.display = 'block';
+                document.getElementById('research-report-body').innerHTML = renderMarkdown(data.report || '');
+                document.getElementById("research-timestamp").textContent = new Date().toLocaleString("en-US", {weekday:"short", month:"short", day:"numeric", year:"numeric", hour:"2-digit", minute:"2-digit", timeZoneName:"short"});
+
+                if (data.risk_flags) {
+                    document.getElementById('research-risk').style.display = 'block';
+                    document.getElementById('research-risk-body').innerHTML = renderMarkdown(data.risk_flags);
+                } else {
+                    document.getElementById('research-risk').style.display = 'none';
+                }
+            } catch(e) {
+                alert('Error loading report: ' + e.message);
+            }
+        }
+
+        function escapeHtml(str) {
+            const div = document.createElement('div');
+            div.textContent = str;
+            return div.innerHTML;
+        }
+
+        function renderMarkdown(md) {
+            if (!md) return '';
+            // Simple markdown → HTML converter
+            let html = md
+                // Code blocks
+                .replace(/```(\w*)\n([\s\S]*?)```/g, '<pre style="background:#0f172a;padding:12px;border-radius:8px;overflow-x:auto;font-size:0.85rem;border:1px solid #2d3748;"><code>$2</code></pre>')
+                // Headers
+                .replace(/^#### (.+)$/gm, '<h4 style="font-weight:700;font-size:0.9rem;margin:10px 0 4px;color:var(--text);">$1</h4>')
+                .replace(/^### (.+)$/gm, '<h3 style="font-weight:700;font-size:1rem;margin:14px 0 6px;color:var(--text);">$1</h3>')
+                .replace(/^## (.+)$/gm, '<h2 style="font-weight:700;font-size:1.1rem;margin:18px 0 6px;color:var(--accent);">$1</h2>')
+                .replace(/^# (.+)$/gm, '<h1 style="font-weight:800;font-size:1.25rem;margin:0 0 10px;color:var(--text);">$1</h1>')
+                // Bold & italic
+                .replace(/\*\*\[HIGH\]\*\*/g, '<span style="color:#ef4444;font-weight:700;">[HIGH]</span>')
+                .replace(/\*\*\[MEDIUM\]\*\*/g, '<span style="color:#eab308;font-weight:700;">[MEDIUM]</span>')
+                .replace(/\*\*\[LOW\]\*\*/g, '<span style="color:#10b981;font-weight:700;">[LOW]</span>')
+                .replace(/\*\*(.+?)\*\*/g, '<strong>$1</strong>')
+                .replace(/\*(.+?)\*/g, '<em>$1</em>')
+                // Inline code
+                .replace(/`([^`]+)`/g, '<code style="background:#0f172a;padding:2px 6px;border-radius:4px;font-size:0.85rem;">$1</code>')
+                // Unordered lists
+                .replace(/^[-*] (.+)$/gm, '<li style="margin-left:20px;margin-bottom:2px;">$1</li>')
+                // Ordered lists
+                .replace(/^\d+\. (.+)$/gm, '<li style="margin-left:20px;margin-bottom:2px;list-style-type:decimal;">$1</li>')
+                // Horizontal rule
+                .replace(/^---$/gm, '<hr style="border:none;border-top:1px solid #2d3748;margin:12px 0;">')
+                // Paragraphs (double newlines)
+                .replace(/\n\n/g, '</p><p style="margin-bottom:6px;">')
+                // Single newlines within paragraphs
+                .replace(/\n/g, '<br>');
+            return '<p style="margin-bottom:6px;">' + html + '</p>';
+        }
+
+        // Add fadeIn animation
+        if (!document.getElementById('research-styles')) {
+            const style = document.createElement('style');
+            style.id = 'research-styles';
+            style.textContent = '@keyframes fadeIn { from { opacity: 0; transform: translateY(4px); } to { opacity: 1; transform: translateY(0); } }';
+            document.head.appendChild(style);
+        }
+
+        // ===== CHECKLIST COUNTER =====
+        document.addEventListener('change', function(e) {
+            if (e.target.id && e.target.id.startsWith('chk-')) {
+                const checks = ['chk-ewros','chk-distribution','chk-market','chk-rr','chk-position','chk-earnings','chk-thesis'];
+                const passed = checks.filter(id => document.getElementById(id)?.checked).length;
+                const el = document.getElementById('checklist-score');
+                if (el) {
+                    el.textContent = `${passed}/7 checks passed`;
+                    el.style.color = passed >= 5 ? '#10b981' : passed >= 3 ? '#eab308' : '#ef4444';
+                }
+            }
+        });
+
+    
\ No newline at end of file
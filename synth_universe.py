@@ -0,0 +1,237 @@
+"""
+Synthetic Universe — statistically realistic stock universes for scale testing (10k–100k tickers).
+
+Grows the real universe (data/all_stocks.json) to N tickers. Every real record is kept; the rest are
+synthetic, each assembled from independently drawn blocks of real records so that the joint
+structure that matters stays intact while the universe does not collapse into copies:
+
+- identity: new ticker and company name, sector/industry drawn from the real joint distribution
+- scoring: score, grade, component scores, moonshot_score and criteria from one real record of
+  the same sector (criteria points add up to the score, exactly as the scanner writes them)
+- fundamentals: valuation/analyst fields from another same-sector record, price and market cap
+  jittered log-normally (target_mean moves with price)
+- EWROS: ewros_score/raw/trend/prior and ewros_stats from one record, iq_edge from another
+
+Matching side files are derived from the generated records: top_stocks.json (top 100 by score,
+total_stocks = A/B count, as the scanner writes it), insider_universe.json (signals drawn from the
+real insider scan for a realistic share of tickers) and rotation_snapshots.json (a few recent
+trading days for the strongest EWROS names). Output is deterministic for a given seed.
+
+Usage:
+  python3 synth_universe.py 50000 /tmp/universe-50k        # writes /tmp/universe-50k/data/*.json
+  python3 synth_universe.py 100k /tmp/u --seed 3
+  INVESTIQ_DATA_ROOT=/tmp/universe-50k python3 bench_research.py --queries hunter
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import string
+from collections import defaultdict
+
+BASE = os.path.dirname(os.path.abspath(__file__))
+
+SCORING_FIELDS = ("score", "grade", "max_score", "technical_score", "growth_score", "quality_score",
+                  "context_score", "moonshot_score", "criteria")
+FUNDAMENTAL_FIELDS = ("market_cap", "revenue_growth", "earnings_growth", "forward_pe", "trailing_pe",
+                      "peg_ratio", "recommendation", "target_mean", "analyst_count", "current_price")
+EWROS_FIELDS = ("ewros_score", "ewros_raw", "ewros_trend", "ewros_prior", "ewros_stats")
+IQ_FIELDS = ("iq_edge", "iq_edge_raw")
+# Keys of a top_stocks.json record (the scanner writes it before EWROS / IQ Edge are merged in)
+TOP_FIELDS = ("ticker", "name", "sector", "industry") + SCORING_FIELDS + FUNDAMENTAL_FIELDS + ("ewros_score",)
+TOP_N = 100
+
+INSIDER_COVERAGE = 0.35  # share of tickers with Form 4 activity in the lookback window
+ROTATION_SHARE = 0.01  # share of the universe tracked in rotation snapshots (at least the real count)
+ROTATION_DATES = ["2026-03-05", "2026-03-06", "2026-03-09", "2026-03-10", "2026-03-11"]
+
+_NAME_HEADS = ["Apex", "Blue", "Cardinal", "Delta", "Evergreen", "First", "Granite", "Harbor", "Iron", "Juniper",
+               "Keystone", "Liberty", "Meridian", "North", "Orion", "Pinnacle", "Quantum", "River", "Summit",
+               "Titan", "Union", "Vertex", "West", "Zenith"]
+_NAME_TAILS = ["Analytics", "Bancorp", "Biosciences", "Brands", "Capital", "Dynamics", "Energy", "Foods",
+               "Holdings", "Industries", "Logistics", "Materials", "Networks", "Pharmaceuticals", "Realty",
+               "Semiconductor", "Systems", "Technologies", "Therapeutics", "Utilities"]
+_NAME_SUFFIXES = ["Inc.", "Corporation", "Group, Inc.", "Holdings Corp.", "Co.", "Ltd.", "plc"]
+
+
+def _load(name):
+    try:
+        with open(os.path.join(BASE, "data", name)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def parse_size(label):
+    label = str(label).lower()
+    return int(float(label[:-1]) * 1000) if label.endswith("k") else int(label)
+
+
+def _ticker(rng, taken):
+    while True:
+        t = "".join(rng.choice(string.ascii_uppercase) for _ in range(rng.choice((3, 4, 4, 4, 5))))
+        if t not in taken:
+            taken.add(t)
+            return t
+
+
+def _jitter(value, rng, sigma):
+    return value * math.exp(rng.gauss(0, sigma)) if isinstance(value, (int, float)) else value
+
+
+def _synthetic_record(ticker, sector_pool, all_records, rng):
+    identity = rng.choice(all_records)
+    sector = identity["sector"]
+    peers = sector_pool[sector]
+    scoring, fundamentals = rng.choice(peers), rng.choice(peers)
+    ewros, iq = rng.choice(all_records), rng.choice(all_records)
+
+    rec = {"ticker": ticker,
+           "name": f"{rng.choice(_NAME_HEADS)} {rng.choice(_NAME_TAILS)} {rng.choice(_NAME_SUFFIXES)}",
+           "sector": sector, "industry": identity["industry"]}
+    for field in SCORING_FIELDS:
+        if field in scoring:
+            rec[field] = scoring[field]  # criteria lists are shared, not copied: records are read-only
+    price_factor = math.exp(rng.gauss(0, 0.35))
+    for field in FUNDAMENTAL_FIELDS:
+        rec[field] = fundamentals.get(field)
+    for field in ("current_price", "target_mean"):
+        if isinstance(rec[field], (int, float)):
+            rec[field] = round(rec[field] * price_factor, 2)
+    if isinstance(rec["market_cap"], (int, float)):
+        rec["market_cap"] = int(_jitter(rec["market_cap"], rng, 0.6))
+    for field in ("revenue_growth", "earnings_growth"):
+        if isinstance(rec[field], (int, float)):
+            rec[field] = round(rec[field] + rng.gauss(0, 3), 1)
+    for field in EWROS_FIELDS:
+        rec[field] = ewros.get(field)
+    for field in IQ_FIELDS:
+        rec[field] = iq.get(field)
+    return rec
+
+
+def generate_stocks(n, seed=7):
+    """The all_stocks.json payload for an n-ticker universe (real records first)."""
+    real = _load("all_stocks.json")
+    records = list(real.get("stocks", {}).values())
+    if not records:
+        raise RuntimeError("data/all_stocks.json is missing or empty — it is the seed distribution")
+    rng = random.Random(seed)
+    sector_pool = defaultdict(list)
+    for rec in records:
+        sector_pool[rec["sector"]].append(rec)
+
+    stocks = {rec["ticker"]: rec for rec in records[:n]}
+    taken = set(stocks)
+    while len(stocks) < n:
+        ticker = _ticker(rng, taken)
+        stocks[ticker] = _synthetic_record(ticker, sector_pool, records, rng)
+    return {**{k: v for k, v in real.items() if k != "stocks"}, "total_stocks": len(stocks), "stocks": stocks}
+
+
+def generate_top_stocks(all_stocks):
+    stocks = list(all_stocks["stocks"].values())
+    ranked = sorted((s for s in stocks if s.get("grade") != "ETF"), key=lambda s: s.get("score") or 0,
+                    reverse=True)
+    real = _load("top_stocks.json")
+    return {
+        "version": real.get("version", all_stocks.get("version")),
+        "max_score": 100,
+        "last_scan": all_stocks.get("last_scan"),
+        "total_stocks": sum(1 for s in stocks if s.get("grade") in ("A", "B")),
+        "stocks": [{k: s[k] for k in TOP_FIELDS if k in s} for s in ranked[:TOP_N]],
+    }
+
+
+def _quiet_signal():
+    return {"ins_score": 0, "signal": "neutral", "signal_emoji": "⚪", "transactions": 0, "buys": 0, "sells": 0,
+            "total_buy_value": 0, "total_sell_value": 0, "reasons": [], "details": []}
+
+
+def generate_insider_universe(all_stocks, seed=7):
+    """insider_universe.json: real scan results where available, drawn from them elsewhere."""
+    rng = random.Random(seed + 1)
+    real_signals = (_load("insider_universe.json") or _load("insider_signals.json")).get("signals", {})
+    donors = list(real_signals.values())
+    signals = {}
+    for ticker, rec in all_stocks["stocks"].items():
+        if ticker in real_signals:
+            signals[ticker] = real_signals[ticker]
+        elif rec.get("grade") != "ETF" and rng.random() < INSIDER_COVERAGE:
+            donor = rng.choice(donors) if donors else _quiet_signal()
+            scale = math.exp(rng.gauss(0, 0.8))
+            signals[ticker] = {
+                **donor,
+                "total_buy_value": round(donor.get("total_buy_value", 0) * scale),
+                "total_sell_value": round(donor.get("total_sell_value", 0) * scale),
+                "details": [{**d, "value": round(d.get("value", 0) * scale)} for d in donor.get("details", [])],
+            }
+    return {"scan_date": "2026-03-12 18:07:15", "lookback_days": 90,
+            "tickers_scanned": len(all_stocks["stocks"]), "signals": signals}
+
+
+def _tier(ewros_score):
+    if ewros_score is None or ewros_score < 50:
+        return "SELL"
+    return "HOLD" if ewros_score >= 60 else "WATCH"
+
+
+def generate_rotation_snapshots(all_stocks, seed=7):
+    """rotation_snapshots.json: daily price/EWROS/tier history for the strongest EWROS names."""
+    rng = random.Random(seed + 2)
+    snapshots = dict(_load("rotation_snapshots.json"))
+    count = max(len(snapshots), int(len(all_stocks["stocks"]) * ROTATION_SHARE))
+    leaders = sorted(all_stocks["stocks"].values(), key=lambda s: s.get("ewros_score") or 0, reverse=True)
+    for rec in leaders:
+        if len(snapshots) >= count:
+            break
+        if rec["ticker"] in snapshots or not isinstance(rec.get("current_price"), (int, float)):
+            continue
+        price, score = rec["current_price"], rec.get("ewros_score") or 0
+        history = {}
+        for date in reversed(ROTATION_DATES):
+            history[date] = {"price": round(price, 2), "ewros_score": score, "tier": _tier(score)}
+            price /= math.exp(rng.gauss(0.001, 0.02))
+            score = max(0, min(100, score + round(rng.gauss(0, 4))))
+        snapshots[rec["ticker"]] = dict(sorted(history.items()))
+    return snapshots
+
+
+def generate(n, seed=7):
+    """{file name: payload} for every data file of an n-ticker universe."""
+    all_stocks = generate_stocks(n, seed)
+    return {
+        "all_stocks.json": all_stocks,
+        "top_stocks.json": generate_top_stocks(all_stocks),
+        "insider_universe.json": generate_insider_universe(all_stocks, seed),
+        "rotation_snapshots.json": generate_rotation_snapshots(all_stocks, seed),
+    }
+
+
+def write(n, root, seed=7):
+    """Write the universe to root/data/ (the layout app.py and agent_committee.py read). Returns the paths."""
+    data_dir = os.path.join(root, "data")
+    os.makedirs(data_dir, exist_ok=True)
+    paths = []
+    for name, payload in generate(n, seed).items():
+        path = os.path.join(data_dir, name)
+        with open(path, "w") as f:
+            json.dump(payload, f, separators=(",", ":"))
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic n-ticker universe for scale testing")
+    parser.add_argument("size", help="ticker count, e.g. 10000 or 50k")
+    parser.add_argument("root", help="output directory (files go to ROOT/data/)")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    for path in write(parse_size(args.size), args.root, args.seed):
+        print(f"{path}: {os.path.getsize(path) // 1024} KB")
+
+
+if __name__ == "__main__":
+    main()